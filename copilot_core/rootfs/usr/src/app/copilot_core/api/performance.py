@@ -12,6 +12,8 @@ from ..performance import (
     api_response_cache,
     sql_pool,
     async_executor,
+    get_connection_pools,
+    get_connection_pool_stats,
     perf_monitor,
     get_performance_stats,
     reset_performance_stats,
@@ -94,15 +96,19 @@ def invalidate_pattern() -> Dict[str, Any]:
     JSON body:
     - cache: brain_graph, ml, or api
     - pattern: string to match in cache keys
+    - tags: list of dependency tags (e.g. ["view:entity|light"])
     """
     from flask import request
     
     data = request.get_json() or {}
     cache_name = data.get("cache", "")
     pattern = data.get("pattern", "")
+    tags = data.get("tags") or []
     
-    if not pattern:
-        return jsonify({"error": "pattern is required"}), 400
+    if not pattern and not tags:
+        return jsonify({"error": "pattern or tags is required"}), 400
+    if not isinstance(tags, list):
+        return jsonify({"error": "tags must be a list"}), 400
     
     cache_map = {
         "brain_graph": brain_graph_cache,
@@ -113,17 +119,16 @@ def invalidate_pattern() -> Dict[str, Any]:
     if cache_name and cache_name not in cache_map:
         return jsonify({"error": f"Unknown cache: {cache_name}"}), 400
     
-    if cache_name:
-        # Invalidate specific cache
-        count = cache_map[cache_name].invalidate_pattern(pattern)
-    else:
-        # Invalidate all caches
-        count = 0
-        for cache in cache_map.values():
+    caches = [cache_map[cache_name]] if cache_name else list(cache_map.values())
+    count = 0
+    for cache in caches:
+        if pattern:
             count += cache.invalidate_pattern(pattern)
+        if tags:
+            count += cache.invalidate_tags(tags)
     
     return jsonify({
-        "message": f"Invalidated {count} cache entries matching '{pattern}'",
+        "message": f"Invalidated {count} cache entries matching '{pattern or tags}'",
         "count": count,
         "timestamp_ms": int(time.time() * 1000),
     })
@@ -148,11 +153,12 @@ def cleanup_expired_caches() -> Dict[str, Any]:
 @performance_bp.route('/pool/status', methods=['GET'])
 @require_api_key
 def get_pool_status() -> Dict[str, Any]:
-    """Get connection pool status."""
+    """Get connection pool status (default pool plus named component pools)."""
     return jsonify({
         "version": 1,
         "timestamp_ms": int(time.time() * 1000),
         **sql_pool.get_stats(),
+        "pools": get_connection_pool_stats(),
     })
 
 
@@ -161,6 +167,8 @@ def get_pool_status() -> Dict[str, Any]:
 def cleanup_pool() -> Dict[str, Any]:
     """Clean up idle connections in the pool."""
     removed = sql_pool.cleanup_idle()
+    for pool in get_connection_pools().values():
+        removed += pool.cleanup_idle()
     
     return jsonify({
         "message": f"Removed {removed} idle connections",
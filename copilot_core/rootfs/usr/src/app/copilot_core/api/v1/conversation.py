@@ -880,6 +880,8 @@ def _store_in_memory(content: str, role: str = "user"):
             embedding_engine = services.get("embedding_engine")
             if vector_store and embedding_engine and msg_id:
                 try:
+                    from copilot_core.vector_store.embeddings import TEXT_BAG_MODEL
+
                     vec = embedding_engine.embed_text_sync(content)
                     vector_store.upsert_sync(
                         entry_id=f"conv:{msg_id}",
@@ -890,6 +892,7 @@ def _store_in_memory(content: str, role: str = "user"):
                             "snippet": content[:200],
                             "timestamp": time.time(),
                             "character": character,
+                            "embedding_model": TEXT_BAG_MODEL,
                         },
                     )
                 except Exception:
@@ -7,6 +7,7 @@ Endpoints:
     POST /api/v1/events          – Ingest a batch of event envelopes
     GET  /api/v1/events          – Query stored events (with filters)
     GET  /api/v1/events/stats    – Store statistics / health
+    GET  /api/v1/events/pipeline – Post-ingest queue depth and stage lag
 """
 from __future__ import annotations
 
@@ -17,6 +18,7 @@ from copilot_core.api.security import require_token
 from copilot_core.api.validation import validate_json
 from copilot_core.api.v1.schemas import BatchEventPayload
 from copilot_core.ingest.event_store import EventStore
+from copilot_core.ingest.pipeline import IngestPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,10 @@ _store: EventStore | None = None
 # Post-ingest callback – called with list of accepted events after each batch
 _post_ingest_callback = None
 
+# Async post-ingest pipeline – when set, accepted batches are queued instead
+# of running the callback inside the request
+_pipeline: IngestPipeline | None = None
+
 
 def set_post_ingest_callback(callback) -> None:
     """Register a callback invoked after each successful ingest batch.
@@ -39,6 +45,17 @@ def set_post_ingest_callback(callback) -> None:
     _post_ingest_callback = callback
 
 
+def set_ingest_pipeline(pipeline: IngestPipeline | None) -> None:
+    """Route accepted batches through an async pipeline (None = synchronous)."""
+    global _pipeline
+    _pipeline = pipeline
+
+
+def get_ingest_pipeline() -> IngestPipeline | None:
+    """Return the active post-ingest pipeline, if any."""
+    return _pipeline
+
+
 def get_store() -> EventStore:
     """Return (and lazily create) the global EventStore singleton."""
     global _store
@@ -70,9 +87,11 @@ def ingest_events(body: BatchEventPayload):
     store = get_store()
     result = store.ingest_batch(body.items)
 
-    # Fire post-ingest callback (e.g. EventProcessor → Brain Graph)
+    # Hand off to post-ingest consumers (e.g. EventProcessor → Brain Graph)
     accepted_events = result.pop("accepted_events", [])
-    if accepted_events and _post_ingest_callback:
+    if accepted_events and _pipeline is not None:
+        result["queued"] = _pipeline.submit(accepted_events)
+    elif accepted_events and _post_ingest_callback:
         try:
             _post_ingest_callback(accepted_events)
         except Exception as exc:
@@ -118,3 +137,14 @@ def events_stats():
     """Return event store statistics for operator diagnostics."""
     store = get_store()
     return jsonify(store.stats()), 200
+
+
+# ── GET /api/v1/events/pipeline ─────────────────────────────────────
+
+@bp.route("/api/v1/events/pipeline", methods=["GET"])
+@require_token
+def events_pipeline():
+    """Return post-ingest queue depth, drop counters and per-stage lag."""
+    if _pipeline is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **_pipeline.stats()}), 200
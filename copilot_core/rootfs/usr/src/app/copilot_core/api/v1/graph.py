@@ -3,9 +3,10 @@ from __future__ import annotations
 import time
 import hashlib
 import json
-from flask import Blueprint, jsonify, make_response, request
+from flask import Blueprint, Response, jsonify, make_response, request
 
 from copilot_core.brain_graph.provider import get_graph_service
+from copilot_core.brain_graph.service import cached_graph_state_json
 from copilot_core.performance import brain_graph_cache
 
 bp = Blueprint("graph", __name__, url_prefix="/graph")
@@ -71,19 +72,13 @@ def graph_state():
         limit_edges=limit_edges
     )
     
-    # Try cache first (unless nocache)
-    if not nocache:
-        cached_result = brain_graph_cache.get(cache_key)
-        if cached_result is not None:
-            # Copy to avoid mutating shared cached dict across threads
-            result = {**cached_result, "_cached": True}
-            return jsonify(result)
-
     # Convert query params to match BrainGraphService.get_graph_state signature
     kinds = [k for k in kinds if isinstance(k, str)]
     domains = [d for d in domains if isinstance(d, str)]
-    
-    state = _svc().get_graph_state(
+    body = cached_graph_state_json(
+        _svc(),
+        cache_key,
+        nocache=nocache,
         kinds=kinds if kinds else None,
         domains=domains if domains else None,
         center_node=center if center else None,
@@ -91,12 +86,7 @@ def graph_state():
         limit_nodes=limit_nodes,
         limit_edges=limit_edges,
     )
-    
-    # Cache the result
-    brain_graph_cache.set(cache_key, state, ttl=30.0)
-    state["_cached"] = False
-    
-    return jsonify(state)
+    return Response(body, mimetype="application/json")
 
 
 @bp.get("/stats")
@@ -120,6 +110,8 @@ def graph_stats():
             "hits": cache_stats["hits"],
             "misses": cache_stats["misses"],
             "hit_rate": round(cache_stats["hit_rate"], 3),
+            "generation": cache_stats["generation"],
+            "tag_invalidations": cache_stats["tag_invalidations"],
         }
     })
 
@@ -51,6 +51,7 @@ def get_status():
             "status": "ok",
             "version": "0.1.0",
             "statistics": stats,
+            "incremental": service.get_pair_stats().stats(),
             "config": {
                 "windows": service.config.windows,
                 "min_support_A": service.config.min_support_A,
@@ -210,7 +211,9 @@ def mine_rules():
         service = _get_service()
         start_time = time.time()
         
-        rules = service.mine_from_ha_events(ha_events)
+        rules = service.mine_from_ha_events(
+            ha_events, incremental=bool(data.get("incremental", False))
+        )
         
         mining_time = time.time() - start_time
         
@@ -403,6 +403,9 @@ def vector_stats():
         asyncio.set_event_loop(loop)
         
         stats = loop.run_until_complete(_store().stats())
+        ollama = _engine().ollama_stats()
+        if ollama is not None:
+            stats["ollama_embeddings"] = ollama
         
         return jsonify({
             "ok": True,
@@ -468,29 +471,28 @@ def create_embeddings_bulk(body: BulkEmbeddingRequest):
             "patterns": {"created": 0, "failed": 0},
         }
         
-        # Process entities
+        # Process entities (one batched embed + commit)
+        batch = []
         for entity in entities:
-            try:
-                entity_id = entity.get("id") or entity.get("entity_id")
-                if not entity_id:
-                    results["entities"]["failed"] += 1
-                    continue
-                    
-                loop.run_until_complete(
-                    _store().store_entity_embedding(
-                        entity_id=entity_id,
-                        domain=entity.get("domain"),
-                        area=entity.get("area"),
-                        capabilities=entity.get("capabilities"),
-                        tags=entity.get("tags"),
-                        state=entity.get("state"),
-                        metadata=entity.get("metadata"),
-                    )
-                )
-                results["entities"]["created"] += 1
-            except Exception as e:
-                _LOGGER.warning("Failed to create entity embedding: %s", e)
+            entity_id = entity.get("id") or entity.get("entity_id")
+            if not entity_id:
                 results["entities"]["failed"] += 1
+                continue
+            batch.append({
+                "entity_id": entity_id,
+                "domain": entity.get("domain"),
+                "area": entity.get("area"),
+                "capabilities": entity.get("capabilities"),
+                "tags": entity.get("tags"),
+                "state": entity.get("state"),
+                "metadata": entity.get("metadata"),
+            })
+        try:
+            loop.run_until_complete(_store().store_entity_embeddings_batch(batch))
+            results["entities"]["created"] += len(batch)
+        except Exception as e:
+            _LOGGER.warning("Failed to create entity embeddings: %s", e)
+            results["entities"]["failed"] += len(batch)
                 
         # Process user preferences
         for pref in user_preferences:
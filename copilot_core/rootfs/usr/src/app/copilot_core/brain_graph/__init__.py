@@ -9,7 +9,10 @@ Submodules:
 - store: Persistent graph storage (SQLite)
 - service: High-level graph operations
 - bridge: Bridge to Candidates Store for pattern extraction
-- render: DOT/SVG graph rendering
+- snapshot: In-memory materialized graph served by the service
+- stream: Coalescing SSE live-update stream
+- render: DOT/SVG graph rendering with render cache
+- layout: Warm-startable force-directed layout
 """
 
 from .model import GraphNode, GraphEdge
@@ -8,8 +8,8 @@ import json
 from flask import Blueprint, request, jsonify, Response
 from typing import Dict, Any, Optional
 
-from .service import BrainGraphService
-from .render import GraphRenderer
+from .service import BrainGraphService, cached_graph_state_json
+from .render import GRAPHVIZ_LAYOUTS, GraphRenderer
 from ..api.security import require_api_key
 from ..performance import brain_graph_cache, api_response_cache, QueryCache
 
@@ -28,6 +28,7 @@ def _compute_cache_key(prefix: str, **params) -> str:
     content = f"{prefix}:{sorted_params}"
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
+
 def init_brain_graph_api(service: BrainGraphService, renderer: GraphRenderer = None):
     """Initialize the brain graph API with service instances."""
     global _brain_graph_service, _graph_renderer
@@ -77,13 +78,6 @@ def get_graph_state() -> Response:
             limit_edges=limit_edges
         )
         
-        # Try cache first (unless nocache)
-        if not nocache:
-            cached_result = brain_graph_cache.get(cache_key)
-            if cached_result is not None:
-                cached_result["_cached"] = True
-                return jsonify(cached_result)
-        
         # Validate parameters
         if hops < 1 or hops > 3:
             return jsonify({"error": "hops must be between 1 and 3"}), 400
@@ -93,8 +87,10 @@ def get_graph_state() -> Response:
             if kind not in valid_kinds:
                 return jsonify({"error": f"Invalid kind: {kind}"}), 400
         
-        # Get graph state
-        state = _brain_graph_service.get_graph_state(
+        body = cached_graph_state_json(
+            _brain_graph_service,
+            cache_key,
+            nocache=nocache,
             kinds=kinds or None,
             domains=domains or None,
             center_node=center,
@@ -102,12 +98,7 @@ def get_graph_state() -> Response:
             limit_nodes=limit_nodes,
             limit_edges=limit_edges
         )
-        
-        # Cache the result (30 second TTL for graph state)
-        brain_graph_cache.set(cache_key, state, ttl=30.0)
-        state["_cached"] = False
-        
-        return jsonify(state)
+        return Response(body, mimetype='application/json')
         
     except ValueError as e:
         return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
@@ -125,7 +116,7 @@ def get_graph_snapshot() -> Response:
     
     Query parameters:
     - Same as /state plus:
-    - layout: dot, neato, fdp (default dot)
+    - layout: dot, neato, fdp, circo, twopi, force (default dot)
     - theme: light, dark (default light)
     - label: short, full (default short)
     """
@@ -151,7 +142,7 @@ def get_graph_snapshot() -> Response:
         limit_edges = _parse_int_param('limitEdges', default=300, max_value=300)
         
         # Validate parameters
-        if layout not in ['dot', 'neato', 'fdp', 'circo', 'twopi']:
+        if layout not in GRAPHVIZ_LAYOUTS + ('force',):
             layout = 'dot'
         if theme not in ['light', 'dark']:
             theme = 'light'
@@ -170,12 +161,13 @@ def get_graph_snapshot() -> Response:
             limit_edges=limit_edges
         )
         
-        # Render as SVG
+        # Render as SVG (views that look unchanged come from the render cache)
         svg_bytes = _graph_renderer.render_svg(
             graph_state=state,
             layout=layout,
             theme=theme,
-            label_style=label_style
+            label_style=label_style,
+            view=(tuple(kinds), tuple(domains), center, hops, limit_nodes, limit_edges),
         )
         
         return Response(svg_bytes, mimetype='image/svg+xml')
@@ -223,7 +215,11 @@ def get_graph_stats() -> Response:
                 "misses": cache_stats["misses"],
                 "hit_rate": round(cache_stats["hit_rate"], 3),
                 "evictions": cache_stats["evictions"],
-            }
+                "generation": cache_stats["generation"],
+                "tag_invalidations": cache_stats["tag_invalidations"],
+                "tags": brain_graph_cache.get_tag_stats(),
+            },
+            "render": _graph_renderer.get_stats() if _graph_renderer else None,
         })
     except Exception as e:
         # Security: Don't leak internal error details
@@ -423,26 +419,49 @@ def _parse_int_param(param_name: str, default: int = None, max_value: int = None
 def stream_graph_updates() -> Response:
     """SSE endpoint for real-time brain graph updates.
 
-    Streams node_updated, edge_updated, and graph_pruned events.
+    Streams coalesced node_updated, edge_updated and graph_pruned events,
+    one per message (``{"event", "data", "timestamp_ms", "seq"}``). With
+    ``?batch=1`` each message is instead one batch
+    (``{"event": "batch", "seq", "events": [...]}``). The SSE ``id`` is the
+    sequence number everything before it is covered up to. Reconnecting
+    clients resume from ``Last-Event-ID`` (header, or ``lastEventId`` query
+    parameter); a ``{"event": "resync"}`` message means the gap could not
+    be replayed and the client should re-read ``/api/v1/graph/state``.
     Client connects with: ``new EventSource('/api/v1/graph/stream')``.
     """
     if not _brain_graph_service:
         return jsonify({"error": "Brain graph service not initialized"}), 503
 
-    import queue as _queue
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('lastEventId'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = -1  # unparseable: resync
 
-    subscriber = _brain_graph_service.subscribe_sse()
+    batch = request.args.get('batch', '0') == '1'
+    subscriber = _brain_graph_service.subscribe_sse(last_event_id)
 
     def generate():
         try:
             # Send initial connected event
-            yield f"data: {json.dumps({'event': 'connected', 'timestamp_ms': int(time.time() * 1000)})}\n\n"
+            connected = {'event': 'connected', 'seq': subscriber.last_seq,
+                         'timestamp_ms': int(time.time() * 1000)}
+            yield f"data: {json.dumps(connected)}\n\n"
             while True:
-                try:
-                    msg = subscriber.get(timeout=30.0)
-                    yield f"data: {json.dumps(msg)}\n\n"
-                except _queue.Empty:
+                frame = subscriber.next_frame(timeout=30.0)
+                if frame is None:
                     yield ": keepalive\n\n"
+                    continue
+                if frame.get("resync"):
+                    messages = [{"event": "resync", "seq": frame["seq"]}]
+                elif batch:
+                    messages = [{"event": "batch", **frame}]
+                else:
+                    messages = frame["events"]
+                # Only the last message of a frame advances Last-Event-ID
+                for i, message in enumerate(messages):
+                    id_line = f"id: {frame['seq']}\n" if i == len(messages) - 1 else ""
+                    yield f"{id_line}data: {json.dumps(message, separators=(',', ':'), default=str)}\n\n"
         except GeneratorExit:
             pass
         finally:
@@ -452,4 +471,4 @@ def stream_graph_updates() -> Response:
         generate(),
         mimetype='text/event-stream',
         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
-    )
\ No newline at end of file
+    )
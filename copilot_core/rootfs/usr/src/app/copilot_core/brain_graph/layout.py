@@ -0,0 +1,104 @@
+"""Force-directed layout for brain graph rendering.
+
+Fruchterman-Reingold with numpy: all-pairs repulsion as one broadcast per
+iteration, spring attraction along edges (scaled by edge weight) with
+``np.add.at``, a pull toward the centroid that keeps disconnected parts
+together, and displacement capped by a cooling temperature. A bounded
+render (~120 nodes) takes a few milliseconds warm, tens cold.
+
+Given the previous positions of a view the layout warm-starts: known nodes
+keep their coordinates, new nodes are placed next to their already-placed
+neighbors, and a short low-temperature run settles the change without
+reshuffling the rest of the picture.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Position = Tuple[float, float]
+
+COLD_ITERATIONS = 200
+WARM_ITERATIONS = 40
+_MIN_DISTANCE = 0.01
+# Pull toward the centroid so disconnected components do not drift apart
+GRAVITY = 3.0
+
+
+def _seed(node_ids: List[str]) -> int:
+    """Deterministic RNG seed per node set (stable renders across restarts)."""
+    digest = hashlib.sha1("\0".join(sorted(node_ids)).encode()).digest()
+    return int.from_bytes(digest[:4], "little")
+
+
+def force_layout(
+    node_ids: List[str],
+    edges: Iterable[Tuple[str, str, float]],
+    initial: Optional[Dict[str, Position]] = None,
+    width: float = 800.0,
+    height: float = 600.0,
+    iterations: Optional[int] = None,
+) -> Dict[str, Position]:
+    """Positions for *node_ids*; *edges* are ``(from, to, weight)``.
+
+    Nodes found in *initial* start from (and mostly stay at) their previous
+    position; with no overlap this is a cold layout in a ``width`` x
+    ``height`` frame.
+    """
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    pairs = [(index[a], index[b], w) for a, b, w in edges if a in index and b in index and a != b]
+    src = np.array([p[0] for p in pairs], dtype=np.intp)
+    dst = np.array([p[1] for p in pairs], dtype=np.intp)
+    weight = np.clip(np.array([p[2] for p in pairs], dtype=float), 0.1, 5.0)
+
+    rng = np.random.default_rng(_seed(node_ids))
+    initial = initial or {}
+    known = np.array([node_id in initial for node_id in node_ids], dtype=bool)
+    pos = np.empty((n, 2))
+    if known.any():
+        pos[known] = [initial[node_id] for node_id, k in zip(node_ids, known) if k]
+        lo, hi = pos[known].min(axis=0), pos[known].max(axis=0)
+        span = np.maximum(hi - lo, 1.0)
+        # New nodes start at the centroid of their placed neighbors
+        for i in np.flatnonzero(~known):
+            neighbors = [b for a, b in zip(src, dst) if a == i and known[b]]
+            neighbors += [a for a, b in zip(src, dst) if b == i and known[a]]
+            anchor = pos[neighbors].mean(axis=0) if neighbors else (lo + hi) / 2
+            pos[i] = anchor + rng.normal(scale=0.05 * span.mean(), size=2)
+        warm = True
+    else:
+        pos[:] = rng.random((n, 2)) * (width, height)
+        warm = False
+
+    if iterations is None:
+        iterations = WARM_ITERATIONS if warm else COLD_ITERATIONS
+    area = width * height
+    k = math.sqrt(area / n)
+    # Max step per iteration; placed nodes of a warm start move only a little
+    temperature = np.full(n, 0.1 * math.sqrt(area))
+    if warm:
+        temperature[known] *= 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        dx = pos[:, 0, None] - pos[None, :, 0]
+        dy = pos[:, 1, None] - pos[None, :, 1]
+        force = (k * k) / np.maximum(dx * dx + dy * dy, _MIN_DISTANCE ** 2)
+        disp = np.stack([(dx * force).sum(axis=1), (dy * force).sum(axis=1)], axis=1)
+        if pairs:
+            d = pos[src] - pos[dst]
+            length = np.maximum(np.sqrt((d ** 2).sum(axis=-1)), _MIN_DISTANCE)
+            pull = d * (length * weight / k)[:, None]
+            np.add.at(disp, src, -pull)
+            np.add.at(disp, dst, pull)
+        disp -= GRAVITY * (pos - pos.mean(axis=0))
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=-1)), _MIN_DISTANCE)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(node_ids, pos)}
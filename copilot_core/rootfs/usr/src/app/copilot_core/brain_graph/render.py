@@ -1,9 +1,84 @@
 """
 DOT/SVG rendering for brain graph visualization.
+
+Rendered SVGs are cached by what they draw – the selected nodes and edges
+with the attributes that appear in the picture (scores and weights rounded
+as they are displayed) – plus view, layout, theme and label style, for at
+most ``cache_ttl`` seconds. Touches elsewhere in the graph, or decay too
+small to show, do not invalidate a view, so repeated requests for it never
+reach Graphviz.
+For the force-directed layouts (``force``, ``neato``, ``fdp``) the renderer
+also remembers node positions per view: when the graph changed only a
+little, it relayouts in-process with :func:`.layout.force_layout`,
+warm-started from those positions, and writes the SVG itself. Graphviz is
+only run for full re-renders (first render of a view, large changes, the
+hierarchical/circular layouts); its node positions seed the next warm
+start. ``force`` never uses Graphviz, and the other force layouts fall
+back to it when Graphviz is not installed.
 """
 
+import re
 import subprocess
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Any, Tuple
+
+from .layout import Position, force_layout
+
+GRAPHVIZ_LAYOUTS = ("dot", "neato", "fdp", "circo", "twopi")
+FORCE_LAYOUTS = ("force", "neato", "fdp")
+
+_THEMES = {
+    "dark": {
+        "bg": "#2b2b2b",
+        "text": "#ffffff",
+        "edge": "#666666",
+        "nodes": {
+            "entity": "#4CAF50",
+            "zone": "#2196F3",
+            "device": "#FF9800",
+            "person": "#E91E63",
+            "concept": "#9C27B0",
+            "module": "#607D8B",
+            "event": "#FF5722"
+        },
+    },
+    "light": {
+        "bg": "#ffffff",
+        "text": "#000000",
+        "edge": "#999999",
+        "nodes": {
+            "entity": "#8BC34A",
+            "zone": "#03A9F4",
+            "device": "#FFC107",
+            "person": "#F06292",
+            "concept": "#AB47BC",
+            "module": "#78909C",
+            "event": "#FF7043"
+        },
+    },
+}
+
+# Graphviz SVG: node group title (the DOT id) followed by its label position
+_SVG_NODE_RE = re.compile(
+    r'<g id="node\d+" class="node">\s*<title>([^<]*)</title>.*?'
+    r'<text[^>]*?\bx="(-?[\d.]+)" y="(-?[\d.]+)"',
+    re.DOTALL,
+)
+
+
+def _edge_style(edge_type: str) -> Tuple[str, str]:
+    """(line style, arrowhead) for an edge type."""
+    if edge_type in ["correlates", "observed_with"]:
+        return "dashed", "none"
+    if edge_type == "in_zone":
+        return "dotted", "normal"
+    return "solid", "normal"
+
+
+def _node_shape(kind: str) -> str:
+    return {"zone": "box", "concept": "diamond", "module": "hexagon"}.get(kind, "ellipse")
 
 
 class GraphRenderer:
@@ -12,19 +87,60 @@ class GraphRenderer:
     def __init__(
         self,
         max_render_nodes: int = 120,
-        max_render_edges: int = 300
+        max_render_edges: int = 300,
+        cache_size: int = 64,
+        relayout_max_new: float = 0.25,
+        cache_ttl: float = 300.0,
     ):
         self.max_render_nodes = max_render_nodes
         self.max_render_edges = max_render_edges
-    
+        self.cache_size = max(1, cache_size)
+        # Upper bound on the age of a cached SVG, in seconds
+        self.cache_ttl = cache_ttl
+        # Share of new nodes up to which a view is relaid out incrementally
+        self.relayout_max_new = relayout_max_new
+        self._lock = threading.Lock()
+        self._svg_cache: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._positions: "OrderedDict[Hashable, Dict[str, Position]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "incremental": 0, "full": 0, "graphviz": 0}
+
+    @staticmethod
+    def _content_key(
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        label_style: str,
+    ) -> Tuple:
+        """Everything of the selection that shows up in the rendered SVG."""
+        full = label_style == "full"
+        return (
+            tuple(
+                (n["id"], n.get("kind"), n.get("label"), n.get("domain") if full else None,
+                 round(n.get("score", 0), 1) if full else None)
+                for n in nodes
+            ),
+            tuple(
+                (e["from"], e["to"], e.get("type"), round(max(1.0, min(5.0, e.get("weight", 1.0))), 1))
+                for e in edges
+            ),
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "cached_svgs": len(self._svg_cache), "views": len(self._positions)}
+
     def render_svg(
         self,
         graph_state: Dict[str, Any],
         layout: str = "dot",
         theme: str = "light", 
-        label_style: str = "short"
+        label_style: str = "short",
+        view: Hashable = None,
     ) -> bytes:
-        """Render graph state as SVG."""
+        """Render graph state as SVG.
+
+        *view* identifies the query the state came from, for the render
+        cache and for warm-started relayouts.
+        """
         
         # Apply rendering limits
         nodes = graph_state.get("nodes", [])
@@ -38,11 +154,183 @@ class GraphRenderer:
         valid_edges = [e for e in edges if e.get("from") in node_ids and e.get("to") in node_ids]
         valid_edges = sorted(valid_edges, key=lambda e: e.get("weight", 0), reverse=True)[:self.max_render_edges]
         
-        # Generate DOT
-        dot_content = self._generate_dot(nodes, valid_edges, theme, label_style)
-        
-        # Render with Graphviz
-        return self._dot_to_svg(dot_content, layout)
+        key = (self._content_key(nodes, valid_edges, label_style), view, layout, theme, label_style)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._svg_cache.get(key)
+            if cached is not None and now - cached[0] <= self.cache_ttl:
+                self._svg_cache.move_to_end(key)
+                self._stats["hits"] += 1
+                return cached[1]
+            self._stats["misses"] += 1
+
+        svg, ok = self._render(nodes, valid_edges, layout, theme, label_style, view)
+        if ok:
+            with self._lock:
+                self._svg_cache[key] = (now, svg)
+                self._svg_cache.move_to_end(key)
+                while len(self._svg_cache) > self.cache_size:
+                    self._svg_cache.popitem(last=False)
+        return svg
+
+    def _render(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        layout: str,
+        theme: str,
+        label_style: str,
+        view: Hashable,
+    ) -> Tuple[bytes, bool]:
+        """(svg, success): incremental in-process render or a full re-render."""
+        if layout in FORCE_LAYOUTS:
+            with self._lock:
+                previous = self._positions.get((view, layout))
+            if previous is not None and self._small_change(previous, nodes):
+                positions = self._layout(nodes, edges, previous)
+                self._remember(view, layout, positions, "incremental")
+                return self._positions_to_svg(nodes, edges, positions, theme, label_style), True
+
+        svg, error = None, None
+        if layout != "force":
+            dot_content = self._generate_dot(nodes, edges, theme, label_style)
+            svg, error = self._run_graphviz(dot_content, layout)
+            if svg is not None:
+                with self._lock:
+                    self._stats["graphviz"] += 1
+        if svg is None and layout not in FORCE_LAYOUTS:
+            return self._generate_error_svg(error), False
+
+        if layout in FORCE_LAYOUTS:
+            positions = self._svg_positions(svg, nodes) if svg is not None else None
+            if positions is None:
+                positions = self._layout(nodes, edges, None)
+            if svg is None:
+                svg = self._positions_to_svg(nodes, edges, positions, theme, label_style)
+            self._remember(view, layout, positions, "full")
+        else:
+            with self._lock:
+                self._stats["full"] += 1
+        return svg, True
+
+    def _small_change(self, previous: Dict[str, Position], nodes: List[Dict[str, Any]]) -> bool:
+        new = sum(1 for node in nodes if node["id"] not in previous)
+        return new < len(nodes) and new <= max(2, self.relayout_max_new * len(nodes))
+
+    def _layout(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        initial: Optional[Dict[str, Position]],
+    ) -> Dict[str, Position]:
+        return force_layout(
+            [node["id"] for node in nodes],
+            [(e["from"], e["to"], e.get("weight", 1.0)) for e in edges],
+            initial=initial,
+        )
+
+    def _remember(self, view: Hashable, layout: str, positions: Dict[str, Position], kind: str) -> None:
+        with self._lock:
+            self._positions[(view, layout)] = positions
+            self._positions.move_to_end((view, layout))
+            while len(self._positions) > self.cache_size:
+                self._positions.popitem(last=False)
+            self._stats[kind] += 1
+
+    def _svg_positions(self, svg: bytes, nodes: List[Dict[str, Any]]) -> Optional[Dict[str, Position]]:
+        """Node positions from Graphviz SVG output (None if unparseable)."""
+        dot_ids = {self._escape_dot_id(node["id"]): node["id"] for node in nodes}
+        positions = {}
+        for title, x, y in _SVG_NODE_RE.findall(svg.decode("utf-8", errors="ignore")):
+            node_id = dot_ids.get(title)
+            if node_id is not None:
+                positions[node_id] = (float(x), float(y))
+        return positions if len(positions) == len(nodes) else None
+
+    def _positions_to_svg(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        positions: Dict[str, Position],
+        theme: str,
+        label_style: str,
+    ) -> bytes:
+        """Draw laid-out nodes and edges as SVG (the in-process renderer)."""
+        colors = _THEMES.get(theme, _THEMES["light"])
+        pad, rx, ry = 60.0, 34.0, 16.0
+        xs = [p[0] for p in positions.values()] or [0.0]
+        ys = [p[1] for p in positions.values()] or [0.0]
+        x0, y0 = min(xs) - pad, min(ys) - pad
+        width, height = max(xs) - x0 + pad, max(ys) - y0 + pad
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" height="{height:.0f}pt" '
+            f'viewBox="{x0:.1f} {y0:.1f} {width:.1f} {height:.1f}">',
+            '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" '
+            'markerWidth="8" markerHeight="8" orient="auto-start-reverse">'
+            f'<path d="M0,0 L10,5 L0,10 z" fill="{colors["edge"]}"/></marker></defs>',
+            f'<rect x="{x0:.1f}" y="{y0:.1f}" width="{width:.1f}" height="{height:.1f}" fill="{colors["bg"]}"/>',
+            f'<g class="edges" stroke="{colors["edge"]}" fill="none" font-family="Arial" font-size="9">',
+        ]
+        for edge in edges:
+            (x1, y1), (x2, y2) = positions[edge["from"]], positions[edge["to"]]
+            edge_type = edge.get("type", "")
+            style, arrowhead = _edge_style(edge_type)
+            dash = {"dashed": ' stroke-dasharray="6,4"', "dotted": ' stroke-dasharray="2,3"'}.get(style, "")
+            marker = ' marker-end="url(#arrow)"' if arrowhead == "normal" else ""
+            width_px = max(1.0, min(5.0, edge.get("weight", 1.0)))
+            parts.append(
+                f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+                f'stroke-width="{width_px:.1f}"{dash}{marker}/>'
+            )
+            if edge_type:
+                parts.append(
+                    f'<text x="{(x1 + x2) / 2:.1f}" y="{(y1 + y2) / 2:.1f}" stroke="none" '
+                    f'fill="{colors["text"]}" text-anchor="middle">'
+                    f'{self._escape_xml(edge_type.replace("_", " "))}</text>'
+                )
+        parts.append("</g>")
+        parts.append(f'<g class="nodes" font-family="Arial" font-size="11" fill="{colors["text"]}">')
+        for node in nodes:
+            x, y = positions[node["id"]]
+            kind = node.get("kind", "entity")
+            fill = colors["nodes"].get(kind, colors["nodes"]["entity"])
+            shape = _node_shape(kind)
+            if shape == "box":
+                outline = f'<rect x="{x - rx:.1f}" y="{y - ry:.1f}" width="{2 * rx:.1f}" height="{2 * ry:.1f}"'
+            elif shape == "ellipse":
+                outline = f'<ellipse cx="{x:.1f}" cy="{y:.1f}" rx="{rx:.1f}" ry="{ry:.1f}"'
+            else:
+                corners = (
+                    [(0, -ry), (rx, 0), (0, ry), (-rx, 0)] if shape == "diamond"
+                    else [(-rx, 0), (-rx / 2, -ry), (rx / 2, -ry), (rx, 0), (rx / 2, ry), (-rx / 2, ry)]
+                )
+                points = " ".join(f"{x + dx:.1f},{y + dy:.1f}" for dx, dy in corners)
+                outline = f'<polygon points="{points}"'
+            lines = self._label_lines(node, label_style)
+            top = y - 6 * (len(lines) - 1) + 4
+            text = "".join(
+                f'<tspan x="{x:.1f}" y="{top + 12 * i:.1f}">{self._escape_xml(line)}</tspan>'
+                for i, line in enumerate(lines)
+            )
+            parts.append(
+                f'<g class="node"><title>{self._escape_xml(node["id"])}</title>'
+                f'{outline} fill="{fill}" stroke="black"/>'
+                f'<text text-anchor="middle">{text}</text></g>'
+            )
+        parts.extend(["</g>", "</svg>"])
+        return "\n".join(parts).encode("utf-8")
+
+    def _label_lines(self, node: Dict[str, Any], label_style: str) -> List[str]:
+        label = str(node.get("label", node["id"]))
+        if label_style == "full":
+            lines = [label]
+            if node.get("domain"):
+                lines.append(f"({node['domain']})")
+            if node.get("score", 0) > 0:
+                lines.append(f"score: {node['score']:.1f}")
+            return lines
+        return [label[:17] + "..." if len(label) > 20 else label]
     
     def _generate_dot(
         self,
@@ -53,33 +341,9 @@ class GraphRenderer:
     ) -> str:
         """Generate DOT format from nodes and edges."""
         
-        # Theme colors
-        if theme == "dark":
-            bg_color = "#2b2b2b"
-            text_color = "#ffffff" 
-            node_colors = {
-                "entity": "#4CAF50",
-                "zone": "#2196F3",
-                "device": "#FF9800",
-                "person": "#E91E63",
-                "concept": "#9C27B0", 
-                "module": "#607D8B",
-                "event": "#FF5722"
-            }
-            edge_color = "#666666"
-        else:  # light theme
-            bg_color = "#ffffff"
-            text_color = "#000000"
-            node_colors = {
-                "entity": "#8BC34A",
-                "zone": "#03A9F4", 
-                "device": "#FFC107",
-                "person": "#F06292",
-                "concept": "#AB47BC",
-                "module": "#78909C",
-                "event": "#FF7043"
-            }
-            edge_color = "#999999"
+        colors = _THEMES.get(theme, _THEMES["light"])
+        bg_color, text_color, edge_color = colors["bg"], colors["text"], colors["edge"]
+        node_colors = colors["nodes"]
         
         dot_lines = [
             f'digraph BrainGraph {{',
@@ -108,13 +372,7 @@ class GraphRenderer:
                     label = label[:17] + "..."
             
             # Node shape based on kind
-            shape = "ellipse"
-            if kind == "zone":
-                shape = "box"
-            elif kind == "concept":
-                shape = "diamond"
-            elif kind == "module":
-                shape = "hexagon"
+            shape = _node_shape(kind)
             
             dot_lines.append(
                 f'    {node_id} [label="{label}", fillcolor="{color}", style="filled", shape="{shape}"];'
@@ -130,14 +388,7 @@ class GraphRenderer:
             weight = edge.get("weight", 1.0)
             
             # Edge style based on type
-            style = "solid"
-            arrowhead = "normal"
-            
-            if edge_type in ["correlates", "observed_with"]:
-                style = "dashed"
-                arrowhead = "none"
-            elif edge_type == "in_zone":
-                style = "dotted"
+            style, arrowhead = _edge_style(edge_type)
             
             # Line width based on weight
             penwidth = max(1.0, min(5.0, weight))
@@ -155,7 +406,12 @@ class GraphRenderer:
     
     def _dot_to_svg(self, dot_content: str, layout: str) -> bytes:
         """Convert DOT content to SVG using Graphviz."""
-        if layout not in ["dot", "neato", "fdp", "circo", "twopi"]:
+        svg, error = self._run_graphviz(dot_content, layout)
+        return svg if svg is not None else self._generate_error_svg(error)
+
+    def _run_graphviz(self, dot_content: str, layout: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """(svg, None) on success, (None, error message) on failure."""
+        if layout not in GRAPHVIZ_LAYOUTS:
             layout = "dot"
             
         try:
@@ -168,15 +424,12 @@ class GraphRenderer:
             )
             
             if process.returncode != 0:
-                # Fallback to simple error SVG
-                error_msg = f"Graphviz error: {process.stderr.decode('utf-8', errors='ignore')}"
-                return self._generate_error_svg(error_msg)
+                return None, f"Graphviz error: {process.stderr.decode('utf-8', errors='ignore')}"
             
-            return process.stdout
+            return process.stdout, None
             
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            # Fallback to simple error SVG
-            return self._generate_error_svg(f"Rendering failed: {str(e)}")
+            return None, f"Rendering failed: {str(e)}"
     
     def _generate_error_svg(self, message: str) -> bytes:
         """Generate a simple error SVG."""
@@ -1,16 +1,41 @@
 """
 Brain Graph service providing high-level graph operations.
+
+Writes go through a write-behind buffer: touched nodes and edges are kept in
+an in-memory dirty map (later touches accumulate on the buffered state) and
+written to the store in a single transaction by :meth:`BrainGraphService.flush`.
+Inside ``begin_batch``/``commit_batch`` everything is flushed once at commit;
+outside a batch writes go straight through unless ``flush_interval_seconds``
+is set, in which case a background thread flushes on that timer. A batch
+belongs to the thread that began it: ``rollback_batch`` discards only that
+thread's writes, and only those still buffered – once ``max_pending_writes``
+forces a flush mid-batch, the writes flushed so far stay persisted.
+
+Cached graph views in ``brain_graph_cache`` carry dependency tags (see
+:func:`graph_view_tags`): ``view:<kind>|<domain>`` for the filters that
+selected them (``*`` = unfiltered) and ``node:<id>`` for every node they
+contain. A node touch invalidates the view tags its kind/domain can match
+plus its own node tag; an edge touch invalidates its endpoints. Pruning
+retires the whole cache generation.
+
+``get_graph_state`` is served from a :class:`~.snapshot.GraphSnapshot`, an
+in-memory copy of the graph that touches patch directly, so polling the
+state neither flushes nor queries SQLite. The snapshot is loaded lazily and
+dropped (reloaded on the next read) after a prune or rollback. Graphs larger
+than ``SNAPSHOT_CAPACITY_FACTOR`` times the store caps are read from the
+store instead.
 """
 
 import json
 import logging
-import queue
 import threading
 import time
 from typing import Dict, List, Optional, Any, Tuple, Iterable
 
 from .model import GraphNode, GraphEdge, NodeKind, EdgeType
+from .snapshot import GraphSnapshot
 from .store import BrainGraphStore
+from .stream import GraphEventStream, StreamSubscriber
 from ..performance import brain_graph_cache
 
 logger = logging.getLogger(__name__)
@@ -19,9 +44,96 @@ logger = logging.getLogger(__name__)
 GraphStore = BrainGraphStore
 
 
-def _invalidate_graph_cache():
-    """Invalidate all graph state cache entries."""
-    brain_graph_cache.clear()
+_TAG_ANY = "*"
+# A batch touching more tags than this retires the whole generation instead
+_MAX_INVALIDATION_TAGS = 512
+# Snapshot capacity relative to store.max_nodes/max_edges (pruning lags writes)
+SNAPSHOT_CAPACITY_FACTOR = 4
+
+
+def node_change_tags(node_id: str, kind: Optional[str], domain: Optional[str]) -> set:
+    """Cache tags affected by a change to node *node_id*."""
+    domains = (domain, _TAG_ANY) if domain else (_TAG_ANY,)
+    tags = {f"node:{node_id}"}
+    for k in (kind, _TAG_ANY) if kind else (_TAG_ANY,):
+        for d in domains:
+            tags.add(f"view:{k}|{d}")
+    return tags
+
+
+def edge_change_tags(from_node: str, to_node: str) -> set:
+    """Cache tags affected by a change to an edge."""
+    return {f"node:{from_node}", f"node:{to_node}", "edges:*"}
+
+
+def graph_view_tags(
+    node_ids: Iterable[str],
+    edge_count: int,
+    kinds: Optional[List[str]] = None,
+    domains: Optional[List[str]] = None,
+    center_node: Optional[str] = None,
+    limit_nodes: Optional[int] = None,
+    limit_edges: Optional[int] = None,
+) -> List[str]:
+    """Dependency tags for a cached graph state with these nodes and edges."""
+    node_ids = list(node_ids)
+    tags = {f"node:{node_id}" for node_id in node_ids}
+    if center_node:
+        tags.add(f"node:{center_node}")
+        truncated = (
+            (limit_nodes is not None and len(node_ids) >= limit_nodes)
+            or (limit_edges is not None and edge_count >= limit_edges)
+        )
+        if truncated:
+            # Anything may displace a member of a capped neighborhood
+            tags.update((f"view:{_TAG_ANY}|{_TAG_ANY}", "edges:*"))
+    else:
+        for k in kinds or (_TAG_ANY,):
+            for d in domains or (_TAG_ANY,):
+                tags.add(f"view:{k}|{d}")
+    return sorted(tags)
+
+
+def cached_graph_state_json(
+    service: "BrainGraphService",
+    cache_key: str,
+    nocache: bool = False,
+    ttl: float = 30.0,
+    **view: Any,
+) -> str:
+    """Graph state document for the state endpoints, via ``brain_graph_cache``.
+
+    *view* takes the filters of :meth:`BrainGraphService.get_graph_state_json`.
+    Concurrent misses compute once and expired views are served while they
+    refresh; *nocache* recomputes and replaces the cached copy. The document
+    carries ``_cached`` (false when it was computed for this call).
+    """
+    computed = []
+
+    def load():
+        computed.append(True)
+        return service.get_graph_state_json(**view)
+
+    if nocache:
+        body, tags = load()
+        brain_graph_cache.set(cache_key, (body, tags), ttl=ttl, tags=tags)
+    else:
+        body, _ = brain_graph_cache.get_or_compute(
+            cache_key, load, ttl=ttl, tags=lambda value: value[1],
+        )
+    return body[:-1] + (',"_cached":false}' if computed else ',"_cached":true}')
+
+
+def _invalidate_graph_cache(tags: Optional[Iterable[str]] = None):
+    """Invalidate cached graph views depending on *tags* (all if None)."""
+    if tags is None:
+        brain_graph_cache.bump_generation()
+        return
+    tags = list(tags)
+    if len(tags) > _MAX_INVALIDATION_TAGS:
+        brain_graph_cache.bump_generation()
+    elif tags:
+        brain_graph_cache.invalidate_tags(tags)
 
 
 class BrainGraphService:
@@ -33,6 +145,8 @@ class BrainGraphService:
         node_half_life_hours: float = 24.0,
         edge_half_life_hours: float = 12.0,
         prune_interval_minutes: int = 60,
+        flush_interval_seconds: float = 0.0,
+        max_pending_writes: int = 5000,
     ):
         self.store = store or GraphStore()
         self.node_half_life_hours = node_half_life_hours
@@ -42,6 +156,13 @@ class BrainGraphService:
         self._batch_mode = False
         self._batch_size = 0
         self._pending_invalidations = 0
+        self._pending_tags: set = set()
+        # Batch-owned buffered writes: key -> (buffered value before the
+        # batch's first touch, the batch's latest value); guarded by _lock
+        self._batch_owner: Optional[int] = None
+        self._batch_nodes: Dict[str, Tuple[Optional[GraphNode], GraphNode]] = {}
+        self._batch_edges: Dict[str, Tuple[Optional[GraphEdge], GraphEdge]] = {}
+        self._batch_flushed = False
 
         # Pruning counter for deterministic cleanup
         self._operation_count = 0
@@ -51,8 +172,7 @@ class BrainGraphService:
         self._lock = threading.Lock()
 
         # SSE event broadcasting (v5.0.0)
-        self._sse_subscribers: List[queue.Queue] = []
-        self._sse_lock = threading.Lock()
+        self._sse = GraphEventStream()
 
         # Scheduled pruning: daemon thread that runs prune_graph at fixed intervals
         self._prune_interval_seconds = max(60, prune_interval_minutes * 60)
@@ -60,6 +180,36 @@ class BrainGraphService:
         self._prune_thread: Optional[threading.Thread] = None
         self._last_prune_stats: Optional[Dict[str, Any]] = None
 
+        # Write-behind buffer (guarded by _lock). Entries being written by a
+        # running flush stay visible through the _inflight_* maps.
+        self._flush_interval_seconds = max(0.0, float(flush_interval_seconds))
+        self._max_pending_writes = max(1, int(max_pending_writes))
+        self._dirty_nodes: Dict[str, GraphNode] = {}
+        self._dirty_edges: Dict[str, GraphEdge] = {}
+        self._inflight_nodes: Dict[str, GraphNode] = {}
+        self._inflight_edges: Dict[str, GraphEdge] = {}
+        self._prune_due = False
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._flush_stop = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
+        self._write_stats = {
+            "flushes": 0,
+            "flushed_nodes": 0,
+            "flushed_edges": 0,
+            "flush_errors": 0,
+            "dropped_writes": 0,
+            "last_flush_ms": 0.0,
+        }
+
+        # Materialized graph for get_graph_state (see module docstring).
+        # _snapshot_epoch (guarded by _lock) changes whenever the store loses
+        # rows behind the snapshot's back, so a concurrent load is discarded.
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_epoch = 0
+        self._snapshot_oversized_epoch: Optional[int] = None
+        self._snapshot_stats = {"loads": 0, "served": 0, "fallbacks": 0, "drops": 0}
+
     # --- Scheduled Pruning -------------------------------------------------
 
     def start_scheduled_pruning(self) -> None:
@@ -87,49 +237,28 @@ class BrainGraphService:
 
     # --- SSE Event Broadcasting (v5.0.0) ------------------------------------
 
-    def subscribe_sse(self) -> queue.Queue:
-        """Create a new SSE subscriber queue.
+    def subscribe_sse(self, last_event_id: Optional[int] = None) -> StreamSubscriber:
+        """Create a new SSE subscriber (see :mod:`.stream`).
 
-        Returns a Queue that receives event dicts:
-            {"event": "node_updated"|"edge_updated"|"graph_pruned",
-             "data": {...}, "timestamp_ms": int}
+        Pass the client's ``Last-Event-ID`` to replay what it missed. The
+        subscriber's ``next_frame()`` returns batched, coalesced frames of
+        ``{"seq": int, "event": "node_updated"|"edge_updated"|"graph_pruned",
+        "data": {...}, "timestamp_ms": int}`` events.
 
         Caller MUST call unsubscribe_sse() when done.
         """
-        q: queue.Queue = queue.Queue(maxsize=256)
-        with self._sse_lock:
-            self._sse_subscribers.append(q)
-        logger.debug("SSE subscriber added (total: %d)", len(self._sse_subscribers))
-        return q
-
-    def unsubscribe_sse(self, q: queue.Queue) -> None:
-        """Remove an SSE subscriber queue."""
-        with self._sse_lock:
-            try:
-                self._sse_subscribers.remove(q)
-            except ValueError:
-                pass
-        logger.debug("SSE subscriber removed (total: %d)", len(self._sse_subscribers))
+        subscriber = self._sse.subscribe(last_event_id)
+        logger.debug("SSE subscriber added (total: %d)", len(self._sse))
+        return subscriber
+
+    def unsubscribe_sse(self, subscriber: StreamSubscriber) -> None:
+        """Remove an SSE subscriber."""
+        self._sse.unsubscribe(subscriber)
+        logger.debug("SSE subscriber removed (total: %d)", len(self._sse))
 
     def _broadcast_sse(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Broadcast an event to all SSE subscribers (non-blocking)."""
-        msg = {
-            "event": event_type,
-            "data": data,
-            "timestamp_ms": int(time.time() * 1000),
-        }
-        dead: List[queue.Queue] = []
-        with self._sse_lock:
-            for q in self._sse_subscribers:
-                try:
-                    q.put_nowait(msg)
-                except queue.Full:
-                    dead.append(q)
-            for q in dead:
-                try:
-                    self._sse_subscribers.remove(q)
-                except ValueError:
-                    pass
+        """Publish an event to all SSE subscribers (non-blocking)."""
+        self._sse.publish(event_type, data)
 
     def _prune_loop(self) -> None:
         """Background loop: sleep then prune, repeat until stopped."""
@@ -143,6 +272,7 @@ class BrainGraphService:
                 }
                 removed = stats.get("nodes_removed", 0) + stats.get("edges_removed", 0)
                 if removed > 0:
+                    self._drop_snapshot()
                     _invalidate_graph_cache()
                     self._broadcast_sse("graph_pruned", stats)
                     logger.info("Scheduled prune: removed %d nodes, %d edges",
@@ -152,27 +282,205 @@ class BrainGraphService:
             except Exception:
                 logger.exception("Scheduled prune failed")
     
+    # --- Write-behind buffer ------------------------------------------------
+
+    def _start_flusher(self) -> None:
+        """Lazily start the timed flush thread (only with flush_interval_seconds)."""
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        self._flush_stop.clear()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop,
+            name="brain-graph-flusher",
+            daemon=True,
+        )
+        self._flush_thread.start()
+
+    def _flush_loop(self) -> None:
+        """Background loop: flush buffered writes every flush interval."""
+        while not self._flush_stop.wait(timeout=self._flush_interval_seconds):
+            with self._lock:
+                if self._batch_mode:
+                    continue  # commit_batch flushes the batch as a whole
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Scheduled brain graph flush failed")
+
+    def flush(self) -> Dict[str, int]:
+        """Write all buffered nodes and edges to the store in one transaction.
+
+        On failure the entries are re-buffered (up to max_pending_writes) and
+        retried on the next flush. Returns the number of nodes/edges written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                nodes, self._dirty_nodes = self._dirty_nodes, {}
+                edges, self._dirty_edges = self._dirty_edges, {}
+                self._inflight_nodes, self._inflight_edges = nodes, edges
+                prune, self._prune_due = self._prune_due, False
+                if self._batch_nodes or self._batch_edges:
+                    # Forced mid-batch: these writes can no longer be rolled back
+                    self._batch_flushed = True
+                    self._batch_nodes, self._batch_edges = {}, {}
+
+            written = {"nodes": 0, "edges": 0}
+            try:
+                if nodes or edges:
+                    started = time.monotonic()
+                    written["nodes"], written["edges"] = self.store.upsert_many(
+                        nodes.values(), edges.values()
+                    )
+                    with self._lock:
+                        self._write_stats["flushes"] += 1
+                        self._write_stats["flushed_nodes"] += written["nodes"]
+                        self._write_stats["flushed_edges"] += written["edges"]
+                        self._write_stats["last_flush_ms"] = round(
+                            (time.monotonic() - started) * 1000, 3
+                        )
+            except Exception:
+                logger.exception(
+                    "Brain graph flush failed (%d nodes, %d edges re-buffered)",
+                    len(nodes), len(edges),
+                )
+                self._drop_snapshot()  # it may hold writes that get dropped
+                with self._lock:
+                    self._write_stats["flush_errors"] += 1
+                    self._prune_due = self._prune_due or prune
+                    for pending, failed in ((self._dirty_nodes, nodes), (self._dirty_edges, edges)):
+                        for key, item in failed.items():
+                            if key in pending:
+                                continue  # touched again meanwhile; newer state wins
+                            if len(self._dirty_nodes) + len(self._dirty_edges) >= self._max_pending_writes:
+                                self._write_stats["dropped_writes"] += 1
+                                continue
+                            pending[key] = item
+                return written
+            finally:
+                with self._lock:
+                    self._inflight_nodes, self._inflight_edges = {}, {}
+
+            if prune:
+                stats = self.store.prune_graph()
+                if stats.get("nodes_removed", 0) + stats.get("edges_removed", 0) > 0:
+                    self._drop_snapshot()
+                    _invalidate_graph_cache()
+            return written
+
+    def close(self) -> None:
+        """Stop the background threads and flush buffered writes."""
+        self._flush_stop.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=5)
+            self._flush_thread = None
+        self.stop_scheduled_pruning()
+        self.flush()
+
+    def _buffered_node(self, node_id: str) -> Optional[GraphNode]:
+        """Latest state of a node: buffered write if any, else the store."""
+        with self._lock:
+            node = self._dirty_nodes.get(node_id) or self._inflight_nodes.get(node_id)
+        return node if node is not None else self.store.get_node(node_id)
+
+    def _buffered_edge(self, from_node: str, edge_type: EdgeType, to_node: str) -> Optional[GraphEdge]:
+        """Latest state of an edge: buffered write if any, else the store."""
+        edge_id = GraphEdge.create_id(from_node, edge_type, to_node)
+        with self._lock:
+            edge = self._dirty_edges.get(edge_id) or self._inflight_edges.get(edge_id)
+        if edge is not None:
+            return edge
+        existing_edges = self.store.get_edges(from_node=from_node, to_node=to_node, edge_types=[edge_type])
+        return next((e for e in existing_edges if e.id == edge_id), None)
+
+    def _buffered_edges_from(self, node_id: str) -> List[GraphEdge]:
+        """Outgoing edges of a node, including buffered (unflushed) ones."""
+        edges = {e.id: e for e in self.store.get_edges(from_node=node_id)}
+        with self._lock:
+            for pending in (self._inflight_edges, self._dirty_edges):
+                for edge in pending.values():
+                    if edge.from_node == node_id:
+                        edges[edge.id] = edge
+        return list(edges.values())
+
+    def _in_batch_locked(self) -> bool:
+        """True if the calling thread owns the open batch. Caller holds _lock."""
+        return self._batch_mode and self._batch_owner == threading.get_ident()
+
+    def _buffer_write_locked(self) -> bool:
+        """Book-keeping after a buffered write; returns True if a flush is due.
+
+        Caller holds _lock.
+        """
+        self._operation_count += 1
+        if self._operation_count >= self._prune_interval:
+            self._operation_count = 0
+            self._prune_due = True
+        if len(self._dirty_nodes) + len(self._dirty_edges) >= self._max_pending_writes:
+            return True
+        return not self._batch_mode and self._flush_interval_seconds <= 0
+
     def begin_batch(self, size: int = 50):
-        """Start batch processing mode - delays cache invalidation until commit."""
+        """Start batch processing mode - buffers writes and cache invalidation until commit."""
+        # Write out anything buffered before the batch so a rollback only
+        # discards the batch's own writes.
+        self.flush()
         with self._lock:
             self._batch_mode = True
             self._batch_size = size
+            self._batch_owner = threading.get_ident()
+            self._batch_nodes, self._batch_edges = {}, {}
+            self._batch_flushed = False
             self._pending_invalidations = 0
+            self._pending_tags = set()
 
     def commit_batch(self):
-        """Commit batch and invalidate cache once if needed."""
+        """Commit batch: flush buffered writes in one transaction, invalidate cache once."""
         with self._lock:
             should_invalidate = self._batch_mode and self._pending_invalidations > 0
+            tags, self._pending_tags = self._pending_tags, set()
             self._batch_mode = False
+            self._batch_owner = None
+            self._batch_nodes, self._batch_edges = {}, {}
             self._pending_invalidations = 0
+        self.flush()
         if should_invalidate:
-            _invalidate_graph_cache()
+            _invalidate_graph_cache(tags)
+
+    def rollback_batch(self) -> Dict[str, Any]:
+        """Rollback batch: discard its buffered writes without invalidating cache.
 
-    def rollback_batch(self):
-        """Rollback batch without invalidating cache."""
+        Only writes made by the batch's own thread are discarded; concurrent
+        touches from other threads are kept. Writes already flushed because
+        ``max_pending_writes`` was reached mid-batch cannot be undone – the
+        result reports them as ``partially_persisted``.
+        """
+        discarded = 0
         with self._lock:
+            for pending, owned in ((self._dirty_nodes, self._batch_nodes),
+                                   (self._dirty_edges, self._batch_edges)):
+                for key, (previous, ours) in owned.items():
+                    if pending.get(key) is not ours:
+                        continue  # touched again by another thread on top of it
+                    if previous is None:
+                        del pending[key]
+                    else:
+                        pending[key] = previous
+                    discarded += 1
+            partial = self._batch_flushed
             self._batch_mode = False
+            self._batch_owner = None
+            self._batch_nodes, self._batch_edges = {}, {}
+            self._batch_flushed = False
             self._pending_invalidations = 0
+            self._pending_tags = set()
+            remaining = bool(self._dirty_nodes or self._dirty_edges)
+        if partial:
+            logger.warning("Brain graph batch rolled back after a forced flush; "
+                           "writes flushed before the rollback stay persisted")
+        self._drop_snapshot()
+        if remaining and self._flush_interval_seconds <= 0:
+            self.flush()  # concurrent writes held back by the batch
+        return {"discarded": discarded, "partially_persisted": partial}
     
     def touch_node(
         self,
@@ -188,8 +496,8 @@ class BrainGraphService:
         """Touch a node, updating its score and metadata."""
         now_ms = int(time.time() * 1000)
         
-        # Get existing node or create new one
-        existing_node = self.store.get_node(node_id)
+        # Get existing node (buffered state first) or create new one
+        existing_node = self._buffered_node(node_id)
         
         if existing_node:
             # Update existing node
@@ -230,26 +538,31 @@ class BrainGraphService:
             meta=new_meta,
         )
         
-        # Store the node
-        self.store.upsert_node(updated_node)
-        
-        # Invalidate graph cache on updates (batched) + trigger pruning
+        # Buffer the node; invalidate dependent cached views (batched), prune every N ops
+        tags = node_change_tags(node_id, new_kind, new_domain)
+        if existing_node and (existing_node.kind, existing_node.domain) != (new_kind, new_domain):
+            tags |= node_change_tags(node_id, existing_node.kind, existing_node.domain)
         should_invalidate = False
-        should_prune = False
         with self._lock:
-            if self._batch_mode:
+            in_batch = self._in_batch_locked()
+            if in_batch:
+                previous = self._batch_nodes.get(node_id, (self._dirty_nodes.get(node_id),))[0]
+                self._batch_nodes[node_id] = (previous, updated_node)
+            self._dirty_nodes[node_id] = updated_node
+            if in_batch:
                 self._pending_invalidations += 1
+                self._pending_tags |= tags
             else:
                 should_invalidate = True
-            self._operation_count += 1
-            if self._operation_count >= self._prune_interval:
-                self._operation_count = 0
-                should_prune = True
+            should_flush = self._buffer_write_locked()
 
+        self._patch_snapshot(node=updated_node)
+        if should_flush:
+            self.flush()
+        elif self._flush_interval_seconds > 0:
+            self._start_flusher()
         if should_invalidate:
-            _invalidate_graph_cache()
-        if should_prune:
-            self.store.prune_graph(now_ms)
+            _invalidate_graph_cache(tags)
 
         # Broadcast SSE event (v5.0.0)
         self._broadcast_sse("node_updated", {
@@ -275,9 +588,8 @@ class BrainGraphService:
         
         edge_id = GraphEdge.create_id(from_node, edge_type, to_node)
         
-        # Get existing edge or create new one
-        existing_edges = self.store.get_edges(from_node=from_node, to_node=to_node, edge_types=[edge_type])
-        existing_edge = next((e for e in existing_edges if e.id == edge_id), None)
+        # Get existing edge (buffered state first) or create new one
+        existing_edge = self._buffered_edge(from_node, edge_type, to_node)
         
         if existing_edge:
             # Update existing edge
@@ -306,18 +618,29 @@ class BrainGraphService:
             meta=new_meta,
         )
         
-        # Store the edge
-        self.store.upsert_edge(updated_edge)
-        
-        # Invalidate graph cache on edge updates (batched)
+        # Buffer the edge; invalidate views containing an endpoint (batched)
+        tags = edge_change_tags(from_node, to_node)
         should_invalidate = False
         with self._lock:
-            if self._batch_mode:
+            in_batch = self._in_batch_locked()
+            if in_batch:
+                previous = self._batch_edges.get(edge_id, (self._dirty_edges.get(edge_id),))[0]
+                self._batch_edges[edge_id] = (previous, updated_edge)
+            self._dirty_edges[edge_id] = updated_edge
+            if in_batch:
                 self._pending_invalidations += 1
+                self._pending_tags |= tags
             else:
                 should_invalidate = True
+            should_flush = self._buffer_write_locked()
+
+        self._patch_snapshot(edge=updated_edge)
+        if should_flush:
+            self.flush()
+        elif self._flush_interval_seconds > 0:
+            self._start_flusher()
         if should_invalidate:
-            _invalidate_graph_cache()
+            _invalidate_graph_cache(tags)
 
         # Broadcast SSE event (v5.0.0)
         self._broadcast_sse("edge_updated", {
@@ -349,6 +672,121 @@ class BrainGraphService:
             meta_patch=meta
         )
     
+    # --- Materialized snapshot ----------------------------------------------
+
+    def _drop_snapshot(self) -> None:
+        """Forget the snapshot; the next read reloads it from the store."""
+        with self._lock:
+            self._snapshot_epoch += 1
+            if self._snapshot is not None:
+                self._snapshot = None
+                self._snapshot_stats["drops"] += 1
+
+    def _patch_snapshot(self, node: Optional[GraphNode] = None, edge: Optional[GraphEdge] = None) -> None:
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            fits = snapshot.upsert_node(node) if node is not None else snapshot.upsert_edge(edge)
+        if not fits:
+            self._drop_snapshot()
+
+    def _ensure_snapshot(self) -> Optional[GraphSnapshot]:
+        """Loaded snapshot, loading it if needed; None if the graph is too large."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            epoch = self._snapshot_epoch
+        if self._snapshot_oversized_epoch == epoch:
+            return None  # retried after the next prune
+        try:
+            self.flush()
+            with self._snapshot_lock:
+                if self._snapshot is not None:
+                    return self._snapshot
+                snapshot = GraphSnapshot(
+                    self.node_half_life_hours,
+                    self.edge_half_life_hours,
+                    max_nodes=SNAPSHOT_CAPACITY_FACTOR * self.store.max_nodes,
+                    max_edges=SNAPSHOT_CAPACITY_FACTOR * self.store.max_edges,
+                )
+                counts = self.store.get_stats()
+                if counts["nodes"] > snapshot.max_nodes or counts["edges"] > snapshot.max_edges:
+                    self._snapshot_oversized_epoch = epoch
+                    return None
+                nodes = {n.id: n for n in self.store.get_nodes()}
+                edges = {e.id: e for e in self.store.get_edges()}
+                # Touches buffered since the flush above are patched in by
+                # _patch_snapshot once this lock is released; pick up the
+                # ones that were already waiting.
+                with self._lock:
+                    for pending in (self._inflight_nodes, self._dirty_nodes):
+                        nodes.update(pending)
+                    for pending in (self._inflight_edges, self._dirty_edges):
+                        edges.update(pending)
+                if not snapshot.load(nodes.values(), edges.values()):
+                    self._snapshot_oversized_epoch = epoch
+                    return None
+                with self._lock:
+                    if self._snapshot_epoch != epoch:
+                        return None  # pruned or rolled back while loading
+                    self._snapshot = snapshot
+                    self._snapshot_stats["loads"] += 1
+                return snapshot
+        except Exception:
+            logger.exception("Loading brain graph snapshot failed; reading from the store")
+            self._snapshot_oversized_epoch = epoch
+            return None
+
+    def _snapshot_state(self, as_json: bool, **view) -> Any:
+        """State from the snapshot as ``(state, node_ids, edge_count)``, or None."""
+        snapshot = self._ensure_snapshot()
+        if snapshot is None:
+            with self._lock:
+                self._snapshot_stats["fallbacks"] += 1
+            return None
+        limits = {"nodes_max": self.store.max_nodes, "edges_max": self.store.max_edges}
+        with self._snapshot_lock:
+            nodes, edges = snapshot.view(**view)
+            now_ms = int(time.time() * 1000)
+            render = snapshot.state_json if as_json else snapshot.state
+            result = render(nodes, edges, now_ms, limits)
+        with self._lock:
+            self._snapshot_stats["served"] += 1
+        return result, [entry.node.id for entry in nodes], len(edges)
+
+    def get_graph_state_json(
+        self,
+        kinds: Optional[List[NodeKind]] = None,
+        domains: Optional[List[str]] = None,
+        center_node: Optional[str] = None,
+        hops: int = 1,
+        limit_nodes: Optional[int] = None,
+        limit_edges: Optional[int] = None
+    ) -> Tuple[str, List[str]]:
+        """:meth:`get_graph_state` as a JSON document plus its cache tags.
+
+        With the snapshot loaded the document is assembled from
+        pre-serialized fragments; see :func:`graph_view_tags` for the tags.
+        """
+        served = self._snapshot_state(
+            True, kinds=kinds, domains=domains, center_node=center_node,
+            hops=hops, limit_nodes=limit_nodes, limit_edges=limit_edges,
+        )
+        if served is not None:
+            body, node_ids, edge_count = served
+        else:
+            state = self._store_graph_state(
+                kinds, domains, center_node, hops, limit_nodes, limit_edges
+            )
+            body = json.dumps(state, separators=(",", ":"), default=str)
+            node_ids, edge_count = [n["id"] for n in state["nodes"]], len(state["edges"])
+        tags = graph_view_tags(
+            node_ids, edge_count, kinds, domains, center_node, limit_nodes, limit_edges
+        )
+        return body, tags
+
     def get_graph_state(
         self,
         kinds: Optional[List[NodeKind]] = None,
@@ -359,6 +797,27 @@ class BrainGraphService:
         limit_edges: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get current graph state with optional filtering."""
+        served = self._snapshot_state(
+            False, kinds=kinds, domains=domains, center_node=center_node,
+            hops=hops, limit_nodes=limit_nodes, limit_edges=limit_edges,
+        )
+        if served is not None:
+            return served[0]
+        return self._store_graph_state(
+            kinds, domains, center_node, hops, limit_nodes, limit_edges
+        )
+
+    def _store_graph_state(
+        self,
+        kinds: Optional[List[NodeKind]] = None,
+        domains: Optional[List[str]] = None,
+        center_node: Optional[str] = None,
+        hops: int = 1,
+        limit_nodes: Optional[int] = None,
+        limit_edges: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Graph state read from the store (snapshot unavailable)."""
+        self.flush()
         now_ms = int(time.time() * 1000)
         
         if center_node:
@@ -377,15 +836,8 @@ class BrainGraphService:
                 limit=limit_nodes
             )
             
-            # Get edges between these nodes
-            node_ids = {node.id for node in nodes}
-            all_edges = []
-            
-            for node in nodes:
-                node_edges = self.store.get_edges(from_node=node.id)
-                for edge in node_edges:
-                    if edge.to_node in node_ids and edge not in all_edges:
-                        all_edges.append(edge)
+            # Get edges between these nodes (induced subgraph, one query)
+            all_edges = self.store.get_induced_edges(node.id for node in nodes)
             
             # Apply edge limit
             if limit_edges and len(all_edges) > limit_edges:
@@ -432,6 +884,7 @@ class BrainGraphService:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current graph statistics."""
+        self.flush()
         store_stats = self.store.get_stats()
 
         result = {
@@ -442,8 +895,24 @@ class BrainGraphService:
                 "node_min_score": self.store.node_min_score,
                 "edge_min_weight": self.store.edge_min_weight,
                 "prune_interval_minutes": self._prune_interval_seconds // 60,
+                "flush_interval_seconds": self._flush_interval_seconds,
+                "max_pending_writes": self._max_pending_writes,
             },
         }
+        with self._lock:
+            result["write_behind"] = {
+                **self._write_stats,
+                "pending_nodes": len(self._dirty_nodes),
+                "pending_edges": len(self._dirty_edges),
+            }
+            snapshot = self._snapshot
+            result["snapshot"] = {
+                **self._snapshot_stats,
+                "loaded": snapshot is not None,
+                "nodes": len(snapshot) if snapshot is not None else 0,
+                "edges": snapshot.edge_count if snapshot is not None else 0,
+            }
+        result["sse"] = self._sse.get_stats()
         if self._last_prune_stats is not None:
             result["last_prune"] = self._last_prune_stats
         return result
@@ -470,7 +939,12 @@ class BrainGraphService:
     
     def prune_now(self) -> Dict[str, int]:
         """Manually trigger graph pruning."""
-        return self.store.prune_graph()
+        self.flush()
+        stats = self.store.prune_graph()
+        if stats.get("nodes_removed", 0) + stats.get("edges_removed", 0) > 0:
+            self._drop_snapshot()
+            _invalidate_graph_cache()
+        return stats
     
     def prune(self) -> Dict[str, int]:
         """Alias for prune_now for backward compatibility."""
@@ -529,6 +1003,7 @@ class BrainGraphService:
     
     def infer_patterns(self) -> Dict[str, Any]:
         """Infer common patterns from the current graph state."""
+        self.flush()
         now_ms = int(time.time() * 1000)
         
         # Get all nodes and edges
@@ -585,6 +1060,7 @@ class BrainGraphService:
         Returns:
             Dict with entities, edges, and zone info
         """
+        self.flush()
         now_ms = int(time.time() * 1000)
         
         # Normalize zone_id
@@ -642,6 +1118,7 @@ class BrainGraphService:
         Returns:
             List of zone dictionaries with metadata
         """
+        self.flush()
         now_ms = int(time.time() * 1000)
         
         all_nodes = self.store.get_nodes(kinds=["zone"])
@@ -849,7 +1326,7 @@ class BrainGraphService:
             )
             
             # If entity has known zones, link service to zones too (spatial intent)
-            entity_edges = self.store.get_edges(from_node=f"ha.entity:{entity_id}")
+            entity_edges = self._buffered_edges_from(f"ha.entity:{entity_id}")
             for edge in entity_edges:
                 if edge.edge_type == "in_zone" and edge.to_node.startswith("zone:"):
                     self.link(
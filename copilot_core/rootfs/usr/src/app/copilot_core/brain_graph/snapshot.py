@@ -0,0 +1,266 @@
+"""In-memory materialized view of the brain graph.
+
+:class:`GraphSnapshot` mirrors the (pruned, capped) graph so
+``get_graph_state`` can be answered without SQLite. Nodes are kept sorted
+by a decay-invariant salience key, ``log2(score) + updated_at / half_life``:
+every node decays with the same half-life, so ordering by this key equals
+ordering by ``effective_score`` at any moment and never has to be redone
+as time passes. Touches move one entry (``bisect``); a top-N query walks
+the order from the top.
+
+Every node and edge also carries its JSON serialization split around the
+decaying score/weight, so a response is the concatenation of fragments
+plus one float per item.
+
+The mirror is only used while it is complete: if the graph grows past
+the snapshot capacity (between prunes) the owner drops it and falls back
+to the store until it is reloaded.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .model import GraphEdge, GraphNode
+
+_COMPACT = (",", ":")
+_MS_PER_HOUR = 3600 * 1000
+
+
+def _salience_key(value: float, updated_at_ms: int, half_life_hours: float) -> float:
+    if value <= 0:
+        return -math.inf
+    return math.log2(value) + updated_at_ms / (half_life_hours * _MS_PER_HOUR)
+
+
+class _NodeEntry:
+    __slots__ = ("node", "key", "head", "tail")
+
+    def __init__(self, node: GraphNode, half_life_hours: float) -> None:
+        self.node = node
+        self.key = _salience_key(node.score, node.updated_at_ms, half_life_hours)
+        head = json.dumps(
+            {"id": node.id, "kind": node.kind, "label": node.label, "domain": node.domain},
+            separators=_COMPACT,
+        )
+        tail = json.dumps(
+            {"updated_at_ms": node.updated_at_ms, "source": node.source,
+             "tags": node.tags, "meta": node.meta},
+            separators=_COMPACT, default=str,
+        )
+        self.head = head[:-1] + ',"score":'
+        self.tail = "," + tail[1:]
+
+
+class _EdgeEntry:
+    __slots__ = ("edge", "key", "head", "tail")
+
+    def __init__(self, edge: GraphEdge, half_life_hours: float) -> None:
+        self.edge = edge
+        self.key = _salience_key(edge.weight, edge.updated_at_ms, half_life_hours)
+        head = json.dumps(
+            {"id": edge.id, "from": edge.from_node, "to": edge.to_node, "type": edge.edge_type},
+            separators=_COMPACT,
+        )
+        tail = json.dumps(
+            {"updated_at_ms": edge.updated_at_ms, "evidence": edge.evidence, "meta": edge.meta},
+            separators=_COMPACT, default=str,
+        )
+        self.head = head[:-1] + ',"weight":'
+        self.tail = "," + tail[1:]
+
+
+class GraphSnapshot:
+    """Complete in-memory copy of the graph, ordered by decayed salience."""
+
+    def __init__(
+        self,
+        node_half_life_hours: float,
+        edge_half_life_hours: float,
+        max_nodes: int,
+        max_edges: int,
+    ) -> None:
+        self.node_half_life_hours = node_half_life_hours
+        self.edge_half_life_hours = edge_half_life_hours
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self._nodes: Dict[str, _NodeEntry] = {}
+        self._order: List[Tuple[float, str]] = []  # ascending (key, node id)
+        self._edges: Dict[str, _EdgeEntry] = {}
+        self._adjacent: Dict[str, set] = {}  # node id -> ids of incident edges
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def load(self, nodes: Iterable[GraphNode], edges: Iterable[GraphEdge]) -> bool:
+        """Replace the contents; False if the graph exceeds the capacity."""
+        self._nodes, self._order, self._edges, self._adjacent = {}, [], {}, {}
+        for node in nodes:
+            entry = self._nodes[node.id] = _NodeEntry(node, self.node_half_life_hours)
+            self._order.append((entry.key, node.id))
+        self._order.sort()
+        for edge in edges:
+            self._put_edge(_EdgeEntry(edge, self.edge_half_life_hours))
+        return len(self._nodes) <= self.max_nodes and len(self._edges) <= self.max_edges
+
+    def upsert_node(self, node: GraphNode) -> bool:
+        """Apply a touched node; False once the node capacity is exceeded."""
+        old = self._nodes.get(node.id)
+        if old is not None and old.node.updated_at_ms > node.updated_at_ms:
+            return True  # a newer touch was applied first
+        if old is not None:
+            pos = bisect.bisect_left(self._order, (old.key, node.id))
+            del self._order[pos]
+        entry = self._nodes[node.id] = _NodeEntry(node, self.node_half_life_hours)
+        bisect.insort(self._order, (entry.key, node.id))
+        return len(self._nodes) <= self.max_nodes
+
+    def upsert_edge(self, edge: GraphEdge) -> bool:
+        """Apply a touched edge; False once the edge capacity is exceeded."""
+        old = self._edges.get(edge.id)
+        if old is not None and old.edge.updated_at_ms > edge.updated_at_ms:
+            return True
+        self._put_edge(_EdgeEntry(edge, self.edge_half_life_hours))
+        return len(self._edges) <= self.max_edges
+
+    def _put_edge(self, entry: _EdgeEntry) -> None:
+        edge = entry.edge
+        self._edges[edge.id] = entry
+        self._adjacent.setdefault(edge.from_node, set()).add(edge.id)
+        self._adjacent.setdefault(edge.to_node, set()).add(edge.id)
+
+    # --- Views --------------------------------------------------------------
+
+    def view(
+        self,
+        kinds: Optional[List[str]] = None,
+        domains: Optional[List[str]] = None,
+        center_node: Optional[str] = None,
+        hops: int = 1,
+        limit_nodes: Optional[int] = None,
+        limit_edges: Optional[int] = None,
+    ) -> Tuple[List[_NodeEntry], List[_EdgeEntry]]:
+        """Same selection as the store-backed ``get_graph_state``.
+
+        Top-N is by salience key with ties broken by descending id, matching
+        ``BrainGraphStore.get_nodes`` (``ORDER BY decay_rank DESC, id DESC``).
+        """
+        if center_node:
+            visited = {center_node}
+            layer = {center_node}
+            for _ in range(hops):
+                following = set()
+                for node_id in layer:
+                    for edge_id in self._adjacent.get(node_id, ()):
+                        edge = self._edges[edge_id].edge
+                        neighbor = edge.to_node if edge.from_node == node_id else edge.from_node
+                        if neighbor not in visited:
+                            following.add(neighbor)
+                visited |= following
+                layer = following
+                if not layer:
+                    break
+            nodes = [self._nodes[n] for n in visited if n in self._nodes]
+            if limit_nodes and len(nodes) > limit_nodes:
+                nodes = sorted(nodes, key=lambda e: e.key, reverse=True)[:limit_nodes]
+                visited = {e.node.id for e in nodes}
+            members = visited
+        else:
+            kind_set = set(kinds) if kinds else None
+            domain_set = set(domains) if domains else None
+            nodes = []
+            for _, node_id in reversed(self._order):
+                node = self._nodes[node_id].node
+                if kind_set is not None and node.kind not in kind_set:
+                    continue
+                if domain_set is not None and node.domain not in domain_set:
+                    continue
+                nodes.append(self._nodes[node_id])
+                if limit_nodes and len(nodes) >= limit_nodes:
+                    break
+            members = {e.node.id for e in nodes}
+
+        edge_ids = set()
+        for node_id in members:
+            for edge_id in self._adjacent.get(node_id, ()):
+                edge = self._edges[edge_id].edge
+                if edge.from_node in members and edge.to_node in members:
+                    edge_ids.add(edge_id)
+        edges = [self._edges[e] for e in edge_ids]
+        if limit_edges and len(edges) > limit_edges:
+            edges = sorted(edges, key=lambda e: e.key, reverse=True)[:limit_edges]
+        return nodes, edges
+
+    def state(
+        self,
+        nodes: List[_NodeEntry],
+        edges: List[_EdgeEntry],
+        now_ms: int,
+        limits: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """``get_graph_state`` dict for a :meth:`view` result."""
+        return {
+            "version": 1,
+            "generated_at_ms": now_ms,
+            "limits": limits,
+            "nodes": [
+                {
+                    "id": n.id,
+                    "kind": n.kind,
+                    "label": n.label,
+                    "domain": n.domain,
+                    "score": n.effective_score(now_ms, self.node_half_life_hours),
+                    "updated_at_ms": n.updated_at_ms,
+                    "source": n.source,
+                    "tags": n.tags,
+                    "meta": n.meta,
+                }
+                for n in (entry.node for entry in nodes)
+            ],
+            "edges": [
+                {
+                    "id": e.id,
+                    "from": e.from_node,
+                    "to": e.to_node,
+                    "type": e.edge_type,
+                    "weight": e.effective_weight(now_ms, self.edge_half_life_hours),
+                    "updated_at_ms": e.updated_at_ms,
+                    "evidence": e.evidence,
+                    "meta": e.meta,
+                }
+                for e in (entry.edge for entry in edges)
+            ],
+        }
+
+    def state_json(
+        self,
+        nodes: List[_NodeEntry],
+        edges: List[_EdgeEntry],
+        now_ms: int,
+        limits: Dict[str, Any],
+    ) -> str:
+        """The same document as :meth:`state`, assembled from the fragments."""
+        node_hl, edge_hl = self.node_half_life_hours, self.edge_half_life_hours
+        parts = [
+            '{"version":1,"generated_at_ms":', str(now_ms),
+            ',"limits":', json.dumps(limits, separators=_COMPACT),
+            ',"nodes":[',
+            ",".join(
+                e.head + json.dumps(e.node.effective_score(now_ms, node_hl)) + e.tail
+                for e in nodes
+            ),
+            '],"edges":[',
+            ",".join(
+                e.head + json.dumps(e.edge.effective_weight(now_ms, edge_hl)) + e.tail
+                for e in edges
+            ),
+            "]}",
+        ]
+        return "".join(parts)
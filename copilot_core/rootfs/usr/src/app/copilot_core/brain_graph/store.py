@@ -2,25 +2,84 @@
 SQLite-based graph storage with bounded capacity and automatic pruning.
 
 FIX: Added async support via ThreadPoolExecutor for non-blocking I/O.
+
+Connections are long-lived: one writer connection (writes are serialized
+anyway) and a small pool of reader connections, which WAL lets run
+alongside the writer. Per-connection pragmas are applied once and each
+connection keeps its prepared-statement cache. Both pools are listed under
+``/api/v1/performance/pool/status``.
+
+Pruning never deserializes rows: each node/edge carries a ``decay_rank``
+column, log2(score) + updated_at / half-life, so "decayed below threshold"
+becomes ``decay_rank < threshold(now)`` and "lowest decayed score" becomes
+``ORDER BY decay_rank`` – both served by an index. Node degree is kept in a
+``degree`` column by triggers on edge insert/delete. Pruning deletes in
+bounded statements and commits in slices, releasing the write lock whenever
+a slice has used up its time budget.
+
+Environment variables:
+    COPILOT_BRAIN_GRAPH_READERS          – max pooled reader connections (default: 4)
+    COPILOT_BRAIN_GRAPH_PRUNE_BUDGET_MS  – max write-lock hold per prune slice (default: 50)
+    COPILOT_BRAIN_GRAPH_PRUNE_BATCH      – max rows deleted per prune statement (default: 500)
 """
 
 import json
 import logging
+import math
 import os
 import sqlite3
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .model import GraphNode, GraphEdge, NodeKind, EdgeType
+from ..performance import SQLiteConnectionPool, register_connection_pool
 
 
 # Thread pool for async SQLite operations (avoids blocking Flask threads)
 _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="brain_graph_")
 logger = logging.getLogger(__name__)
 
+_DEFAULT_READERS = 4
+_DEFAULT_PRUNE_BUDGET_MS = 50
+_DEFAULT_PRUNE_BATCH = 500
+
+# Node-id sets above this size are joined through a temp table instead of
+# being inlined as IN (...) parameter lists.
+_INDUCED_IN_LIST_MAX = 400
+
+# Half-lives used for pruning decay (GraphNode/GraphEdge defaults). They are
+# baked into the stored decay_rank, so they are constants, not options.
+NODE_HALF_LIFE_MS = 24.0 * 3600 * 1000
+EDGE_HALF_LIFE_MS = 12.0 * 3600 * 1000
+_ZERO_RANK = -1e12  # decay_rank for non-positive scores: always below threshold
+
+
+def decay_rank(value: float, updated_at_ms: int, half_life_ms: float) -> float:
+    """Time-invariant sort key for exponentially decaying scores.
+
+    value * 2^-((now - t) / hl) < min  <=>  decay_rank < log2(min) + now / hl
+    """
+    if value <= 0:
+        return _ZERO_RANK
+    return math.log2(value) + updated_at_ms / half_life_ms
+
+
+def decay_threshold(min_value: float, now_ms: int, half_life_ms: float) -> float:
+    """decay_rank below which the decayed value at *now_ms* is < *min_value*."""
+    return math.log2(min_value) + now_ms / half_life_ms
+
+# Per-connection settings (journal_mode=WAL is persistent and set in _init_db)
+_CONNECTION_PRAGMAS = [
+    "synchronous=NORMAL",
+    "busy_timeout=30000",
+    "cache_size=-8000",  # 8 MB
+    "temp_store=MEMORY",
+]
+
 
 class BrainGraphStore:
     """SQLite-backed graph storage with bounded capacity.
@@ -35,7 +94,10 @@ class BrainGraphStore:
         max_nodes: int = 500,
         max_edges: int = 1500,
         node_min_score: float = 0.1,
-        edge_min_weight: float = 0.1
+        edge_min_weight: float = 0.1,
+        max_readers: Optional[int] = None,
+        prune_budget_ms: Optional[float] = None,
+        prune_batch: Optional[int] = None,
     ):
         self.db_path = self._resolve_db_path(Path(db_path))
         self.max_nodes = max_nodes
@@ -43,10 +105,37 @@ class BrainGraphStore:
         self.node_min_score = node_min_score
         self.edge_min_weight = edge_min_weight
         self._connect_timeout = 30  # seconds
+        self.prune_budget_ms = max(1.0, prune_budget_ms if prune_budget_ms is not None else float(
+            os.environ.get("COPILOT_BRAIN_GRAPH_PRUNE_BUDGET_MS", _DEFAULT_PRUNE_BUDGET_MS)
+        ))
+        self.prune_batch = max(1, prune_batch if prune_batch is not None else int(
+            os.environ.get("COPILOT_BRAIN_GRAPH_PRUNE_BATCH", _DEFAULT_PRUNE_BATCH)
+        ))
 
         # Serialize write operations to avoid SQLite "database is locked" errors
         self._write_lock = threading.Lock()
 
+        # Long-lived connections: a single writer and N WAL readers
+        self.max_readers = max(1, max_readers if max_readers is not None else int(
+            os.environ.get("COPILOT_BRAIN_GRAPH_READERS", _DEFAULT_READERS)
+        ))
+        self._writer_pool = SQLiteConnectionPool(
+            db_path=str(self.db_path),
+            pragmas=_CONNECTION_PRAGMAS,
+            max_connections=1,
+            min_connections=1,
+            connection_timeout=self._connect_timeout,
+        )
+        self._reader_pool = SQLiteConnectionPool(
+            db_path=str(self.db_path),
+            pragmas=_CONNECTION_PRAGMAS,
+            max_connections=self.max_readers,
+            min_connections=1,
+            connection_timeout=self._connect_timeout,
+        )
+        register_connection_pool("brain_graph_writer", self._writer_pool)
+        register_connection_pool("brain_graph_readers", self._reader_pool)
+
         # Initialize database
         self._init_db()
 
@@ -66,19 +155,37 @@ class BrainGraphStore:
             )
             return fallback_path
     
-    def _connect(self) -> sqlite3.Connection:
-        """Create a new SQLite connection with proper timeout and pragmas."""
-        return sqlite3.connect(self.db_path, timeout=self._connect_timeout)
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled reader connection."""
+        with self._reader_pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        """Hold the write lock and the writer connection for one transaction."""
+        with self._write_lock, self._writer_pool.connection() as conn:
+            with conn:  # commit on success, rollback on error
+                yield conn
+
+    def close(self) -> None:
+        """Close idle pooled connections."""
+        self._reader_pool.close()
+        with self._write_lock:
+            self._writer_pool.close()
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Writer/reader pool statistics."""
+        return {
+            "writer": self._writer_pool.get_stats(),
+            "readers": self._reader_pool.get_stats(),
+        }
 
     def _init_db(self):
         """Initialize SQLite schema with WAL mode for better concurrency."""
-        with self._connect() as conn:
+        with self._writer() as conn:
             # Enable WAL mode for better concurrency (SQLite best practice)
             conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=30000")
-            conn.execute("PRAGMA cache_size=-8000")  # 8 MB
-            conn.execute("PRAGMA temp_store=MEMORY")
             conn.execute("PRAGMA wal_autocheckpoint=1000")
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS nodes (
@@ -90,7 +197,9 @@ class BrainGraphStore:
                     domain TEXT,
                     source_json TEXT,
                     tags_json TEXT,
-                    meta_json TEXT
+                    meta_json TEXT,
+                    degree INTEGER NOT NULL DEFAULT 0,
+                    decay_rank REAL NOT NULL DEFAULT 0
                 );
                 
                 CREATE TABLE IF NOT EXISTS edges (
@@ -102,6 +211,7 @@ class BrainGraphStore:
                     weight REAL NOT NULL,
                     evidence_json TEXT,
                     meta_json TEXT,
+                    decay_rank REAL NOT NULL DEFAULT 0,
                     FOREIGN KEY (from_node) REFERENCES nodes (id) ON DELETE CASCADE,
                     FOREIGN KEY (to_node) REFERENCES nodes (id) ON DELETE CASCADE
                 );
@@ -121,61 +231,158 @@ class BrainGraphStore:
                 CREATE INDEX IF NOT EXISTS idx_nodes_kind_score ON nodes (kind, score);
                 CREATE INDEX IF NOT EXISTS idx_edges_type_weight ON edges (edge_type, weight);
             """)
+            self._migrate_prune_columns(conn)
+            conn.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_nodes_rank ON nodes (decay_rank, updated_at_ms);
+                CREATE INDEX IF NOT EXISTS idx_nodes_degree_rank ON nodes (degree, decay_rank);
+                CREATE INDEX IF NOT EXISTS idx_edges_rank ON edges (decay_rank, updated_at_ms);
+
+                CREATE TRIGGER IF NOT EXISTS trg_edges_insert_degree AFTER INSERT ON edges
+                BEGIN
+                    UPDATE nodes SET degree = degree + 1 WHERE id IN (NEW.from_node, NEW.to_node);
+                END;
+                CREATE TRIGGER IF NOT EXISTS trg_edges_delete_degree AFTER DELETE ON edges
+                BEGIN
+                    UPDATE nodes SET degree = degree - 1 WHERE id IN (OLD.from_node, OLD.to_node);
+                END;
+                -- Edges may be linked before their endpoint node exists
+                CREATE TRIGGER IF NOT EXISTS trg_nodes_insert_degree AFTER INSERT ON nodes
+                BEGIN
+                    UPDATE nodes SET degree = (
+                        SELECT COUNT(*) FROM edges WHERE from_node = NEW.id OR to_node = NEW.id
+                    ) WHERE id = NEW.id;
+                END;
+            """)
+
+    def _migrate_prune_columns(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill degree/decay_rank on databases created before them."""
+        node_cols = {row[1] for row in conn.execute("PRAGMA table_info(nodes)")}
+        edge_cols = {row[1] for row in conn.execute("PRAGMA table_info(edges)")}
+        if "decay_rank" not in node_cols:
+            conn.execute("ALTER TABLE nodes ADD COLUMN degree INTEGER NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE nodes ADD COLUMN decay_rank REAL NOT NULL DEFAULT 0")
+            conn.executemany(
+                "UPDATE nodes SET decay_rank = ? WHERE id = ?",
+                [
+                    (decay_rank(score, ts, NODE_HALF_LIFE_MS), node_id)
+                    for node_id, score, ts in conn.execute("SELECT id, score, updated_at_ms FROM nodes")
+                ],
+            )
+            conn.execute(
+                "UPDATE nodes SET degree = "
+                "(SELECT COUNT(*) FROM edges WHERE from_node = nodes.id OR to_node = nodes.id)"
+            )
+            logger.info("Brain graph: added degree/decay_rank columns to nodes")
+        if "decay_rank" not in edge_cols:
+            conn.execute("ALTER TABLE edges ADD COLUMN decay_rank REAL NOT NULL DEFAULT 0")
+            conn.executemany(
+                "UPDATE edges SET decay_rank = ? WHERE id = ?",
+                [
+                    (decay_rank(weight, ts, EDGE_HALF_LIFE_MS), edge_id)
+                    for edge_id, weight, ts in conn.execute("SELECT id, weight, updated_at_ms FROM edges")
+                ],
+            )
+            logger.info("Brain graph: added decay_rank column to edges")
     
+    # True upserts (not INSERT OR REPLACE): a REPLACE deletes the old row
+    # without firing the degree triggers and would reset nodes.degree.
+    _NODE_UPSERT_SQL = """
+        INSERT INTO nodes
+        (id, kind, label, updated_at_ms, score, domain, source_json, tags_json, meta_json, decay_rank)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            kind = excluded.kind,
+            label = excluded.label,
+            updated_at_ms = excluded.updated_at_ms,
+            score = excluded.score,
+            domain = excluded.domain,
+            source_json = excluded.source_json,
+            tags_json = excluded.tags_json,
+            meta_json = excluded.meta_json,
+            decay_rank = excluded.decay_rank
+    """
+
+    # The edge id is derived from (from_node, edge_type, to_node), so the
+    # endpoints never change on conflict.
+    _EDGE_UPSERT_SQL = """
+        INSERT INTO edges
+        (id, from_node, to_node, edge_type, updated_at_ms, weight, evidence_json, meta_json, decay_rank)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            updated_at_ms = excluded.updated_at_ms,
+            weight = excluded.weight,
+            evidence_json = excluded.evidence_json,
+            meta_json = excluded.meta_json,
+            decay_rank = excluded.decay_rank
+    """
+
+    @staticmethod
+    def _node_row(node: GraphNode) -> tuple:
+        return (
+            node.id,
+            node.kind,
+            node.label,
+            node.updated_at_ms,
+            node.score,
+            node.domain,
+            json.dumps(node.source) if node.source else None,
+            json.dumps(node.tags) if node.tags else None,
+            json.dumps(node.meta) if node.meta else None,
+            decay_rank(node.score, node.updated_at_ms, NODE_HALF_LIFE_MS),
+        )
+
+    @staticmethod
+    def _edge_row(edge: GraphEdge) -> tuple:
+        return (
+            edge.id,
+            edge.from_node,
+            edge.to_node,
+            edge.edge_type,
+            edge.updated_at_ms,
+            edge.weight,
+            json.dumps(edge.evidence) if edge.evidence else None,
+            json.dumps(edge.meta) if edge.meta else None,
+            decay_rank(edge.weight, edge.updated_at_ms, EDGE_HALF_LIFE_MS),
+        )
+
     def upsert_node(self, node: GraphNode) -> bool:
         """Insert or update a node. Returns True if inserted/updated."""
-        with self._write_lock, self._connect() as conn:
+        with self._writer() as conn:
             cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO nodes 
-                (id, kind, label, updated_at_ms, score, domain, source_json, tags_json, meta_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    node.id,
-                    node.kind,
-                    node.label,
-                    node.updated_at_ms,
-                    node.score,
-                    node.domain,
-                    json.dumps(node.source) if node.source else None,
-                    json.dumps(node.tags) if node.tags else None,
-                    json.dumps(node.meta) if node.meta else None,
-                )
-            )
-            
+            cursor.execute(self._NODE_UPSERT_SQL, self._node_row(node))
             return cursor.rowcount > 0
     
     def upsert_edge(self, edge: GraphEdge) -> bool:
         """Insert or update an edge. Returns True if inserted/updated."""
-        with self._write_lock, self._connect() as conn:
+        with self._writer() as conn:
             cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO edges
-                (id, from_node, to_node, edge_type, updated_at_ms, weight, evidence_json, meta_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    edge.id,
-                    edge.from_node,
-                    edge.to_node,
-                    edge.edge_type,
-                    edge.updated_at_ms,
-                    edge.weight,
-                    json.dumps(edge.evidence) if edge.evidence else None,
-                    json.dumps(edge.meta) if edge.meta else None,
-                )
-            )
-            
+            cursor.execute(self._EDGE_UPSERT_SQL, self._edge_row(edge))
             return cursor.rowcount > 0
+
+    def upsert_many(
+        self,
+        nodes: Iterable[GraphNode] = (),
+        edges: Iterable[GraphEdge] = (),
+    ) -> Tuple[int, int]:
+        """Insert or update nodes and edges in a single transaction.
+
+        Used by the service write-behind buffer: one connection, one
+        ``executemany`` per table, one commit. Returns (nodes, edges) written.
+        """
+        node_rows = [self._node_row(n) for n in nodes]
+        edge_rows = [self._edge_row(e) for e in edges]
+        if not node_rows and not edge_rows:
+            return 0, 0
+        with self._writer() as conn:
+            if node_rows:
+                conn.executemany(self._NODE_UPSERT_SQL, node_rows)
+            if edge_rows:
+                conn.executemany(self._EDGE_UPSERT_SQL, edge_rows)
+        return len(node_rows), len(edge_rows)
     
     def get_node(self, node_id: str) -> Optional[GraphNode]:
         """Retrieve a node by ID."""
-        with self._connect() as conn:
+        with self._reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -203,8 +410,12 @@ class BrainGraphStore:
         domains: Optional[List[str]] = None,
         limit: Optional[int] = None
     ) -> List[GraphNode]:
-        """Retrieve nodes with optional filtering."""
-        with self._connect() as conn:
+        """Retrieve nodes with optional filtering, most salient first.
+
+        Ordered by decayed score (``decay_rank``, ties by id), the same order
+        as the in-memory ``GraphSnapshot``, so a ``limit`` picks the same nodes.
+        """
+        with self._reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -221,7 +432,7 @@ class BrainGraphStore:
                 query += f" AND domain IN ({placeholders})"
                 params.extend(domains)
                 
-            query += " ORDER BY score DESC"
+            query += " ORDER BY decay_rank DESC, id DESC"
             
             if limit:
                 query += " LIMIT ?"
@@ -253,7 +464,7 @@ class BrainGraphStore:
         limit: Optional[int] = None
     ) -> List[GraphEdge]:
         """Retrieve edges with optional filtering."""
-        with self._connect() as conn:
+        with self._reader() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -296,6 +507,70 @@ class BrainGraphStore:
                 for row in rows
             ]
     
+    def get_induced_edges(
+        self,
+        node_ids: Iterable[str],
+        edge_types: Optional[List[EdgeType]] = None,
+    ) -> List[GraphEdge]:
+        """Edges whose both endpoints are in *node_ids* (the induced subgraph).
+
+        One query: small sets are inlined as IN lists, large sets are loaded
+        into a connection-local temp table and joined on both endpoints.
+        Ordered by weight descending, like get_edges.
+        """
+        ids = list(dict.fromkeys(node_ids))
+        if not ids:
+            return []
+
+        type_clause = ""
+        type_params: List[str] = []
+        if edge_types:
+            type_clause = f" AND e.edge_type IN ({','.join('?' * len(edge_types))})"
+            type_params = list(edge_types)
+
+        with self._reader() as conn:
+            conn.row_factory = sqlite3.Row
+            if len(ids) <= _INDUCED_IN_LIST_MAX:
+                placeholders = ",".join("?" * len(ids))
+                rows = conn.execute(
+                    f"""SELECT e.* FROM edges e
+                        WHERE e.from_node IN ({placeholders})
+                        AND e.to_node IN ({placeholders}){type_clause}
+                        ORDER BY e.weight DESC""",
+                    ids + ids + type_params,
+                ).fetchall()
+            else:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS induced_ids (id TEXT PRIMARY KEY)")
+                try:
+                    conn.executemany("INSERT INTO temp.induced_ids (id) VALUES (?)", ((i,) for i in ids))
+                    rows = conn.execute(
+                        f"""SELECT e.* FROM edges e
+                            JOIN temp.induced_ids a ON a.id = e.from_node
+                            JOIN temp.induced_ids b ON b.id = e.to_node
+                            WHERE 1=1{type_clause}
+                            ORDER BY e.weight DESC""",
+                        type_params,
+                    ).fetchall()
+                finally:
+                    # End the implicit transaction so the pooled reader does
+                    # not keep an old WAL snapshot
+                    conn.execute("DELETE FROM temp.induced_ids")
+                    conn.commit()
+
+        return [
+            GraphEdge(
+                id=row["id"],
+                from_node=row["from_node"],
+                to_node=row["to_node"],
+                edge_type=row["edge_type"],
+                updated_at_ms=row["updated_at_ms"],
+                weight=row["weight"],
+                evidence=json.loads(row["evidence_json"]) if row["evidence_json"] else None,
+                meta=json.loads(row["meta_json"]) if row["meta_json"] else {},
+            )
+            for row in rows
+        ]
+
     def get_neighborhood(
         self, 
         center_node: str, 
@@ -317,7 +592,7 @@ class BrainGraphStore:
             
             # FIX: Batch query all edges from current layer in ONE query
             if current_layer:
-                with self._connect() as conn:
+                with self._reader() as conn:
                     conn.row_factory = sqlite3.Row
                     cursor = conn.cursor()
                     
@@ -363,7 +638,7 @@ class BrainGraphStore:
         
         # FIX: Batch fetch all nodes in ONE query instead of N queries
         if visited_nodes:
-            with self._connect() as conn:
+            with self._reader() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -397,36 +672,7 @@ class BrainGraphStore:
             visited_nodes = {n.id for n in nodes}
         
         # FIX: Batch fetch all edges between visited nodes in ONE query
-        edges = []
-        if visited_nodes:
-            with self._connect() as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                placeholders = ",".join("?" * len(visited_nodes))
-                
-                # Single query for edges where both nodes are in visited set
-                cursor.execute(
-                    f"""SELECT * FROM edges 
-                        WHERE from_node IN ({placeholders}) 
-                        AND to_node IN ({placeholders})""",
-                    list(visited_nodes) * 2
-                )
-                rows = cursor.fetchall()
-                
-                edges = [
-                    GraphEdge(
-                        id=row["id"],
-                        from_node=row["from_node"],
-                        to_node=row["to_node"],
-                        edge_type=row["edge_type"],
-                        updated_at_ms=row["updated_at_ms"],
-                        weight=row["weight"],
-                        evidence=json.loads(row["evidence_json"]) if row["evidence_json"] else None,
-                        meta=json.loads(row["meta_json"]) if row["meta_json"] else {},
-                    )
-                    for row in rows
-                ]
+        edges = self.get_induced_edges(visited_nodes)
         
         if max_edges and len(edges) > max_edges:
             edges = sorted(edges, key=lambda e: e.effective_weight(), reverse=True)[:max_edges]
@@ -435,115 +681,101 @@ class BrainGraphStore:
     
     def prune_graph(self, now_ms: Optional[int] = None) -> Dict[str, int]:
         """Remove low-salience nodes/edges and enforce capacity limits.
-        
-        Optimized: Uses only 2 table scans (one for edges, one for nodes)
-        instead of 4 separate scans.
+
+        Runs in slices: each slice is one write transaction that executes
+        bounded DELETE statements (at most ``prune_batch`` rows each) until
+        its ``prune_budget_ms`` is used up, then commits and releases the
+        write lock so other writers can interleave. Order of work: decayed
+        edges, excess edges, decayed isolated nodes, excess nodes.
         """
         if now_ms is None:
             now_ms = int(time.time() * 1000)
 
-        stats = {"nodes_removed": 0, "edges_removed": 0}
+        stats = {"nodes_removed": 0, "edges_removed": 0, "slices": 0, "max_slice_ms": 0.0}
+        steps = [
+            self._prune_weak_edges,
+            self._prune_excess_edges,
+            self._prune_weak_nodes,
+            self._prune_excess_nodes,
+        ]
+        budget_s = self.prune_budget_ms / 1000
 
-        with self._write_lock, self._connect() as conn:
-            cursor = conn.cursor()
+        while steps:
+            with self._writer() as conn:
+                started = time.monotonic()
+                while steps:
+                    nodes_removed, edges_removed, done = steps[0](conn, now_ms)
+                    stats["nodes_removed"] += nodes_removed
+                    stats["edges_removed"] += edges_removed
+                    if done:
+                        steps.pop(0)
+                    if time.monotonic() - started >= budget_s:
+                        break
+                elapsed_ms = (time.monotonic() - started) * 1000
+            stats["slices"] += 1
+            stats["max_slice_ms"] = round(max(stats["max_slice_ms"], elapsed_ms), 3)
 
-            # ========== Single pass for edges ==========
-            cursor.execute("SELECT * FROM edges")
-            all_edges = []
-            weak_edge_ids = []
-            
-            for row in cursor.fetchall():
-                edge = GraphEdge(
-                    id=row[0],
-                    from_node=row[1], 
-                    to_node=row[2],
-                    edge_type=row[3],
-                    updated_at_ms=row[4],
-                    weight=row[5],
-                    evidence=json.loads(row[6]) if row[6] else None,
-                    meta=json.loads(row[7]) if row[7] else {},
-                )
-                effective_weight = edge.effective_weight(now_ms)
-                
-                if effective_weight < self.edge_min_weight:
-                    weak_edge_ids.append(edge.id)
-                all_edges.append((edge.id, effective_weight, edge.updated_at_ms))
-            
-            # Remove weak edges
-            if weak_edge_ids:
-                placeholders = ",".join("?" * len(weak_edge_ids))
-                cursor.execute(f"DELETE FROM edges WHERE id IN ({placeholders})", weak_edge_ids)
-                stats["edges_removed"] += cursor.rowcount
-            
-            # Enforce edge limit in same pass
-            if len(all_edges) > self.max_edges:
-                # Sort by weight desc, then recency desc
-                all_edges.sort(key=lambda x: (x[1], x[2]), reverse=True)
-                edges_to_remove = [eid for eid, _, _ in all_edges[self.max_edges:]]
-                
-                if edges_to_remove:
-                    placeholders = ",".join("?" * len(edges_to_remove))
-                    cursor.execute(f"DELETE FROM edges WHERE id IN ({placeholders})", edges_to_remove)
-                    stats["edges_removed"] += cursor.rowcount
-            
-            # ========== Single pass for nodes ==========
-            cursor.execute("""
-                SELECT n.*, 
-                       (SELECT COUNT(*) FROM edges WHERE from_node = n.id OR to_node = n.id) as edge_count
-                FROM nodes n
-            """)
-            all_nodes = []
-            weak_node_ids = []
-            
-            for row in cursor.fetchall():
-                node = GraphNode(
-                    id=row[0],
-                    kind=row[1],
-                    label=row[2], 
-                    updated_at_ms=row[3],
-                    score=row[4],
-                    domain=row[5],
-                    source=json.loads(row[6]) if row[6] else None,
-                    tags=json.loads(row[7]) if row[7] else None,
-                    meta=json.loads(row[8]) if row[8] else {},
-                )
-                edge_count = row[9]  # Already joined from subquery
-                effective_score = node.effective_score(now_ms)
-                
-                if effective_score < self.node_min_score and edge_count == 0:
-                    weak_node_ids.append(node.id)
-                all_nodes.append((node.id, effective_score, node.updated_at_ms))
-            
-            # Remove weak nodes
-            if weak_node_ids:
-                placeholders = ",".join("?" * len(weak_node_ids))
-                cursor.execute(f"DELETE FROM nodes WHERE id IN ({placeholders})", weak_node_ids)
-                stats["nodes_removed"] += cursor.rowcount
-            
-            # Enforce node limit in same pass
-            if len(all_nodes) > self.max_nodes:
-                # Sort by score desc, then recency desc
-                all_nodes.sort(key=lambda x: (x[1], x[2]), reverse=True)
-                nodes_to_remove = [nid for nid, _, _ in all_nodes[self.max_nodes:]]
-                
-                if nodes_to_remove:
-                    placeholders = ",".join("?" * len(nodes_to_remove))
-                    # Remove associated edges first
-                    cursor.execute(
-                        f"DELETE FROM edges WHERE from_node IN ({placeholders}) OR to_node IN ({placeholders})",
-                        nodes_to_remove + nodes_to_remove
-                    )
-                    # Remove nodes
-                    cursor.execute(f"DELETE FROM nodes WHERE id IN ({placeholders})", nodes_to_remove)
-                    stats["nodes_removed"] += cursor.rowcount
-            
-            conn.commit()
-        
         return stats
+
+    def _prune_weak_edges(self, conn: sqlite3.Connection, now_ms: int) -> Tuple[int, int, bool]:
+        if self.edge_min_weight <= 0:
+            return 0, 0, True
+        threshold = decay_threshold(self.edge_min_weight, now_ms, EDGE_HALF_LIFE_MS)
+        removed = conn.execute(
+            "DELETE FROM edges WHERE id IN "
+            "(SELECT id FROM edges WHERE decay_rank < ? LIMIT ?)",
+            (threshold, self.prune_batch),
+        ).rowcount
+        return 0, removed, removed < self.prune_batch
+
+    def _prune_excess_edges(self, conn: sqlite3.Connection, now_ms: int) -> Tuple[int, int, bool]:
+        excess = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0] - self.max_edges
+        if excess <= 0:
+            return 0, 0, True
+        # Lowest decayed weight first, oldest first on ties
+        removed = conn.execute(
+            "DELETE FROM edges WHERE id IN "
+            "(SELECT id FROM edges ORDER BY decay_rank, updated_at_ms LIMIT ?)",
+            (min(excess, self.prune_batch),),
+        ).rowcount
+        return 0, removed, removed >= excess
+
+    def _prune_weak_nodes(self, conn: sqlite3.Connection, now_ms: int) -> Tuple[int, int, bool]:
+        if self.node_min_score <= 0:
+            return 0, 0, True
+        threshold = decay_threshold(self.node_min_score, now_ms, NODE_HALF_LIFE_MS)
+        removed = conn.execute(
+            "DELETE FROM nodes WHERE id IN "
+            "(SELECT id FROM nodes WHERE degree <= 0 AND decay_rank < ? LIMIT ?)",
+            (threshold, self.prune_batch),
+        ).rowcount
+        return removed, 0, removed < self.prune_batch
+
+    def _prune_excess_nodes(self, conn: sqlite3.Connection, now_ms: int) -> Tuple[int, int, bool]:
+        excess = conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0] - self.max_nodes
+        if excess <= 0:
+            return 0, 0, True
+        victims = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM nodes ORDER BY decay_rank, updated_at_ms LIMIT ?",
+                (min(excess, self.prune_batch),),
+            )
+        ]
+        placeholders = ",".join("?" * len(victims))
+        # Remove associated edges first
+        edges_removed = conn.execute(
+            f"DELETE FROM edges WHERE from_node IN ({placeholders}) OR to_node IN ({placeholders})",
+            victims + victims,
+        ).rowcount
+        nodes_removed = conn.execute(
+            f"DELETE FROM nodes WHERE id IN ({placeholders})", victims
+        ).rowcount
+        return nodes_removed, edges_removed, nodes_removed >= excess
     
     def get_stats(self) -> Dict[str, int]:
         """Get current graph statistics."""
-        with self._connect() as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
             
             cursor.execute("SELECT COUNT(*) FROM nodes")
@@ -0,0 +1,193 @@
+"""Coalescing live-update stream for brain graph SSE clients.
+
+Every published event gets a sequence number and lands in a bounded replay
+log. Subscribers do not queue events one by one: each keeps a coalescing
+buffer holding only the latest event per key (``node:<id>``,
+``edge:<id>``, or the event type for graph-wide events), so a burst of
+touches to the same nodes collapses to one entry per node. The SSE handler
+drains the buffer once per flush interval into a frame whose ``seq`` is the
+last sequence number it covers; the frame goes out as one message per event
+(default) or as a single batch message (``?batch=1``).
+
+A reconnecting client sends ``Last-Event-ID``; if that sequence number is
+still in the replay log the missed events are replayed (coalesced) before
+live delivery continues. If it is too old, or a subscriber's buffer grows
+past ``max_pending`` keys, the subscriber gets a ``resync`` frame telling it
+to re-read ``/api/v1/graph/state`` instead of being disconnected.
+
+Environment variables:
+    COPILOT_SSE_FLUSH_MS     – coalescing window per frame (default: 250)
+    COPILOT_SSE_REPLAY       – events kept for Last-Event-ID resume (default: 4096)
+    COPILOT_SSE_MAX_PENDING  – buffered keys per subscriber before resync (default: 5000)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+_DEFAULT_FLUSH_MS = 250
+_DEFAULT_REPLAY = 4096
+_DEFAULT_MAX_PENDING = 5000
+
+# (seq, event type, data, timestamp_ms)
+Event = Tuple[int, str, Dict[str, Any], int]
+
+
+def event_key(event_type: str, data: Dict[str, Any]) -> str:
+    """Coalescing key: later events with the same key replace earlier ones."""
+    if event_type.startswith("node_") and "id" in data:
+        return f"node:{data['id']}"
+    if event_type.startswith("edge_") and "id" in data:
+        return f"edge:{data['id']}"
+    return event_type
+
+
+class StreamSubscriber:
+    """Coalescing buffer of one SSE client."""
+
+    def __init__(self, stream: "GraphEventStream", last_seq: int) -> None:
+        self._stream = stream
+        self._pending: "OrderedDict[str, Event]" = OrderedDict()
+        self.last_seq = last_seq  # last sequence number handed out
+        self.resync = False
+        self.delivered_events = 0
+        self.coalesced_events = 0
+
+    def _offer(self, key: str, event: Event) -> None:
+        """Caller holds the stream lock."""
+        if self.resync:
+            return  # everything up to the resync is superseded by a state re-read
+        if key in self._pending:
+            del self._pending[key]
+            self.coalesced_events += 1
+        self._pending[key] = event
+        if len(self._pending) > self._stream.max_pending:
+            self._pending.clear()
+            self.resync = True
+
+    def next_frame(self, timeout: float, max_events: int = 1000) -> Optional[Dict[str, Any]]:
+        """Block until events are pending, wait one flush interval, then drain.
+
+        Returns ``{"seq", "events"}`` (or ``{"seq", "resync": True}``), or
+        None if nothing arrived within *timeout* seconds.
+        """
+        stream = self._stream
+        with stream._cond:
+            if not stream._cond.wait_for(lambda: self._pending or self.resync, timeout):
+                return None
+        if stream.flush_interval > 0:
+            time.sleep(stream.flush_interval)  # let the burst coalesce
+        with stream._cond:
+            if self.resync:
+                self.resync = False
+                self._pending.clear()
+                self.last_seq = stream.seq
+                return {"seq": self.last_seq, "resync": True}
+            events = []
+            while self._pending and len(events) < max_events:
+                _, event = self._pending.popitem(last=False)
+                events.append(event)
+            # Frames are cumulative: seq covers everything older than what is left
+            if self._pending:
+                self.last_seq = min(e[0] for e in self._pending.values()) - 1
+            else:
+                self.last_seq = stream.seq
+            self.delivered_events += len(events)
+        events.sort(key=lambda e: e[0])
+        return {
+            "seq": self.last_seq,
+            "events": [
+                {"seq": seq, "event": event_type, "data": data, "timestamp_ms": ts}
+                for seq, event_type, data, ts in events
+            ],
+        }
+
+    def close(self) -> None:
+        self._stream.unsubscribe(self)
+
+
+class GraphEventStream:
+    """Sequenced event fan-out with replay log and per-subscriber coalescing."""
+
+    def __init__(
+        self,
+        flush_interval_ms: Optional[float] = None,
+        replay_size: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.flush_interval = max(0.0, float(
+            flush_interval_ms if flush_interval_ms is not None
+            else os.environ.get("COPILOT_SSE_FLUSH_MS", _DEFAULT_FLUSH_MS)
+        )) / 1000
+        self.replay_size = max(1, int(
+            replay_size if replay_size is not None
+            else os.environ.get("COPILOT_SSE_REPLAY", _DEFAULT_REPLAY)
+        ))
+        self.max_pending = max(1, int(
+            max_pending if max_pending is not None
+            else os.environ.get("COPILOT_SSE_MAX_PENDING", _DEFAULT_MAX_PENDING)
+        ))
+        self.seq = 0
+        self._cond = threading.Condition()
+        self._replay: Deque[Tuple[str, Event]] = deque(maxlen=self.replay_size)
+        self._subscribers: List[StreamSubscriber] = []
+        self._stats = {"published": 0, "resumed": 0, "resyncs": 0}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Record an event and offer it to all subscribers; returns its seq."""
+        key = event_key(event_type, data)
+        with self._cond:
+            self.seq += 1
+            event = (self.seq, event_type, data, int(time.time() * 1000))
+            self._replay.append((key, event))
+            self._stats["published"] += 1
+            for subscriber in self._subscribers:
+                was_resync = subscriber.resync
+                subscriber._offer(key, event)
+                if subscriber.resync and not was_resync:
+                    self._stats["resyncs"] += 1
+            self._cond.notify_all()
+            return self.seq
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> StreamSubscriber:
+        """New subscriber; with *last_event_id* missed events are replayed."""
+        with self._cond:
+            subscriber = StreamSubscriber(self, self.seq)
+            if last_event_id is not None and last_event_id != self.seq:
+                oldest = self._replay[0][1][0] if self._replay else self.seq + 1
+                # Too old for the log, or from before a restart (seq reset)
+                if not oldest <= last_event_id + 1 <= self.seq:
+                    subscriber.resync = True
+                    self._stats["resyncs"] += 1
+                else:
+                    subscriber.last_seq = last_event_id
+                    for key, event in self._replay:
+                        if event[0] > last_event_id:
+                            subscriber._offer(key, event)
+                    self._stats["resumed"] += 1
+            self._subscribers.append(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        with self._cond:
+            try:
+                self._subscribers.remove(subscriber)
+            except ValueError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "seq": self.seq,
+                "subscribers": len(self._subscribers),
+                "replay_events": len(self._replay),
+                "flush_interval_ms": self.flush_interval * 1000,
+            }
@@ -9,7 +9,7 @@ from flask import Flask
 
 from copilot_core.api.v1 import log_fixer_tx
 from copilot_core.api.v1 import events_ingest
-from copilot_core.api.v1.events_ingest import set_post_ingest_callback
+from copilot_core.api.v1.events_ingest import set_ingest_pipeline, set_post_ingest_callback
 from copilot_core.brain_graph.api import brain_graph_bp, init_brain_graph_api
 from copilot_core.brain_graph.service import BrainGraphService
 from copilot_core.brain_graph.store import BrainGraphStore
@@ -18,6 +18,7 @@ from copilot_core.brain_graph.store import BrainGraphStore
 GraphStore = BrainGraphStore
 from copilot_core.brain_graph.render import GraphRenderer
 from copilot_core.ingest.event_processor import EventProcessor
+from copilot_core.ingest.pipeline import IngestPipeline
 from copilot_core.dev_surface.api import dev_surface_bp, init_dev_surface_api
 from copilot_core.candidates.api import candidates_bp, init_candidates_api
 from copilot_core.candidates.store import CandidateStore
@@ -81,6 +82,7 @@ def init_services(hass=None, config: dict = None):
         "habitus_service": None,
         "mood_service": None,
         "event_processor": None,
+        "ingest_pipeline": None,
         "tag_registry": None,
         "webhook_pusher": None,
         "household_profile": None,
@@ -150,6 +152,8 @@ def init_services(hass=None, config: dict = None):
             node_half_life_hours=_safe_float(bg_config.get("node_half_life_hours", 24.0), 24.0, 0.1, 8760.0),
             edge_half_life_hours=_safe_float(bg_config.get("edge_half_life_hours", 12.0), 12.0, 0.1, 8760.0),
             prune_interval_minutes=_safe_int(bg_config.get("prune_interval_minutes", 60), 60, 1, 1440),
+            flush_interval_seconds=_safe_float(bg_config.get("flush_interval_seconds", 0.0), 0.0, 0.0, 300.0),
+            max_pending_writes=_safe_int(bg_config.get("max_pending_writes", 5000), 5000, 100, 100000),
         )
         brain_graph_service.start_scheduled_pruning()
         services["brain_graph_service"] = brain_graph_service
@@ -196,6 +200,12 @@ def init_services(hass=None, config: dict = None):
             event_processor = EventProcessor(brain_graph_service=services["brain_graph_service"])
             services["event_processor"] = event_processor
             set_post_ingest_callback(event_processor.process_events)
+            # Run it off the request thread so POST /api/v1/events acks immediately
+            ingest_pipeline = IngestPipeline()
+            ingest_pipeline.add_stage("event_processor", event_processor.process_events)
+            ingest_pipeline.start()
+            services["ingest_pipeline"] = ingest_pipeline
+            set_ingest_pipeline(ingest_pipeline)
     except Exception:
         _LOGGER.exception("Failed to init EventProcessor")
 
@@ -448,6 +458,14 @@ def init_services(hass=None, config: dict = None):
 
         _LOGGER.info("Hub engines: %d/%d initialized", _engines_ok, len(_hub_engines))
 
+    # Step 2b: Restore persisted anomaly baselines (engine stays in-memory on failure)
+    anomaly_engine = services.get("hub_anomaly")
+    if anomaly_engine is not None:
+        try:
+            anomaly_engine.attach_store()
+        except Exception:
+            _LOGGER.exception("Failed to open anomaly history store — baselines will not persist")
+
     # Step 3: Wire Integration Hub (only if it was created)
     integration_hub = services.get("hub_integration")
     if integration_hub is not None:
@@ -539,6 +557,37 @@ def init_services(hass=None, config: dict = None):
     return services
 
 
+# Seconds the ingest pipeline gets to process already-acknowledged batches
+# on shutdown (HA stops add-ons with SIGKILL 10 s after SIGTERM).
+_SHUTDOWN_DRAIN_TIMEOUT = 8.0
+
+
+def shutdown_services(services: dict) -> None:
+    """
+    Stop background services that hold accepted but unpersisted work.
+
+    Registered by main.create_app as an atexit hook. Each step is wrapped
+    in try/except so one failure does not skip the rest.
+    """
+    ingest_pipeline = services.get("ingest_pipeline")
+    if ingest_pipeline is not None:
+        try:
+            if not ingest_pipeline.drain(timeout=_SHUTDOWN_DRAIN_TIMEOUT):
+                _LOGGER.warning("Ingest pipeline not drained on shutdown: %s",
+                                ingest_pipeline.stats())
+            ingest_pipeline.stop(timeout=1.0)
+        except Exception:
+            _LOGGER.exception("Failed to stop ingest pipeline")
+
+    # After the pipeline: its last batches may still feed anomaly readings
+    anomaly_engine = services.get("hub_anomaly")
+    if anomaly_engine is not None:
+        try:
+            anomaly_engine.close()
+        except Exception:
+            _LOGGER.exception("Failed to write final anomaly history checkpoint")
+
+
 def register_blueprints(app: Flask, services: dict = None) -> None:
     """
     Register all API blueprints with the Flask app.
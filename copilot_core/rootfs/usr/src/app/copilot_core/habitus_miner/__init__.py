@@ -6,10 +6,12 @@ Focuses on explainability and anti-noise measures.
 v0.2 adds zone-based mining with TagZoneIntegration.
 """
 
+from .incremental import PairStatistics
 from .mining import mine_ab_rules, mine_with_context_stratification
 from .model import NormEvent, Rule, MiningConfig, EventStreamType, RulesType
 from .service import HabitusMinerService
 from .store import HabitusMinerStore
+from .table import EventTable
 from .zone_mining import (
     ZoneBasedMiner,
     ZoneMiningConfig,
@@ -27,6 +29,8 @@ __all__ = [
     "RulesType",
     "HabitusMinerService",
     "HabitusMinerStore",
+    "PairStatistics",
+    "EventTable",
     # v0.2 API
     "ZoneBasedMiner",
     "ZoneMiningConfig",
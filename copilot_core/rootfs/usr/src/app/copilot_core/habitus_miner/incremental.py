@@ -0,0 +1,418 @@
+"""Incremental A→B mining from persisted sufficient statistics.
+
+:func:`~copilot_core.habitus_miner.mining.mine_ab_rules` needs the whole
+event stream on every run. :class:`PairStatistics` instead keeps, per
+event key and per (A, B) pair, the counts the rule metrics are computed
+from, so each run only folds in events newer than the last one seen:
+
+* ``nA`` / ``nB`` – (decayed) event count per key,
+* a latency histogram per pair – for every A, the delay to the first B
+  strictly after it, bucketed on log-spaced edges that include every
+  configured window. ``nAB`` for window *dt* is the histogram mass up to
+  *dt*; the same buckets give the latency quantiles,
+* the (decayed) observation period.
+
+An A event is only *finalized* – counted and matched against its
+successors – once the stream has advanced the largest window past it, so
+a hit whose B arrives in a later batch is still seen. Unfinalized events
+are kept as a small tail and replayed with the next batch.
+
+With ``decay_half_life_days`` > 0 every contribution is weighted by
+``2 ** (-age / half_life)``; counts and the observation period are
+decayed together, so confidence and lift stay comparable while old
+behavior fades. Months of history cost a few arrays instead of a re-scan.
+
+Raw events are not retained, so rules from statistics carry latency
+quantiles but no hit/miss examples.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from typing import Any
+
+import numpy as np
+
+from .mining import (
+    _calculate_rule_quality,
+    _deduplicate_events,
+    _filter_events,
+    _key_entity,
+    _wilson_lower_bounds,
+)
+from .model import EventStreamType, MiningConfig, NormEvent, Rule, RuleEvidence, RulesType
+
+_LOGGER = logging.getLogger(__name__)
+
+STATS_VERSION = 1
+
+_DAY_MS = 24 * 3600 * 1000
+# Log-spaced latency edges between 1 s and the largest window
+_SKETCH_EDGES = 12
+# Upper limit on tracked pairs; the lightest are dropped beyond it
+_MAX_PAIRS = 200_000
+# Pairs whose decayed hit mass falls below this are forgotten
+_MIN_PAIR_MASS = 0.05
+# Finalized (A, successor) combinations expanded per numpy chunk
+_EXPAND_CHUNK = 1_000_000
+
+
+def config_signature(config: MiningConfig) -> str:
+    """Settings the statistics depend on; a change requires a rebuild."""
+    return json.dumps({
+        "windows": sorted(set(config.windows)),
+        "half_life_days": config.decay_half_life_days,
+        "default_cooldown": config.default_cooldown,
+        "entity_cooldown": config.entity_cooldown,
+        "include_domains": config.include_domains,
+        "exclude_domains": config.exclude_domains,
+        "include_entities": config.include_entities,
+        "exclude_entities": config.exclude_entities,
+    }, sort_keys=True)
+
+
+def _latency_edges(windows: list[int]) -> np.ndarray:
+    """Histogram bucket upper edges (ms): log-spaced plus every window."""
+    max_ms = max(windows) * 1000
+    log_edges = np.geomspace(1000, max(max_ms, 1000), _SKETCH_EDGES).round().astype(np.int64)
+    return np.unique(np.concatenate([log_edges, np.array(windows, dtype=np.int64) * 1000]))
+
+
+class PairStatistics:
+    """Decayed per-key counts and per-pair latency histograms."""
+
+    def __init__(self, config: MiningConfig) -> None:
+        windows = sorted(set(config.windows))
+        if not windows:
+            raise ValueError("mining config has no windows")
+        self.signature = config_signature(config)
+        self.windows = windows
+        self.edges = _latency_edges(windows)
+        self.half_life_ms = config.decay_half_life_days * _DAY_MS
+        self.max_window_ms = windows[-1] * 1000
+        self.max_cooldown_ms = 1000 * max(
+            [config.default_cooldown, *config.entity_cooldown.values()]
+        )
+
+        self.keys: list[str] = []
+        self._key_ids: dict[str, int] = {}
+        self.key_counts = np.zeros(0, dtype=np.float64)
+        # Pair code = a_id << 32 | b_id, sorted; one histogram row each
+        self.pair_codes = np.zeros(0, dtype=np.int64)
+        self.pair_hist = np.zeros((0, self.edges.size), dtype=np.float32)
+
+        self.ref_ts: int | None = None      # decay reference = finalized horizon
+        self.watermark: int | None = None   # newest event folded in
+        self.period_ms = 0.0                # decayed observation period
+        self.tail: EventStreamType = []     # events not finalized yet
+        self.events_folded = 0
+        self.late_events = 0
+
+    # --- Folding ------------------------------------------------------------
+
+    def update(self, events: EventStreamType, config: MiningConfig) -> int:
+        """Fold events newer than the watermark in; returns how many."""
+        events = _filter_events(list(events), config)
+        if self.watermark is not None:
+            fresh = [e for e in events if e.ts > self.watermark]
+            self.late_events += len(events) - len(fresh)
+            events = fresh
+        if not events:
+            return 0
+
+        stream = _deduplicate_events(self.tail + events, config)
+        new_watermark = stream[-1].ts
+        old_horizon = self.ref_ts
+        horizon = new_watermark - self.max_window_ms
+
+        ts = np.fromiter((e.ts for e in stream), dtype=np.int64, count=len(stream))
+        kid = np.fromiter(
+            (self._key_id(e.key) for e in stream), dtype=np.int64, count=len(stream)
+        )
+        lo = 0 if old_horizon is None else int(np.searchsorted(ts, old_horizon, side="right"))
+        hi = int(np.searchsorted(ts, horizon, side="right"))
+
+        if hi > lo:
+            if old_horizon is None:
+                old_horizon = int(ts[lo])
+            self._advance(old_horizon, horizon)
+            weights = self._weights(ts[lo:hi], horizon)
+            self.key_counts += np.bincount(
+                kid[lo:hi], weights=weights, minlength=len(self.keys)
+            )
+            self._fold_pairs(ts, kid, lo, hi, weights)
+            self._prune()
+
+        self.watermark = new_watermark
+        keep_from = self.ref_ts - self.max_cooldown_ms if self.ref_ts is not None else None
+        self.tail = [e for e in stream if keep_from is None or e.ts > keep_from]
+        self.events_folded += len(events)
+        return len(events)
+
+    def _key_id(self, key: str) -> int:
+        kid = self._key_ids.get(key)
+        if kid is None:
+            kid = self._key_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.key_counts = np.append(self.key_counts, 0.0)
+        return kid
+
+    def _decay(self, age_ms: np.ndarray | float) -> np.ndarray | float:
+        if self.half_life_ms <= 0:
+            return np.ones_like(age_ms) if isinstance(age_ms, np.ndarray) else 1.0
+        return np.exp2(-np.asarray(age_ms, dtype=np.float64) / self.half_life_ms)
+
+    def _advance(self, old_ref: int, new_ref: int) -> None:
+        """Move the decay reference forward, growing the observed period."""
+        if self.ref_ts is None:
+            self.ref_ts = old_ref
+        elapsed = max(0, new_ref - self.ref_ts)
+        factor = float(self._decay(elapsed))
+        self.key_counts *= factor
+        self.pair_hist *= factor
+        if self.half_life_ms > 0:
+            scale = self.half_life_ms / math.log(2)
+            self.period_ms = self.period_ms * factor + scale * (1 - factor)
+        else:
+            self.period_ms += elapsed
+        self.ref_ts = new_ref
+
+    def _weights(self, ts: np.ndarray, ref: int) -> np.ndarray:
+        return np.asarray(self._decay(ref - ts), dtype=np.float64)
+
+    def _fold_pairs(
+        self, ts: np.ndarray, kid: np.ndarray, lo: int, hi: int, weights: np.ndarray
+    ) -> None:
+        """Add first-successor latencies of the finalized events ``[lo, hi)``."""
+        n = ts.size
+        # Previous index with the same key (-1 if none)
+        prev_same = np.full(n, -1, dtype=np.int64)
+        order = np.lexsort((np.arange(n), kid))
+        same = kid[order[1:]] == kid[order[:-1]]
+        prev_same[order[1:][same]] = order[:-1][same]
+
+        starts = np.searchsorted(ts, ts[lo:hi], side="right")
+        ends = np.searchsorted(ts, ts[lo:hi] + self.max_window_ms, side="right")
+        lengths = ends - starts
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+        first = 0
+        while first < lengths.size:
+            last = int(np.searchsorted(bounds, bounds[first] + _EXPAND_CHUNK, side="right")) - 1
+            last = max(last, first + 1)
+            rows = np.arange(first, last)
+            counts = lengths[rows]
+            total = int(counts.sum())
+            if total:
+                rep = np.repeat(rows, counts)
+                j = np.arange(total) - np.repeat(bounds[rows] - bounds[first], counts) \
+                    + np.repeat(starts[rows], counts)
+                # j is the first of its key after event i
+                ok = prev_same[j] < starts[rep]
+                rep, j = rep[ok], j[ok]
+                i = rep + lo
+                codes = (kid[i] << 32) | kid[j]
+                buckets = np.searchsorted(self.edges, ts[j] - ts[i], side="left")
+                self._merge(codes, buckets, weights[rep])
+            first = last
+
+    def _merge(self, codes: np.ndarray, buckets: np.ndarray, weights: np.ndarray) -> None:
+        uniq, inverse = np.unique(codes, return_inverse=True)
+        width = self.edges.size
+        hist = np.bincount(
+            inverse * width + buckets, weights=weights, minlength=uniq.size * width
+        ).reshape(uniq.size, width).astype(np.float32)
+
+        pos = np.searchsorted(self.pair_codes, uniq)
+        known = pos < self.pair_codes.size
+        known[known] = self.pair_codes[pos[known]] == uniq[known]
+        self.pair_hist[pos[known]] += hist[known]
+        if not known.all():
+            # Both sides are sorted, so inserting at pos keeps pair_codes sorted
+            fresh = ~known
+            self.pair_codes = np.insert(self.pair_codes, pos[fresh], uniq[fresh])
+            self.pair_hist = np.insert(self.pair_hist, pos[fresh], hist[fresh], axis=0)
+            if self.pair_codes.size > 2 * _MAX_PAIRS:
+                self._prune()
+
+    def _prune(self) -> None:
+        mass = self.pair_hist.sum(axis=1, dtype=np.float64)
+        keep = mass >= _MIN_PAIR_MASS
+        if keep.sum() > _MAX_PAIRS:
+            cutoff = np.partition(mass, mass.size - _MAX_PAIRS)[mass.size - _MAX_PAIRS]
+            keep &= mass >= cutoff
+        if not keep.all():
+            self.pair_codes, self.pair_hist = self.pair_codes[keep], self.pair_hist[keep]
+
+    # --- Rules --------------------------------------------------------------
+
+    def n_ab(self, a_key: str, b_key: str, dt_sec: int) -> float:
+        """Decayed count of A events followed by B within *dt_sec*."""
+        a, b = self._key_ids.get(a_key), self._key_ids.get(b_key)
+        if a is None or b is None:
+            return 0.0
+        code = (a << 32) | b
+        pos = int(np.searchsorted(self.pair_codes, code))
+        if pos >= self.pair_codes.size or self.pair_codes[pos] != code:
+            return 0.0
+        upto = int(np.searchsorted(self.edges, dt_sec * 1000)) + 1
+        return float(self.pair_hist[pos, :upto].sum(dtype=np.float64))
+
+    def rules(self, config: MiningConfig) -> RulesType:
+        """Rules passing *config*'s filters, from the statistics alone."""
+        if self.pair_codes.size == 0 or self.period_ms <= 0:
+            return []
+        counts = np.rint(self.key_counts).astype(np.int64)
+        a_ids = self.pair_codes >> 32
+        b_ids = self.pair_codes & 0xFFFFFFFF
+        support = (
+            (counts[a_ids] >= max(1, config.min_support_A))
+            & (counts[b_ids] >= config.min_support_B)
+        )
+        if config.exclude_self_rules:
+            support &= a_ids != b_ids
+        rows = np.flatnonzero(support)
+        if rows.size == 0:
+            return []
+
+        period = int(self.period_ms)
+        observation_period_days = max(1, period // _DAY_MS)
+        cumulative = np.cumsum(self.pair_hist[rows], axis=1, dtype=np.float64)
+        window_cols = np.searchsorted(self.edges, np.array(self.windows) * 1000)
+        n_ab = np.rint(cumulative[:, window_cols]).astype(np.int64)
+        n_a = counts[a_ids[rows]]
+        n_b = counts[b_ids[rows]]
+        # _baseline_pb for every (B, window) at once
+        num_windows = np.maximum(1, period // (np.array(self.windows, dtype=np.int64) * 1000))
+        base = np.minimum(1.0, n_b[:, None] / num_windows[None, :])
+
+        trials = n_a[:, None].astype(np.float64)
+        confidence = n_ab / trials
+        keep = (
+            (n_ab >= config.min_hits)
+            & (confidence >= config.min_confidence - 1e-9)
+            & (_wilson_lower_bounds(n_ab, trials) >= config.min_confidence_lb - 1e-9)
+            & (confidence / np.maximum(0.001, base) >= config.min_lift - 1e-9)
+            & (confidence - base >= config.min_leverage - 1e-9)
+        )
+
+        rules: RulesType = []
+        for r, col in zip(*np.nonzero(keep)):
+            a_key, b_key = self.keys[a_ids[rows[r]]], self.keys[b_ids[rows[r]]]
+            if config.exclude_same_entity and _key_entity(a_key) == _key_entity(b_key):
+                continue
+            quality = _calculate_rule_quality(int(n_a[r]), int(n_ab[r, col]), float(base[r, col]))
+            if (
+                quality["confidence"] < config.min_confidence
+                or quality["confidence_lb"] < config.min_confidence_lb
+                or quality["lift"] < config.min_lift
+                or quality["leverage"] < config.min_leverage
+            ):
+                continue
+            dt_sec = self.windows[col]
+            rules.append(Rule(
+                A=a_key,
+                B=b_key,
+                dt_sec=dt_sec,
+                nA=int(n_a[r]),
+                nB=int(n_b[r]),
+                nAB=int(n_ab[r, col]),
+                confidence=quality["confidence"],
+                confidence_lb=quality["confidence_lb"],
+                lift=quality["lift"],
+                leverage=quality["leverage"],
+                conviction=quality["conviction"],
+                observation_period_days=observation_period_days,
+                baseline_p_b=float(base[r, col]),
+                evidence=RuleEvidence(
+                    hit_examples=[],
+                    miss_examples=[],
+                    latency_quantiles=self._quantiles(self.pair_hist[rows[r]], dt_sec),
+                ),
+            ))
+
+        rules.sort(key=lambda rule: rule.score(), reverse=True)
+        return rules[:config.max_rules]
+
+    def _quantiles(self, hist: np.ndarray, dt_sec: int) -> list[float]:
+        """p25/p50/p75/p90/p99 latency (s) of hits within *dt_sec*."""
+        upto = int(np.searchsorted(self.edges, dt_sec * 1000)) + 1
+        mass = np.cumsum(hist[:upto], dtype=np.float64)
+        if mass[-1] <= 0:
+            return []
+        lower = np.concatenate([[0], self.edges[:upto - 1]])
+        out = []
+        for q in (0.25, 0.5, 0.75, 0.9, 0.99):
+            target = q * mass[-1]
+            b = int(np.searchsorted(mass, target))
+            below = mass[b - 1] if b else 0.0
+            frac = (target - below) / hist[b] if hist[b] > 0 else 0.0
+            out.append(float(lower[b] + frac * (self.edges[b] - lower[b])) / 1000)
+        return out
+
+    # --- Persistence --------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "keys": len(self.keys),
+            "pairs": int(self.pair_codes.size),
+            "events_folded": self.events_folded,
+            "late_events": self.late_events,
+            "tail_events": len(self.tail),
+            "watermark": self.watermark,
+            "finalized_until": self.ref_ts,
+            "observation_period_days": round(self.period_ms / _DAY_MS, 2),
+            "bytes": int(self.pair_codes.nbytes + self.pair_hist.nbytes + self.key_counts.nbytes),
+        }
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arrays for ``np.savez`` (no pickled objects)."""
+        meta = {
+            "version": STATS_VERSION,
+            "signature": self.signature,
+            "ref_ts": self.ref_ts,
+            "watermark": self.watermark,
+            "period_ms": self.period_ms,
+            "events_folded": self.events_folded,
+            "late_events": self.late_events,
+            "tail": [
+                [e.ts, e.key, e.entity_id, e.domain, e.transition, e.context]
+                for e in self.tail
+            ],
+        }
+        return {
+            "meta": np.array(json.dumps(meta)),
+            "keys": np.array(self.keys, dtype=str),
+            "key_counts": self.key_counts,
+            "pair_codes": self.pair_codes,
+            "pair_hist": self.pair_hist,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], config: MiningConfig) -> "PairStatistics":
+        """Restore saved statistics; raises ValueError if they do not fit *config*."""
+        meta = json.loads(str(arrays["meta"]))
+        stats = cls(config)
+        if meta.get("version") != STATS_VERSION or meta.get("signature") != stats.signature:
+            raise ValueError("pair statistics were built with different settings")
+        keys = [str(k) for k in arrays["keys"]]
+        if arrays["pair_hist"].shape[1:] != (stats.edges.size,) or len(keys) != arrays["key_counts"].size:
+            raise ValueError("inconsistent pair statistics arrays")
+        stats.keys = keys
+        stats._key_ids = {key: i for i, key in enumerate(keys)}
+        stats.key_counts = np.asarray(arrays["key_counts"], dtype=np.float64)
+        stats.pair_codes = np.asarray(arrays["pair_codes"], dtype=np.int64)
+        stats.pair_hist = np.asarray(arrays["pair_hist"], dtype=np.float32)
+        stats.ref_ts = meta["ref_ts"]
+        stats.watermark = meta["watermark"]
+        stats.period_ms = float(meta["period_ms"])
+        stats.events_folded = meta.get("events_folded", 0)
+        stats.late_events = meta.get("late_events", 0)
+        stats.tail = [
+            NormEvent(ts=ts, key=key, entity_id=entity_id, domain=domain,
+                      transition=transition, context=context)
+            for ts, key, entity_id, domain, transition, context in meta["tail"]
+        ]
+        return stats
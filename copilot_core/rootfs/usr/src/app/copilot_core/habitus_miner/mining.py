@@ -1,4 +1,17 @@
-"""A→B rule mining algorithms for Habitus Miner v0.1."""
+"""A→B rule mining algorithms for Habitus Miner v0.1.
+
+:func:`mine_ab_rules` avoids scoring every frequent A × B pair:
+
+1. Per-key counts, sorted timestamp arrays and the observation period are
+   computed once.
+2. A bucketed sweep over the time-sorted stream (buckets of a fraction of
+   the window) gives, for every pair, an upper bound on the A events
+   followed by B. Only pairs whose bound can satisfy the rule filters in
+   some window are kept.
+3. For each surviving pair, one ``searchsorted`` yields the latency to the
+   first B after every A. All ``config.windows`` are then evaluated from
+   that single latency vector.
+"""
 
 from __future__ import annotations
 
@@ -8,6 +21,8 @@ import statistics
 from collections import defaultdict
 from typing import Any
 
+import numpy as np
+
 from .model import (
     NormEvent, 
     Rule, 
@@ -16,9 +31,17 @@ from .model import (
     EventStreamType, 
     RulesType
 )
+from .table import EventTable
 
 _LOGGER = logging.getLogger(__name__)
 
+# Upper limit on sweep buckets (long streams get coarser buckets)
+_MAX_SWEEP_BUCKETS = 4096
+# Rows of the A×B bound matrix evaluated at a time
+_SWEEP_CHUNK = 512
+# Sweep buckets per window (finer buckets give a tighter bound)
+_SWEEP_SUBDIVISIONS = 4
+
 
 def _wilson_lower_bound(successes: int, trials: int, confidence: float = 0.95) -> float:
     """Calculate Wilson score interval lower bound for confidence estimation."""
@@ -107,16 +130,80 @@ def _filter_events(events: EventStreamType, config: MiningConfig) -> EventStream
     return filtered
 
 
+def _filter_table(table: EventTable, config: MiningConfig) -> EventTable:
+    """:func:`_filter_events` on an :class:`EventTable` (id masks)."""
+    keep = np.ones(len(table), dtype=bool)
+    if config.include_domains:
+        keep &= table.value_mask("domain", config.include_domains)
+    if config.exclude_domains:
+        keep &= ~table.value_mask("domain", config.exclude_domains)
+    if config.include_entities:
+        keep &= table.value_mask("entity", config.include_entities)
+    if config.exclude_entities:
+        keep &= ~table.value_mask("entity", config.exclude_entities)
+    
+    _LOGGER.debug(
+        "Domain/entity filtering: %d events -> %d events (removed %d)",
+        len(table), int(keep.sum()), len(table) - int(keep.sum())
+    )
+    
+    return table if keep.all() else table.select(keep)
+
+
+def _deduplicate_table(table: EventTable, config: MiningConfig) -> EventTable:
+    """:func:`_deduplicate_events` on a time-sorted :class:`EventTable`.
+    
+    Groups (entity, transition) whose consecutive gaps all respect the
+    cooldown are kept whole; only groups with a short gap are walked.
+    """
+    if len(table) == 0:
+        return table
+    
+    cooldown_ms = np.array([
+        config.entity_cooldown.get(entity, config.default_cooldown) * 1000
+        for entity in table.entities
+    ], dtype=np.int64)
+    group = table.entity_ids.astype(np.int64) * len(table.transitions) + table.transition_ids
+    order = np.argsort(group, kind="stable")
+    g, ts = group[order], table.ts[order]
+    cd = cooldown_ms[table.entity_ids[order]]
+    
+    keep = np.ones(len(table), dtype=bool)
+    # First event of a group is always kept (last_seen starts at 0)
+    keep[0] = ts[0] >= cd[0]
+    starts = np.flatnonzero(g[1:] != g[:-1]) + 1
+    keep[starts] = ts[starts] >= cd[starts]
+    short = (g[1:] == g[:-1]) & (ts[1:] - ts[:-1] < cd[1:])
+    dropped_starts = np.concatenate([[0], starts])[~keep[np.concatenate([[0], starts])]]
+    for grp in np.unique(np.concatenate([g[1:][short], g[dropped_starts]])):
+        lo, hi = np.searchsorted(g, [grp, grp + 1])
+        last = 0
+        for i in range(lo, hi):
+            keep[i] = ts[i] - last >= cd[i]
+            if keep[i]:
+                last = ts[i]
+    
+    rows = np.sort(order[keep])
+    _LOGGER.debug(
+        "Deduplication: %d events -> %d events (removed %d)",
+        len(table), rows.size, len(table) - rows.size
+    )
+    
+    return table if rows.size == len(table) else table.select(rows)
+
+
 def _get_frequent_events(
-    events: EventStreamType, 
+    events: EventStreamType | EventTable, 
     min_support_a: int, 
     min_support_b: int
 ) -> tuple[set[str], set[str]]:
     """Get frequent A and B event candidates based on minimum support."""
-    counts = defaultdict(int)
-    
-    for event in events:
-        counts[event.key] += 1
+    if isinstance(events, EventTable):
+        counts = dict(zip(events.keys, events.key_counts().tolist()))
+    else:
+        counts = defaultdict(int)
+        for event in events:
+            counts[event.key] += 1
     
     a_candidates = {key for key, count in counts.items() if count >= min_support_a}
     b_candidates = {key for key, count in counts.items() if count >= min_support_b}
@@ -129,8 +216,13 @@ def _get_frequent_events(
     return a_candidates, b_candidates
 
 
-def _create_event_indices(events: EventStreamType) -> dict[str, list[int]]:
+def _create_event_indices(
+    events: EventStreamType | EventTable,
+) -> dict[str, list[int]] | dict[str, np.ndarray]:
     """Create time-sorted indices for each event type."""
+    if isinstance(events, EventTable):
+        return events.key_times()
+    
     indices = defaultdict(list)
     
     for event in events:
@@ -147,41 +239,37 @@ def _count_ab_hits(
     a_key: str,
     b_key: str, 
     dt_ms: int,
-    indices: dict[str, list[int]]
+    indices: dict[str, list[int]] | dict[str, np.ndarray]
 ) -> tuple[int, list[tuple[int, int, int]], list[int]]:
     """Count A→B hits within time window and collect evidence."""
-    import bisect
+    a_times = np.asarray(indices.get(a_key, []), dtype=np.int64)
+    b_times = np.asarray(indices.get(b_key, []), dtype=np.int64)
     
-    a_times = indices.get(a_key, [])
-    b_times = indices.get(b_key, [])
+    if not a_times.size or not b_times.size:
+        return 0, [], a_times.tolist()
     
-    if not a_times or not b_times:
-        return 0, [], list(a_times)
+    # First B event in window (t_a, t_a + dt_ms] for every A at once
+    start_idx = np.searchsorted(b_times, a_times, side="right")
+    end_idx = np.searchsorted(b_times, a_times + dt_ms, side="right")
+    hit = start_idx < end_idx
     
-    hits = 0
-    hit_examples = []
-    miss_examples = []
+    hit_a = a_times[hit][:10]  # limit evidence collection
+    hit_b = b_times[start_idx[hit][:10]]
+    hit_examples = [
+        (t_a, t_b, t_b - t_a) for t_a, t_b in zip(hit_a.tolist(), hit_b.tolist())
+    ]
+    miss_examples = a_times[~hit][:10].tolist()
     
-    for t_a in a_times:
-        # Find first B event in window (t_a, t_a + dt_ms]
-        start_idx = bisect.bisect_right(b_times, t_a)
-        end_idx = bisect.bisect_right(b_times, t_a + dt_ms)
-        
-        if start_idx < end_idx:
-            # Found at least one B in window
-            t_b = b_times[start_idx]  # take first B
-            latency_ms = t_b - t_a
-            hits += 1
-            
-            # Collect evidence
-            if len(hit_examples) < 10:  # limit evidence collection
-                hit_examples.append((t_a, t_b, latency_ms))
-        else:
-            # No B found in window
-            if len(miss_examples) < 10:
-                miss_examples.append(t_a)
-    
-    return hits, hit_examples, miss_examples
+    return int(hit.sum()), hit_examples, miss_examples
+
+
+def _baseline_pb(b_count: int, total_period_ms: int, dt_sec: int) -> float:
+    """P(B in a random dt_sec window) from B's count over the observation period."""
+    if total_period_ms <= 0:
+        return 0.0
+    dt_ms = dt_sec * 1000
+    num_windows = max(1, total_period_ms // dt_ms)
+    return min(1.0, b_count / num_windows)
 
 
 def _calculate_baseline_pb(
@@ -197,17 +285,129 @@ def _calculate_baseline_pb(
     events.sort(key=lambda e: e.ts)
     total_period_ms = events[-1].ts - events[0].ts
     
-    if total_period_ms <= 0:
-        return 0.0
-    
     # Count B events
     b_count = sum(1 for e in events if e.key == b_key)
     
     # Estimate P(B in random dt_sec window) using window-based baseline
-    dt_ms = dt_sec * 1000
-    num_windows = max(1, total_period_ms // dt_ms)
-    
-    return min(1.0, b_count / num_windows)
+    return _baseline_pb(b_count, total_period_ms, dt_sec)
+
+
+def _key_entity(key: str) -> str:
+    return key.split(':')[0] if ':' in key else key
+
+
+def _candidate_pairs(
+    times: dict[str, np.ndarray],
+    a_keys: list[str],
+    b_keys: list[str],
+    windows: list[int],
+    observation_period_ms: int,
+    config: MiningConfig,
+) -> dict[str, list[str]]:
+    """B keys per A key that can pass the rule filters in some window.
+
+    Time is cut into buckets of about a quarter window. An A event in bucket
+    k can only be a hit if some B lies in buckets k..k+reach (reach covers
+    one window past the end of bucket k), so counting A per bucket against
+    "B present in that span" bounds nAB from above – one matrix product per
+    window. A pair is kept if, for some window, that bound reaches the hits
+    implied by ``min_hits``, ``min_confidence(_lb)``, ``min_lift`` and
+    ``min_leverage`` (the latter two via B's baseline for the window).
+    """
+    start = min(int(times[k][0]) for k in a_keys + b_keys)
+    end = max(int(times[k][-1]) for k in a_keys + b_keys)
+    min_width = -(-(end - start + 1) // _MAX_SWEEP_BUCKETS)
+
+    n_a = np.array([times[k].size for k in a_keys], dtype=np.float64)
+    n_b = [int(times[k].size) for k in b_keys]
+    floor = max(config.min_confidence, config.min_confidence_lb)
+
+    keep = np.zeros((len(a_keys), len(b_keys)), dtype=bool)
+    for dt_sec in windows:
+        dt_ms = dt_sec * 1000
+        base = np.array([_baseline_pb(n, observation_period_ms, dt_sec) for n in n_b])
+        rate = np.maximum.reduce([
+            np.full(len(b_keys), floor),
+            config.min_lift * np.maximum(0.001, base),
+            base + config.min_leverage,
+        ])
+        width = max(-(-dt_ms // _SWEEP_SUBDIVISIONS), min_width, 1)
+        reach = 1 + (dt_ms - 1) // width
+        n_buckets = (end - start) // width + reach + 1
+
+        a_counts = np.zeros((len(a_keys), n_buckets), dtype=np.float32)
+        for row, key in enumerate(a_keys):
+            a_counts[row] = np.bincount((times[key] - start) // width, minlength=n_buckets)
+        present = np.zeros((len(b_keys), n_buckets), dtype=bool)
+        for row, key in enumerate(b_keys):
+            present[row, np.unique((times[key] - start) // width)] = True
+        b_near = present.copy()
+        for shift in range(1, reach + 1):
+            b_near[:, :-shift] |= present[:, shift:]
+        b_near_t = b_near.T.astype(np.float32)
+
+        for lo in range(0, len(a_keys), _SWEEP_CHUNK):
+            bound = a_counts[lo:lo + _SWEEP_CHUNK] @ b_near_t
+            need = np.maximum(config.min_hits, n_a[lo:lo + _SWEEP_CHUNK, None] * rate[None, :] - 1e-6)
+            keep[lo:lo + _SWEEP_CHUNK] |= bound >= need
+
+    b_entities = [_key_entity(k) for k in b_keys]
+    pairs: dict[str, list[str]] = {}
+    for row, col in zip(*np.nonzero(keep)):
+        a_key, b_key = a_keys[row], b_keys[col]
+        if config.exclude_self_rules and a_key == b_key:
+            continue
+        if config.exclude_same_entity and _key_entity(a_key) == b_entities[col]:
+            continue
+        pairs.setdefault(a_key, []).append(b_key)
+    return pairs
+
+
+def _merge_times(
+    keys: list[str], times: dict[str, np.ndarray], origin: int, span: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate the timestamps of *keys*, each shifted into its own range.
+
+    Returns ``(merged, offsets, ends)``: key *i* occupies
+    ``merged[ends[i] - n_i:ends[i]]`` with values ``t - origin + offsets[i]``,
+    so one ``searchsorted`` can answer queries against many keys at once.
+    """
+    stride = span + 1
+    offsets = np.arange(len(keys), dtype=np.int64) * stride
+    ends = np.cumsum([times[k].size for k in keys]).astype(np.int64)
+    merged = np.concatenate([times[k] - origin + off for k, off in zip(keys, offsets)])
+    return merged, offsets, ends
+
+
+def _first_b_latencies(
+    a_rel: np.ndarray,
+    b_rows: np.ndarray,
+    merged: np.ndarray,
+    offsets: np.ndarray,
+    ends: np.ndarray,
+) -> np.ndarray:
+    """Latency (ms) from each A to the first B strictly after it, per B row.
+
+    *a_rel* are A timestamps relative to the merge origin; *b_rows* index
+    into the :func:`_merge_times` arrays. Returns a ``(len(b_rows),
+    len(a_rel))`` array, -1 where no B follows.
+    """
+    queries = a_rel[None, :] + offsets[b_rows, None]
+    idx = np.searchsorted(merged, queries, side="right")
+    found = idx < ends[b_rows, None]
+    latencies = np.full(queries.shape, -1, dtype=np.int64)
+    latencies[found] = merged[idx[found]] - queries[found]
+    return latencies
+
+
+def _wilson_lower_bounds(successes: np.ndarray, trials: int) -> np.ndarray:
+    """Vectorized :func:`_wilson_lower_bound` (95%) for a fixed trial count."""
+    z = 1.96
+    p = successes / trials
+    denominator = 1 + z**2 / trials
+    center_adjusted = p + z**2 / (2 * trials)
+    margin = z * np.sqrt((p * (1 - p) + z**2 / (4 * trials)) / trials)
+    return np.maximum(0.0, (center_adjusted - margin) / denominator)
 
 
 def _calculate_rule_quality(
@@ -274,105 +474,131 @@ def _create_rule_evidence(
 
 
 def mine_ab_rules(
-    events: EventStreamType,
+    events: EventStreamType | EventTable,
     config: MiningConfig
 ) -> RulesType:
-    """Mine A→B rules from event stream using the specified configuration."""
+    """Mine A→B rules from event stream using the specified configuration.
+    
+    *events* may be a NormEvent list or an :class:`EventTable`; lists are
+    encoded into a table first.
+    """
     _LOGGER.info("Starting A→B rule mining with %d events", len(events))
     
-    # Preprocessing
-    events = _filter_events(events, config)
-    events = _deduplicate_events(events, config)
+    # Preprocessing (on the columnar table)
+    table = events if isinstance(events, EventTable) else EventTable.from_events(events)
+    table = _filter_table(table, config)
+    table = _deduplicate_table(table, config)
     
-    if len(events) < config.min_support_A:
-        _LOGGER.warning("Too few events after preprocessing: %d", len(events))
+    if len(table) < config.min_support_A:
+        _LOGGER.warning("Too few events after preprocessing: %d", len(table))
         return []
     
     # Get frequent event candidates
     a_candidates, b_candidates = _get_frequent_events(
-        events, config.min_support_A, config.min_support_B
+        table, config.min_support_A, config.min_support_B
     )
     
     if not a_candidates or not b_candidates:
         _LOGGER.warning("No frequent events found")
         return []
     
-    # Create time indices for efficient lookup
-    indices = _create_event_indices(events)
+    # Per-key sorted timestamps and counts, computed once
+    times = _create_event_indices(table)
     
-    # Calculate observation period
-    events.sort(key=lambda e: e.ts)
-    observation_period_ms = events[-1].ts - events[0].ts
+    # Calculate observation period (table is time-sorted)
+    origin = int(table.ts[0])
+    observation_period_ms = int(table.ts[-1]) - origin
     observation_period_days = max(1, observation_period_ms // (24 * 3600 * 1000))
     
-    # Mine rules for each time window
+    windows = sorted(set(config.windows))
+    if not windows:
+        return []
+    window_ms = np.array(windows, dtype=np.int64) * 1000
+    pairs = _candidate_pairs(
+        times, sorted(a_candidates), sorted(b_candidates), windows,
+        observation_period_ms, config,
+    )
+    _LOGGER.debug(
+        "Sweep kept %d of %d candidate pairs",
+        sum(len(b) for b in pairs.values()), len(a_candidates) * len(b_candidates),
+    )
+    
+    # B timestamps merged once; baseline P(B) per B key and window
+    b_list = sorted(b_candidates)
+    b_row = {key: row for row, key in enumerate(b_list)}
+    merged, offsets, ends = _merge_times(b_list, times, origin, observation_period_ms)
+    baselines = np.array([
+        [_baseline_pb(int(times[b].size), observation_period_ms, dt_sec) for dt_sec in windows]
+        for b in b_list
+    ])
     all_rules = []
     
-    for dt_sec in config.windows:
-        _LOGGER.debug("Mining rules for time window: %d seconds", dt_sec)
-        dt_ms = dt_sec * 1000
+    for a_key, b_keys in pairs.items():
+        a_times = times[a_key]
+        n_a = int(a_times.size)
+        rows = np.array([b_row[b] for b in b_keys], dtype=np.int64)
+        latencies = _first_b_latencies(a_times - origin, rows, merged, offsets, ends)
+        # nAB for every (B, window) from the same latencies
+        hits = (latencies[:, :, None] >= 0) & (latencies[:, :, None] <= window_ms)
+        n_ab = hits.sum(axis=1)
+        base = baselines[rows]
         
-        for a_key in a_candidates:
-            for b_key in b_candidates:
-                # Apply self-rule filters
-                if config.exclude_self_rules and a_key == b_key:
-                    continue
-                
-                if config.exclude_same_entity:
-                    a_entity = a_key.split(':')[0] if ':' in a_key else a_key
-                    b_entity = b_key.split(':')[0] if ':' in b_key else b_key
-                    if a_entity == b_entity:
-                        continue
-                
-                # Count hits and evidence
-                n_ab, hit_examples, miss_examples = _count_ab_hits(
-                    a_key, b_key, dt_ms, indices
-                )
-                
-                n_a = len(indices.get(a_key, []))
-                n_b = len(indices.get(b_key, []))
-                
-                # Apply minimum thresholds
-                if n_ab < config.min_hits:
-                    continue
-                
-                # Calculate quality metrics
-                baseline_p_b = _calculate_baseline_pb(b_key, events, dt_sec)
-                quality = _calculate_rule_quality(n_a, n_ab, baseline_p_b)
-                
-                # Apply quality filters
-                if quality["confidence"] < config.min_confidence:
-                    continue
-                if quality["confidence_lb"] < config.min_confidence_lb:
-                    continue
-                if quality["lift"] < config.min_lift:
-                    continue
-                if quality["leverage"] < config.min_leverage:
-                    continue
-                
-                # Create evidence
-                evidence = _create_rule_evidence(hit_examples, miss_examples, 
-                                               config.max_evidence_examples)
-                
-                # Create rule
-                rule = Rule(
-                    A=a_key,
-                    B=b_key,
-                    dt_sec=dt_sec,
-                    nA=n_a,
-                    nB=n_b,
-                    nAB=n_ab,
-                    confidence=quality["confidence"],
-                    confidence_lb=quality["confidence_lb"],
-                    lift=quality["lift"],
-                    leverage=quality["leverage"],
-                    conviction=quality["conviction"],
-                    observation_period_days=observation_period_days,
-                    baseline_p_b=baseline_p_b,
-                    evidence=evidence
-                )
-                
-                all_rules.append(rule)
+        # Vectorized prefilter (with slack); survivors are re-checked exactly
+        confidence = n_ab / n_a
+        keep = (
+            (n_ab >= config.min_hits)
+            & (confidence >= config.min_confidence - 1e-9)
+            & (_wilson_lower_bounds(n_ab, n_a) >= config.min_confidence_lb - 1e-9)
+            & (confidence / np.maximum(0.001, base) >= config.min_lift - 1e-9)
+            & (confidence - base >= config.min_leverage - 1e-9)
+        )
+        
+        for row, col in zip(*np.nonzero(keep)):
+            b_key, dt_sec = b_keys[row], windows[col]
+            rule_n_ab = int(n_ab[row, col])
+            baseline_p_b = float(base[row, col])
+            quality = _calculate_rule_quality(n_a, rule_n_ab, baseline_p_b)
+            
+            # Apply quality filters
+            if quality["confidence"] < config.min_confidence:
+                continue
+            if quality["confidence_lb"] < config.min_confidence_lb:
+                continue
+            if quality["lift"] < config.min_lift:
+                continue
+            if quality["leverage"] < config.min_leverage:
+                continue
+            
+            # Create evidence (first hits/misses in time order)
+            hit_mask = hits[row, :, col]
+            lat = latencies[row]
+            hit_examples = [
+                (int(a_times[i]), int(a_times[i] + lat[i]), int(lat[i]))
+                for i in np.flatnonzero(hit_mask)[:10]
+            ]
+            miss_examples = [int(a_times[i]) for i in np.flatnonzero(~hit_mask)[:10]]
+            evidence = _create_rule_evidence(hit_examples, miss_examples, 
+                                           config.max_evidence_examples)
+            
+            # Create rule
+            rule = Rule(
+                A=a_key,
+                B=b_key,
+                dt_sec=dt_sec,
+                nA=n_a,
+                nB=int(times[b_key].size),
+                nAB=rule_n_ab,
+                confidence=quality["confidence"],
+                confidence_lb=quality["confidence_lb"],
+                lift=quality["lift"],
+                leverage=quality["leverage"],
+                conviction=quality["conviction"],
+                observation_period_days=observation_period_days,
+                baseline_p_b=baseline_p_b,
+                evidence=evidence
+            )
+            
+            all_rules.append(rule)
     
     # Sort by score and limit
     all_rules.sort(key=lambda r: r.score(), reverse=True)
@@ -119,6 +119,9 @@ class MiningConfig:
     
     # Privacy settings
     anonymize_entity_ids: bool = False  # replace with domain-based labels
+    
+    # Incremental mining: half-life of event weights (0 = no decay)
+    decay_half_life_days: float = 30.0
 
 
 EventStreamType = list[NormEvent]
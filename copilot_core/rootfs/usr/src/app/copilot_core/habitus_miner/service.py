@@ -8,6 +8,7 @@ import time
 from pathlib import Path
 from typing import Any
 
+from .incremental import PairStatistics, config_signature
 from .model import NormEvent, Rule, MiningConfig, EventStreamType, RulesType  
 from .store import HabitusMinerStore
 from .mining import mine_ab_rules, mine_with_context_stratification
@@ -26,6 +27,7 @@ class HabitusMinerService:
         self.storage_dir = Path(storage_dir)
         self.config = config or MiningConfig()
         self.store = HabitusMinerStore(self.storage_dir)
+        self._pair_stats: PairStatistics | None = None
     
     def normalize_ha_event(self, ha_event: dict[str, Any]) -> NormEvent | None:
         """Convert Home Assistant event to normalized event.
@@ -144,9 +146,13 @@ class HabitusMinerService:
         
         return events
     
-    def mine_from_ha_events(self, ha_events: list[dict[str, Any]]) -> RulesType:
+    def mine_from_ha_events(
+        self, ha_events: list[dict[str, Any]], *, incremental: bool = False
+    ) -> RulesType:
         """Mine rules directly from HA events."""
         events = self.process_ha_events(ha_events)
+        if incremental:
+            return self.mine_incremental(events)
         return self.mine_rules(events)
     
     def mine_rules(self, events: EventStreamType) -> RulesType:
@@ -180,6 +186,35 @@ class HabitusMinerService:
         
         return rules
     
+    def mine_incremental(self, events: EventStreamType) -> RulesType:
+        """Fold new events into the persisted pair statistics and re-derive rules.
+        
+        Only events newer than the last folded one are processed, so the
+        cost of a run follows the batch size rather than the history length.
+        Context stratification is not applied in this mode.
+        """
+        stats = self.get_pair_stats()
+        start_time = time.time()
+        folded = stats.update(events, self.config)
+        rules = stats.rules(self.config)
+        
+        _LOGGER.info(
+            "Incremental mining folded %d new events in %.2fs: %d rules",
+            folded, time.time() - start_time, len(rules)
+        )
+        
+        self.store.save_pair_stats(stats)
+        self.store.save_rules(rules)
+        self.store.update_mining_timestamp(int(time.time() * 1000))
+        
+        return rules
+    
+    def get_pair_stats(self) -> PairStatistics:
+        """Return the incremental statistics matching the current config."""
+        if self._pair_stats is None or self._pair_stats.signature != config_signature(self.config):
+            self._pair_stats = self.store.load_pair_stats(self.config)
+        return self._pair_stats
+    
     def get_rules(
         self, 
         *, 
@@ -325,4 +360,5 @@ class HabitusMinerService:
     def reset_cache(self) -> None:
         """Reset all cached data."""
         self.store.clear_cache()
+        self._pair_stats = None
         _LOGGER.info("Reset all cached data")
\ No newline at end of file
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from pathlib import Path
 from typing import Any
 
-from .model import Rule, NormEvent, RulesType, EventStreamType
+import numpy as np
+
+from .incremental import PairStatistics
+from .model import Rule, NormEvent, MiningConfig, RulesType, EventStreamType
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +27,7 @@ class HabitusMinerStore:
         self.rules_file = self.storage_dir / "discovered_rules.json"
         self.events_cache_file = self.storage_dir / "events_cache.jsonl"
         self.state_file = self.storage_dir / "miner_state.json"
+        self.pair_stats_file = self.storage_dir / "pair_stats.npz"
         
         # In-memory cache
         self.rules: list[Rule] = []
@@ -199,6 +204,27 @@ class HabitusMinerStore:
         
         return events
     
+    def load_pair_stats(self, config: MiningConfig) -> PairStatistics:
+        """Load incremental pair statistics (empty if missing or stale)."""
+        try:
+            if self.pair_stats_file.exists():
+                with np.load(self.pair_stats_file, allow_pickle=False) as data:
+                    return PairStatistics.from_arrays(dict(data), config)
+        except ValueError as e:
+            _LOGGER.info("Rebuilding pair statistics: %s", e)
+        except Exception as e:
+            _LOGGER.warning("Failed to load pair statistics: %s", e)
+        return PairStatistics(config)
+    
+    def save_pair_stats(self, stats: PairStatistics) -> None:
+        """Persist incremental pair statistics (atomic replace)."""
+        try:
+            tmp = self.pair_stats_file.with_suffix(".tmp.npz")
+            np.savez(tmp, **stats.to_arrays())
+            os.replace(tmp, self.pair_stats_file)
+        except Exception as e:
+            _LOGGER.error("Failed to save pair statistics: %s", e)
+    
     def update_mining_timestamp(self, ts: int) -> None:
         """Update the last mining timestamp."""
         self.last_mining_ts = ts
@@ -215,13 +241,15 @@ class HabitusMinerStore:
                 "rules": self.rules_file.exists(),
                 "events_cache": self.events_cache_file.exists(),
                 "state": self.state_file.exists(),
+                "pair_stats": self.pair_stats_file.exists(),
             },
         }
     
     def clear_cache(self) -> None:
         """Clear all cached data (for testing/reset)."""
         try:
-            for file in [self.rules_file, self.events_cache_file, self.state_file]:
+            for file in [self.rules_file, self.events_cache_file, self.state_file,
+                         self.pair_stats_file]:
                 if file.exists():
                     file.unlink()
             
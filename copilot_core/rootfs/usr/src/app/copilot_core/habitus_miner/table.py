@@ -0,0 +1,175 @@
+"""Columnar, dictionary-encoded event stream for Habitus mining.
+
+A list of :class:`~copilot_core.habitus_miner.model.NormEvent` costs a
+Python object plus four string references per event. :class:`EventTable`
+stores the same stream as five arrays – int64 timestamps and int32 ids
+into interned ``keys``, ``entities``, ``domains`` and ``transitions``
+lists – about 24 bytes per event. Per-key timestamp arrays for
+``searchsorted`` hit counting come from one stable sort instead of a
+dict-of-lists rebuilt on every run.
+
+Event context is not kept; A→B mining does not use it (context
+stratification still works on ``NormEvent`` lists).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from .model import EventStreamType, NormEvent
+
+COLUMNS = ("ts", "key_ids", "entity_ids", "domain_ids", "transition_ids")
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+
+class EventTable:
+    """Time-ordered events as int columns plus string dictionaries."""
+
+    __slots__ = (*COLUMNS, "keys", "entities", "domains", "transitions", "_key_ids")
+
+    def __init__(
+        self,
+        ts: np.ndarray,
+        key_ids: np.ndarray,
+        entity_ids: np.ndarray,
+        domain_ids: np.ndarray,
+        transition_ids: np.ndarray,
+        keys: Sequence[str],
+        entities: Sequence[str],
+        domains: Sequence[str],
+        transitions: Sequence[str],
+    ) -> None:
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.key_ids = np.asarray(key_ids, dtype=np.int32)
+        self.entity_ids = np.asarray(entity_ids, dtype=np.int32)
+        self.domain_ids = np.asarray(domain_ids, dtype=np.int32)
+        self.transition_ids = np.asarray(transition_ids, dtype=np.int32)
+        self.keys = list(keys)
+        self.entities = list(entities)
+        self.domains = list(domains)
+        self.transitions = list(transitions)
+        self._key_ids: dict[str, int] | None = None
+
+    @classmethod
+    def from_events(cls, events: EventStreamType) -> "EventTable":
+        """Encode *events*, sorted by timestamp (ties keep input order)."""
+        keys, entities, domains, transitions = _Interner(), _Interner(), _Interner(), _Interner()
+        n = len(events)
+        columns = np.empty((4, n), dtype=np.int32)
+        for i, event in enumerate(events):
+            columns[0, i] = keys(event.key)
+            columns[1, i] = entities(event.entity_id)
+            columns[2, i] = domains(event.domain)
+            columns[3, i] = transitions(event.transition)
+        ts = np.fromiter((e.ts for e in events), dtype=np.int64, count=n)
+        order = np.argsort(ts, kind="stable")
+        return cls(
+            ts[order], *columns[:, order],
+            keys.values, entities.values, domains.values, transitions.values,
+        )
+
+    def __len__(self) -> int:
+        return int(self.ts.size)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(getattr(self, name).nbytes) for name in COLUMNS)
+
+    def select(self, rows: np.ndarray) -> "EventTable":
+        """Rows by boolean mask or index array (dictionaries are shared)."""
+        return EventTable(
+            *(getattr(self, name)[rows] for name in COLUMNS),
+            self.keys, self.entities, self.domains, self.transitions,
+        )
+
+    def key_id(self, key: str) -> int | None:
+        if self._key_ids is None:
+            self._key_ids = {k: i for i, k in enumerate(self.keys)}
+        return self._key_ids.get(key)
+
+    def entity_mask(self, entity_ids: Iterable[str]) -> np.ndarray:
+        """Boolean mask of rows whose entity is in *entity_ids*."""
+        wanted = set(entity_ids)
+        ids = [i for i, entity in enumerate(self.entities) if entity in wanted]
+        return np.isin(self.entity_ids, np.array(ids, dtype=np.int32))
+
+    def value_mask(self, column: str, values: Iterable[str]) -> np.ndarray:
+        """Rows whose ``domain``/``entity`` string is in *values*."""
+        strings, ids = {
+            "domain": (self.domains, self.domain_ids),
+            "entity": (self.entities, self.entity_ids),
+        }[column]
+        wanted = set(values)
+        return np.isin(ids, np.array([i for i, v in enumerate(strings) if v in wanted], dtype=np.int32))
+
+    def key_counts(self) -> np.ndarray:
+        """Event count per key id."""
+        return np.bincount(self.key_ids, minlength=len(self.keys))
+
+    def key_times(self) -> dict[str, np.ndarray]:
+        """Sorted timestamp array per key (keys without events omitted)."""
+        order = np.argsort(self.key_ids, kind="stable")
+        ts = self.ts[order]
+        bounds = np.concatenate([[0], np.cumsum(self.key_counts())])
+        return {
+            key: ts[bounds[i]:bounds[i + 1]]
+            for i, key in enumerate(self.keys)
+            if bounds[i + 1] > bounds[i]
+        }
+
+    def to_events(self) -> EventStreamType:
+        """Decode back into NormEvents (without context)."""
+        return [
+            NormEvent(ts=t, key=self.keys[k], entity_id=self.entities[e],
+                      domain=self.domains[d], transition=self.transitions[tr])
+            for t, k, e, d, tr in zip(
+                self.ts.tolist(), self.key_ids.tolist(), self.entity_ids.tolist(),
+                self.domain_ids.tolist(), self.transition_ids.tolist(),
+            )
+        ]
+
+    # --- Shared-memory layout -----------------------------------------------
+
+    def buffer_size(self) -> int:
+        """Bytes needed by :meth:`write_columns`."""
+        return len(self) * (8 + 4 * (len(COLUMNS) - 1))
+
+    def write_columns(self, buf: Any) -> None:
+        """Copy the columns back to back into *buf* (e.g. shared memory)."""
+        offset = 0
+        for name in COLUMNS:
+            column = getattr(self, name)
+            np.ndarray(column.shape, dtype=column.dtype, buffer=buf, offset=offset)[:] = column
+            offset += column.nbytes
+
+    def dictionaries(self) -> tuple[list[str], list[str], list[str], list[str]]:
+        return self.keys, self.entities, self.domains, self.transitions
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buf: Any,
+        count: int,
+        dictionaries: tuple[list[str], list[str], list[str], list[str]],
+    ) -> "EventTable":
+        """Zero-copy table over columns written by :meth:`write_columns`."""
+        columns = [np.ndarray((count,), dtype=np.int64, buffer=buf)]
+        offset = count * 8
+        for _ in COLUMNS[1:]:
+            columns.append(np.ndarray((count,), dtype=np.int32, buffer=buf, offset=offset))
+            offset += count * 4
+        return cls(*columns, *dictionaries)
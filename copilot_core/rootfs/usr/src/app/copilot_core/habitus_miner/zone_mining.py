@@ -8,19 +8,43 @@ Extends the base mining with zone-awareness:
 Architecture:
     Events → Zone Filter → Zone-Scoped Mining → Governance Check → Suggestions
 
+``mine_all_zones`` encodes the stream once into an
+:class:`~copilot_core.habitus_miner.table.EventTable` and selects each
+zone's rows by entity id. With more than one worker, zones fan out to a
+process pool: the table's columns live in one shared-memory block and
+each task only carries its zone's entity list. Workers enforce a per-zone timeout and
+every zone gets a result – failed or timed-out zones are reported in
+their stats instead of failing the whole run. ``SIGALRM`` only interrupts
+Python code, so the parent also waits against a deadline and kills the
+pool's workers if a zone stuck in a native call overruns it.
+
 See: docs/HABITUS_PHILOSOPHY.md
 """
 from __future__ import annotations
 
+import concurrent.futures
 import logging
+import math
+import multiprocessing
+import os
+import signal
+import time
 from collections import defaultdict
+from multiprocessing import shared_memory
 from typing import Any, Optional
 
+import numpy as np
+
 from .model import NormEvent, Rule, MiningConfig, EventStreamType, RulesType
 from .mining import mine_ab_rules
+from .table import EventTable
 
 _LOGGER = logging.getLogger(__name__)
 
+# Extra seconds the parent allows on top of the zone timeouts for spawning
+# the workers and attaching the shared memory
+_POOL_START_GRACE = 5.0
+
 
 class ZoneMiningConfig:
     """Configuration for zone-based mining."""
@@ -83,15 +107,29 @@ class ZoneBasedMiner:
     Usage:
         miner = ZoneBasedMiner(tag_zone_integration)
         results = miner.mine_all_zones(events, configs)
+    
+    Args:
+        workers: Processes for ``mine_all_zones`` (default: CPU count;
+            1 mines sequentially on the calling thread)
+        zone_timeout: Seconds one zone may mine in a worker before it is
+            reported as ``"timeout"`` (None = unlimited)
+        parallel_min_events: Smaller event streams are mined sequentially,
+            where process start-up would cost more than it saves
     """
     
     def __init__(
         self,
         tag_zone_integration: Any,  # TagZoneIntegration from tagging/
         base_config: Optional[MiningConfig] = None,
+        workers: Optional[int] = None,
+        zone_timeout: Optional[float] = None,
+        parallel_min_events: int = 20_000,
     ):
         self.tag_zone = tag_zone_integration
         self.base_config = base_config or MiningConfig()
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.zone_timeout = zone_timeout
+        self.parallel_min_events = parallel_min_events
         self._zone_configs: dict[str, ZoneMiningConfig] = {}
     
     def set_zone_config(self, zone_id: str, config: ZoneMiningConfig) -> None:
@@ -151,75 +189,8 @@ class ZoneBasedMiner:
             ZoneMiningResult with rules and stats
         """
         config = zone_config or self.get_zone_config(zone_id)
-        result = ZoneMiningResult(zone_id)
-        
-        # Filter events by zone
         zone_events = self.filter_events_by_zone(events, zone_id)
-        
-        if len(zone_events) < config.min_events:
-            _LOGGER.info(
-                "ZoneBasedMiner: Zone %s has only %d events (min: %d), skipping",
-                zone_id, len(zone_events), config.min_events
-            )
-            result.stats = {
-                "events": len(zone_events),
-                "skipped": True,
-                "reason": "insufficient_events",
-            }
-            return result
-        
-        # Mine rules with zone-filtered events
-        result.rules = mine_ab_rules(zone_events, self.base_config)
-        
-        # Apply zone governance filtering
-        result.filtered_rules = []
-        
-        for rule in result.rules:
-            # Check confidence threshold
-            if rule.confidence < config.confidence_threshold:
-                continue
-            
-            # Check lift threshold
-            if rule.lift < config.lift_threshold:
-                continue
-            
-            # Check safety-critical entities
-            a_entity = rule.A.split(":")[0] if ":" in rule.A else rule.A
-            b_entity = rule.B.split(":")[0] if ":" in rule.B else rule.B
-            
-            a_critical = a_entity in config.safety_critical_entities
-            b_critical = b_entity in config.safety_critical_entities
-            
-            if a_critical or b_critical:
-                result.safety_blocked.append({
-                    "rule": f"{rule.A} → {rule.B}",
-                    "confidence": round(rule.confidence, 3),
-                    "lift": round(rule.lift, 2),
-                    "blocked_by": "safety_critical",
-                    "entities": [e for e in [a_entity, b_entity] if e in config.safety_critical_entities],
-                })
-                continue
-            
-            # Rule passed all filters
-            result.filtered_rules.append(rule)
-        
-        # Update stats
-        result.stats = {
-            "events": len(zone_events),
-            "raw_rules": len(result.rules),
-            "filtered_rules": len(result.filtered_rules),
-            "safety_blocked": len(result.safety_blocked),
-            "confidence_threshold": config.confidence_threshold,
-            "lift_threshold": config.lift_threshold,
-            "requires_confirmation": config.requires_confirmation,
-        }
-        
-        _LOGGER.info(
-            "ZoneBasedMiner: Zone %s mined %d rules -> %d filtered (%d safety-blocked)",
-            zone_id, len(result.rules), len(result.filtered_rules), len(result.safety_blocked)
-        )
-        
-        return result
+        return _mine_zone_events(zone_events, zone_id, config, self.base_config)
     
     def mine_all_zones(
         self,
@@ -249,12 +220,92 @@ class ZoneBasedMiner:
             len(all_zones), len(events)
         )
         
-        for zone_id in all_zones:
-            config = (zone_configs or {}).get(zone_id, self.get_zone_config(zone_id))
-            results[zone_id] = self.mine_zone(events, zone_id, config)
+        zones = [
+            (zone_id, (zone_configs or {}).get(zone_id, self.get_zone_config(zone_id)))
+            for zone_id in all_zones
+        ]
+        workers = min(self.workers, len(zones))
+        if workers > 1 and len(events) >= self.parallel_min_events:
+            return self._mine_zones_parallel(events, zones, workers)
+        
+        table = EventTable.from_events(events)
+        for zone_id, config in zones:
+            try:
+                zone_entities = self.tag_zone.get_entities_for_zone(zone_id) or []
+                zone_events = table.select(table.entity_mask(zone_entities))
+                results[zone_id] = _mine_zone_events(zone_events, zone_id, config, self.base_config)
+            except Exception as exc:
+                _LOGGER.error("ZoneBasedMiner: Zone %s failed: %s", zone_id, exc)
+                results[zone_id] = _failed_result(zone_id, 0, "error", str(exc))
         
         return results
     
+    def _mine_zones_parallel(
+        self,
+        events: EventStreamType,
+        zones: list[tuple[str, ZoneMiningConfig]],
+        workers: int,
+    ) -> dict[str, ZoneMiningResult]:
+        """Mine *zones* in a process pool over shared-memory event columns."""
+        table = EventTable.from_events(events)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, table.buffer_size()))
+        results: dict[str, ZoneMiningResult] = {}
+        try:
+            table.write_columns(shm.buf)
+            
+            # spawn: forking a threaded server process is unsafe. Workers
+            # re-import the main script, so main.py keeps startup in create_app()
+            pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(shm.name, len(table), table.dictionaries(), self.base_config),
+            )
+            overrun = False
+            try:
+                futures = {
+                    zone_id: pool.submit(
+                        _mine_zone_worker,
+                        zone_id,
+                        list(self.tag_zone.get_entities_for_zone(zone_id) or []),
+                        config,
+                        self.zone_timeout,
+                    )
+                    for zone_id, config in zones
+                }
+                deadline = None
+                if self.zone_timeout:
+                    waves = math.ceil(len(zones) / workers)
+                    deadline = time.monotonic() + self.zone_timeout * waves + _POOL_START_GRACE
+                for zone_id, future in futures.items():
+                    try:
+                        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                        results[zone_id] = future.result(timeout=remaining)
+                    except concurrent.futures.TimeoutError:
+                        _LOGGER.error("ZoneBasedMiner: Zone %s overran the pool deadline", zone_id)
+                        results[zone_id] = _failed_result(zone_id, 0, "timeout")
+                        overrun = True
+                    except Exception as exc:
+                        _LOGGER.error("ZoneBasedMiner: Zone %s failed: %s", zone_id, exc)
+                        results[zone_id] = _failed_result(zone_id, 0, "error", str(exc))
+            finally:
+                if overrun:
+                    # Stuck workers never return; shutdown(wait=True) would hang.
+                    # The executor has no public terminate before Python 3.14.
+                    for process in list((pool._processes or {}).values()):
+                        process.terminate()
+                pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        failed = [z for z, r in results.items() if r.stats.get("reason") in ("timeout", "error")]
+        _LOGGER.info(
+            "ZoneBasedMiner: Mined %d zones on %d workers (%d failed or timed out)",
+            len(results), workers, len(failed)
+        )
+        return results
+    
     def get_top_suggestions(
         self,
         results: dict[str, ZoneMiningResult],
@@ -335,5 +386,144 @@ class ZoneBasedMiner:
                 "total_rules": sum(len(r.rules) for r in results.values()),
                 "total_filtered": sum(len(r.filtered_rules) for r in results.values()),
                 "total_safety_blocked": sum(len(r.safety_blocked) for r in results.values()),
+                "failed_zones": sorted(
+                    zid for zid, r in results.items()
+                    if r.stats.get("reason") in ("timeout", "error")
+                ),
             },
-        }
\ No newline at end of file
+        }
+
+
+def _mine_zone_events(
+    zone_events: EventStreamType | EventTable,
+    zone_id: str,
+    config: ZoneMiningConfig,
+    base_config: MiningConfig,
+) -> ZoneMiningResult:
+    """Mine one zone's events and apply its governance filters."""
+    result = ZoneMiningResult(zone_id)
+
+    if len(zone_events) < config.min_events:
+        _LOGGER.info(
+            "ZoneBasedMiner: Zone %s has only %d events (min: %d), skipping",
+            zone_id, len(zone_events), config.min_events
+        )
+        result.stats = {
+            "events": len(zone_events),
+            "skipped": True,
+            "reason": "insufficient_events",
+        }
+        return result
+    
+    # Mine rules with zone-filtered events
+    result.rules = mine_ab_rules(zone_events, base_config)
+    
+    # Apply zone governance filtering
+    result.filtered_rules = []
+    
+    for rule in result.rules:
+        # Check confidence threshold
+        if rule.confidence < config.confidence_threshold:
+            continue
+        
+        # Check lift threshold
+        if rule.lift < config.lift_threshold:
+            continue
+        
+        # Check safety-critical entities
+        a_entity = rule.A.split(":")[0] if ":" in rule.A else rule.A
+        b_entity = rule.B.split(":")[0] if ":" in rule.B else rule.B
+        
+        a_critical = a_entity in config.safety_critical_entities
+        b_critical = b_entity in config.safety_critical_entities
+        
+        if a_critical or b_critical:
+            result.safety_blocked.append({
+                "rule": f"{rule.A} → {rule.B}",
+                "confidence": round(rule.confidence, 3),
+                "lift": round(rule.lift, 2),
+                "blocked_by": "safety_critical",
+                "entities": [e for e in [a_entity, b_entity] if e in config.safety_critical_entities],
+            })
+            continue
+        
+        # Rule passed all filters
+        result.filtered_rules.append(rule)
+    
+    # Update stats
+    result.stats = {
+        "events": len(zone_events),
+        "raw_rules": len(result.rules),
+        "filtered_rules": len(result.filtered_rules),
+        "safety_blocked": len(result.safety_blocked),
+        "confidence_threshold": config.confidence_threshold,
+        "lift_threshold": config.lift_threshold,
+        "requires_confirmation": config.requires_confirmation,
+    }
+    
+    _LOGGER.info(
+        "ZoneBasedMiner: Zone %s mined %d rules -> %d filtered (%d safety-blocked)",
+        zone_id, len(result.rules), len(result.filtered_rules), len(result.safety_blocked)
+    )
+    
+    return result
+
+
+# --- Worker side (process pool) -------------------------------------------------
+
+# Set per worker process by _init_worker
+_WORKER: dict[str, Any] = {}
+
+
+class _ZoneTimeout(Exception):
+    pass
+
+
+def _init_worker(
+    shm_name: str,
+    count: int,
+    dictionaries: tuple[list[str], list[str], list[str], list[str]],
+    base_config: MiningConfig,
+) -> None:
+    """Attach to the shared event columns once per worker process."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER.update(
+        shm=shm,
+        table=EventTable.from_buffer(shm.buf, count, dictionaries),
+        base_config=base_config,
+    )
+
+
+def _on_zone_timeout(signum, frame):
+    raise _ZoneTimeout()
+
+
+def _mine_zone_worker(
+    zone_id: str,
+    zone_entities: list[str],
+    config: ZoneMiningConfig,
+    timeout: float | None,
+) -> ZoneMiningResult:
+    """Pool task: select the zone's rows from shared memory and mine them."""
+    table = _WORKER["table"]
+    zone_events = table.select(table.entity_mask(zone_entities))
+
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_zone_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _mine_zone_events(zone_events, zone_id, config, _WORKER["base_config"])
+    except _ZoneTimeout:
+        return _failed_result(zone_id, len(zone_events), "timeout")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _failed_result(zone_id: str, events: int, reason: str, error: str | None = None) -> ZoneMiningResult:
+    result = ZoneMiningResult(zone_id)
+    result.stats = {"events": events, "skipped": True, "reason": reason}
+    if error:
+        result.stats["error"] = error
+    return result
@@ -6,18 +6,44 @@ Advanced anomaly detection with:
 - Correlation-based anomalies (unusual device combinations)
 - Severity scoring with context-aware thresholds
 - German alerts and explanations
+
+Per entity, readings live in a fixed-size ring buffer of float arrays
+(value, epoch timestamp, hour, weekday) and Welford accumulators for the
+global, hourly and weekday moments are updated on every ingest – with
+the evicted reading removed again – so profiles always describe exactly
+the buffered window without a learning pass. The accumulators are
+recomputed from the buffer once per full rotation to cancel rounding
+drift.
+
+Correlations are computed on a common hourly grid: every entity's
+readings are averaged per slot and forward-filled, and the whole matrix
+comes from one ``np.corrcoef``. Only pairs above a strength threshold
+that are among an entity's strongest partners are kept. Rows of entities
+without new readings are reused while the grid does not move, and only
+the rows of changed entities are recomputed.
+
+With :meth:`AnomalyDetectionEngine.attach_store` readings are also
+appended to an :class:`~copilot_core.hub.anomaly_store.AnomalyHistoryStore`
+and profiles/correlations are snapshotted periodically, so baselines
+survive restarts.
 """
 
 from __future__ import annotations
 
 import logging
 import math
-import statistics
+import os
+import threading
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import numpy as np
+
+from .anomaly_store import DEFAULT_DIR as DEFAULT_STORE_DIR
+from .anomaly_store import DEFAULT_SNAPSHOT_INTERVAL, AnomalyHistoryStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,6 +139,261 @@ _FLATLINE_THRESHOLD = 12  # consecutive identical values
 # Frequency analysis
 _FREQUENCY_CHANGE_THRESHOLD = 0.5  # 50% change in reporting frequency
 
+# Correlation matrix
+_CORRELATION_GRID_S = 3600  # common time grid resolution (seconds)
+_CORRELATION_MIN_ABS = 0.3  # weaker pairs are not stored
+_CORRELATION_TOP_K = 10  # strongest partners kept per entity
+_CORRELATION_RECENT_SLOTS = 24  # grid slots compared by break detection
+
+
+# ── Streaming statistics ────────────────────────────────────────────────────
+
+
+class _Moments:
+    """Welford mean/variance accumulator that also supports removal."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        old_mean = (self.n * self.mean - x) / (self.n - 1)
+        self.m2 = max(0.0, self.m2 - (x - self.mean) * (x - old_mean))
+        self.mean = old_mean
+        self.n -= 1
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (0 below two samples)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+def _grouped_moments(groups: np.ndarray, values: np.ndarray, size: int) -> list[_Moments]:
+    """Exact two-pass moments of *values* per group id in ``range(size)``."""
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+    m2 = np.bincount(groups, weights=(values - means[groups]) ** 2, minlength=size)
+    return [_Moments(int(counts[g]), float(means[g]), float(m2[g])) for g in range(size)]
+
+
+class _EntitySeries:
+    """Ring buffer of one entity's readings plus running moments."""
+
+    def __init__(self, entity_id: str, capacity: int) -> None:
+        self.entity_id = entity_id
+        self.capacity = max(1, capacity)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.times = np.zeros(self.capacity, dtype=np.float64)  # epoch seconds
+        self.hours = np.zeros(self.capacity, dtype=np.int8)
+        self.weekdays = np.zeros(self.capacity, dtype=np.int8)
+        self._start = 0
+        self._len = 0
+        self.appended = 0  # change counter for derived caches
+        self.total = _Moments()
+        self.hourly = [_Moments() for _ in range(24)]
+        self.daily = [_Moments() for _ in range(7)]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> DataPoint:
+        """Reading *index* in insertion order (negative counts from the end)."""
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("reading index out of range")
+        slot = (self._start + index) % self.capacity
+        return DataPoint(
+            entity_id=self.entity_id,
+            value=float(self.values[slot]),
+            timestamp=datetime.fromtimestamp(float(self.times[slot]), tz=timezone.utc),
+        )
+
+    def append(self, value: float, timestamp: datetime) -> int:
+        """Add a reading (evicting the oldest when full); returns its slot."""
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        hour, day = timestamp.hour, timestamp.weekday()
+        if self._len == self.capacity:
+            slot = self._start
+            old, old_hour, old_day = float(self.values[slot]), int(self.hours[slot]), int(self.weekdays[slot])
+            self.total.remove(old)
+            self.hourly[old_hour].remove(old)
+            self.daily[old_day].remove(old)
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = (self._start + self._len) % self.capacity
+            self._len += 1
+        self.values[slot] = value
+        self.times[slot] = timestamp.timestamp()
+        self.hours[slot] = hour
+        self.weekdays[slot] = day
+        self.appended += 1
+        self.total.add(value)
+        self.hourly[hour].add(value)
+        self.daily[day].add(value)
+        if self._len == self.capacity and self._start == 0:
+            self._resync()
+        return slot
+
+    def load(self, records: np.ndarray) -> None:
+        """Replace the contents with persisted *records* (oldest first)."""
+        records = records[-self.capacity:]
+        n = int(records.size)
+        self.values[:n] = records["value"]
+        self.times[:n] = records["ts"]
+        self.hours[:n] = records["hour"]
+        self.weekdays[:n] = records["weekday"]
+        self._start, self._len = 0, n
+        self.appended += n
+        self._resync()
+
+    def _resync(self) -> None:
+        """Recompute the moments exactly from the buffer."""
+        values = self.ordered(self.values)
+        self.total = _grouped_moments(np.zeros(values.size, dtype=np.intp), values, 1)[0]
+        self.hourly = _grouped_moments(self.ordered(self.hours).astype(np.intp), values, 24)
+        self.daily = _grouped_moments(self.ordered(self.weekdays).astype(np.intp), values, 7)
+
+    def ordered(self, column: np.ndarray) -> np.ndarray:
+        """*column* in insertion order (a view unless the ring has wrapped)."""
+        end = self._start + self._len
+        if end <= self.capacity:
+            return column[self._start:end]
+        return np.concatenate([column[self._start:], column[:end - self.capacity]])
+
+    def tail(self, column: np.ndarray, n: int) -> np.ndarray:
+        """Last *n* entries of *column* in insertion order."""
+        return self.ordered(column)[-n:] if n > 0 else column[:0]
+
+    def profile(self) -> PatternProfile:
+        """Current PatternProfile from the running moments."""
+        values = self.ordered(self.values)
+        return PatternProfile(
+            entity_id=self.entity_id,
+            hourly_means={h: m.mean for h, m in enumerate(self.hourly) if m.n},
+            hourly_stds={h: m.std for h, m in enumerate(self.hourly) if m.n},
+            daily_means={d: m.mean for d, m in enumerate(self.daily) if m.n},
+            daily_stds={d: m.std for d, m in enumerate(self.daily) if m.n},
+            global_mean=self.total.mean,
+            global_std=self.total.std,
+            min_value=float(values.min()),
+            max_value=float(values.max()),
+            total_points=self._len,
+            last_updated=datetime.now(tz=timezone.utc),
+        )
+
+
+class _CorrelationGrid:
+    """Entities resampled onto a shared time grid, plus their correlations."""
+
+    def __init__(self) -> None:
+        self.entities: list[str] = []
+        self.start = 0  # first slot number (epoch // grid)
+        self.slots = 0
+        self.versions: list[int] = []
+        self.rows = np.zeros((0, 0))  # forward-filled slot means
+        self.observed = np.zeros((0, 0), dtype=bool)
+        self.corr = np.zeros((0, 0))
+
+    def update(self, series: list[_EntitySeries], max_slots: int) -> None:
+        """Resample *series* onto at most *max_slots* recent slots and correlate."""
+        first = min(int(s.ordered(s.times).min() // _CORRELATION_GRID_S) for s in series)
+        last = max(int(s.ordered(s.times).max() // _CORRELATION_GRID_S) for s in series)
+        start = max(first, last - max_slots + 1)
+        slots = last - start + 1
+        entities = [s.entity_id for s in series]
+        versions = [s.appended for s in series]
+        same_grid = (
+            entities == self.entities and start == self.start and slots == self.slots
+        )
+        changed = [i for i, v in enumerate(versions) if not same_grid or v != self.versions[i]]
+        if not changed:
+            return
+
+        if not same_grid:
+            self.rows = np.empty((len(series), slots))
+            self.observed = np.zeros((len(series), slots), dtype=bool)
+        for i in changed:
+            self.rows[i], self.observed[i] = self._resample(series[i], start, slots)
+
+        if same_grid and len(changed) < len(series):
+            # Only the changed rows/columns move
+            z = self._standardize(self.rows)
+            part = z[changed] @ z.T / max(1, slots - 1)
+            self.corr[changed] = part
+            self.corr[:, changed] = part.T
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.corr = np.atleast_2d(np.corrcoef(self.rows))
+        self.corr = np.nan_to_num(np.clip(self.corr, -1.0, 1.0))
+        self.entities, self.start, self.slots, self.versions = entities, start, slots, versions
+
+    @staticmethod
+    def _resample(series: _EntitySeries, start: int, slots: int) -> tuple[np.ndarray, np.ndarray]:
+        slot = (series.ordered(series.times) // _CORRELATION_GRID_S).astype(np.int64) - start
+        keep = (slot >= 0) & (slot < slots)
+        slot = slot[keep]
+        sums = np.bincount(slot, weights=series.ordered(series.values)[keep], minlength=slots)
+        counts = np.bincount(slot, minlength=slots)
+        observed = counts > 0
+        if not observed.any():
+            return np.zeros(slots), observed
+        # Forward-fill gaps; slots before the first reading take its value
+        idx = np.maximum.accumulate(np.where(observed, np.arange(slots), 0))
+        idx[:np.argmax(observed)] = np.argmax(observed)
+        means = np.divide(sums, counts, out=np.zeros(slots), where=observed)
+        return means[idx], observed
+
+    @staticmethod
+    def _standardize(rows: np.ndarray) -> np.ndarray:
+        dev = rows - rows.mean(axis=1, keepdims=True)
+        std = rows.std(axis=1, ddof=1, keepdims=True)
+        return np.divide(dev, std, out=np.zeros_like(dev), where=std > 0)
+
+    def strongest_pairs(self, min_abs: float, top_k: int) -> list[tuple[int, int]]:
+        """Pairs (i < j) above *min_abs* that are in either entity's top *top_k*."""
+        n = len(self.entities)
+        if n < 2:
+            return []
+        strength = np.abs(self.corr)
+        np.fill_diagonal(strength, -1.0)
+        k = min(top_k, n - 1)
+        top = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+        ranked = np.zeros((n, n), dtype=bool)
+        ranked[np.arange(n)[:, None], top] = True
+        keep = np.triu((ranked | ranked.T) & (strength >= min_abs), k=1)
+        return list(zip(*(idx.tolist() for idx in np.nonzero(keep))))
+
+    def joint_counts(self, pairs: list[tuple[int, int]]) -> list[int]:
+        """Slots in which both entities of each pair had readings."""
+        obs = self.observed
+        return [int(np.count_nonzero(obs[i] & obs[j])) for i, j in pairs]
+
+    def recent_correlation(self, entity_a: str, entity_b: str, slots: int) -> float | None:
+        """Pearson correlation over the last *slots* grid slots."""
+        try:
+            i, j = self.entities.index(entity_a), self.entities.index(entity_b)
+        except ValueError:
+            return None
+        a, b = self.rows[i, -slots:], self.rows[j, -slots:]
+        if a.size < 5 or a.std() == 0 or b.std() == 0:
+            return None
+        return float(np.corrcoef(a, b)[0, 1])
+
 
 # ── Engine ──────────────────────────────────────────────────────────────────
 
@@ -127,29 +408,125 @@ class AnomalyDetectionEngine:
             max_history: Maximum data points per entity (default 2016 = 12 weeks hourly).
         """
         self._max_history = max_history
-        self._history: dict[str, list[DataPoint]] = defaultdict(list)
+        self._history: dict[str, _EntitySeries] = {}
         self._profiles: dict[str, PatternProfile] = {}
         self._anomalies: list[Anomaly] = []
         self._correlations: dict[str, CorrelationPair] = {}
+        self._grid = _CorrelationGrid()
         self._anomaly_counter = 0
+        self._store: AnomalyHistoryStore | None = None
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread: threading.Thread | None = None
+
+    # ── Persistence ─────────────────────────────────────────────────────
+
+    def attach_store(self, directory: str | None = None,
+                     snapshot_interval: float | None = None) -> int:
+        """Persist history under *directory* and restore what is there.
+
+        Starts a daemon thread that flushes readings and snapshots
+        profiles/correlations every *snapshot_interval* seconds.
+
+        Returns:
+            Number of entities restored.
+        """
+        directory = directory or os.environ.get("COPILOT_ANOMALY_DIR", DEFAULT_STORE_DIR)
+        if snapshot_interval is None:
+            snapshot_interval = float(
+                os.environ.get("COPILOT_ANOMALY_SNAPSHOT_S", DEFAULT_SNAPSHOT_INTERVAL)
+            )
+        self.close()
+        store = AnomalyHistoryStore(directory, self._max_history)
+        restored = 0
+        for eid, records in store.load().items():
+            series = self._history.get(eid)
+            if series is None:
+                series = self._history[eid] = _EntitySeries(eid, self._max_history)
+            series.load(records)
+            restored += 1
+        self._restore_snapshot(store.read_snapshot())
+        self._store = store
+        logger.info("Anomaly history: restored %d entities from %s", restored, directory)
+
+        if snapshot_interval > 0:
+            self._checkpoint_stop.clear()
+            self._checkpoint_thread = threading.Thread(
+                target=self._checkpoint_loop,
+                args=(snapshot_interval,),
+                name="anomaly-checkpoint",
+                daemon=True,
+            )
+            self._checkpoint_thread.start()
+        return restored
+
+    def checkpoint(self) -> None:
+        """Flush buffered readings and snapshot profiles/correlations."""
+        store = self._store
+        if store is None:
+            return
+        store.flush()
+        store.write_snapshot({
+            "profiles": [
+                dict(asdict(p), last_updated=p.last_updated.isoformat() if p.last_updated else None)
+                for p in list(self._profiles.values())
+            ],
+            "correlations": [asdict(c) for c in list(self._correlations.values())],
+        })
+
+    def close(self) -> None:
+        """Stop the checkpoint thread and write a final checkpoint."""
+        if self._checkpoint_thread is not None:
+            self._checkpoint_stop.set()
+            self._checkpoint_thread.join(timeout=5)
+            self._checkpoint_thread = None
+        self.checkpoint()
+
+    def _checkpoint_loop(self, interval: float) -> None:
+        while not self._checkpoint_stop.wait(interval):
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("Anomaly history checkpoint failed")
+
+    def _restore_snapshot(self, snapshot: dict[str, Any]) -> None:
+        for raw in snapshot.get("profiles", []):
+            try:
+                profile = PatternProfile(**raw)
+                for name in ("hourly_means", "hourly_stds", "daily_means", "daily_stds"):
+                    setattr(profile, name, {int(k): v for k, v in getattr(profile, name).items()})
+                if profile.last_updated:
+                    profile.last_updated = datetime.fromisoformat(profile.last_updated)
+            except (TypeError, ValueError):
+                continue
+            self._profiles.setdefault(profile.entity_id, profile)
+        for raw in snapshot.get("correlations", []):
+            try:
+                pair = CorrelationPair(**raw)
+            except TypeError:
+                continue
+            self._correlations.setdefault(f"{pair.entity_a}|{pair.entity_b}", pair)
 
     # ── Data ingestion ──────────────────────────────────────────────────
 
     def ingest(self, entity_id: str, value: float,
                timestamp: datetime | None = None,
                attributes: dict[str, Any] | None = None) -> None:
-        """Ingest a single data point."""
-        ts = timestamp or datetime.now(tz=timezone.utc)
-        dp = DataPoint(
-            entity_id=entity_id,
-            value=value,
-            timestamp=ts,
-            attributes=attributes or {},
-        )
-        history = self._history[entity_id]
-        history.append(dp)
-        if len(history) > self._max_history:
-            self._history[entity_id] = history[-self._max_history:]
+        """Ingest a single data point.
+
+        Updates the entity's running moments; *attributes* are not retained.
+        """
+        series = self._history.get(entity_id)
+        if series is None:
+            series = self._history[entity_id] = _EntitySeries(entity_id, self._max_history)
+        slot = series.append(float(value), timestamp or datetime.now(tz=timezone.utc))
+        if self._store is not None:
+            self._store.append(
+                entity_id,
+                float(series.times[slot]),
+                float(series.values[slot]),
+                int(series.hours[slot]),
+                int(series.weekdays[slot]),
+            )
 
     def ingest_batch(self, points: list[dict[str, Any]]) -> int:
         """Ingest a batch of data points.
@@ -175,7 +552,10 @@ class AnomalyDetectionEngine:
     # ── Pattern learning ────────────────────────────────────────────────
 
     def learn_patterns(self, entity_id: str | None = None) -> int:
-        """Learn/update pattern profiles.
+        """Publish pattern profiles.
+
+        The moments are maintained on ingest, so this only snapshots them;
+        :meth:`detect` and :meth:`get_profile` always use current values.
 
         Args:
             entity_id: If provided, learn only this entity. Otherwise learn all.
@@ -187,67 +567,50 @@ class AnomalyDetectionEngine:
         updated = 0
 
         for eid in entities:
-            history = self._history.get(eid, [])
-            if len(history) < _MIN_POINTS_BASIC:
-                continue
-
-            profile = PatternProfile(entity_id=eid)
-            values = [dp.value for dp in history]
+            if self._current_profile(eid) is not None:
+                updated += 1
 
-            # Global statistics
-            profile.global_mean = statistics.mean(values)
-            profile.global_std = statistics.stdev(values) if len(values) > 1 else 0.0
-            profile.min_value = min(values)
-            profile.max_value = max(values)
-            profile.total_points = len(values)
-            profile.last_updated = datetime.now(tz=timezone.utc)
-
-            # Hourly patterns (0-23)
-            hourly_buckets: dict[int, list[float]] = defaultdict(list)
-            for dp in history:
-                hourly_buckets[dp.timestamp.hour].append(dp.value)
-
-            for hour, vals in hourly_buckets.items():
-                profile.hourly_means[hour] = statistics.mean(vals)
-                profile.hourly_stds[hour] = statistics.stdev(vals) if len(vals) > 1 else 0.0
+        return updated
 
-            # Daily patterns (0=Monday, 6=Sunday)
-            daily_buckets: dict[int, list[float]] = defaultdict(list)
-            for dp in history:
-                daily_buckets[dp.timestamp.weekday()].append(dp.value)
+    def _current_profile(self, entity_id: str) -> PatternProfile | None:
+        """Materialize the live profile of *entity_id* into ``_profiles``."""
+        series = self._history.get(entity_id)
+        if series is None or len(series) < _MIN_POINTS_BASIC:
+            return None
+        profile = self._profiles[entity_id] = series.profile()
+        return profile
 
-            for day, vals in daily_buckets.items():
-                profile.daily_means[day] = statistics.mean(vals)
-                profile.daily_stds[day] = statistics.stdev(vals) if len(vals) > 1 else 0.0
+    def learn_correlations(self) -> int:
+        """Learn pairwise correlations between entities.
 
-            self._profiles[eid] = profile
-            updated += 1
+        Replaces the stored pairs with the strongest ones of the current
+        correlation matrix.
+        """
+        if not self._refresh_grid():
+            self._correlations = {}
+            return 0
+
+        grid = self._grid
+        pairs = grid.strongest_pairs(_CORRELATION_MIN_ABS, _CORRELATION_TOP_K)
+        self._correlations = {}
+        for (i, j), samples in zip(pairs, grid.joint_counts(pairs)):
+            eid_a, eid_b = grid.entities[i], grid.entities[j]
+            self._correlations[f"{eid_a}|{eid_b}"] = CorrelationPair(
+                entity_a=eid_a,
+                entity_b=eid_b,
+                correlation=float(grid.corr[i, j]),
+                sample_count=samples,
+            )
 
-        return updated
+        return len(pairs)
 
-    def learn_correlations(self) -> int:
-        """Learn pairwise correlations between entities."""
-        entities = [eid for eid, h in self._history.items()
-                    if len(h) >= _MIN_POINTS_CORRELATION]
-        learned = 0
-
-        for i, eid_a in enumerate(entities):
-            for eid_b in entities[i + 1:]:
-                corr = self._calculate_correlation(eid_a, eid_b)
-                if corr is not None:
-                    key = f"{eid_a}|{eid_b}"
-                    self._correlations[key] = CorrelationPair(
-                        entity_a=eid_a,
-                        entity_b=eid_b,
-                        correlation=corr,
-                        sample_count=min(
-                            len(self._history[eid_a]),
-                            len(self._history[eid_b]),
-                        ),
-                    )
-                    learned += 1
-
-        return learned
+    def _refresh_grid(self) -> bool:
+        """Bring the correlation grid up to date; False if too few entities."""
+        series = [s for s in self._history.values() if len(s) >= _MIN_POINTS_CORRELATION]
+        if len(series) < 2:
+            return False
+        self._grid.update(series, self._max_history)
+        return True
 
     # ── Anomaly detection ───────────────────────────────────────────────
 
@@ -264,24 +627,17 @@ class AnomalyDetectionEngine:
         new_anomalies: list[Anomaly] = []
 
         for eid in entities:
-            history = self._history.get(eid, [])
-            if len(history) < _MIN_POINTS_BASIC:
-                continue
-
-            # Ensure profile is up to date
-            if eid not in self._profiles:
-                self.learn_patterns(eid)
-
-            profile = self._profiles.get(eid)
+            profile = self._current_profile(eid)
             if not profile:
                 continue
+            series = self._history[eid]
 
             # Run detection methods
-            new_anomalies.extend(self._detect_spikes(eid, history, profile))
-            new_anomalies.extend(self._detect_drift(eid, history, profile))
-            new_anomalies.extend(self._detect_flatline(eid, history))
-            new_anomalies.extend(self._detect_seasonal(eid, history, profile))
-            new_anomalies.extend(self._detect_frequency(eid, history))
+            new_anomalies.extend(self._detect_spikes(eid, series, profile))
+            new_anomalies.extend(self._detect_drift(eid, series, profile))
+            new_anomalies.extend(self._detect_flatline(eid, series))
+            new_anomalies.extend(self._detect_seasonal(eid, series, profile))
+            new_anomalies.extend(self._detect_frequency(eid, series))
 
         # Correlation anomalies (cross-entity)
         if entity_id is None:
@@ -294,7 +650,7 @@ class AnomalyDetectionEngine:
 
         return new_anomalies
 
-    def _detect_spikes(self, entity_id: str, history: list[DataPoint],
+    def _detect_spikes(self, entity_id: str, series: _EntitySeries,
                        profile: PatternProfile) -> list[Anomaly]:
         """Detect sudden spikes/drops using z-score."""
         anomalies = []
@@ -302,13 +658,14 @@ class AnomalyDetectionEngine:
             return anomalies
 
         # Check last 3 data points
-        recent = history[-3:]
-        for dp in recent:
+        hours = series.tail(series.hours, 3).tolist()
+        for offset, hour in enumerate(hours, start=-len(hours)):
+            dp = series[offset]
             z_score = abs(dp.value - profile.global_mean) / profile.global_std
 
             # Also check against hourly pattern if available
-            hourly_mean = profile.hourly_means.get(dp.timestamp.hour)
-            hourly_std = profile.hourly_stds.get(dp.timestamp.hour, 0)
+            hourly_mean = profile.hourly_means.get(hour)
+            hourly_std = profile.hourly_stds.get(hour, 0)
             hourly_z = 0.0
             if hourly_std > 0 and hourly_mean is not None:
                 hourly_z = abs(dp.value - hourly_mean) / hourly_std
@@ -335,23 +692,21 @@ class AnomalyDetectionEngine:
 
         return anomalies
 
-    def _detect_drift(self, entity_id: str, history: list[DataPoint],
+    def _detect_drift(self, entity_id: str, series: _EntitySeries,
                       profile: PatternProfile) -> list[Anomaly]:
         """Detect gradual drift (values slowly moving away from baseline)."""
         anomalies = []
-        if len(history) < 48:
+        if len(series) < 48:
             return anomalies
 
         # Compare recent 24h mean vs historical mean
-        recent_values = [dp.value for dp in history[-24:]]
-        older_values = [dp.value for dp in history[:-24]]
+        values = series.ordered(series.values)
+        recent_values = values[-24:]
+        older_values = values[:-24]
 
-        if not older_values:
-            return anomalies
-
-        recent_mean = statistics.mean(recent_values)
-        older_mean = statistics.mean(older_values)
-        older_std = statistics.stdev(older_values) if len(older_values) > 1 else 0
+        recent_mean = float(recent_values.mean())
+        older_mean = float(older_values.mean())
+        older_std = float(older_values.std(ddof=1)) if older_values.size > 1 else 0
 
         if older_std == 0:
             return anomalies
@@ -370,7 +725,7 @@ class AnomalyDetectionEngine:
                 value=recent_mean,
                 expected_value=older_mean,
                 deviation_pct=dev_pct,
-                detected_at=history[-1].timestamp,
+                detected_at=series[-1].timestamp,
                 context={
                     "drift_z": round(drift_z, 2),
                     "direction": direction,
@@ -381,44 +736,44 @@ class AnomalyDetectionEngine:
 
         return anomalies
 
-    def _detect_flatline(self, entity_id: str, history: list[DataPoint]) -> list[Anomaly]:
+    def _detect_flatline(self, entity_id: str, series: _EntitySeries) -> list[Anomaly]:
         """Detect stuck/frozen sensors (flatline)."""
         anomalies = []
-        if len(history) < _FLATLINE_THRESHOLD:
+        if len(series) < _FLATLINE_THRESHOLD:
             return anomalies
 
-        recent = history[-_FLATLINE_THRESHOLD:]
-        values = [dp.value for dp in recent]
+        values = series.tail(series.values, _FLATLINE_THRESHOLD)
 
-        if len(set(values)) == 1:
+        if np.all(values == values[0]):
+            stuck = float(values[0])
             anomalies.append(self._create_anomaly(
                 entity_id=entity_id,
                 anomaly_type="flatline",
                 severity="warning",
                 score=60.0,
-                value=values[0],
-                expected_value=values[0],
+                value=stuck,
+                expected_value=stuck,
                 deviation_pct=0.0,
-                detected_at=recent[-1].timestamp,
+                detected_at=series[-1].timestamp,
                 context={
                     "consecutive_identical": _FLATLINE_THRESHOLD,
-                    "stuck_value": values[0],
+                    "stuck_value": stuck,
                 },
             ))
 
         return anomalies
 
-    def _detect_seasonal(self, entity_id: str, history: list[DataPoint],
+    def _detect_seasonal(self, entity_id: str, series: _EntitySeries,
                          profile: PatternProfile) -> list[Anomaly]:
         """Detect violations of seasonal/time-of-day patterns."""
         anomalies = []
-        if len(history) < _MIN_POINTS_SEASONAL:
+        if len(series) < _MIN_POINTS_SEASONAL:
             return anomalies
 
         # Check latest point against expected hourly pattern
-        latest = history[-1]
-        hour = latest.timestamp.hour
-        day = latest.timestamp.weekday()
+        latest = series[-1]
+        hour = int(series.tail(series.hours, 1)[0])
+        day = int(series.tail(series.weekdays, 1)[0])
 
         # Hourly check
         hourly_mean = profile.hourly_means.get(hour)
@@ -478,22 +833,23 @@ class AnomalyDetectionEngine:
 
         return anomalies
 
-    def _detect_frequency(self, entity_id: str, history: list[DataPoint]) -> list[Anomaly]:
+    def _detect_frequency(self, entity_id: str, series: _EntitySeries) -> list[Anomaly]:
         """Detect changes in reporting frequency (sensor dropping out)."""
         anomalies = []
-        if len(history) < _MIN_POINTS_BASIC * 2:
+        if len(series) < _MIN_POINTS_BASIC * 2:
             return anomalies
 
         # Calculate intervals between recent and historical data
-        mid = len(history) // 2
-        older_intervals = self._calculate_intervals(history[:mid])
-        recent_intervals = self._calculate_intervals(history[mid:])
+        times = series.ordered(series.times)
+        mid = len(series) // 2
+        older_intervals = self._calculate_intervals(times[:mid])
+        recent_intervals = self._calculate_intervals(times[mid:])
 
-        if not older_intervals or not recent_intervals:
+        if not older_intervals.size or not recent_intervals.size:
             return anomalies
 
-        older_freq = statistics.mean(older_intervals)
-        recent_freq = statistics.mean(recent_intervals)
+        older_freq = float(older_intervals.mean())
+        recent_freq = float(recent_intervals.mean())
 
         if older_freq == 0:
             return anomalies
@@ -511,7 +867,7 @@ class AnomalyDetectionEngine:
                 value=recent_freq,
                 expected_value=older_freq,
                 deviation_pct=change_ratio * 100,
-                detected_at=history[-1].timestamp,
+                detected_at=series[-1].timestamp,
                 context={
                     "recent_interval_s": round(recent_freq, 1),
                     "historical_interval_s": round(older_freq, 1),
@@ -525,20 +881,14 @@ class AnomalyDetectionEngine:
     def _detect_correlation_anomalies(self) -> list[Anomaly]:
         """Detect broken correlations between entities."""
         anomalies = []
+        strong = [c for c in self._correlations.values() if abs(c.correlation) >= 0.7]
+        if not strong or not self._refresh_grid():
+            return anomalies
 
-        for key, corr_pair in self._correlations.items():
-            if abs(corr_pair.correlation) < 0.7:
-                continue  # Only check strongly correlated pairs
-
-            hist_a = self._history.get(corr_pair.entity_a, [])
-            hist_b = self._history.get(corr_pair.entity_b, [])
-
-            if len(hist_a) < 24 or len(hist_b) < 24:
-                continue
-
-            # Calculate recent correlation (last 24 points)
-            recent_corr = self._calculate_correlation(
-                corr_pair.entity_a, corr_pair.entity_b, window=24
+        for corr_pair in strong:  # Only check strongly correlated pairs
+            # Correlation over the most recent grid slots
+            recent_corr = self._grid.recent_correlation(
+                corr_pair.entity_a, corr_pair.entity_b, _CORRELATION_RECENT_SLOTS
             )
 
             if recent_corr is None:
@@ -585,8 +935,8 @@ class AnomalyDetectionEngine:
         return results[-limit:]
 
     def get_profile(self, entity_id: str) -> PatternProfile | None:
-        """Get learned pattern profile for an entity."""
-        return self._profiles.get(entity_id)
+        """Get the current pattern profile for an entity."""
+        return self._current_profile(entity_id)
 
     def get_summary(self) -> AnomalySummary:
         """Get overall anomaly detection summary."""
@@ -763,43 +1113,11 @@ class AnomalyDetectionEngine:
                     f"now: {ctx.get('recent_correlation', 0):.2f})")
         return f"Anomaly in {entity_short}: {value:.1f}"
 
-    def _calculate_correlation(self, entity_a: str, entity_b: str,
-                                window: int | None = None) -> float | None:
-        """Calculate Pearson correlation between two entities."""
-        hist_a = self._history.get(entity_a, [])
-        hist_b = self._history.get(entity_b, [])
-
-        if window:
-            hist_a = hist_a[-window:]
-            hist_b = hist_b[-window:]
-
-        n = min(len(hist_a), len(hist_b))
-        if n < 5:
-            return None
-
-        vals_a = [dp.value for dp in hist_a[-n:]]
-        vals_b = [dp.value for dp in hist_b[-n:]]
-
-        mean_a = statistics.mean(vals_a)
-        mean_b = statistics.mean(vals_b)
-        std_a = statistics.stdev(vals_a) if len(vals_a) > 1 else 0
-        std_b = statistics.stdev(vals_b) if len(vals_b) > 1 else 0
-
-        if std_a == 0 or std_b == 0:
-            return 0.0
-
-        cov = sum((a - mean_a) * (b - mean_b) for a, b in zip(vals_a, vals_b)) / (n - 1)
-        return cov / (std_a * std_b)
-
     @staticmethod
-    def _calculate_intervals(history: list[DataPoint]) -> list[float]:
-        """Calculate time intervals between consecutive data points in seconds."""
-        intervals = []
-        for i in range(1, len(history)):
-            dt = (history[i].timestamp - history[i - 1].timestamp).total_seconds()
-            if dt > 0:
-                intervals.append(dt)
-        return intervals
+    def _calculate_intervals(times: np.ndarray) -> np.ndarray:
+        """Positive intervals between consecutive epoch timestamps in seconds."""
+        intervals = np.diff(times)
+        return intervals[intervals > 0]
 
     @staticmethod
     def _z_to_severity(z: float) -> str:
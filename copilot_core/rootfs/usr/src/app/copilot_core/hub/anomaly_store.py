@@ -0,0 +1,183 @@
+"""Append-only on-disk history for the anomaly detection engine.
+
+Every entity gets one segment file of packed fixed-size records
+(float64 epoch timestamp, float64 value, int8 hour, int8 weekday – 18
+bytes per reading). Readings are buffered in memory and appended by
+:meth:`AnomalyHistoryStore.flush`; once a segment holds more than twice
+the engine's ring capacity it is rewritten to the newest ``capacity``
+records. Loading memory-maps each segment and hands back only its tail,
+so a restart costs one small read per entity instead of re-learning.
+
+A torn record at the end of a segment (crash mid-append) is ignored on
+load and cut off before the next append.
+
+Profiles and learned correlations are snapshotted into
+``snapshot.json`` (written to a temp file and swapped with
+``os.replace``).
+
+Directory layout::
+
+    entities.json   entity id -> segment file name
+    <hash>.seg      records of one entity
+    snapshot.json   profiles and correlations
+
+Environment variables:
+    COPILOT_ANOMALY_DIR        – store directory (default: /data/anomaly_history)
+    COPILOT_ANOMALY_SNAPSHOT_S – flush/snapshot period in seconds (default: 60)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = "/data/anomaly_history"
+DEFAULT_SNAPSHOT_INTERVAL = 60.0
+
+RECORD = np.dtype([("ts", "<f8"), ("value", "<f8"), ("hour", "i1"), ("weekday", "i1")])
+
+_INDEX_NAME = "entities.json"
+_SNAPSHOT_NAME = "snapshot.json"
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+class AnomalyHistoryStore:
+    """Per-entity append-only reading segments plus a JSON snapshot."""
+
+    def __init__(self, directory: str | os.PathLike, capacity: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()  # guards _pending
+        self._io_lock = threading.Lock()  # serializes file writes
+        self._pending: dict[str, list[tuple[float, float, int, int]]] = {}
+        self._files: dict[str, str] = self._read_index()
+        self._records: dict[str, int] = {}  # records on disk per entity, once known
+        self._stats = {"flushes": 0, "appended": 0, "compactions": 0, "snapshots": 0}
+
+    # --- Segments -----------------------------------------------------------
+
+    def append(self, entity_id: str, ts: float, value: float, hour: int, weekday: int) -> None:
+        """Buffer one reading for the next :meth:`flush`."""
+        with self._lock:
+            self._pending.setdefault(entity_id, []).append((ts, value, hour, weekday))
+
+    def flush(self) -> int:
+        """Append buffered readings to their segments; returns records written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        written = 0
+        with self._io_lock:
+            new_entities = False
+            for entity_id, rows in pending.items():
+                if entity_id not in self._files:
+                    self._files[entity_id] = self._segment_name(entity_id)
+                    new_entities = True
+                written += self._append_rows(entity_id, np.array(rows, dtype=RECORD))
+            if new_entities:
+                _atomic_write_json(self.directory / _INDEX_NAME, self._files)
+            self._stats["flushes"] += 1
+            self._stats["appended"] += written
+        return written
+
+    def load(self) -> dict[str, np.ndarray]:
+        """Newest ``capacity`` records per entity (read-only memory maps)."""
+        history: dict[str, np.ndarray] = {}
+        with self._io_lock:
+            for entity_id, name in self._files.items():
+                path = self.directory / name
+                try:
+                    count = path.stat().st_size // RECORD.itemsize
+                except FileNotFoundError:
+                    continue
+                self._records[entity_id] = count
+                if count == 0:
+                    continue
+                records = np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+                history[entity_id] = records[-self.capacity:]
+        return history
+
+    def _append_rows(self, entity_id: str, rows: np.ndarray) -> int:
+        path = self.directory / self._files[entity_id]
+        count = self._records.get(entity_id)
+        if count is None:
+            count = path.stat().st_size // RECORD.itemsize if path.exists() else 0
+        with open(path, "ab") as fh:
+            if fh.tell() != count * RECORD.itemsize:
+                fh.truncate(count * RECORD.itemsize)  # drop a torn record
+                fh.seek(0, os.SEEK_END)
+            fh.write(rows.tobytes())
+        count += rows.size
+        if count > 2 * self.capacity:
+            count = self._compact(path)
+        self._records[entity_id] = count
+        return int(rows.size)
+
+    def _compact(self, path: Path) -> int:
+        """Rewrite *path* to its newest ``capacity`` records."""
+        records = np.fromfile(path, dtype=RECORD)[-self.capacity:]
+        tmp = path.with_name(path.name + ".tmp")
+        records.tofile(tmp)
+        os.replace(tmp, path)
+        self._stats["compactions"] += 1
+        return int(records.size)
+
+    def _segment_name(self, entity_id: str) -> str:
+        return hashlib.sha1(entity_id.encode()).hexdigest()[:20] + ".seg"
+
+    def _read_index(self) -> dict[str, str]:
+        try:
+            with open(self.directory / _INDEX_NAME, encoding="utf-8") as fh:
+                index = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable anomaly history index in %s", self.directory)
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    # --- Snapshot -----------------------------------------------------------
+
+    def write_snapshot(self, data: dict[str, Any]) -> None:
+        with self._io_lock:
+            _atomic_write_json(self.directory / _SNAPSHOT_NAME, data)
+            self._stats["snapshots"] += 1
+
+    def read_snapshot(self) -> dict[str, Any]:
+        """Return the last snapshot, or ``{}`` if missing/unreadable."""
+        try:
+            with open(self.directory / _SNAPSHOT_NAME, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable anomaly snapshot in %s", self.directory)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pending = sum(len(rows) for rows in self._pending.values())
+        return dict(
+            self._stats,
+            entities=len(self._files),
+            pending=pending,
+            directory=str(self.directory),
+        )
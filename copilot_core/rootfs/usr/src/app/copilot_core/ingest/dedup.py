@@ -0,0 +1,120 @@
+"""Expiring dedup table for the event store (timer-wheel style).
+
+Keys are registered with an expiry time and filed into coarse time buckets
+(``granularity`` seconds wide). Buckets are ordered by expiry, so expiring
+is a matter of popping buckets off the front as the clock passes them –
+amortized O(1) per key, no full-table scans. Re-registering a key after it
+expired leaves a stale entry in its old bucket; the bucket index stored per
+key makes such entries harmless when their bucket is drained.
+
+Memory is bounded by ``max_keys``: when the table is full the keys closest
+to expiry are dropped first (counted as ``evicted_early``), which keeps the
+newest keys – the ones most likely to see a retransmit – deduplicated.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Callable
+
+# Rough per-key cost (dict slot + key string + bucket slot) used for the
+# memory ceiling estimate reported in stats.
+_APPROX_BYTES_PER_KEY = 200
+_DEFAULT_SLOTS = 64
+
+
+class DedupWheel:
+    """Bounded TTL set with amortized O(1) insert and expiry."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_keys: int,
+        granularity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = float(ttl)
+        self.max_keys = max(1, int(max_keys))
+        self.granularity = granularity or max(0.5, self.ttl / _DEFAULT_SLOTS)
+        self._clock = clock
+
+        # key → (exact expiry, bucket index the key is filed under)
+        self._entries: dict[str, tuple[float, int]] = {}
+        # (bucket index, keys) in ascending bucket order
+        self._buckets: deque[tuple[int, deque[str]]] = deque()
+
+        self.expired_total = 0
+        self.evicted_early = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bucket(self, expiry: float) -> int:
+        return int(expiry // self.granularity)
+
+    def expire(self, now: float | None = None) -> int:
+        """Drop every key whose bucket lies entirely in the past."""
+        now = self._clock() if now is None else now
+        current = self._bucket(now)
+        removed = 0
+        while self._buckets and self._buckets[0][0] < current:
+            idx, keys = self._buckets.popleft()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == idx:
+                    del self._entries[key]
+                    removed += 1
+        self.expired_total += removed
+        return removed
+
+    def seen(self, key: str) -> bool:
+        """Return True if *key* is live; otherwise register it and return False."""
+        now = self._clock()
+        self.expire(now)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return True
+
+        expiry = now + self.ttl
+        idx = self._bucket(expiry)
+        if self._buckets and self._buckets[-1][0] >= idx:
+            # Same slot (or the clock stepped back): file with the newest bucket
+            idx, keys = self._buckets[-1]
+            keys.append(key)
+        else:
+            self._buckets.append((idx, deque((key,))))
+        self._entries[key] = (expiry, idx)
+
+        if len(self._entries) > self.max_keys:
+            self._evict_oldest(len(self._entries) - self.max_keys)
+        return False
+
+    def _evict_oldest(self, count: int) -> None:
+        while count > 0 and self._buckets:
+            idx, keys = self._buckets[0]
+            while keys and count > 0:
+                key = keys.popleft()
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == idx:
+                    del self._entries[key]
+                    self.evicted_early += 1
+                    count -= 1
+            if not keys:
+                self._buckets.popleft()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "keys": len(self._entries),
+            "max_keys": self.max_keys,
+            "buckets": len(self._buckets),
+            "granularity_s": self.granularity,
+            "expired_total": self.expired_total,
+            "evicted_early": self.evicted_early,
+            "approx_bytes": len(self._entries) * _APPROX_BYTES_PER_KEY,
+            "max_bytes": self.max_keys * _APPROX_BYTES_PER_KEY,
+        }
@@ -7,6 +7,21 @@ Environment variables:
     COPILOT_EVENT_STORE_PATH  – JSONL file path (default: /data/events.jsonl)
     COPILOT_EVENT_STORE_MAX   – max events in memory ring (default: 5000)
     COPILOT_EVENT_STORE_DEDUP_TTL – dedup window in seconds (default: 120)
+    COPILOT_EVENT_STORE_DEDUP_MAX – dedup table ceiling in keys
+                                (default: 2 × COPILOT_EVENT_STORE_MAX)
+    COPILOT_EVENT_STORE_FSYNC – journal fsync policy: always|interval|never
+                                (default: interval)
+    COPILOT_EVENT_STORE_FLUSH_INTERVAL – background flush/fsync period in
+                                seconds (default: 1.0)
+    COPILOT_EVENT_STORE_ROTATE_MB – rotate the journal above this size
+                                (default: 64, 0 disables)
+    COPILOT_EVENT_STORE_ROTATE_HOURS – rotate the journal after this age
+                                (default: 0 = disabled)
+    COPILOT_EVENT_STORE_BACKUPS – rotated journal generations kept (default: 3)
+    COPILOT_EVENT_STORE_COMPACT_KEEP – records retained when the journal is
+                                compacted into indexed segments after a
+                                rotation; compaction drops the rotated
+                                generations (default: 0 = disabled)
 """
 from __future__ import annotations
 
@@ -15,14 +30,23 @@ import json
 import os
 import threading
 import time
-from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
+from copilot_core.ingest.dedup import DedupWheel
+from copilot_core.ingest.journal import FSYNC_POLICIES, JournalWriter, read_tail
+from copilot_core.ingest.ring import EventRing
+
 
 _DEFAULT_STORE_PATH = "/data/events.jsonl"
 _DEFAULT_MAX_EVENTS = 5000
 _DEFAULT_DEDUP_TTL = 120  # seconds
+_DEFAULT_FSYNC = "interval"
+_DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+_DEFAULT_ROTATE_MB = 64
+_DEFAULT_ROTATE_HOURS = 0
+_DEFAULT_BACKUPS = 3
+_DEFAULT_COMPACT_KEEP = 0  # opt-in: compaction drops rotated generations
 
 # Allowed envelope versions (for forward-compat)
 _SUPPORTED_VERSIONS = {1}
@@ -64,6 +88,13 @@ class EventStore:
         store_path: str | None = None,
         max_events: int | None = None,
         dedup_ttl: int | None = None,
+        fsync: str | None = None,
+        flush_interval: float | None = None,
+        rotate_bytes: int | None = None,
+        rotate_seconds: float | None = None,
+        backups: int | None = None,
+        compact_keep: int | None = None,
+        dedup_max_keys: int | None = None,
     ) -> None:
         self._path = store_path or os.environ.get(
             "COPILOT_EVENT_STORE_PATH", _DEFAULT_STORE_PATH
@@ -75,9 +106,39 @@ class EventStore:
             os.environ.get("COPILOT_EVENT_STORE_DEDUP_TTL", _DEFAULT_DEDUP_TTL)
         )
 
+        fsync = (fsync or os.environ.get("COPILOT_EVENT_STORE_FSYNC", _DEFAULT_FSYNC)).lower()
+        if fsync not in FSYNC_POLICIES:
+            fsync = _DEFAULT_FSYNC
+        self._journal = JournalWriter(
+            self._path,
+            fsync=fsync,
+            flush_interval=flush_interval if flush_interval is not None else float(
+                os.environ.get("COPILOT_EVENT_STORE_FLUSH_INTERVAL", _DEFAULT_FLUSH_INTERVAL)
+            ),
+            rotate_bytes=rotate_bytes if rotate_bytes is not None else int(
+                float(os.environ.get("COPILOT_EVENT_STORE_ROTATE_MB", _DEFAULT_ROTATE_MB))
+                * 1024 * 1024
+            ),
+            rotate_seconds=rotate_seconds if rotate_seconds is not None else (
+                float(os.environ.get("COPILOT_EVENT_STORE_ROTATE_HOURS", _DEFAULT_ROTATE_HOURS))
+                * 3600
+            ),
+            backups=backups if backups is not None else int(
+                os.environ.get("COPILOT_EVENT_STORE_BACKUPS", _DEFAULT_BACKUPS)
+            ),
+            compact_keep=compact_keep if compact_keep is not None else int(
+                os.environ.get("COPILOT_EVENT_STORE_COMPACT_KEEP", _DEFAULT_COMPACT_KEEP)
+            ),
+        )
+
         self._lock = threading.Lock()
-        self._ring: list[dict[str, Any]] = []
-        self._seen: OrderedDict[str, float] = OrderedDict()  # key → expiry_ts
+        self._ring = EventRing(self._max)
+        self._dedup = DedupWheel(
+            ttl=self._dedup_ttl,
+            max_keys=dedup_max_keys if dedup_max_keys is not None else int(
+                os.environ.get("COPILOT_EVENT_STORE_DEDUP_MAX", max(1, self._max * 2))
+            ),
+        ) if self._dedup_ttl > 0 else None
 
         # Stats
         self.accepted_total: int = 0
@@ -88,65 +149,26 @@ class EventStore:
         self._load_tail()
 
     def _load_tail(self) -> None:
-        """Load last N events from JSONL into memory ring."""
-        try:
-            with open(self._path, "r", encoding="utf-8") as fh:
-                lines = fh.readlines()
-            tail = lines[-self._max:] if len(lines) > self._max else lines
-            for line in tail:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    self._ring.append(json.loads(line))
-                except (json.JSONDecodeError, ValueError):
-                    continue
-        except FileNotFoundError:
-            pass
-        except Exception:
-            pass
+        """Load last N events from the JSONL journal into memory ring.
 
-    def _prune_seen(self) -> None:
-        """Remove ALL expired dedup entries (call under lock).
-        
-        FIX: Now removes ALL expired entries, not just until first non-expired.
-        This prevents unbounded growth when events arrive with old timestamps.
+        Reverse-seeks the journal files and only parses the records kept,
+        so cold start is O(ring size) regardless of journal length.
         """
-        now = time.time()
-        # Remove ALL expired entries (not just until first non-expired)
-        expired_keys = [k for k, expiry in self._seen.items() if expiry <= now]
-        for key in expired_keys:
-            self._seen.pop(key, None)
+        try:
+            tail = read_tail(self._path, self._max, self._journal.backups)
+        except Exception:
+            return
+        for line in tail:
+            try:
+                self._ring.append(json.loads(line))
+            except (json.JSONDecodeError, ValueError):
+                continue
 
     def _is_duplicate(self, key: str) -> bool:
-        """Check and register dedup key (call under lock).
-        
-        FIX: Added periodic full prune to prevent memory leak.
-        """
-        if self._dedup_ttl <= 0:
+        """Check and register dedup key (call under lock)."""
+        if self._dedup is None:
             return False
-
-        # FIX: Periodic full prune every 100 calls to prevent memory leak
-        # Use modulo to avoid expensive pruning on every call
-        if self.accepted_total % 100 == 0:
-            self._prune_seen()
-
-        now = time.time()
-        if key in self._seen and self._seen[key] > now:
-            return True
-
-        self._seen[key] = now + self._dedup_ttl
-        
-        # FIX: More aggressive bound enforcement
-        # Bound dedup map - keep it bounded to 2x max events
-        max_dedup_size = self._max * 2
-        if len(self._seen) > max_dedup_size:
-            # Remove oldest 50% of entries
-            keys_to_remove = list(self._seen.keys())[:max_dedup_size // 2]
-            for key in keys_to_remove:
-                self._seen.pop(key, None)
-
-        return False
+        return self._dedup.seen(key)
 
     def validate_event(self, event: dict[str, Any]) -> str | None:
         """Validate a single event envelope. Returns error string or None if valid."""
@@ -189,6 +211,7 @@ class EventStore:
         deduped = 0
         errors: list[dict[str, Any]] = []
         accepted_events: list[dict[str, Any]] = []
+        journal_lines: list[str] = []
 
         with self._lock:
             for i, item in enumerate(items):
@@ -208,18 +231,23 @@ class EventStore:
                 # Normalize to canonical envelope
                 normalized = self._normalize(item, dedup_key)
 
-                # Append to ring
+                # Append to ring (evicts oldest + keeps indexes in step)
                 self._ring.append(normalized)
-                if len(self._ring) > self._max:
-                    del self._ring[:len(self._ring) - self._max]
 
-                # Persist
-                self._append_jsonl(normalized)
+                # Persist (queued, written once per batch below)
+                journal_lines.append(json.dumps(normalized, ensure_ascii=False) + "\n")
 
                 accepted += 1
                 self.accepted_total += 1
                 accepted_events.append(normalized)
 
+            # Queue under the lock so journal order matches ring order
+            self._journal.append(journal_lines)
+
+        # Group commit outside the lock: readers never wait on disk I/O
+        if journal_lines:
+            self._journal.commit()
+
         return {
             "accepted": accepted,
             "rejected": rejected,
@@ -291,14 +319,24 @@ class EventStore:
 
         return normalized
 
-    def _append_jsonl(self, event: dict[str, Any]) -> None:
-        """Append a single event to the JSONL file."""
-        try:
-            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
-            with open(self._path, "a", encoding="utf-8") as fh:
-                fh.write(json.dumps(event, ensure_ascii=False) + "\n")
-        except Exception:
-            pass  # Best-effort persistence
+    def flush(self) -> None:
+        """Write out queued journal records and fsync (best-effort)."""
+        self._journal.sync()
+
+    def compact(self, keep: int | None = None) -> dict[str, Any]:
+        """Compact the journal into indexed segments keeping *keep* records.
+
+        Defaults to the configured compact_keep, or the ring size when
+        automatic compaction is disabled. Safe while
+        ingesting; the ring buffer is not affected.
+        """
+        if keep is None:
+            keep = self._journal.compact_keep or self._max
+        return self._journal.compact(keep)
+
+    def close(self) -> None:
+        """Flush the journal and stop its background flusher."""
+        self._journal.close()
 
     def query(
         self,
@@ -309,34 +347,26 @@ class EventStore:
         since: str | None = None,
         limit: int = 100,
     ) -> list[dict[str, Any]]:
-        """Query events from the in-memory ring buffer with optional filters."""
+        """Query events from the in-memory ring buffer with optional filters.
+
+        Served from the ring's posting lists and ts index, so the cost is
+        proportional to the matching events rather than the ring size.
+        """
         limit = max(1, min(limit, 1000))
 
         with self._lock:
-            results: list[dict[str, Any]] = []
-            for ev in reversed(self._ring):
-                if domain and ev.get("domain") != domain:
-                    continue
-                if entity_id and ev.get("entity_id") != entity_id:
-                    continue
-                if kind and ev.get("kind") != kind:
-                    continue
-                if zone_id:
-                    zones = ev.get("zone_ids", [])
-                    if zone_id not in zones:
-                        continue
-                if since and ev.get("ts", "") < since:
-                    continue
-
-                results.append(ev)
-                if len(results) >= limit:
-                    break
-
-            results.reverse()
-            return results
+            return self._ring.query(
+                domain=domain,
+                entity_id=entity_id,
+                kind=kind,
+                zone_id=zone_id,
+                since=since,
+                limit=limit,
+            )
 
     def stats(self) -> dict[str, Any]:
         """Return store statistics."""
+        journal = self._journal.stats()
         with self._lock:
             return {
                 "buffered": len(self._ring),
@@ -345,5 +375,8 @@ class EventStore:
                 "accepted_total": self.accepted_total,
                 "rejected_total": self.rejected_total,
                 "deduped_total": self.deduped_total,
-                "dedup_keys_tracked": len(self._seen),
+                "dedup_keys_tracked": len(self._dedup) if self._dedup else 0,
+                "dedup": self._dedup.stats() if self._dedup else None,
+                "index_keys": self._ring.index_stats(),
+                "journal": journal,
             }
@@ -0,0 +1,570 @@
+"""Append-only JSONL journal with group commit and rotation.
+
+Used by :class:`~copilot_core.ingest.event_store.EventStore` to persist
+accepted events. Instead of opening and closing the file for every event,
+the journal keeps a single append handle open and writes everything queued
+since the last commit with one ``write()`` call ("group commit"), so the
+cost of persisting a forwarder batch scales with batches, not events.
+
+fsync policies:
+    always   – fsync after every group commit (durable before the ack)
+    interval – a background flusher fsyncs dirty data every ``flush_interval``
+    never    – leave write-back entirely to the OS page cache
+
+Rotation:
+    When the active file grows beyond ``rotate_bytes`` or has been open for
+    longer than ``rotate_seconds`` it is renamed to ``<path>.1`` (older
+    generations shift to ``.2`` … ``.<backups>``, the oldest is dropped) and
+    a fresh file is started. A value of 0 disables the respective trigger.
+
+Compaction:
+    ``compact_journal`` rewrites the newest ``keep`` records of the active
+    file, its rotated generations and any previous segments into segment
+    files ``<path>.seg-NNNNNN`` described by a small JSON index
+    ``<path>.idx`` (record counts plus the byte offset of every
+    ``INDEX_STRIDE``-th record). ``read_tail`` reverse-seeks the active and
+    rotated files and uses the index to seek straight into segments, so a
+    cold start parses only the records it keeps. Compaction runs online in
+    the flusher thread after a rotation (``compact_keep`` > 0) or offline via
+    ``python -m copilot_core.ingest.journal compact <path> --keep N``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+INDEX_VERSION = 1
+INDEX_STRIDE = 256  # records between offset index entries
+_TAIL_BLOCK = 64 * 1024
+_DEFAULT_SEGMENT_RECORDS = 10_000
+
+
+def rotated_path(path: str, generation: int) -> str:
+    """Return the file name of rotated generation *generation* (1 = newest)."""
+    return f"{path}.{generation}"
+
+
+def segment_path(path: str, seq: int) -> str:
+    """Return the file name of compacted segment number *seq*."""
+    return f"{path}.seg-{seq:06d}"
+
+
+def index_path(path: str) -> str:
+    """Return the file name of the segment offset index."""
+    return f"{path}.idx"
+
+
+def _empty_index() -> dict[str, Any]:
+    return {"version": INDEX_VERSION, "stride": INDEX_STRIDE, "next_seq": 1, "segments": []}
+
+
+def load_index(path: str) -> dict[str, Any]:
+    """Load the segment index for journal *path* (empty index if absent/corrupt)."""
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as fh:
+            index = json.load(fh)
+    except (OSError, ValueError):
+        return _empty_index()
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return _empty_index()
+    index.setdefault("segments", [])
+    index.setdefault("stride", INDEX_STRIDE)
+    index.setdefault("next_seq", 1)
+    return index
+
+
+def _write_index(path: str, index: dict[str, Any]) -> None:
+    """Atomically replace the index file (this is the compaction commit point)."""
+    target = index_path(path)
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, separators=(",", ":"))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, target)
+
+
+def _reverse_lines(path: str, limit: int) -> list[str]:
+    """Return up to *limit* last non-empty lines of *path*, newest first.
+
+    Reads fixed-size blocks backwards from EOF, so the cost is proportional
+    to the bytes of the returned lines, not to the file size.
+    """
+    out: list[str] = []
+    if limit <= 0:
+        return out
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return out
+    with fh:
+        pos = fh.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0 and len(out) < limit:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            fh.seek(pos)
+            lines = (fh.read(step) + rest).split(b"\n")
+            rest = lines[0]  # possibly partial until we reach the start
+            for line in reversed(lines[1:]):
+                line = line.strip()
+                if line:
+                    out.append(line.decode("utf-8", "replace"))
+                    if len(out) >= limit:
+                        break
+        rest = rest.strip()
+        if pos == 0 and rest and len(out) < limit:
+            out.append(rest.decode("utf-8", "replace"))
+    return out
+
+
+def _segment_tail(path: str, segment: dict[str, Any], count: int, stride: int) -> list[str]:
+    """Return the last *count* records of an indexed segment, oldest first."""
+    records = int(segment.get("records", 0))
+    skip = max(0, records - count)
+    offsets = segment.get("offsets") or [0]
+    slot = min(skip // stride, len(offsets) - 1)
+    skip -= slot * stride
+    out: list[str] = []
+    try:
+        with open(os.path.join(os.path.dirname(path), segment["file"]), "rb") as fh:
+            fh.seek(int(offsets[slot]))
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                if skip > 0:
+                    skip -= 1
+                    continue
+                out.append(line.decode("utf-8", "replace"))
+    except (OSError, KeyError, ValueError):
+        return []
+    return out[-count:] if count > 0 else []
+
+
+def read_tail(path: str, limit: int, backups: int = 3) -> list[str]:
+    """Return the newest *limit* raw journal records, oldest first.
+
+    Sources are visited newest to oldest – active file, rotated generations,
+    then indexed segments – and reading stops as soon as *limit* records
+    have been collected.
+    """
+    newest_first: list[str] = []
+    if limit <= 0:
+        return newest_first
+    for src in [path] + [rotated_path(path, gen) for gen in range(1, max(1, backups) + 1)]:
+        need = limit - len(newest_first)
+        if need <= 0:
+            break
+        newest_first.extend(_reverse_lines(src, need))
+
+    if len(newest_first) < limit:
+        index = load_index(path)
+        stride = max(1, int(index.get("stride", INDEX_STRIDE)))
+        for segment in reversed(index["segments"]):
+            need = limit - len(newest_first)
+            if need <= 0:
+                break
+            newest_first.extend(reversed(_segment_tail(path, segment, need, stride)))
+
+    newest_first.reverse()
+    return newest_first
+
+
+def _record_ts(line: str) -> str | None:
+    try:
+        ts = json.loads(line).get("ts")
+    except (ValueError, AttributeError):
+        return None
+    return ts if isinstance(ts, str) else None
+
+
+def finish_compaction(path: str) -> None:
+    """Complete the cleanup step of a compaction interrupted after its commit."""
+    index = load_index(path)
+    cleanup = index.get("cleanup")
+    if not cleanup:
+        return
+    directory = os.path.dirname(path)
+    for name in cleanup.get("files", []):
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    consumed = int(cleanup.get("active_bytes", 0))
+    try:
+        if consumed and os.path.getsize(path) >= consumed:
+            tmp = path + ".tmp"
+            with open(path, "rb") as src, open(tmp, "wb") as dst:
+                src.seek(consumed)
+                dst.write(src.read())
+            os.replace(tmp, path)
+    except FileNotFoundError:
+        pass
+    index.pop("cleanup", None)
+    _write_index(path, index)
+
+
+def compact_journal(
+    path: str,
+    keep: int,
+    backups: int = 3,
+    segment_records: int = _DEFAULT_SEGMENT_RECORDS,
+) -> dict[str, Any]:
+    """Rewrite the newest *keep* records into indexed segment files.
+
+    The active file, rotated generations and previous segments are replaced.
+    Not safe against a concurrent writer – use ``JournalWriter.compact`` on
+    a live journal. Crash-safe: the index replace is the commit point and
+    ``finish_compaction`` completes an interrupted cleanup on next open.
+    """
+    finish_compaction(path)
+    segment_records = max(1, int(segment_records))
+    index = load_index(path)
+    directory = os.path.dirname(path)
+
+    try:
+        active_bytes = os.path.getsize(path)
+    except OSError:
+        active_bytes = 0
+    replaced = [seg["file"] for seg in index["segments"]]
+    replaced += [
+        os.path.basename(rotated_path(path, gen))
+        for gen in range(1, max(1, backups) + 1)
+        if os.path.exists(rotated_path(path, gen))
+    ]
+
+    records = read_tail(path, keep, backups)
+    seq = int(index["next_seq"])
+    segments: list[dict[str, Any]] = []
+    written = 0
+    for start in range(0, len(records), segment_records):
+        chunk = records[start:start + segment_records]
+        name = segment_path(path, seq)
+        offsets: list[int] = []
+        pos = 0
+        with open(name, "wb") as fh:
+            for i, line in enumerate(chunk):
+                if i % INDEX_STRIDE == 0:
+                    offsets.append(pos)
+                data = (line + "\n").encode("utf-8")
+                fh.write(data)
+                pos += len(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        segments.append({
+            "file": os.path.basename(name),
+            "records": len(chunk),
+            "bytes": pos,
+            "first_ts": _record_ts(chunk[0]),
+            "last_ts": _record_ts(chunk[-1]),
+            "offsets": offsets,
+        })
+        written += pos
+        seq += 1
+
+    new_index = {
+        "version": INDEX_VERSION,
+        "stride": INDEX_STRIDE,
+        "next_seq": seq,
+        "segments": segments,
+        "cleanup": {"files": replaced, "active_bytes": active_bytes},
+    }
+    _write_index(path, new_index)
+    finish_compaction(path)
+
+    return {
+        "records": len(records),
+        "segments": len(segments),
+        "bytes": written,
+        "replaced_files": len(replaced),
+        "active_bytes_compacted": active_bytes,
+    }
+
+
+class JournalWriter:
+    """Thread-safe group-commit writer for a JSONL journal file."""
+
+    def __init__(
+        self,
+        path: str,
+        fsync: str = "interval",
+        flush_interval: float = 1.0,
+        rotate_bytes: int = 0,
+        rotate_seconds: float = 0,
+        backups: int = 3,
+        compact_keep: int = 0,
+        segment_records: int = _DEFAULT_SEGMENT_RECORDS,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unsupported fsync policy: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.rotate_bytes = max(0, int(rotate_bytes))
+        self.rotate_seconds = max(0.0, float(rotate_seconds))
+        self.backups = max(1, int(backups))
+        self.compact_keep = max(0, int(compact_keep))
+        self.segment_records = max(1, int(segment_records))
+
+        # _pending_lock guards the queue only, so producers never wait on disk I/O.
+        # _io_lock serializes commits, rotation and the file handle.
+        self._pending_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: list[str] = []
+
+        self._fh: Any = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._dirty = False
+        self._closed = False
+        self._compact_due = False
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._stats = {
+            "commits": 0,
+            "records": 0,
+            "bytes_written": 0,
+            "fsyncs": 0,
+            "rotations": 0,
+            "compactions": 0,
+            "errors": 0,
+        }
+
+        try:
+            finish_compaction(path)
+        except OSError as exc:
+            logger.warning("Event journal compaction recovery failed (%s): %s", path, exc)
+
+    # --- Producer side ------------------------------------------------------
+
+    def append(self, lines: list[str]) -> None:
+        """Queue serialized records (each ending in ``\\n``) for the next commit.
+
+        Cheap enough to call while holding the caller's own lock; no I/O
+        happens here. Queue order is preserved on disk.
+        """
+        if not lines:
+            return
+        with self._pending_lock:
+            self._pending.extend(lines)
+        self._ensure_flusher()
+
+    def commit(self) -> int:
+        """Write every queued record with a single ``write()`` call.
+
+        Concurrent callers coalesce: whoever gets the I/O lock first writes
+        the records of all producers that queued before it, the others find
+        the queue empty. Returns the number of records written.
+        """
+        with self._io_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+
+            data = "".join(pending).encode("utf-8")
+            try:
+                fh = self._open_locked()
+                fh.write(data)
+                fh.flush()
+                self._size += len(data)
+                self._stats["commits"] += 1
+                self._stats["records"] += len(pending)
+                self._stats["bytes_written"] += len(data)
+                if self.fsync == "always":
+                    self._fsync_locked()
+                else:
+                    self._dirty = True
+                if self.rotate_bytes and self._size >= self.rotate_bytes:
+                    self._rotate_locked()
+            except OSError as exc:
+                # Best-effort persistence: the in-memory ring stays authoritative.
+                self._stats["errors"] += 1
+                logger.warning("Event journal write failed (%s): %s", self.path, exc)
+                self._close_handle_locked()
+            return len(pending)
+
+    # --- Durability / lifecycle --------------------------------------------
+
+    def sync(self) -> None:
+        """Commit queued records and fsync the active file."""
+        self.commit()
+        with self._io_lock:
+            if self._dirty:
+                self._fsync_locked()
+
+    def compact(self, keep: int | None = None) -> dict[str, Any]:
+        """Compact the live journal into indexed segments (online mode).
+
+        Producers keep queuing while this runs; their records land in the
+        fresh active file on the next commit.
+        """
+        keep = self.compact_keep if keep is None else max(0, int(keep))
+        self.commit()
+        with self._io_lock:
+            if self._dirty:
+                self._fsync_locked()
+            self._close_handle_locked()
+            self._compact_due = False
+            try:
+                result = compact_journal(self.path, keep, self.backups, self.segment_records)
+            except OSError as exc:
+                self._stats["errors"] += 1
+                logger.warning("Event journal compaction failed (%s): %s", self.path, exc)
+                return {"error": str(exc)}
+            finally:
+                self._size = 0
+            self._stats["compactions"] += 1
+            return result
+
+    def close(self) -> None:
+        """Stop the flusher, write out queued records and close the handle."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+        self.sync()
+        with self._io_lock:
+            self._close_handle_locked()
+            self._closed = True
+
+    def stats(self) -> dict[str, Any]:
+        """Return writer counters and configuration."""
+        with self._pending_lock:
+            queued = len(self._pending)
+        with self._io_lock:
+            return {
+                **self._stats,
+                "queued": queued,
+                "active_bytes": self._size,
+                "fsync_policy": self.fsync,
+                "rotate_bytes": self.rotate_bytes,
+                "rotate_seconds": self.rotate_seconds,
+                "backups": self.backups,
+                "compact_keep": self.compact_keep,
+            }
+
+    # --- Internals (call with _io_lock held) --------------------------------
+
+    def _open_locked(self) -> Any:
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fh = open(self.path, "ab")
+            self._size = self._fh.tell()
+            self._opened_at = time.time()
+        return self._fh
+
+    def _close_handle_locked(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+
+    def _fsync_locked(self) -> None:
+        if self._fh is None:
+            self._dirty = False
+            return
+        try:
+            os.fsync(self._fh.fileno())
+            self._stats["fsyncs"] += 1
+        except OSError as exc:
+            self._stats["errors"] += 1
+            logger.warning("Event journal fsync failed (%s): %s", self.path, exc)
+        self._dirty = False
+
+    def _rotate_locked(self) -> None:
+        """Shift generations and start a new active file."""
+        if self._dirty and self.fsync != "never":
+            self._fsync_locked()
+        self._close_handle_locked()
+        try:
+            oldest = rotated_path(self.path, self.backups)
+            if os.path.exists(oldest):
+                os.remove(oldest)
+            for gen in range(self.backups - 1, 0, -1):
+                src = rotated_path(self.path, gen)
+                if os.path.exists(src):
+                    os.replace(src, rotated_path(self.path, gen + 1))
+            if os.path.exists(self.path):
+                os.replace(self.path, rotated_path(self.path, 1))
+            self._stats["rotations"] += 1
+            self._compact_due = self.compact_keep > 0
+        except OSError as exc:
+            self._stats["errors"] += 1
+            logger.warning("Event journal rotation failed (%s): %s", self.path, exc)
+        self._size = 0
+        self._dirty = False
+
+    # --- Background flusher ------------------------------------------------
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None or self._closed:
+            return
+        if self.fsync != "interval" and not self.rotate_seconds and not self.compact_keep:
+            return
+        with self._io_lock:
+            if self._thread is not None or self._closed:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._flush_loop,
+                name="event-journal-flusher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.commit()
+                with self._io_lock:
+                    if self._dirty and self.fsync == "interval":
+                        self._fsync_locked()
+                    if (
+                        self.rotate_seconds
+                        and self._fh is not None
+                        and self._size > 0
+                        and time.time() - self._opened_at >= self.rotate_seconds
+                    ):
+                        self._rotate_locked()
+                    compact_due = self._compact_due
+                if compact_due:
+                    self.compact()
+            except Exception:
+                logger.exception("Event journal flusher error")
+
+
+def _main(argv: list[str] | None = None) -> int:
+    """Offline maintenance entry point (run while the add-on is stopped)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m copilot_core.ingest.journal")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("compact", help="rewrite the journal into indexed segments")
+    cmd.add_argument("path", help="journal file, e.g. /data/events.jsonl")
+    cmd.add_argument("--keep", type=int, required=True, help="newest records to retain")
+    cmd.add_argument("--backups", type=int, default=3, help="rotated generations to include")
+    cmd.add_argument("--segment-records", type=int, default=_DEFAULT_SEGMENT_RECORDS)
+    args = parser.parse_args(argv)
+
+    result = compact_journal(args.path, args.keep, args.backups, args.segment_records)
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
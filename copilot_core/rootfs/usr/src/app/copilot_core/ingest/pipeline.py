@@ -0,0 +1,242 @@
+"""Asynchronous post-ingest pipeline with backpressure.
+
+Decouples the HTTP acknowledgement of ``POST /api/v1/events`` from the
+downstream consumers (EventProcessor → Brain Graph, mood wiring, …).
+Accepted batches go into a bounded in-process queue; a small pool of
+consumer threads runs every registered stage on each batch in order.
+
+Overflow policies (when the queue is full):
+    block – wait up to ``block_timeout`` seconds for room, then drop
+    drop  – drop the new batch immediately
+
+Every stage records batch/event counts, errors, processing time and lag
+(enqueue → stage finished), so operators can see which consumer falls
+behind via ``GET /api/v1/events/pipeline``.
+
+Environment variables:
+    COPILOT_INGEST_QUEUE_MAX      – max queued batches (default: 1000)
+    COPILOT_INGEST_WORKERS        – consumer threads (default: 1, keeps order)
+    COPILOT_INGEST_OVERFLOW       – block|drop (default: block)
+    COPILOT_INGEST_BLOCK_TIMEOUT  – seconds to wait under "block" (default: 2.0)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+_DEFAULT_QUEUE_MAX = 1000
+_DEFAULT_WORKERS = 1
+_DEFAULT_OVERFLOW = "block"
+_DEFAULT_BLOCK_TIMEOUT = 2.0
+
+Stage = Callable[[list[dict[str, Any]]], Any]
+
+
+class _StageMetrics:
+    """Counters for one pipeline stage (guarded by the pipeline lock)."""
+
+    __slots__ = ("batches", "events", "errors", "busy_s", "lag_last_ms", "lag_max_ms", "lag_sum_ms")
+
+    def __init__(self) -> None:
+        self.batches = 0
+        self.events = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self.lag_last_ms = 0.0
+        self.lag_max_ms = 0.0
+        self.lag_sum_ms = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "events": self.events,
+            "errors": self.errors,
+            "avg_duration_ms": round(self.busy_s * 1000 / self.batches, 3) if self.batches else 0.0,
+            "lag_last_ms": round(self.lag_last_ms, 3),
+            "lag_max_ms": round(self.lag_max_ms, 3),
+            "lag_avg_ms": round(self.lag_sum_ms / self.batches, 3) if self.batches else 0.0,
+        }
+
+
+class IngestPipeline:
+    """Bounded work queue feeding post-ingest stages on worker threads."""
+
+    def __init__(
+        self,
+        max_queue: int | None = None,
+        workers: int | None = None,
+        overflow: str | None = None,
+        block_timeout: float | None = None,
+    ) -> None:
+        self.max_queue = max(1, max_queue if max_queue is not None else int(
+            os.environ.get("COPILOT_INGEST_QUEUE_MAX", _DEFAULT_QUEUE_MAX)
+        ))
+        self.workers = max(1, workers if workers is not None else int(
+            os.environ.get("COPILOT_INGEST_WORKERS", _DEFAULT_WORKERS)
+        ))
+        overflow = (overflow or os.environ.get("COPILOT_INGEST_OVERFLOW", _DEFAULT_OVERFLOW)).lower()
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unsupported overflow policy: {overflow}")
+        self.overflow = overflow
+        self.block_timeout = max(0.0, block_timeout if block_timeout is not None else float(
+            os.environ.get("COPILOT_INGEST_BLOCK_TIMEOUT", _DEFAULT_BLOCK_TIMEOUT)
+        ))
+
+        # Items are (enqueued_monotonic, events); None is the stop sentinel.
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._stages: list[tuple[str, Stage]] = []
+        self._metrics: dict[str, _StageMetrics] = {}
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+        self._stats = {
+            "enqueued_batches": 0,
+            "enqueued_events": 0,
+            "dropped_batches": 0,
+            "dropped_events": 0,
+            "blocked_puts": 0,
+            "high_watermark": 0,
+        }
+
+    # --- Configuration ------------------------------------------------------
+
+    def add_stage(self, name: str, stage: Stage) -> None:
+        """Register a consumer; stages run in registration order per batch."""
+        with self._lock:
+            self._stages.append((name, stage))
+            self._metrics[name] = _StageMetrics()
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        """Start the consumer threads (idempotent)."""
+        if self.running:
+            return
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"ingest-pipeline-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            "Ingest pipeline started (%d worker(s), queue=%d, overflow=%s)",
+            self.workers, self.max_queue, self.overflow,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Finish queued work, then stop the consumer threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    # --- Producer side ------------------------------------------------------
+
+    def submit(self, events: list[dict[str, Any]]) -> bool:
+        """Queue a batch of accepted events. Returns False if it was dropped."""
+        if not events:
+            return True
+        item = (time.monotonic(), events)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            queued = False
+            if self.overflow == "block" and self.block_timeout > 0:
+                with self._lock:
+                    self._stats["blocked_puts"] += 1
+                try:
+                    self._queue.put(item, timeout=self.block_timeout)
+                    queued = True
+                except queue.Full:
+                    pass
+            if not queued:
+                with self._lock:
+                    self._stats["dropped_batches"] += 1
+                    self._stats["dropped_events"] += len(events)
+                logger.warning("Ingest pipeline full, dropped batch of %d events", len(events))
+                return False
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["enqueued_batches"] += 1
+            self._stats["enqueued_events"] += len(events)
+            if depth > self._stats["high_watermark"]:
+                self._stats["high_watermark"] = depth
+        return True
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued batch has been processed."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    # --- Consumer side ------------------------------------------------------
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._run_stages(*item)
+            finally:
+                self._queue.task_done()
+
+    def _run_stages(self, enqueued: float, events: list[dict[str, Any]]) -> None:
+        with self._lock:
+            stages = list(self._stages)
+        for name, stage in stages:
+            started = time.monotonic()
+            failed = False
+            try:
+                stage(events)
+            except Exception as exc:
+                failed = True
+                logger.error("Ingest pipeline stage %s failed: %s", name, exc, exc_info=True)
+            finished = time.monotonic()
+            lag_ms = (finished - enqueued) * 1000
+            with self._lock:
+                m = self._metrics[name]
+                m.batches += 1
+                m.events += len(events)
+                m.errors += int(failed)
+                m.busy_s += finished - started
+                m.lag_last_ms = lag_ms
+                m.lag_sum_ms += lag_ms
+                if lag_ms > m.lag_max_ms:
+                    m.lag_max_ms = lag_ms
+
+    # --- Introspection ------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, throughput/drop counters and per-stage lag metrics."""
+        with self._queue.mutex:
+            depth = len(self._queue.queue)
+            head = self._queue.queue[0] if depth else None
+        oldest_ms = (time.monotonic() - head[0]) * 1000 if head else 0.0
+        with self._lock:
+            return {
+                **self._stats,
+                "depth": depth,
+                "max_queue": self.max_queue,
+                "oldest_age_ms": round(oldest_ms, 3),
+                "workers": self.workers,
+                "running": self.running,
+                "overflow": self.overflow,
+                "stages": {name: m.as_dict() for name, m in self._metrics.items()},
+            }
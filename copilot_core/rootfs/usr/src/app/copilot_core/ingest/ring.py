@@ -0,0 +1,166 @@
+"""Bounded event ring with secondary indexes.
+
+Backs :class:`~copilot_core.ingest.event_store.EventStore`. Every event gets
+a monotonically increasing sequence number; per-entity, per-domain, per-kind
+and per-zone posting lists hold the sequence numbers of matching events and
+are trimmed in step with ring eviction (the evicted event is always the
+oldest entry of each of its posting lists).
+
+For ``since`` filters the ring keeps the running maximum of ``ts`` per
+sequence number. That series is non-decreasing even when events arrive out
+of timestamp order, so a binary search yields the first sequence number that
+can possibly satisfy ``ts >= since``; everything older is skipped.
+
+Not thread-safe – the owning store serializes access.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Iterator
+
+# Indexed field → posting-list table name
+_INDEXED_FIELDS = ("entity_id", "domain", "kind")
+
+
+def _zones(event: dict[str, Any]) -> list[str]:
+    zones = event.get("zone_ids") or []
+    if isinstance(zones, str):
+        zones = [zones]
+    return [z for z in dict.fromkeys(zones) if isinstance(z, str)]
+
+
+class EventRing:
+    """Sequence-addressed ring buffer with posting-list indexes."""
+
+    def __init__(self, maxlen: int) -> None:
+        self.maxlen = max(0, int(maxlen))
+        # _events[i] / _ts_max[i] hold sequence number _list_seq + i; the first
+        # _head slots are evicted and compacted away lazily (amortized O(1)).
+        self._events: list[dict[str, Any] | None] = []
+        self._ts_max: list[str] = []
+        self._list_seq = 0
+        self._head = 0
+        self._next_seq = 0
+        self._postings: dict[str, dict[str, deque[int]]] = {
+            name: {} for name in _INDEXED_FIELDS + ("zone",)
+        }
+
+    def __len__(self) -> int:
+        return len(self._events) - self._head
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(self._head, len(self._events)):
+            yield self._events[i]  # type: ignore[misc]
+
+    @property
+    def first_seq(self) -> int:
+        return self._list_seq + self._head
+
+    def _keys(self, event: dict[str, Any]) -> Iterator[tuple[str, str]]:
+        for name in _INDEXED_FIELDS:
+            value = event.get(name)
+            if isinstance(value, str) and value:
+                yield name, value
+        for zone in _zones(event):
+            yield "zone", zone
+
+    def append(self, event: dict[str, Any]) -> None:
+        """Append *event*, evicting the oldest entries beyond ``maxlen``."""
+        if self.maxlen <= 0:
+            return
+        seq = self._next_seq
+        self._next_seq += 1
+        ts = event.get("ts")
+        ts = ts if isinstance(ts, str) else ""
+        prev = self._ts_max[-1] if len(self._events) > self._head else ""
+        self._events.append(event)
+        self._ts_max.append(ts if ts > prev else prev)
+        for name, value in self._keys(event):
+            postings = self._postings[name].get(value)
+            if postings is None:
+                postings = self._postings[name][value] = deque()
+            postings.append(seq)
+        while len(self) > self.maxlen:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        seq = self.first_seq
+        event = self._get(seq)
+        for name, value in self._keys(event):
+            table = self._postings[name]
+            postings = table.get(value)
+            if postings and postings[0] == seq:
+                postings.popleft()
+                if not postings:
+                    del table[value]
+        self._events[self._head] = None
+        self._head += 1
+        if self._head >= max(64, self.maxlen):
+            del self._events[:self._head]
+            del self._ts_max[:self._head]
+            self._list_seq += self._head
+            self._head = 0
+
+    def _get(self, seq: int) -> dict[str, Any]:
+        return self._events[seq - self._list_seq]  # type: ignore[return-value]
+
+    def _since_seq(self, since: str) -> int:
+        """First sequence number whose running max ts reaches *since*."""
+        pos = bisect_left(self._ts_max, since, lo=self._head)
+        return self._list_seq + pos
+
+    def query(
+        self,
+        domain: str | None = None,
+        entity_id: str | None = None,
+        kind: str | None = None,
+        zone_id: str | None = None,
+        since: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Return up to *limit* newest matching events, oldest first."""
+        filters = [
+            (name, value)
+            for name, value in (
+                ("entity_id", entity_id), ("domain", domain), ("kind", kind), ("zone", zone_id)
+            )
+            if value
+        ]
+        lower = self._since_seq(since) if since else self.first_seq
+
+        # Drive the scan from the shortest posting list; verify the rest per event.
+        driver: Any = None
+        for name, value in filters:
+            postings = self._postings[name].get(value)
+            if not postings:
+                return []
+            if driver is None or len(postings) < len(driver):
+                driver = postings
+        seqs = reversed(driver) if driver is not None else range(self._next_seq - 1, lower - 1, -1)
+
+        results: list[dict[str, Any]] = []
+        for seq in seqs:
+            if seq < lower:
+                break
+            ev = self._get(seq)
+            if domain and ev.get("domain") != domain:
+                continue
+            if entity_id and ev.get("entity_id") != entity_id:
+                continue
+            if kind and ev.get("kind") != kind:
+                continue
+            if zone_id and zone_id not in (ev.get("zone_ids") or []):
+                continue
+            if since and ev.get("ts", "") < since:
+                continue
+            results.append(ev)
+            if len(results) >= limit:
+                break
+
+        results.reverse()
+        return results
+
+    def index_stats(self) -> dict[str, int]:
+        """Number of distinct keys per posting-list table."""
+        return {name: len(table) for name, table in self._postings.items()}
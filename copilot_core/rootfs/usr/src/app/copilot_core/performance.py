@@ -2,15 +2,21 @@
 Performance Optimization Module - Core Add-on Performance Enhancements.
 
 Implements:
-- Query Caching (Redis/Memory)
+- Query Caching (Redis/Memory), memory-bounded with a shared budget
+  (COPILOT_CACHE_MEMORY_MB, default 64) for the global caches
 - Lazy Loading (ML Models)
 - Connection Pooling (Database/API)
 - Async Optimization (Parallel Execution)
 """
 
+import logging
+import os
+import sys
 import time
 import threading
 import functools
+import weakref
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, Callable, List
 from collections import OrderedDict
 from dataclasses import dataclass, field
@@ -19,6 +25,8 @@ import asyncio
 import hashlib
 import json
 
+_LOGGER = logging.getLogger(__name__)
+
 
 # =============================================================================
 # 1. QUERY CACHING
@@ -31,29 +39,76 @@ class CacheEntry:
     expires_at: float
     hit_count: int = 0
     created_at: float = field(default_factory=time.time)
+    tags: tuple = ()
+    generation: int = 0
+    size: int = 0  # approximate bytes (BoundedQueryCache)
+    stale_until: float = 0.0  # servable while revalidating until then
+    accessed_at: float = field(default_factory=time.time)
 
 
 class QueryCache:
-    """Memory-based query cache with TTL and LRU eviction."""
+    """Memory-based query cache with TTL and LRU eviction.
+
+    Entries may carry dependency *tags*; :meth:`invalidate_tags` drops only
+    the entries depending on a changed tag. :meth:`bump_generation` retires
+    every entry in O(1) – entries from older generations count as misses
+    and are removed when next seen. Hits, fills and invalidations are
+    counted per tag (for the ``tag_stats_limit`` most recently active tags).
+    """
     
     def __init__(
         self,
         max_size: int = 1000,
         default_ttl: float = 300.0,  # 5 minutes default
         enabled: bool = True,
+        tag_stats_limit: int = 256,
     ):
         self.max_size = max_size
         self.default_ttl = default_ttl
         self.enabled = enabled
+        self.tag_stats_limit = tag_stats_limit
         
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self._lock = threading.RLock()
+        self._generation = 0
+        self._tag_index: Dict[str, set] = {}
+        self._tag_stats: OrderedDict[str, Dict[str, int]] = OrderedDict()
         self._stats = {
             "hits": 0,
             "misses": 0,
             "evictions": 0,
             "clears": 0,
+            "generation_bumps": 0,
+            "tag_invalidations": 0,
         }
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _count_tags(self, tags, stat: str, n: int = 1) -> None:
+        """Add *n* to *stat* of each tag (caller holds the lock)."""
+        for tag in tags:
+            stats = self._tag_stats.get(tag)
+            if stats is None:
+                stats = self._tag_stats[tag] = {"hits": 0, "fills": 0, "invalidations": 0}
+                if len(self._tag_stats) > self.tag_stats_limit:
+                    self._tag_stats.popitem(last=False)
+            else:
+                self._tag_stats.move_to_end(tag)
+            stats[stat] += n
+
+    def _drop(self, key: str) -> Optional[CacheEntry]:
+        """Remove *key* and its tag index references (caller holds the lock)."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            for tag in entry.tags:
+                keys = self._tag_index.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tag_index[tag]
+        return entry
     
     def _compute_key(self, *args, **kwargs) -> str:
         """Compute cache key from function arguments."""
@@ -71,51 +126,110 @@ class QueryCache:
                 self._stats["misses"] += 1
                 return None
             
-            if time.time() > entry.expires_at:
-                del self._cache[key]
+            now = time.time()
+            if now > entry.expires_at:
+                # Stale entries stay around for stale-while-revalidate
+                if now > entry.stale_until or entry.generation != self._generation:
+                    self._drop(key)
+                self._stats["misses"] += 1
+                return None
+            if entry.generation != self._generation:
+                self._drop(key)
                 self._stats["misses"] += 1
                 return None
             
-            entry.hit_count += 1
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
-            self._stats["hits"] += 1
-            return entry.value
-    
-    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
-        """Set value in cache with optional TTL."""
+            return self._hit(key, entry, now)
+
+    def _hit(self, key: str, entry: CacheEntry, now: float) -> Any:
+        """Book-keeping for a cache hit (caller holds the lock)."""
+        entry.hit_count += 1
+        entry.accessed_at = now
+        # Move to end (most recently used)
+        self._cache.move_to_end(key)
+        self._stats["hits"] += 1
+        self._count_tags(entry.tags, "hits")
+        return entry.value
+    
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+    ) -> None:
+        """Set value in cache with optional TTL and dependency tags."""
         if not self.enabled:
             return
             
         with self._lock:
             # Remove if exists to update position
-            if key in self._cache:
-                del self._cache[key]
+            self._drop(key)
             
             # Evict if at capacity
             while len(self._cache) >= self.max_size:
-                self._cache.popitem(last=False)
+                self._drop(next(iter(self._cache)))
                 self._stats["evictions"] += 1
             
             ttl = ttl or self.default_ttl
+            entry_tags = tuple(dict.fromkeys(tags or ()))
             self._cache[key] = CacheEntry(
                 value=value,
                 expires_at=time.time() + ttl,
+                tags=entry_tags,
+                generation=self._generation,
             )
+            for tag in entry_tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            self._count_tags(entry_tags, "fills")
     
     def delete(self, key: str) -> bool:
         """Delete key from cache. Returns True if key existed."""
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            return self._drop(key) is not None
     
     def clear(self) -> None:
         """Clear all cache entries."""
         with self._lock:
             self._cache.clear()
+            self._tag_index.clear()
             self._stats["clears"] += 1
+
+    def bump_generation(self) -> int:
+        """Retire every current entry without walking the cache."""
+        with self._lock:
+            self._generation += 1
+            self._stats["generation_bumps"] += 1
+            return self._generation
+
+    def invalidate_tags(self, tags) -> int:
+        """Drop entries depending on any of *tags*. Returns count invalidated."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                keys = self._tag_index.pop(tag, None)
+                if not keys:
+                    continue
+                self._count_tags((tag,), "invalidations", len(keys))
+                for key in list(keys):
+                    if self._drop(key) is not None:
+                        removed += 1
+            self._stats["tag_invalidations"] += removed
+        return removed
+
+    def get_tag_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tag hits, fills, invalidations, hit rate and live entries."""
+        with self._lock:
+            return {
+                tag: {
+                    **stats,
+                    "entries": len(self._tag_index.get(tag, ())),
+                    "hit_rate": (
+                        stats["hits"] / (stats["hits"] + stats["fills"])
+                        if stats["hits"] + stats["fills"] > 0 else 0.0
+                    ),
+                }
+                for tag, stats in self._tag_stats.items()
+            }
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -124,6 +238,8 @@ class QueryCache:
                 **self._stats,
                 "size": len(self._cache),
                 "max_size": self.max_size,
+                "generation": self._generation,
+                "tags": len(self._tag_index),
                 "hit_rate": (
                     self._stats["hits"] / (self._stats["hits"] + self._stats["misses"])
                     if (self._stats["hits"] + self._stats["misses"]) > 0 else 0.0
@@ -136,10 +252,11 @@ class QueryCache:
             now = time.time()
             expired_keys = [
                 k for k, entry in self._cache.items()
-                if now > entry.expires_at
+                if now > max(entry.expires_at, entry.stale_until)
+                or entry.generation != self._generation
             ]
             for key in expired_keys:
-                del self._cache[key]
+                self._drop(key)
             self._stats["evictions"] += len(expired_keys)
             return len(expired_keys)
 
@@ -148,14 +265,398 @@ class QueryCache:
         with self._lock:
             keys_to_delete = [k for k in self._cache if pattern in k]
             for key in keys_to_delete:
-                del self._cache[key]
+                self._drop(key)
             return len(keys_to_delete)
 
 
-# Global cache instances
-brain_graph_cache = QueryCache(max_size=100, default_ttl=60.0)
-ml_cache = QueryCache(max_size=200, default_ttl=120.0)
-api_response_cache = QueryCache(max_size=1000, default_ttl=30.0)
+# estimate_size: items sampled per container, recursion limit
+_SIZE_SAMPLE = 64
+_SIZE_MAX_DEPTH = 8
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory footprint of *value* in bytes.
+
+    Containers are walked recursively (large ones by sampling their first
+    items); objects exposing ``nbytes`` (numpy arrays) report that.
+    """
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes + 112
+    size = sys.getsizeof(value, 64)
+    if _depth >= _SIZE_MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        items = value.items()
+        per_item = lambda item: estimate_size(item[0], _depth + 1) + estimate_size(item[1], _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+        per_item = lambda item: estimate_size(item, _depth + 1)
+    else:
+        return size
+    n = len(items)
+    if n == 0:
+        return size
+    sampled = 0
+    for i, item in enumerate(items):
+        if i == _SIZE_SAMPLE:
+            break
+        sampled += per_item(item)
+    return size + sampled * n // min(n, _SIZE_SAMPLE)
+
+
+class MemoryBudget:
+    """Byte budget shared by several :class:`BoundedQueryCache` instances.
+
+    When the caches together exceed ``max_bytes`` the globally least
+    recently used entries are evicted, whichever cache holds them.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._caches: List[weakref.ref] = []
+        self._lock = threading.Lock()
+        self._stats = {"evictions": 0, "enforcements": 0}
+
+    def register(self, cache: "BoundedQueryCache") -> None:
+        with self._lock:
+            self._caches = [ref for ref in self._caches if ref() is not None]
+            self._caches.append(weakref.ref(cache))
+
+    def caches(self) -> List["BoundedQueryCache"]:
+        return [cache for cache in (ref() for ref in self._caches) if cache is not None]
+
+    @property
+    def used_bytes(self) -> int:
+        # Each ``cache.bytes`` read takes that cache's lock, one at a time
+        return sum(cache.bytes for cache in self.caches())
+
+    def enforce(self) -> int:
+        """Evict until within budget. Returns count evicted.
+
+        Never called with a cache lock held (it takes the cache locks).
+        """
+        if self.used_bytes <= self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            self._stats["enforcements"] += 1
+            caches = self.caches()
+            while sum(cache.bytes for cache in caches) > self.max_bytes:
+                candidates = [(cache.lru_accessed_at(), i) for i, cache in enumerate(caches)]
+                candidates = [c for c in candidates if c[0] is not None]
+                if not candidates:
+                    break
+                if not caches[min(candidates)[1]].evict_lru():
+                    break
+                evicted += 1
+            self._stats["evictions"] += evicted
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        caches = self.caches()
+        return {
+            **self._stats,
+            "max_bytes": self.max_bytes,
+            "used_bytes": sum(cache.bytes for cache in caches),
+            "caches": {cache.name or str(i): cache.bytes for i, cache in enumerate(caches)},
+        }
+
+
+class _Flight:
+    """A computation other callers for the same key wait on."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache_refresh_")
+        return _refresh_executor
+
+
+class BoundedQueryCache(QueryCache):
+    """QueryCache bounded by approximate memory as well as entry count.
+
+    Each entry records an estimated size (:func:`estimate_size`); the cache
+    evicts LRU entries beyond its own ``max_bytes`` and, when registered
+    with a :class:`MemoryBudget`, beyond the budget shared with other
+    caches.
+
+    :meth:`get_or_compute` adds two read-through behaviours:
+
+    - request coalescing: concurrent misses for one key run the loader
+      once, the other callers wait for its result;
+    - stale-while-revalidate: for ``stale_ttl`` seconds after expiry the
+      old value is still returned while a background thread reloads it.
+      Invalidated entries (tags, generation) are never served stale.
+
+    A load only fills the cache if nothing it may depend on was invalidated
+    while it ran: the generation, a :meth:`clear` and each of its tags are
+    compared against an invalidation sequence captured before the loader
+    was called.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: float = 300.0,
+        enabled: bool = True,
+        tag_stats_limit: int = 256,
+        max_bytes: Optional[int] = None,
+        budget: Optional[MemoryBudget] = None,
+        stale_ttl: float = 0.0,
+        name: str = "",
+    ):
+        super().__init__(max_size, default_ttl, enabled, tag_stats_limit)
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._bytes = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._refreshing: set = set()
+        # Invalidation sequence; per-tag/clear marks kept while loads run
+        self._invalidation_seq = 0
+        self._cleared_at = 0
+        self._tag_invalidated_at: Dict[str, int] = {}
+        self._loads = 0
+        self._stats.update({
+            "byte_evictions": 0,
+            "coalesced": 0,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "discarded_loads": 0,
+        })
+        if budget is not None:
+            budget.register(self)
+
+    @property
+    def bytes(self) -> int:
+        """Bytes held, read under the cache lock (puts/evictions change it)."""
+        with self._lock:
+            return self._bytes
+
+    def _drop(self, key: str) -> Optional[CacheEntry]:
+        entry = super()._drop(key)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._bytes = 0
+            self._invalidation_seq += 1
+            self._cleared_at = self._invalidation_seq
+
+    def invalidate_tags(self, tags) -> int:
+        with self._lock:
+            tags = list(tags)
+            self._invalidation_seq += 1
+            if self._loads:
+                # Even tags without entries: a running load may fill them
+                for tag in tags:
+                    self._tag_invalidated_at[tag] = self._invalidation_seq
+            return super().invalidate_tags(tags)
+
+    def _begin_load(self) -> tuple:
+        """Register a running load; returns its start token (caller holds the lock)."""
+        self._loads += 1
+        return (self._generation, self._invalidation_seq)
+
+    def _end_load(self) -> None:
+        """Caller holds the lock."""
+        self._loads -= 1
+        if not self._loads:
+            self._tag_invalidated_at.clear()
+
+    def _load_is_current(self, token: tuple, tags) -> bool:
+        """False if the generation, a clear or one of *tags* moved since *token*."""
+        generation, seq = token
+        if self._generation != generation or self._cleared_at > seq:
+            return False
+        return all(self._tag_invalidated_at.get(tag, 0) <= seq for tag in tags or ())
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        """Set value with optional TTL, dependency tags and stale window."""
+        if not self.enabled:
+            return
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            self._store(key, value, ttl, tags, stale_ttl, size)
+        if self.budget is not None:
+            self.budget.enforce()
+
+    def _store(self, key: str, value: Any, ttl, tags, stale_ttl, size: int) -> None:
+        """Insert without enforcing the shared budget (caller holds the lock)."""
+        super().set(key, value, ttl, tags)
+        entry = self._cache[key]
+        entry.size = size
+        entry.stale_until = entry.expires_at + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        self._bytes += size
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._cache) > 1:
+            self.evict_lru()
+
+    def _fill(self, key: str, value: Any, ttl, tags, stale_ttl, token: tuple, refresh: bool = False) -> bool:
+        """Cache a loaded value unless it was invalidated while loading."""
+        value_tags = tags(value) if callable(tags) else tags
+        size = estimate_size(value)
+        with self._lock:
+            current = self._load_is_current(token, value_tags)
+            if refresh:
+                # A refresh only replaces the stale entry it was started for
+                entry = self._cache.get(key)
+                current = current and entry is not None and entry.generation == token[0]
+            if not current:
+                self._stats["discarded_loads"] += 1
+                return False
+            self._store(key, value, ttl, value_tags, stale_ttl, size)
+            if refresh:
+                self._stats["refreshes"] += 1
+        if self.budget is not None:
+            self.budget.enforce()
+        return True
+
+    def lru_accessed_at(self) -> Optional[float]:
+        """Last access time of the least recently used entry (None if empty)."""
+        with self._lock:
+            if not self._cache:
+                return None
+            return next(iter(self._cache.values())).accessed_at
+
+    def evict_lru(self) -> bool:
+        """Evict the least recently used entry. Returns False if empty."""
+        with self._lock:
+            if not self._cache:
+                return False
+            self._drop(next(iter(self._cache)))
+            self._stats["evictions"] += 1
+            self._stats["byte_evictions"] += 1
+            return True
+
+    def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Any = None,
+        stale_ttl: Optional[float] = None,
+    ) -> Any:
+        """Cached value of *key*, computing it with *loader* on a miss.
+
+        *tags* may be a list or a callable mapping the loaded value to its
+        tags. Loader exceptions propagate to every coalesced caller and
+        nothing is cached.
+        """
+        if not self.enabled:
+            return loader()
+        with self._lock:
+            entry = self._cache.get(key)
+            now = time.time()
+            if entry is not None and entry.generation == self._generation:
+                if now <= entry.expires_at:
+                    return self._hit(key, entry, now)
+                if now <= entry.stale_until:
+                    self._stats["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        _get_refresh_executor().submit(
+                            self._refresh, key, loader, ttl, tags, stale_ttl, self._begin_load()
+                        )
+                    return self._hit(key, entry, now)
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self._stats["misses"] += 1
+                leader = True
+                token = self._begin_load()
+        if not leader:
+            return flight.wait()
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        else:
+            flight.value = value
+            self._fill(key, value, ttl, tags, stale_ttl, token)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._end_load()
+            flight.event.set()
+
+    def _refresh(self, key: str, loader: Callable[[], Any], ttl, tags, stale_ttl, token: tuple) -> None:
+        """Background reload of a stale entry (skipped if it was invalidated)."""
+        try:
+            self._fill(key, loader(), ttl, tags, stale_ttl, token, refresh=True)
+        except Exception:
+            _LOGGER.exception("Background refresh of cache key %s failed", key)
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+                self._end_load()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **super().get_stats(),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "stale_ttl": self.stale_ttl,
+                "inflight": len(self._inflight),
+            }
+
+
+# Global cache instances, sharing one memory budget
+cache_memory_budget = MemoryBudget(
+    int(float(os.environ.get("COPILOT_CACHE_MEMORY_MB", 64)) * 1024 * 1024)
+)
+brain_graph_cache = BoundedQueryCache(
+    max_size=100, default_ttl=60.0, stale_ttl=30.0, budget=cache_memory_budget, name="brain_graph",
+)
+ml_cache = BoundedQueryCache(
+    max_size=200, default_ttl=120.0, budget=cache_memory_budget, name="ml_models",
+)
+api_response_cache = BoundedQueryCache(
+    max_size=1000, default_ttl=30.0, budget=cache_memory_budget, name="api_response",
+)
 
 
 def get_performance_stats() -> Dict[str, Any]:
@@ -166,7 +667,12 @@ def get_performance_stats() -> Dict[str, Any]:
             "ml_models": ml_cache.get_stats(),
             "api_response": api_response_cache.get_stats(),
         },
+        "cache_tags": {
+            "brain_graph": brain_graph_cache.get_tag_stats(),
+        },
+        "cache_memory": cache_memory_budget.get_stats(),
         "connection_pool": sql_pool.get_stats(),
+        "connection_pools": get_connection_pool_stats(),
         "async_executor": async_executor.get_stats(),
     }
 
@@ -442,6 +948,22 @@ class ConnectionPool:
             
             self._stats["destroyed"] += removed
             return removed
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Acquire a connection for the duration of a ``with`` block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections; the pool stays usable afterwards."""
+        with self._lock:
+            while self._pool:
+                self._close_connection(self._pool.pop())
+                self._stats["destroyed"] += 1
     
     def get_stats(self) -> Dict[str, Any]:
         """Get pool statistics."""
@@ -455,16 +977,38 @@ class ConnectionPool:
 
 
 class SQLiteConnectionPool(ConnectionPool):
-    """SQLite-specific connection pool."""
+    """SQLite-specific connection pool.
+
+    Connections may be handed between threads (``check_same_thread=False``);
+    the pool guarantees a single user at a time. ``pragmas`` are applied
+    once per connection, e.g. ``["synchronous=NORMAL", "busy_timeout=30000"]``.
+    Each long-lived connection keeps its own prepared-statement cache.
+    """
     
-    def __init__(self, db_path: str = "/data/brain_graph.db", **kwargs):
+    def __init__(
+        self,
+        db_path: str = "/data/brain_graph.db",
+        pragmas: Optional[List[str]] = None,
+        cached_statements: int = 128,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.db_path = db_path
+        self.pragmas = list(pragmas or [])
+        self.cached_statements = cached_statements
         import sqlite3
         self.sqlite3 = sqlite3
     
     def _create_connection(self) -> Any:
-        return self.sqlite3.connect(self.db_path, timeout=self.connection_timeout)
+        conn = self.sqlite3.connect(
+            self.db_path,
+            timeout=self.connection_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
     
     def _validate_connection(self, conn: Any) -> bool:
         try:
@@ -489,6 +1033,26 @@ sql_pool = SQLiteConnectionPool(
     max_idle_time=300.0,
 )
 
+# Named pools owned by other components (e.g. the brain graph store), shown
+# by the /api/v1/performance/pool endpoints. Weak references, so a pool goes
+# away together with its owner.
+_connection_pools: "weakref.WeakValueDictionary[str, ConnectionPool]" = weakref.WeakValueDictionary()
+
+
+def register_connection_pool(name: str, pool: ConnectionPool) -> None:
+    """Expose *pool* under *name* in the performance pool stats."""
+    _connection_pools[name] = pool
+
+
+def get_connection_pools() -> Dict[str, ConnectionPool]:
+    """Return the currently registered named pools."""
+    return dict(_connection_pools.items())
+
+
+def get_connection_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every registered named pool."""
+    return {name: pool.get_stats() for name, pool in get_connection_pools().items()}
+
 
 # =============================================================================
 # 4. ASYNC OPTIMIZATION (Parallel Execution)
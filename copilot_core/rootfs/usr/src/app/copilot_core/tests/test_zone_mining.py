@@ -286,5 +286,170 @@ class TestZoneBasedMinerIntegration:
         assert stats["events"] == 40  # 20 light + 20 switch
 
 
+class _StuckZoneConfig(ZoneMiningConfig):
+    """Zone config whose first read in a pool worker hangs with SIGALRM
+    blocked, like a long NumPy call that never returns to the interpreter."""
+    
+    @property
+    def min_events(self) -> int:
+        import multiprocessing
+        import signal
+        import time
+        
+        if multiprocessing.parent_process() is not None:
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(60)
+        return 10
+    
+    @min_events.setter
+    def min_events(self, value: int) -> None:
+        pass
+
+
+class TestParallelZoneMining:
+    """mine_all_zones with a process pool over shared-memory columns."""
+    
+    @staticmethod
+    def _house(zones: int, entities_per_zone: int, events_per_entity: int):
+        import random
+        
+        rng = random.Random(3)
+        base_ts = int(datetime(2026, 2, 1).timestamp() * 1000)
+        zone_map, events = {}, []
+        for z in range(zones):
+            entities = [f"light.z{z}_{e}" for e in range(entities_per_zone)]
+            zone_map[f"zone:{z}"] = entities
+            for entity in entities:
+                for i in range(events_per_entity):
+                    ts = base_ts + rng.randrange(7 * 24 * 3600 * 1000)
+                    events.append(create_test_event(entity, "on" if i % 2 else "off", ts))
+                    if entity.endswith("_0"):
+                        # Planted habit: _1 follows _0 within a few seconds
+                        events.append(create_test_event(entity[:-1] + "1", "on", ts + 4000))
+        return zone_map, events
+    
+    def test_table_shared_buffer_roundtrip(self):
+        from copilot_core.habitus_miner.table import EventTable
+        
+        _, events = self._house(2, 3, 5)
+        table = EventTable.from_events(events)
+        buf = bytearray(table.buffer_size())
+        table.write_columns(buf)
+        shared = EventTable.from_buffer(buf, len(table), table.dictionaries())
+        
+        expected = sorted(events, key=lambda e: e.ts)
+        assert [(e.ts, e.key, e.entity_id, e.domain, e.transition) for e in shared.to_events()] == [
+            (e.ts, e.key, e.entity_id, e.domain, e.transition) for e in expected
+        ]
+        zone = shared.select(shared.entity_mask(["light.z1_0"]))
+        assert {e.entity_id for e in zone.to_events()} == {"light.z1_0"}
+    
+    def test_parallel_matches_sequential(self):
+        zone_map, events = self._house(4, 6, 40)
+        config = MiningConfig(min_support_A=10, min_support_B=10, min_hits=5)
+        sequential = ZoneBasedMiner(MockTagZoneIntegration(zone_map), config, workers=1)
+        parallel = ZoneBasedMiner(
+            MockTagZoneIntegration(zone_map), config, workers=2, parallel_min_events=0
+        )
+        
+        expected = sequential.mine_all_zones(events)
+        results = parallel.mine_all_zones(events)
+        
+        assert list(results) == list(expected)
+        for zone_id, result in results.items():
+            assert result.stats == expected[zone_id].stats
+            assert [(r.A, r.B, r.dt_sec, r.nAB) for r in result.rules] == [
+                (r.A, r.B, r.dt_sec, r.nAB) for r in expected[zone_id].rules
+            ]
+        assert any(r.rules for r in results.values())
+    
+    def test_zone_timeout_reports_partial_results(self):
+        zone_map, events = self._house(1, 40, 1000)
+        zone_map["zone:empty"] = ["light.nowhere"]
+        miner = ZoneBasedMiner(
+            MockTagZoneIntegration(zone_map), workers=2, zone_timeout=0.01,
+            parallel_min_events=0,
+        )
+        
+        results = miner.mine_all_zones(events)
+        
+        assert results["zone:0"].stats["reason"] == "timeout"
+        assert results["zone:0"].stats["events"] > 40_000
+        assert results["zone:empty"].stats["reason"] == "insufficient_events"
+        assert miner.export_results(results)["summary"]["failed_zones"] == ["zone:0"]
+
+    @pytest.mark.skipif(not hasattr(__import__("signal"), "pthread_sigmask"), reason="POSIX only")
+    def test_parent_deadline_catches_zone_stuck_in_native_code(self):
+        import time
+        
+        zone_map, events = self._house(2, 4, 20)
+        miner = ZoneBasedMiner(
+            MockTagZoneIntegration(zone_map), workers=2, zone_timeout=0.5,
+            parallel_min_events=0,
+        )
+        miner.set_zone_config("zone:1", _StuckZoneConfig("zone:1"))
+        
+        started = time.monotonic()
+        results = miner.mine_all_zones(events)
+        
+        assert time.monotonic() - started < 30
+        assert results["zone:1"].stats["reason"] == "timeout"
+        assert results["zone:0"].stats.get("reason") != "timeout"
+    
+    def test_spawn_workers_skip_guarded_startup(self, tmp_path):
+        """Workers re-import the main script but do not run its startup."""
+        import subprocess
+        import textwrap
+
+        marker = tmp_path / "marker.log"
+        script = tmp_path / "service_main.py"
+        script.write_text(textwrap.dedent(f"""
+            import os
+            import sys
+            sys.path[:0] = {[str(Path(__file__).parent), str(Path(__file__).resolve().parents[2])]!r}
+
+            from test_zone_mining import MockTagZoneIntegration, TestParallelZoneMining
+            from copilot_core.habitus_miner.zone_mining import ZoneBasedMiner
+
+            def _log(what):
+                with open({str(marker)!r}, "a") as fh:
+                    fh.write(f"{{what}} {{os.getpid()}}\\n")
+
+            _log("import")  # module-level side effect, repeated in every worker
+
+            def _startup():
+                _log("startup")
+
+            if __name__ == "__main__":
+                _startup()
+                zone_map, events = TestParallelZoneMining._house(3, 3, 10)
+                miner = ZoneBasedMiner(
+                    MockTagZoneIntegration(zone_map), workers=2, parallel_min_events=0
+                )
+                assert len(miner.mine_all_zones(events)) == 3
+        """))
+
+        subprocess.run([sys.executable, str(script)], check=True, timeout=120)
+
+        lines = marker.read_text().split()[::2]
+        assert lines.count("startup") == 1
+        assert lines.count("import") > 1  # the workers did import the script
+
+    def test_main_startup_does_not_run_in_spawned_workers(self, monkeypatch):
+        """main.py imported as a spawn worker's ``__mp_main__`` boots nothing."""
+        import runpy
+        import copilot_core.core_setup as core_setup
+
+        calls = []
+        monkeypatch.setattr(core_setup, "init_services", lambda **kw: calls.append("init"))
+        monkeypatch.setattr(core_setup, "register_blueprints", lambda *a: calls.append("register"))
+
+        main_path = Path(__file__).resolve().parents[2] / "main.py"
+        namespace = runpy.run_path(str(main_path), run_name="__mp_main__")
+
+        assert calls == []
+        assert "PREFLIGHT" not in namespace["app"].config
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""On-disk IVF (inverted file) index for large vector collections.
+
+Unit vectors are partitioned into ``nlist`` cells with spherical k-means
+and stored grouped by cell, so a query scores the ``nprobe`` nearest
+centroids and then only the rows of those cells – a few percent of the
+collection instead of all of it.
+
+An index is a set of ``.npy`` files (rows, centroids, cell offsets) plus a
+JSON id list in a directory next to the SQLite database. Loading uses
+``np.load(mmap_mode="r")``, so startup cost does not grow with the
+collection and pages are faulted in by the searches that touch them. A
+``manifest.json`` names the live files and the store sequence number the
+snapshot was built at; it is replaced atomically after the files exist.
+
+Indexes are immutable snapshots. The owning
+:class:`~copilot_core.vector_store.store.VectorStore` layers live changes
+on top: updated or deleted ids are tombstoned here and their new versions
+are searched exactly in the in-memory
+:class:`~copilot_core.vector_store.index.SimilarityIndex`.
+
+Not thread-safe – the store serializes access.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_MAX_LISTS = 4096
+_TRAIN_PER_LIST = 64
+_ASSIGN_CHUNK = 8192
+
+
+def _assign(units: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every row (chunked)."""
+    out = np.empty(units.shape[0], dtype=np.int32)
+    for start in range(0, units.shape[0], _ASSIGN_CHUNK):
+        block = units[start:start + _ASSIGN_CHUNK] @ centroids.T
+        out[start:start + block.shape[0]] = np.argmax(block, axis=1)
+    return out
+
+
+def _train_centroids(
+    units: np.ndarray, nlist: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Spherical k-means on a sample of *units*; returns unit centroids."""
+    n = units.shape[0]
+    sample_size = min(n, nlist * _TRAIN_PER_LIST)
+    sample = units if sample_size == n else units[rng.choice(n, sample_size, replace=False)]
+    centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1)
+        live = norms > 0
+        # Empty cells keep their previous centroid
+        centroids[live] = sums[live] / norms[live, None]
+    return centroids
+
+
+class IVFIndex:
+    """Immutable IVF snapshot of one entry type and dimension."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+    ) -> None:
+        self.ids = list(ids)
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.dim = int(vectors.shape[1])
+        self._pos = {entry_id: i for i, entry_id in enumerate(self.ids)}
+        self._dead = np.zeros(len(self.ids), dtype=bool)
+        self.tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self.ids) - self.tombstones
+
+    def __contains__(self, entry_id: str) -> bool:
+        pos = self._pos.get(entry_id)
+        return pos is not None and not self._dead[pos]
+
+    @property
+    def size(self) -> int:
+        """Rows in the snapshot, including tombstoned ones."""
+        return len(self.ids)
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def covers(self, entry_id: str) -> bool:
+        """True if *entry_id* is part of the snapshot (live or tombstoned)."""
+        return entry_id in self._pos
+
+    def tombstone(self, entry_id: str) -> bool:
+        """Hide *entry_id* from searches; returns False if it was not live."""
+        pos = self._pos.get(entry_id)
+        if pos is None or self._dead[pos]:
+            return False
+        self._dead[pos] = True
+        self.tombstones += 1
+        return True
+
+    # --- Build / persistence ------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        units: np.ndarray,
+        nlist: int | None = None,
+        iterations: int = 8,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Cluster unit-length *units* (one row per id) into an index."""
+        n = units.shape[0]
+        if n == 0:
+            raise ValueError("cannot build an IVF index without vectors")
+        if nlist is None:
+            nlist = int(round(np.sqrt(n)))
+        nlist = max(1, min(nlist, n, _MAX_LISTS))
+        rng = np.random.default_rng(seed)
+        centroids = _train_centroids(units, nlist, iterations, rng)
+        assign = _assign(units, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            [ids[i] for i in order],
+            np.ascontiguousarray(units[order], dtype=np.float32),
+            centroids.astype(np.float32),
+            offsets,
+        )
+
+    def save(self, directory: Path, stem: str) -> None:
+        """Write the snapshot as ``<stem>.*`` files in *directory*."""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / f"{stem}.vectors.npy", np.asarray(self.vectors))
+        np.save(directory / f"{stem}.centroids.npy", self.centroids)
+        np.save(directory / f"{stem}.offsets.npy", self.offsets)
+        with open(directory / f"{stem}.ids.json", "w", encoding="utf-8") as fh:
+            json.dump(self.ids, fh)
+
+    @classmethod
+    def load(cls, directory: Path, stem: str, mmap: bool = True) -> "IVFIndex":
+        """Open a saved snapshot; rows are memory-mapped when *mmap* is set."""
+        with open(directory / f"{stem}.ids.json", encoding="utf-8") as fh:
+            ids = json.load(fh)
+        vectors = np.load(directory / f"{stem}.vectors.npy", mmap_mode="r" if mmap else None)
+        centroids = np.load(directory / f"{stem}.centroids.npy")
+        offsets = np.load(directory / f"{stem}.offsets.npy")
+        if (
+            vectors.ndim != 2
+            or vectors.shape[0] != len(ids)
+            or centroids.shape[1:] != vectors.shape[1:]
+            or offsets.shape != (centroids.shape[0] + 1,)
+            or int(offsets[-1]) != len(ids)
+        ):
+            raise ValueError(f"inconsistent IVF index files for {stem}")
+        return cls(ids, vectors, centroids, offsets)
+
+    # --- Query --------------------------------------------------------------
+
+    def search(
+        self,
+        unit: np.ndarray,
+        limit: int,
+        threshold: float,
+        nprobe: int,
+        exclude: Iterable[str] = (),
+    ) -> list[tuple[str, float]]:
+        """Approximate top *limit* (id, similarity) pairs from *nprobe* cells."""
+        if limit <= 0 or len(self) == 0:
+            return []
+        nprobe = max(1, min(nprobe, self.nlist))
+        cell_sims = self.centroids @ unit
+        if nprobe < self.nlist:
+            cells = np.argpartition(-cell_sims, nprobe - 1)[:nprobe]
+        else:
+            cells = np.arange(self.nlist)
+
+        rows_parts: list[np.ndarray] = []
+        sims_parts: list[np.ndarray] = []
+        for cell in cells:
+            start, end = int(self.offsets[cell]), int(self.offsets[cell + 1])
+            if end > start:
+                rows_parts.append(np.arange(start, end))
+                sims_parts.append(np.asarray(self.vectors[start:end] @ unit, dtype=np.float32))
+        if not rows_parts:
+            return []
+        rows = np.concatenate(rows_parts)
+        sims = np.concatenate(sims_parts)
+
+        if self.tombstones:
+            sims[self._dead[rows]] = -np.inf
+        excluded = [self._pos[e] for e in exclude if e in self._pos]
+        if excluded:
+            sims[np.isin(rows, excluded)] = -np.inf
+
+        candidates = np.flatnonzero(sims >= threshold)
+        if candidates.size > limit:
+            top = np.argpartition(-sims[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-sims[candidates], kind="stable")]
+        return [
+            (self.ids[rows[i]], float(min(1.0, max(-1.0, sims[i]))))
+            for i in order
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self),
+            "tombstones": self.tombstones,
+            "dim": self.dim,
+            "nlist": self.nlist,
+            "mmap": isinstance(self.vectors, np.memmap),
+            "bytes": int(self.vectors.nbytes + self.centroids.nbytes + self.offsets.nbytes),
+        }
+
+
+# --- Manifest helpers -------------------------------------------------------
+
+
+def read_manifest(directory: Path) -> dict[str, Any]:
+    """Return the manifest in *directory*, or ``{}`` if missing/unreadable."""
+    try:
+        with open(directory / MANIFEST_NAME, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        _LOGGER.warning("Ignoring unreadable ANN manifest in %s", directory)
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def write_manifest(directory: Path, built_seq: int, indexes: dict[str, dict[str, Any]]) -> None:
+    """Atomically replace the manifest in *directory*."""
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f"{MANIFEST_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": MANIFEST_VERSION, "built_seq": built_seq, "indexes": indexes}, fh)
+    os.replace(tmp, directory / MANIFEST_NAME)
+
+
+def remove_unreferenced(directory: Path, keep_stems: Iterable[str]) -> None:
+    """Delete index files whose stem is not in *keep_stems*."""
+    keep = set(keep_stems)
+    if not directory.is_dir():
+        return
+    for path in directory.iterdir():
+        if path.name == MANIFEST_NAME:
+            continue
+        stem = path.name.split(".", 1)[0]
+        if stem not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                _LOGGER.debug("Could not remove stale ANN file %s", path)
@@ -8,6 +8,26 @@ The embedding model captures:
 - Entity domain, area, capabilities
 - User preference patterns
 - Temporal patterns
+
+Hashed components are derived from one SHAKE-256 digest stream per string
+(keyed with a fixed prefix): the stream is read as ``dim`` uint32 values,
+so a component costs one hash call regardless of its width. Components that
+repeat across entities (area, capability set, tag set, words) are memoized
+in a bounded LRU, and :meth:`EmbeddingEngine.embed_entities_batch` builds
+whole NumPy matrices at once.
+
+Ollama embeddings go through :class:`~.ollama.OllamaEmbedder`, which
+coalesces concurrent calls into batched ``/api/embed`` requests over one
+pooled session and keeps results in a persistent on-disk cache.
+
+Environment variables (read by :func:`get_embedding_engine`):
+    COPILOT_USE_OLLAMA                – true to embed via Ollama
+    COPILOT_OLLAMA_MODEL / _URL       – embedding model and server
+    COPILOT_EMBEDDING_CACHE_PATH      – SQLite cache of Ollama embeddings
+                                        (default: /data/embedding_cache.db,
+                                        empty disables)
+    COPILOT_OLLAMA_EMBED_BATCH        – max texts per request (default: 32)
+    COPILOT_OLLAMA_EMBED_WAIT_MS      – coalescing window (default: 5)
 """
 
 from __future__ import annotations
@@ -16,15 +36,36 @@ import hashlib
 import logging
 import math
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .ollama import EmbeddingDiskCache, OllamaEmbedder
 
 _LOGGER = logging.getLogger(__name__)
 
 # Embedding dimension (must match across all usages)
 EMBEDDING_DIM = 128
 
+DEFAULT_EMBEDDING_CACHE_PATH = "/data/embedding_cache.db"
+
+# Names of the local (hashed) embedding models. Bump the version whenever
+# their vectors change and add the old name to RETIRED_EMBEDDING_MODELS:
+# the vector store drops stored rows recorded with a retired model on load.
+ENTITY_MODEL = "entity_v2"
+PREFERENCE_MODEL = "preference_v2"
+PATTERN_MODEL = "pattern_v2"
+TEXT_HASH_MODEL = "text_hash_v2"
+TEXT_BAG_MODEL = "text_bag_v2"  # embed_text_sync (conversation RAG)
+RETIRED_EMBEDDING_MODELS = frozenset({
+    "entity_v1", "preference_v1", "pattern_v1", "text_hash_v1",
+})
+
 # Feature dimensions for structured embeddings
 DOMAIN_FEATURES = {
     "light": [1.0, 0.0, 0.0, 0.0, 0.0],
@@ -54,15 +95,50 @@ def _normalize(vec: list[float]) -> list[float]:
     return [x / magnitude for x in vec]
 
 
+# Key prefix of the digest stream behind every hashed component
+_HASH_KEY = b"copilot-embedding-v2:"
+
+# Column layout of local entity embeddings
+_ENTITY_DOMAIN = slice(0, 5)
+_ENTITY_ID = slice(5, 37)
+_ENTITY_AREA = slice(37, 53)
+_ENTITY_CAPS = slice(53, 85)
+_ENTITY_TAGS = slice(85, 117)
+_ENTITY_STATE = 117
+_ENTITY_WIDTH = 121
+
+_DOMAIN_ARRAYS = {name: np.asarray(vec) for name, vec in DOMAIN_FEATURES.items()}
+
+
+def _hash_array(data: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Deterministic unit vector for *data* from a single digest stream."""
+    if dim <= 0:
+        return np.zeros(0)
+    raw = np.frombuffer(
+        hashlib.shake_256(_HASH_KEY + data.encode()).digest(4 * dim), dtype="<u4"
+    )
+    vec = raw / 2.0**32 * 2 - 1
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _hash_rows(keys: Sequence[str], dim: int) -> np.ndarray:
+    """Row-wise :func:`_hash_array` for many keys in one NumPy pass."""
+    stream = b"".join(
+        hashlib.shake_256(_HASH_KEY + key.encode()).digest(4 * dim) for key in keys
+    )
+    raw = np.frombuffer(stream, dtype="<u4").reshape(len(keys), dim)
+    return _normalize_rows(raw / 2.0**32 * 2 - 1)
+
+
 def _hash_to_vector(data: str, dim: int = EMBEDDING_DIM) -> list[float]:
     """Convert a string to a deterministic pseudo-random vector using hash."""
-    result = []
-    for i in range(dim):
-        h = hashlib.md5(f"{data}:{i}".encode()).hexdigest()
-        # Use first 8 hex chars as a float between -1 and 1
-        val = int(h[:8], 16) / (16**8) * 2 - 1
-        result.append(val)
-    return _normalize(result)
+    return _hash_array(data, dim).tolist()
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
 
 
 @dataclass
@@ -75,6 +151,10 @@ class EmbeddingConfig:
     ollama_url: str = os.environ.get("OLLAMA_URL", "http://localhost:11434")
     cache_embeddings: bool = True
     cache_max_size: int = 1000
+    component_cache_size: int = 4096
+    disk_cache_path: str | None = None
+    ollama_batch_size: int = 32
+    ollama_batch_wait_ms: float = 5.0
     
 
 @dataclass
@@ -108,6 +188,93 @@ class EmbeddingEngine:
         """Initialize the embedding engine."""
         self.config = config or EmbeddingConfig()
         self._cache: dict[str, EmbeddingResult] = {}
+        # LRU of hashed sub-vectors keyed by (component string, width)
+        self._components: OrderedDict[tuple[str, int], np.ndarray] = OrderedDict()
+        self._components_lock = threading.Lock()
+        self._component_hits = 0
+        self._component_misses = 0
+        self._ollama: OllamaEmbedder | None = None
+        self._ollama_lock = threading.Lock()
+
+    def _ollama_client(self) -> OllamaEmbedder:
+        """Lazily create the batching Ollama client (and its disk cache)."""
+        with self._ollama_lock:
+            if self._ollama is None:
+                self._ollama = OllamaEmbedder(
+                    self.config.ollama_url,
+                    self.config.ollama_model,
+                    cache=self._open_disk_cache(),
+                    batch_size=self.config.ollama_batch_size,
+                    batch_wait_ms=self.config.ollama_batch_wait_ms,
+                )
+            return self._ollama
+
+    def _open_disk_cache(self) -> EmbeddingDiskCache | None:
+        path = self.config.disk_cache_path
+        if not path:
+            return None
+        try:
+            return EmbeddingDiskCache(path)
+        except (OSError, sqlite3.Error):
+            fallback = os.path.join(
+                os.environ.get("COPILOT_VECTOR_DB_DIR", "/tmp"), os.path.basename(path)
+            )
+            _LOGGER.warning("Embedding cache %s is not writable, using fallback %s", path, fallback)
+            try:
+                return EmbeddingDiskCache(fallback)
+            except (OSError, sqlite3.Error):
+                _LOGGER.warning("Embedding cache disabled")
+                return None
+
+    def ollama_stats(self) -> dict[str, Any] | None:
+        """Batching/cache counters of the Ollama client, if it was used."""
+        client = self._ollama
+        if client is None:
+            return None
+        stats = client.stats()
+        if client.cache is not None:
+            stats["disk_cache"] = {
+                "path": client.cache.db_path,
+                "hits": client.cache.hits,
+                "misses": client.cache.misses,
+            }
+        return stats
+
+    def close(self) -> None:
+        """Stop the Ollama client and close its disk cache."""
+        with self._ollama_lock:
+            client, self._ollama = self._ollama, None
+        if client is not None:
+            client.close()
+            if client.cache is not None:
+                client.cache.close()
+
+    def _component(self, data: str, dim: int) -> np.ndarray:
+        """Memoized :func:`_hash_array` (read-only result)."""
+        key = (data, dim)
+        with self._components_lock:
+            vec = self._components.get(key)
+            if vec is not None:
+                self._components.move_to_end(key)
+                self._component_hits += 1
+                return vec
+            self._component_misses += 1
+        vec = _hash_array(data, dim)
+        vec.setflags(write=False)
+        with self._components_lock:
+            self._components[key] = vec
+            while len(self._components) > self.config.component_cache_size:
+                self._components.popitem(last=False)
+        return vec
+
+    def component_cache_stats(self) -> dict[str, int]:
+        with self._components_lock:
+            return {
+                "size": len(self._components),
+                "max_size": self.config.component_cache_size,
+                "hits": self._component_hits,
+                "misses": self._component_misses,
+            }
         
     async def embed_entity(
         self,
@@ -214,7 +381,7 @@ class EmbeddingEngine:
             vector=_normalize(vec),
             dimension=self.config.dimension,
             source="local",
-            model="preference_v1",
+            model=PREFERENCE_MODEL,
         )
         
         if self.config.cache_embeddings:
@@ -307,7 +474,7 @@ class EmbeddingEngine:
             vector=_normalize(vec),
             dimension=self.config.dimension,
             source="local",
-            model="pattern_v1",
+            model=PATTERN_MODEL,
         )
         
         if self.config.cache_embeddings:
@@ -316,6 +483,102 @@ class EmbeddingEngine:
             
         return result
     
+    async def embed_entities_batch(
+        self, entities: Sequence[Mapping[str, Any]], with_models: bool = False
+    ) -> np.ndarray | tuple[np.ndarray, list[str]]:
+        """Embed many entities at once; returns an ``(n, dimension)`` array.
+
+        Each mapping takes the keyword arguments of :meth:`embed_entity`
+        (``entity_id`` required; ``domain``, ``area``, ``capabilities``,
+        ``tags``, ``state`` optional). Row *i* equals ``embed_entity`` for
+        ``entities[i]``. Results are not stored in the per-entity cache.
+
+        With *with_models* returns ``(matrix, models)`` where ``models[i]``
+        names the model that produced row *i* – the local hash model for
+        rows that fell back while Ollama was unreachable.
+        """
+        if self.config.use_ollama:
+            keys = [
+                self._build_entity_cache_key(
+                    e["entity_id"], e.get("domain"), e.get("area"),
+                    e.get("capabilities"), e.get("tags"),
+                )
+                for e in entities
+            ]
+            results = await self._embed_ollama_many(keys)
+            matrix = np.asarray(
+                [result.vector for result in results], dtype=np.float64
+            ).reshape(len(results), -1)
+            models = [result.model for result in results]
+        else:
+            matrix = self._entity_matrix(entities)
+            models = [ENTITY_MODEL] * len(entities)
+        return (matrix, models) if with_models else matrix
+
+    def _entity_matrix(self, entities: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Local feature embeddings for *entities*, one normalized row each."""
+        n = len(entities)
+        out = np.zeros((n, max(self.config.dimension, _ENTITY_WIDTH)))
+        domains: list[np.ndarray] = []
+        id_keys: list[str] = []
+        # Per column group: (rows, sub-vectors) filled with one assignment each
+        groups: dict[str, tuple[list[int], list[np.ndarray]]] = {
+            "area": ([], []), "caps": ([], []), "tags": ([], []),
+        }
+        for row, entity in enumerate(entities):
+            entity_id = entity["entity_id"]
+            # Extract domain from entity_id if not provided
+            domain = entity.get("domain")
+            if not domain and "." in entity_id:
+                domain = entity_id.split(".")[0]
+            domains.append(_DOMAIN_ARRAYS.get(domain, _DOMAIN_ARRAYS["default"]))
+            id_keys.append(f"entity:{entity_id}")
+            if entity.get("area"):
+                groups["area"][0].append(row)
+                groups["area"][1].append(self._component(f"area:{entity['area']}", 16))
+            if entity.get("capabilities"):
+                groups["caps"][0].append(row)
+                groups["caps"][1].append(
+                    self._component(f"caps:{','.join(sorted(entity['capabilities']))}", 32)
+                )
+            if entity.get("tags"):
+                groups["tags"][0].append(row)
+                groups["tags"][1].append(self._component(f"tags:{','.join(sorted(entity['tags']))}", 32))
+            state = entity.get("state")
+            if state:
+                self._fill_state_features(out[row], state)
+
+        if n:
+            out[:, _ENTITY_DOMAIN] = domains
+            # Entity ids are unique – hashed in bulk instead of via the LRU
+            out[:, _ENTITY_ID] = _hash_rows(id_keys, 32)
+            for name, cols in (("area", _ENTITY_AREA), ("caps", _ENTITY_CAPS), ("tags", _ENTITY_TAGS)):
+                rows, vectors = groups[name]
+                if rows:
+                    out[rows, cols] = vectors
+        return _normalize_rows(out[:, :self.config.dimension])
+
+    @staticmethod
+    def _fill_state_features(vec: np.ndarray, state: Mapping[str, Any]) -> None:
+        idx = _ENTITY_STATE
+        # Numeric state (normalized)
+        numeric_state = state.get("state")
+        if isinstance(numeric_state, (int, float)):
+            vec[idx] = max(0, min(1, float(numeric_state) / 100))
+        attributes = state.get("attributes", {})
+        # Brightness (if present)
+        brightness = attributes.get("brightness")
+        if brightness:
+            vec[idx + 1] = min(1, brightness / 255)
+        # Temperature (if present)
+        temp = attributes.get("temperature")
+        if temp:
+            vec[idx + 2] = max(0, min(1, (temp - 15) / 15))
+        # Volume (if present)
+        volume = attributes.get("volume_level")
+        if volume:
+            vec[idx + 3] = volume
+
     def _embed_entity_local(
         self,
         entity_id: str,
@@ -326,116 +589,41 @@ class EmbeddingEngine:
         state: dict[str, Any] | None,
     ) -> EmbeddingResult:
         """Generate local feature-based embedding for an entity."""
-        vec = [0.0] * self.config.dimension
-        idx = 0
-        
-        # Extract domain from entity_id if not provided
-        if not domain and "." in entity_id:
-            domain = entity_id.split(".")[0]
-            
-        # Domain features (5 dims)
-        domain_vec = DOMAIN_FEATURES.get(domain, DOMAIN_FEATURES["default"])
-        for val in domain_vec:
-            vec[idx] = val
-            idx += 1
-            
-        # Entity ID hash (32 dims)
-        entity_hash = _hash_to_vector(f"entity:{entity_id}", 32)
-        for val in entity_hash:
-            vec[idx] = val
-            idx += 1
-            
-        # Area hash (16 dims)
-        if area:
-            area_hash = _hash_to_vector(f"area:{area}", 16)
-            for val in area_hash:
-                vec[idx] = val
-                idx += 1
-        else:
-            idx += 16
-            
-        # Capabilities hash (32 dims)
-        if capabilities:
-            cap_hash = _hash_to_vector(f"caps:{','.join(sorted(capabilities))}", 32)
-            for val in cap_hash:
-                vec[idx] = val
-                idx += 1
-        else:
-            idx += 32
-            
-        # Tags hash (32 dims)
-        if tags:
-            tags_hash = _hash_to_vector(f"tags:{','.join(sorted(tags))}", 32)
-            for val in tags_hash:
-                vec[idx] = val
-                idx += 1
-        else:
-            idx += 32
-            
-        # State features (11 dims remaining)
-        if state:
-            # Numeric state (normalized)
-            numeric_state = state.get("state")
-            if isinstance(numeric_state, (int, float)):
-                vec[idx] = max(0, min(1, float(numeric_state) / 100))
-            idx += 1
-            
-            # Brightness (if present)
-            brightness = state.get("attributes", {}).get("brightness")
-            if brightness:
-                vec[idx] = min(1, brightness / 255)
-            idx += 1
-            
-            # Temperature (if present)
-            temp = state.get("attributes", {}).get("temperature")
-            if temp:
-                vec[idx] = max(0, min(1, (temp - 15) / 15))
-            idx += 1
-            
-            # Volume (if present)
-            volume = state.get("attributes", {}).get("volume_level")
-            if volume:
-                vec[idx] = volume
-            idx += 1
-                
+        matrix = self._entity_matrix([{
+            "entity_id": entity_id,
+            "domain": domain,
+            "area": area,
+            "capabilities": capabilities,
+            "tags": tags,
+            "state": state,
+        }])
         return EmbeddingResult(
-            vector=_normalize(vec),
+            vector=matrix[0].tolist(),
             dimension=self.config.dimension,
             source="local",
-            model="entity_v1",
+            model=ENTITY_MODEL,
         )
     
     async def _embed_ollama(self, text: str) -> EmbeddingResult:
         """Generate embedding using Ollama."""
-        import aiohttp
-        
+        return (await self._embed_ollama_many([text]))[0]
+
+    async def _embed_ollama_many(self, texts: list[str]) -> list[EmbeddingResult]:
+        """Embed *texts* via Ollama (batched); local hash vectors on failure."""
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "model": self.config.ollama_model,
-                    "prompt": text,
-                }
-                async with session.post(
-                    f"{self.config.ollama_url}/api/embeddings",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        embedding = data.get("embedding", [])
-                        return EmbeddingResult(
-                            vector=_normalize(embedding[:self.config.dimension]),
-                            dimension=self.config.dimension,
-                            source="ollama",
-                            model=self.config.ollama_model,
-                        )
-                    else:
-                        _LOGGER.warning("Ollama embedding failed: %s", resp.status)
-                        # Fallback to local
-                        return self._embed_text_local(text)
+            embeddings = await self._ollama_client().embed_many(texts)
         except Exception as e:
             _LOGGER.warning("Ollama embedding error: %s", e)
-            return self._embed_text_local(text)
+            return [self._embed_text_local(text) for text in texts]
+        return [
+            EmbeddingResult(
+                vector=_normalize(embedding[:self.config.dimension]),
+                dimension=self.config.dimension,
+                source="ollama",
+                model=self.config.ollama_model,
+            )
+            for embedding in embeddings
+        ]
             
     def embed_text_sync(self, text: str) -> list[float]:
         """Generate embedding for arbitrary text (synchronous, bag-of-words).
@@ -449,15 +637,9 @@ class EmbeddingEngine:
         if not words:
             return [0.0] * self.config.dimension
 
-        vec = [0.0] * self.config.dimension
-        for word in words:
-            word_vec = _hash_to_vector(f"word:{word}", self.config.dimension)
-            for i in range(self.config.dimension):
-                vec[i] += word_vec[i]
-
-        n = len(words)
-        vec = [v / n for v in vec]
-        return _normalize(vec)
+        dim = self.config.dimension
+        vec = np.sum([self._component(f"word:{word}", dim) for word in words], axis=0)
+        return _normalize((vec / len(words)).tolist())
 
     def _embed_text_local(self, text: str) -> EmbeddingResult:
         """Generate local embedding for arbitrary text."""
@@ -465,7 +647,7 @@ class EmbeddingEngine:
             vector=_hash_to_vector(text, self.config.dimension),
             dimension=self.config.dimension,
             source="local",
-            model="text_hash_v1",
+            model=TEXT_HASH_MODEL,
         )
     
     def _build_entity_cache_key(
@@ -518,6 +700,11 @@ def get_embedding_engine(config: EmbeddingConfig | None = None) -> EmbeddingEngi
                 use_ollama=os.environ.get("COPILOT_USE_OLLAMA", "").lower() == "true",
                 ollama_model=os.environ.get("COPILOT_OLLAMA_MODEL", "nomic-embed-text"),
                 ollama_url=os.environ.get("COPILOT_OLLAMA_URL", "http://localhost:11434"),
+                disk_cache_path=os.environ.get(
+                    "COPILOT_EMBEDDING_CACHE_PATH", DEFAULT_EMBEDDING_CACHE_PATH
+                ),
+                ollama_batch_size=int(os.environ.get("COPILOT_OLLAMA_EMBED_BATCH", 32)),
+                ollama_batch_wait_ms=float(os.environ.get("COPILOT_OLLAMA_EMBED_WAIT_MS", 5.0)),
             )
         _EMBEDDING_ENGINE = EmbeddingEngine(config)
     return _EMBEDDING_ENGINE
@@ -526,4 +713,6 @@ def get_embedding_engine(config: EmbeddingConfig | None = None) -> EmbeddingEngi
 def reset_embedding_engine() -> None:
     """Reset the embedding engine singleton (for testing)."""
     global _EMBEDDING_ENGINE
+    if _EMBEDDING_ENGINE is not None:
+        _EMBEDDING_ENGINE.close()
     _EMBEDDING_ENGINE = None
\ No newline at end of file
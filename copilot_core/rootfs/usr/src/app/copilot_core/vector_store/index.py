@@ -0,0 +1,236 @@
+"""In-memory similarity index for the vector store.
+
+Vectors are kept per ``entry_type`` (and dimension) in a contiguous float32
+matrix of unit-length rows, so cosine similarity against every stored
+vector is one matrix-vector product. Top-k selection uses
+``argpartition`` and only sorts the k winners.
+
+Rows are updated in place on upsert; a delete moves the last row into the
+freed slot, keeping the live rows contiguous. Capacity grows by doubling.
+
+Not thread-safe – the owning :class:`~copilot_core.vector_store.store.VectorStore`
+serializes access.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+_INITIAL_CAPACITY = 64
+
+
+def unit_vector(vector: Sequence[float] | np.ndarray) -> np.ndarray:
+    """Return *vector* scaled to unit length as float32 (zero stays zero)."""
+    arr = np.asarray(vector, dtype=np.float64).ravel()
+    norm = float(np.linalg.norm(arr))
+    if norm == 0.0 or not np.isfinite(norm):
+        return np.zeros(arr.shape[0], dtype=np.float32)
+    return (arr / norm).astype(np.float32)
+
+
+def unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise :func:`unit_vector` of a 2-D array, as float32."""
+    arr = np.asarray(matrix, dtype=np.float64)
+    norms = np.linalg.norm(arr, axis=1)
+    ok = (norms > 0) & np.isfinite(norms)
+    out = np.zeros(arr.shape, dtype=np.float32)
+    out[ok] = arr[ok] / norms[ok, None]
+    return out
+
+
+class VectorMatrix:
+    """Unit-length float32 rows of one dimension, addressed by entry id."""
+
+    def __init__(self, dim: int, capacity: int = _INITIAL_CAPACITY) -> None:
+        self.dim = dim
+        self._rows = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._pos: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._pos
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._rows.nbytes)
+
+    def upsert(self, entry_id: str, unit: np.ndarray) -> None:
+        pos = self._pos.get(entry_id)
+        if pos is None:
+            pos = len(self._ids)
+            if pos == self._rows.shape[0]:
+                grown = np.zeros((pos * 2, self.dim), dtype=np.float32)
+                grown[:pos] = self._rows
+                self._rows = grown
+            self._ids.append(entry_id)
+            self._pos[entry_id] = pos
+        self._rows[pos] = unit
+
+    def extend(self, entry_ids: Sequence[str], units: np.ndarray) -> None:
+        """Upsert many rows at once (one copy for the new ids).
+
+        An id repeated within *entry_ids* gets one row; the last occurrence wins.
+        """
+        fresh: dict[str, int] = {}  # new id -> index of its last occurrence
+        for i, entry_id in enumerate(entry_ids):
+            pos = self._pos.get(entry_id)
+            if pos is None:
+                fresh[entry_id] = i
+            else:
+                self._rows[pos] = units[i]
+        if not fresh:
+            return
+        start = len(self._ids)
+        end = start + len(fresh)
+        if end > self._rows.shape[0]:
+            grown = np.zeros((max(end, self._rows.shape[0] * 2), self.dim), dtype=np.float32)
+            grown[:start] = self._rows[:start]
+            self._rows = grown
+        self._rows[start:end] = units[list(fresh.values())]
+        for pos, entry_id in enumerate(fresh, start):
+            self._ids.append(entry_id)
+            self._pos[entry_id] = pos
+
+    def remove(self, entry_id: str) -> bool:
+        pos = self._pos.pop(entry_id, None)
+        if pos is None:
+            return False
+        last = len(self._ids) - 1
+        if pos != last:
+            moved = self._ids[last]
+            self._rows[pos] = self._rows[last]
+            self._ids[pos] = moved
+            self._pos[moved] = pos
+        self._ids.pop()
+        return True
+
+    def search(
+        self,
+        unit: np.ndarray,
+        limit: int,
+        threshold: float,
+        exclude: Iterable[str] = (),
+    ) -> list[tuple[str, float]]:
+        """Top *limit* (id, similarity) pairs with similarity >= *threshold*."""
+        n = len(self._ids)
+        if n == 0 or limit <= 0:
+            return []
+        sims = self._rows[:n] @ unit
+        for entry_id in exclude:
+            pos = self._pos.get(entry_id)
+            if pos is not None:
+                sims[pos] = -np.inf
+        candidates = np.flatnonzero(sims >= threshold)
+        if candidates.size > limit:
+            top = np.argpartition(-sims[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-sims[candidates], kind="stable")]
+        return [(self._ids[i], float(min(1.0, max(-1.0, sims[i])))) for i in order]
+
+
+class SimilarityIndex:
+    """VectorMatrix per (entry_type, dimension) plus an id → location map."""
+
+    def __init__(self) -> None:
+        self._matrices: dict[str, dict[int, VectorMatrix]] = {}
+        self._where: dict[str, tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._where
+
+    def upsert(self, entry_id: str, entry_type: str, vector: Sequence[float] | np.ndarray) -> None:
+        unit = unit_vector(vector)
+        location = (entry_type, unit.shape[0])
+        if self._where.get(entry_id, location) != location:
+            self.remove(entry_id)
+        by_dim = self._matrices.setdefault(entry_type, {})
+        matrix = by_dim.get(unit.shape[0])
+        if matrix is None:
+            matrix = by_dim[unit.shape[0]] = VectorMatrix(unit.shape[0])
+        matrix.upsert(entry_id, unit)
+        self._where[entry_id] = location
+
+    def bulk_upsert(self, entry_type: str, entry_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Upsert a 2-D block of same-dimension vectors for *entry_type*."""
+        if len(entry_ids) == 0:
+            return
+        units = unit_rows(vectors)
+        location = (entry_type, units.shape[1])
+        for entry_id in entry_ids:
+            if self._where.get(entry_id, location) != location:
+                self.remove(entry_id)
+        by_dim = self._matrices.setdefault(entry_type, {})
+        matrix = by_dim.get(units.shape[1])
+        if matrix is None:
+            matrix = by_dim[units.shape[1]] = VectorMatrix(units.shape[1], len(entry_ids))
+        matrix.extend(entry_ids, units)
+        for entry_id in entry_ids:
+            self._where[entry_id] = location
+
+    def entry_types(self) -> list[str]:
+        return list(self._matrices)
+
+    def count(self, entry_type: str, dim: int | None = None) -> int:
+        by_dim = self._matrices.get(entry_type, {})
+        if dim is not None:
+            return len(by_dim[dim]) if dim in by_dim else 0
+        return sum(len(m) for m in by_dim.values())
+
+    def remove(self, entry_id: str) -> bool:
+        location = self._where.pop(entry_id, None)
+        if location is None:
+            return False
+        entry_type, dim = location
+        return self._matrices[entry_type][dim].remove(entry_id)
+
+    def clear(self, entry_type: str | None = None) -> None:
+        if entry_type is None:
+            self._matrices.clear()
+            self._where.clear()
+            return
+        self._matrices.pop(entry_type, None)
+        self._where = {k: v for k, v in self._where.items() if v[0] != entry_type}
+
+    def search(
+        self,
+        query: Sequence[float] | np.ndarray,
+        entry_type: str | None = None,
+        limit: int = 10,
+        threshold: float = 0.0,
+        exclude_ids: Iterable[str] = (),
+    ) -> list[tuple[str, float, str]]:
+        """Top *limit* (id, similarity, entry_type) across matching matrices.
+
+        Only vectors with the query's dimension are compared.
+        """
+        unit = unit_vector(query)
+        exclude = list(exclude_ids)
+        types = [entry_type] if entry_type is not None else list(self._matrices)
+        hits: list[tuple[str, float, str]] = []
+        for etype in types:
+            matrix = self._matrices.get(etype, {}).get(unit.shape[0])
+            if matrix is not None:
+                hits.extend(
+                    (entry_id, sim, etype)
+                    for entry_id, sim in matrix.search(unit, limit, threshold, exclude)
+                )
+        if len(types) > 1:
+            hits.sort(key=lambda h: h[1], reverse=True)
+        return hits[:limit]
+
+    def stats(self) -> dict[str, Any]:
+        by_type: dict[str, int] = {}
+        nbytes = 0
+        for etype, by_dim in self._matrices.items():
+            for matrix in by_dim.values():
+                by_type[etype] = by_type.get(etype, 0) + len(matrix)
+                nbytes += matrix.nbytes
+        return {"entries": len(self._where), "by_type": by_type, "bytes": nbytes}
@@ -0,0 +1,337 @@
+"""Batched Ollama embedding client with a persistent embedding cache.
+
+Callers on any thread or event loop (Flask handlers run short-lived loops)
+submit texts to one background event loop that owns a pooled
+``aiohttp.ClientSession``. Texts arriving within ``batch_wait_ms`` of each
+other – or until ``batch_size`` is reached – are coalesced into a single
+``POST /api/embed`` request (``input`` as a list). Servers without that
+endpoint (Ollama < 0.1.44, HTTP 404) fall back to one
+``/api/embeddings`` request per text.
+
+Results are kept in a SQLite :class:`EmbeddingDiskCache` keyed by a hash of
+(model, text), so a restart does not re-embed everything through the LLM
+host. Each entry records the model *version* (the digest reported by
+``GET /api/tags``); when the installed model changes, entries of older
+versions are dropped the first time the new digest is seen.
+
+All SQLite and HTTP work runs on the background loop thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+_DEFAULT_BATCH_SIZE = 32
+_DEFAULT_BATCH_WAIT_MS = 5.0
+_DEFAULT_MAX_INFLIGHT = 2
+_DEFAULT_TIMEOUT = 30.0
+# Seconds before the model digest is looked up again
+_VERSION_TTL = 300.0
+
+
+def content_key(model: str, text: str) -> str:
+    """Cache key for *text* embedded by *model*."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+class EmbeddingDiskCache:
+    """SQLite table of float32 embeddings keyed by :func:`content_key`."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                version TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings(model, version);
+        """)
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, version: str, keys: Sequence[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        for start in range(0, len(keys), 500):
+            chunk = list(keys[start:start + 500])
+            marks = ",".join("?" * len(chunk))
+            for key, blob in self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND version = ? AND key IN ({marks})",
+                (model, version, *chunk),
+            ):
+                found[key] = np.frombuffer(blob, dtype="<f4").tolist()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, version: str, items: dict[str, Sequence[float]]) -> None:
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, version, vector, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (key, model, version, np.asarray(vec, dtype="<f4").tobytes(), now)
+                for key, vec in items.items()
+            ],
+        )
+        self._db.commit()
+
+    def invalidate(self, model: str, version: str) -> int:
+        """Drop entries of *model* produced by any other version."""
+        cursor = self._db.execute(
+            "DELETE FROM embeddings WHERE model = ? AND version != ?", (model, version)
+        )
+        self._db.commit()
+        if cursor.rowcount:
+            _LOGGER.info(
+                "Embedding cache: dropped %d entries of outdated %s", cursor.rowcount, model
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class OllamaEmbedder:
+    """Coalesces embed calls into batched ``/api/embed`` requests."""
+
+    def __init__(
+        self,
+        url: str,
+        model: str,
+        cache: EmbeddingDiskCache | None = None,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        batch_wait_ms: float = _DEFAULT_BATCH_WAIT_MS,
+        max_inflight: int = _DEFAULT_MAX_INFLIGHT,
+        timeout: float = _DEFAULT_TIMEOUT,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.model = model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000
+        self.max_inflight = max(1, max_inflight)
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, concurrent.futures.Future]] = []
+        self._flush_scheduled = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._session: Any = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._batch_endpoint = True
+        self._version: str | None = None
+        self._version_checked = 0.0
+
+        self._stats = {
+            "texts": 0,
+            "requests": 0,
+            "batched_texts": 0,
+            "cache_hits": 0,
+            "errors": 0,
+        }
+
+    # --- Public API ---------------------------------------------------------
+
+    async def embed(self, text: str) -> list[float]:
+        """Embedding of *text*; awaitable from any event loop."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embeddings of *texts* in order (queued together)."""
+        futures = self.submit(texts)
+        return list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+
+    def submit(self, texts: Sequence[str]) -> list[concurrent.futures.Future]:
+        """Queue *texts*; returns thread-safe futures resolving to vectors."""
+        loop = self._ensure_loop()
+        futures = [concurrent.futures.Future() for _ in texts]
+        with self._lock:
+            self._pending.extend(zip(texts, futures))
+            self._stats["texts"] += len(texts)
+            full = len(self._pending) >= self.batch_size
+            if full or not self._flush_scheduled:
+                self._flush_scheduled = True
+                loop.call_soon_threadsafe(self._schedule_flush, full)
+        return futures
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, pending=len(self._pending))
+        stats["batch_endpoint"] = self._batch_endpoint
+        stats["model_version"] = self._version
+        stats["avg_batch"] = (
+            round(stats["batched_texts"] / stats["requests"], 2) if stats["requests"] else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        """Close the HTTP session and stop the background loop."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+        self._loop = self._thread = self._session = None
+
+    # --- Background loop ----------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="ollama-embed", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _schedule_flush(self, now: bool) -> None:
+        if now or self.batch_wait == 0:
+            self._start_flush()
+        else:
+            self._loop.call_later(self.batch_wait, self._start_flush)
+
+    def _start_flush(self) -> None:
+        with self._lock:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            # More waiting: keep draining without another delay
+            self._flush_scheduled = bool(self._pending)
+            if self._pending:
+                self._loop.call_soon(self._start_flush)
+        if batch:
+            self._loop.create_task(self._flush(batch))
+
+    async def _flush(self, batch: list[tuple[str, concurrent.futures.Future]]) -> None:
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+        async with self._inflight:
+            try:
+                vectors = await self._resolve([text for text, _ in batch])
+            except Exception as exc:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+        for (text, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def _resolve(self, texts: list[str]) -> list[list[float]]:
+        """Cache lookups, then one request for the distinct misses."""
+        version = await self._model_version()
+        keys = [content_key(self.model, text) for text in texts]
+        found: dict[str, list[float]] = {}
+        if self.cache is not None:
+            found = self.cache.get_many(self.model, version, list(dict.fromkeys(keys)))
+            with self._lock:
+                self._stats["cache_hits"] += sum(1 for key in keys if key in found)
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = await self._request(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            found.update(fresh)
+            if self.cache is not None:
+                self.cache.put_many(self.model, version, fresh)
+        return [found[key] for key in keys]
+
+    async def _http(self):
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_inflight),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _request(self, texts: list[str]) -> list[list[float]]:
+        session = await self._http()
+        if self._batch_endpoint:
+            async with session.post(
+                f"{self.url}/api/embed", json={"model": self.model, "input": texts}
+            ) as resp:
+                if resp.status == 404:
+                    _LOGGER.info("Ollama has no /api/embed, using /api/embeddings per text")
+                    self._batch_endpoint = False
+                else:
+                    resp.raise_for_status()
+                    embeddings = (await resp.json()).get("embeddings") or []
+                    if len(embeddings) != len(texts):
+                        raise ValueError(
+                            f"Ollama returned {len(embeddings)} embeddings for {len(texts)} inputs"
+                        )
+                    self._count_request(len(texts))
+                    return embeddings
+
+        vectors = []
+        for text in texts:
+            async with session.post(
+                f"{self.url}/api/embeddings", json={"model": self.model, "prompt": text}
+            ) as resp:
+                resp.raise_for_status()
+                vectors.append((await resp.json()).get("embedding", []))
+            self._count_request(1)
+        return vectors
+
+    def _count_request(self, texts: int) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["batched_texts"] += texts
+
+    async def _model_version(self) -> str:
+        """Digest of the installed model (cached; invalidates the disk cache)."""
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked < _VERSION_TTL:
+            return self._version
+        self._version_checked = now
+        digest = None
+        try:
+            session = await self._http()
+            async with session.get(f"{self.url}/api/tags") as resp:
+                if resp.status == 200:
+                    for model in (await resp.json()).get("models", []):
+                        if model.get("name") in (self.model, f"{self.model}:latest"):
+                            digest = model.get("digest")
+                            break
+        except Exception as exc:
+            _LOGGER.debug("Could not read Ollama model digest: %s", exc)
+        if digest is None:
+            # Unknown (server down or model missing): keep what we had
+            return self._version or "unknown"
+        if digest != self._version:
+            self._version = digest
+            if self.cache is not None:
+                self.cache.invalidate(self.model, digest)
+        return digest
@@ -6,6 +6,25 @@ Provides efficient storage and similarity search for:
 - Pattern embeddings
 
 Uses SQLite for persistence with in-memory cache for performance.
+Vectors are stored as packed little-endian float32 BLOBs; databases written
+by older versions (JSON text vectors) are converted once on open.
+
+Similarity search runs against an in-memory :class:`SimilarityIndex`
+(pre-normalized float32 matrix per entry type) that is loaded once from
+SQLite and kept in sync on upsert/delete/clear. Entry types with at least
+``ann_min_entries`` vectors are additionally snapshotted into an on-disk
+IVF index (:mod:`.ann`) next to the database. Snapshots are memory-mapped
+at startup instead of being loaded, and searched approximately; only rows
+changed since the snapshot (tracked by a per-row sequence number) stay in
+memory. Snapshots are rebuilt in a background thread once enough rows have
+changed.
+
+Environment variables (read by :func:`get_vector_store`):
+    COPILOT_VECTOR_DB_PATH          – SQLite path (default: /data/vector_store.db)
+    COPILOT_VECTOR_PERSIST          – true|false (default: true)
+    COPILOT_VECTOR_ANN_MIN_ENTRIES  – vectors per type before an IVF index is
+                                      built; 0 disables it (default: 20000)
+    COPILOT_VECTOR_ANN_NPROBE       – IVF cells scanned per query (default: 8)
 """
 
 from __future__ import annotations
@@ -15,20 +34,54 @@ import json
 import logging
 import math
 import os
+import re
 import sqlite3
 import threading
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
-from .embeddings import EmbeddingEngine, EmbeddingResult, get_embedding_engine
+import numpy as np
+
+from .ann import IVFIndex, read_manifest, remove_unreferenced, write_manifest
+from .embeddings import (
+    RETIRED_EMBEDDING_MODELS,
+    EmbeddingEngine,
+    EmbeddingResult,
+    get_embedding_engine,
+)
+from .index import SimilarityIndex, unit_rows, unit_vector
 
 _LOGGER = logging.getLogger(__name__)
 
 # Default storage path
 DEFAULT_DB_PATH = "/data/vector_store.db"
 
+# PRAGMA user_version: 1 = float32 BLOBs with a seq column,
+# 2 = rows of embedded types record their ``embedding_model`` in metadata
+_SCHEMA_VERSION = 2
+# Entry types whose vectors come from the embedding engine
+_EMBEDDED_TYPES = ("entity", "user_preference", "pattern", "conversation")
+_VECTOR_DTYPE = np.dtype("<f4")
+
+_DEFAULT_ANN_MIN_ENTRIES = 20000
+_DEFAULT_ANN_NPROBE = 8
+# Rebuild a snapshot once this many of its rows changed (fraction / floor)
+_ANN_REBUILD_FRACTION = 0.2
+_ANN_REBUILD_MIN_CHANGES = 1000
+
+
+def _pack_vector(vector: list[float] | np.ndarray) -> bytes:
+    """Serialize a vector as packed float32 for the ``vector`` BLOB column."""
+    return np.asarray(vector, dtype=_VECTOR_DTYPE).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> np.ndarray:
+    """Inverse of :func:`_pack_vector` (read-only view on *blob*)."""
+    return np.frombuffer(blob, dtype=_VECTOR_DTYPE)
+
 
 def _cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     """Calculate cosine similarity between two vectors."""
@@ -75,6 +128,8 @@ class VectorStoreConfig:
     persist: bool = True
     cache_size: int = 500
     similarity_threshold: float = 0.7
+    ann_min_entries: int = _DEFAULT_ANN_MIN_ENTRIES
+    ann_nprobe: int = _DEFAULT_ANN_NPROBE
     
 
 class VectorStore:
@@ -96,9 +151,24 @@ class VectorStore:
         self._lock = threading.RLock()
         self._db: sqlite3.Connection | None = None
         self._embedding_engine: EmbeddingEngine | None = None
+        # Everything searchable: vectors in _index, metadata by entry id
+        self._index = SimilarityIndex()
+        self._index_metadata: dict[str, dict[str, Any]] = {}
+        # Last row sequence number, and the seq of every in-memory entry
+        self._seq = 0
+        self._index_seq: dict[str, int] = {}
+        # On-disk IVF snapshots by entry type (all built at _ann_seq)
+        self._ann: dict[str, IVFIndex] = {}
+        self._ann_seq = 0
+        self._ann_stems: dict[str, str] = {}
+        self._ann_dir: Path | None = None
+        self._ann_epoch = 0
+        self._ann_thread: threading.Thread | None = None
         
         if self.config.persist:
             self._init_db()
+            self._load_index()
+            self._maybe_build_ann()
 
     def _resolve_writable_db_path(self, configured_path: Path) -> Path:
         """Resolve writable DB path with fallback outside add-on runtime."""
@@ -132,15 +202,403 @@ class VectorStore:
                 vector BLOB NOT NULL,
                 metadata TEXT DEFAULT '{}',
                 created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                updated_at TEXT NOT NULL,
+                seq INTEGER NOT NULL DEFAULT 0
             );
             
             CREATE INDEX IF NOT EXISTS idx_vectors_type ON vectors(entry_type);
             CREATE INDEX IF NOT EXISTS idx_vectors_created ON vectors(created_at);
+
+            -- Deletes of rows that may still sit in an IVF snapshot
+            CREATE TABLE IF NOT EXISTS vector_deletions (
+                id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL
+            );
         """)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._migrate_binary_vectors()
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_vectors_seq ON vectors(seq)")
         self._db.commit()
+        self._seq = self._db.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(seq) FROM vectors), 0),"
+            " COALESCE((SELECT MAX(seq) FROM vector_deletions), 0))"
+        ).fetchone()[0]
+        self._drop_outdated_embeddings(unlabelled=version < 2)
+        if version < _SCHEMA_VERSION:
+            self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._db.commit()
+        self._ann_dir = Path(f"{db_path}.ann")
         _LOGGER.info("Vector store initialized: %s", self.config.db_path)
-        
+
+    def _migrate_binary_vectors(self) -> None:
+        """One-shot conversion of JSON text vectors to float32 BLOBs."""
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(vectors)")}
+        if "seq" not in columns:
+            self._db.execute("ALTER TABLE vectors ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        converted: list[tuple[bytes, str]] = []
+        dropped: list[tuple[str]] = []
+        for row in self._db.execute("SELECT id, vector FROM vectors"):
+            try:
+                converted.append((_pack_vector(json.loads(row["vector"])), row["id"]))
+            except (TypeError, ValueError):
+                dropped.append((row["id"],))
+        self._db.executemany("UPDATE vectors SET vector = ? WHERE id = ?", converted)
+        if dropped:
+            _LOGGER.warning("Dropping %d unreadable vector rows during migration", len(dropped))
+            self._db.executemany("DELETE FROM vectors WHERE id = ?", dropped)
+        self._db.execute("PRAGMA user_version = 1")
+        self._db.commit()
+        if converted:
+            _LOGGER.info("Migrated %d vectors to float32 storage", len(converted))
+
+    def _drop_outdated_embeddings(self, unlabelled: bool) -> None:
+        """Delete rows embedded with a retired model (they no longer compare
+        with fresh query vectors); the next sync embeds them again.
+
+        With *unlabelled* (databases from before models were recorded) rows
+        of embedded types without an ``embedding_model`` are dropped too.
+        """
+        placeholders = ",".join("?" * len(_EMBEDDED_TYPES))
+        outdated = []
+        for row in self._db.execute(
+            f"SELECT id, metadata FROM vectors WHERE entry_type IN ({placeholders})",
+            _EMBEDDED_TYPES,
+        ):
+            try:
+                model = json.loads(row["metadata"] or "{}").get("embedding_model")
+            except (AttributeError, ValueError):
+                model = None
+            if model in RETIRED_EMBEDDING_MODELS or (unlabelled and model is None):
+                outdated.append(row["id"])
+        if not outdated:
+            return
+        # IVF snapshots on disk may still hold the rows
+        deletions = []
+        for entry_id in outdated:
+            self._seq += 1
+            deletions.append((entry_id, self._seq))
+        self._db.executemany("DELETE FROM vectors WHERE id = ?", [(i,) for i in outdated])
+        self._db.executemany(
+            "INSERT OR REPLACE INTO vector_deletions (id, seq) VALUES (?, ?)", deletions
+        )
+        self._db.commit()
+        _LOGGER.info("Dropped %d vectors from outdated embedding models", len(outdated))
+
+    def _load_index(self) -> None:
+        """Open IVF snapshots and load every other vector into the index.
+
+        Rows covered by a snapshot (same type and dimension, unchanged
+        since it was built) are not read at all.
+        """
+        if not self._db:
+            return
+        self._open_ann()
+        where, params = "", []
+        if self._ann:
+            covered = " OR ".join("(entry_type = ? AND length(vector) = ?)" for _ in self._ann)
+            where = f" WHERE seq > ? OR NOT ({covered})"
+            params.append(self._ann_seq)
+            for etype, ann in self._ann.items():
+                params.extend((etype, ann.dim * _VECTOR_DTYPE.itemsize))
+
+        groups: dict[tuple[str, int], list[sqlite3.Row]] = {}
+        for row in self._db.execute(
+            f"SELECT id, entry_type, vector, metadata, seq FROM vectors{where}", params
+        ):
+            blob = row["vector"]
+            if not blob or len(blob) % _VECTOR_DTYPE.itemsize:
+                _LOGGER.warning("Skipping unreadable vector row %s", row["id"])
+                continue
+            groups.setdefault((row["entry_type"], len(blob)), []).append(row)
+
+        for (etype, nbytes), rows in groups.items():
+            ids = [row["id"] for row in rows]
+            block = np.frombuffer(b"".join(row["vector"] for row in rows), dtype=_VECTOR_DTYPE)
+            self._index.bulk_upsert(etype, ids, block.reshape(len(rows), nbytes // _VECTOR_DTYPE.itemsize))
+            for row in rows:
+                try:
+                    self._index_metadata[row["id"]] = json.loads(row["metadata"] or "{}")
+                except ValueError:
+                    self._index_metadata[row["id"]] = {}
+                self._index_seq[row["id"]] = row["seq"]
+                # Changed since the snapshot: hide the stale copy there
+                for ann in self._ann.values():
+                    ann.tombstone(row["id"])
+
+        if self._ann:
+            for row in self._db.execute(
+                "SELECT id FROM vector_deletions WHERE seq > ?", (self._ann_seq,)
+            ):
+                for ann in self._ann.values():
+                    ann.tombstone(row["id"])
+        _LOGGER.info(
+            "Vector index loaded: %d in memory, %d in IVF snapshots",
+            len(self._index), sum(len(ann) for ann in self._ann.values()),
+        )
+
+    def _index_entry(self, entry: VectorEntry, seq: int = 0) -> None:
+        self._index.upsert(entry.id, entry.entry_type, entry.vector)
+        self._index_metadata[entry.id] = entry.metadata
+        self._index_seq[entry.id] = seq
+        for ann in self._ann.values():
+            ann.tombstone(entry.id)
+
+    def _unindex_entry(self, entry_id: str) -> bool:
+        removed = self._index.remove(entry_id)
+        self._index_metadata.pop(entry_id, None)
+        self._index_seq.pop(entry_id, None)
+        for ann in self._ann.values():
+            removed = ann.tombstone(entry_id) or removed
+        return removed
+
+    def _search_index(
+        self,
+        query_vector: list[float],
+        entry_type: str | None,
+        limit: int,
+        threshold: float | None,
+        exclude_ids: list[str] | None,
+    ) -> list[SearchResult]:
+        threshold = threshold if threshold is not None else self.config.similarity_threshold
+        exclude = exclude_ids or ()
+        with self._lock:
+            hits = self._index.search(
+                query_vector,
+                entry_type=entry_type,
+                limit=limit,
+                threshold=threshold,
+                exclude_ids=exclude,
+            )
+            if self._ann:
+                unit = unit_vector(query_vector)
+                for etype, ann in self._ann.items():
+                    if entry_type is not None and etype != entry_type:
+                        continue
+                    if ann.dim != unit.shape[0]:
+                        continue
+                    hits.extend(
+                        (entry_id, similarity, etype)
+                        for entry_id, similarity in ann.search(
+                            unit, limit, threshold, self.config.ann_nprobe, exclude
+                        )
+                    )
+                hits.sort(key=lambda h: h[1], reverse=True)
+                hits = hits[:limit]
+            metadata = self._hit_metadata([entry_id for entry_id, _, _ in hits])
+            return [
+                SearchResult(
+                    id=entry_id,
+                    similarity=similarity,
+                    entry_type=etype,
+                    metadata=metadata.get(entry_id, {}),
+                )
+                for entry_id, similarity, etype in hits
+            ]
+
+    def _hit_metadata(self, entry_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Metadata for search hits; snapshot rows are looked up in SQLite."""
+        found = {i: self._index_metadata[i] for i in entry_ids if i in self._index_metadata}
+        missing = [i for i in entry_ids if i not in found]
+        if missing and self._db:
+            marks = ",".join("?" * len(missing))
+            for row in self._db.execute(
+                f"SELECT id, metadata FROM vectors WHERE id IN ({marks})", missing
+            ):
+                try:
+                    found[row["id"]] = json.loads(row["metadata"] or "{}")
+                except ValueError:
+                    found[row["id"]] = {}
+        return found
+
+    # ==================== IVF snapshots ====================
+
+    def _open_ann(self) -> None:
+        """Memory-map the snapshots named in the manifest (all or nothing)."""
+        if self.config.ann_min_entries <= 0 or self._ann_dir is None:
+            return
+        manifest = read_manifest(self._ann_dir)
+        indexes = manifest.get("indexes") or {}
+        opened: dict[str, IVFIndex] = {}
+        try:
+            for etype, info in indexes.items():
+                opened[etype] = IVFIndex.load(self._ann_dir, info["stem"])
+        except (OSError, KeyError, TypeError, ValueError):
+            # Rows it covered are loaded into memory instead; rebuilt later
+            _LOGGER.warning("Ignoring unreadable IVF snapshot in %s", self._ann_dir, exc_info=True)
+            return
+        self._ann = opened
+        self._ann_seq = int(manifest.get("built_seq", 0))
+        self._ann_stems = {etype: info["stem"] for etype, info in indexes.items()}
+
+    def _ann_rebuild_due(self) -> bool:
+        threshold = self.config.ann_min_entries
+        if threshold <= 0 or not self.config.persist or not self._db:
+            return False
+        for etype in set(self._index.entry_types()) | set(self._ann):
+            ann = self._ann.get(etype)
+            if ann is None:
+                if self._index.count(etype) >= threshold:
+                    return True
+            elif self._index.count(etype, ann.dim) + ann.tombstones >= max(
+                _ANN_REBUILD_MIN_CHANGES, _ANN_REBUILD_FRACTION * ann.size
+            ):
+                return True
+        return False
+
+    def _maybe_build_ann(self) -> None:
+        """Start a background snapshot build when one is due (lock held)."""
+        if self._ann_thread is not None and self._ann_thread.is_alive():
+            return
+        if not self._ann_rebuild_due():
+            return
+        self._ann_thread = threading.Thread(
+            target=self._build_ann_safe, name="vector-ann-build", daemon=True
+        )
+        self._ann_thread.start()
+
+    def _build_ann_safe(self) -> None:
+        try:
+            self.build_ann_index()
+        except Exception:
+            _LOGGER.exception("Building the IVF vector index failed")
+
+    def wait_for_ann(self, timeout: float = 30.0) -> bool:
+        """Wait for a running background snapshot build; False on timeout."""
+        thread = self._ann_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def build_ann_index(self) -> dict[str, Any]:
+        """Rebuild the IVF snapshots now and swap them in.
+
+        Covers every entry type with at least ``ann_min_entries`` rows (and
+        every type that already has a snapshot). Rows are read under the
+        store lock; clustering and file writes happen without it.
+        """
+        with self._lock:
+            if not self._db or not self._ann_dir or self.config.ann_min_entries <= 0:
+                return {}
+            epoch = self._ann_epoch
+            snapshot_seq = self._seq
+            types = {
+                row["entry_type"]
+                for row in self._db.execute(
+                    "SELECT entry_type FROM vectors GROUP BY entry_type HAVING COUNT(*) >= ?",
+                    (self.config.ann_min_entries,),
+                )
+            } | set(self._ann)
+            rows_by_type: dict[str, list[tuple[str, bytes]]] = {}
+            for etype in types:
+                rows_by_type[etype] = self._db.execute(
+                    "SELECT id, vector FROM vectors WHERE entry_type = ?", (etype,)
+                ).fetchall()
+
+        built: dict[str, IVFIndex] = {}
+        stems: dict[str, str] = {}
+        for etype, rows in rows_by_type.items():
+            by_size: dict[int, list] = {}
+            for row in rows:
+                by_size.setdefault(len(row["vector"]), []).append(row)
+            if not by_size:
+                continue
+            # One snapshot per type, for its dominant dimension
+            nbytes, rows = max(by_size.items(), key=lambda kv: len(kv[1]))
+            if nbytes == 0 or nbytes % _VECTOR_DTYPE.itemsize:
+                continue
+            block = np.frombuffer(b"".join(row["vector"] for row in rows), dtype=_VECTOR_DTYPE)
+            units = unit_rows(block.reshape(len(rows), nbytes // _VECTOR_DTYPE.itemsize))
+            stem = f"{re.sub(r'[^A-Za-z0-9_-]', '_', etype)}-{snapshot_seq}-{uuid.uuid4().hex[:8]}"
+            index = IVFIndex.build([row["id"] for row in rows], units)
+            index.save(self._ann_dir, stem)
+            built[etype] = IVFIndex.load(self._ann_dir, stem)
+            stems[etype] = stem
+
+        with self._lock:
+            if epoch != self._ann_epoch or not self._db:
+                remove_unreferenced(self._ann_dir, self._ann_stems.values())
+                return {}
+            # Rows folded into the snapshot leave memory; newer ones shadow it
+            for entry_id, seq in list(self._index_seq.items()):
+                for ann in built.values():
+                    if ann.covers(entry_id):
+                        if seq <= snapshot_seq:
+                            self._index.remove(entry_id)
+                            self._index_metadata.pop(entry_id, None)
+                            self._index_seq.pop(entry_id, None)
+                        else:
+                            ann.tombstone(entry_id)
+                        break
+            for row in self._db.execute(
+                "SELECT id FROM vector_deletions WHERE seq > ?", (snapshot_seq,)
+            ):
+                for ann in built.values():
+                    ann.tombstone(row["id"])
+            self._ann, self._ann_stems, self._ann_seq = built, stems, snapshot_seq
+            self._write_ann_manifest()
+            self._db.execute("DELETE FROM vector_deletions WHERE seq <= ?", (snapshot_seq,))
+            self._db.commit()
+            result = {etype: ann.stats() for etype, ann in built.items()}
+        _LOGGER.info("IVF vector index rebuilt at seq %d: %s", snapshot_seq, result)
+        return result
+
+    def _write_ann_manifest(self) -> None:
+        write_manifest(
+            self._ann_dir,
+            self._ann_seq,
+            {
+                etype: {"stem": self._ann_stems[etype], "dim": ann.dim, "count": ann.size}
+                for etype, ann in self._ann.items()
+            },
+        )
+        remove_unreferenced(self._ann_dir, self._ann_stems.values())
+
+    def _drop_ann(self, entry_type: str | None = None) -> None:
+        """Forget snapshots (of one type) after a clear (lock held)."""
+        self._ann_epoch += 1
+        if not self._ann:
+            return
+        for etype in [entry_type] if entry_type else list(self._ann):
+            self._ann.pop(etype, None)
+            self._ann_stems.pop(etype, None)
+        self._write_ann_manifest()
+
+    def _persist_entry(self, entry: VectorEntry) -> None:
+        """Index *entry* and write it to SQLite (lock held)."""
+        self._persist_entries([entry])
+
+    def _persist_entries(self, entries: list[VectorEntry]) -> None:
+        """Index *entries* and write them in one transaction (lock held)."""
+        rows = []
+        for entry in entries:
+            self._seq += 1
+            self._index_entry(entry, self._seq)
+            rows.append((
+                entry.id, entry.entry_type, _pack_vector(entry.vector),
+                json.dumps(entry.metadata), entry.created_at, entry.updated_at, self._seq,
+            ))
+        if self.config.persist and self._db:
+            self._db.executemany(
+                """INSERT OR REPLACE INTO vectors
+                (id, entry_type, vector, metadata, created_at, updated_at, seq)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            self._db.commit()
+            self._maybe_build_ann()
+
+    def _row_to_entry(self, row: sqlite3.Row) -> VectorEntry:
+        return VectorEntry(
+            id=row["id"],
+            vector=_unpack_vector(row["vector"]).tolist(),
+            entry_type=row["entry_type"],
+            metadata=json.loads(row["metadata"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
     def set_embedding_engine(self, engine: EmbeddingEngine) -> None:
         """Set the embedding engine for auto-embedding."""
         self._embedding_engine = engine
@@ -181,21 +639,7 @@ class VectorStore:
                 entry.created_at = self._cache[entry_id].created_at
             self._cache[entry_id] = entry
             self._prune_cache()
-            
-            # Persist to DB
-            if self.config.persist and self._db:
-                vector_blob = json.dumps(vector).encode("utf-8")
-                metadata_json = json.dumps(entry.metadata)
-                
-                self._db.execute(
-                    """
-                    INSERT OR REPLACE INTO vectors 
-                    (id, entry_type, vector, metadata, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (entry_id, entry_type, vector_blob, metadata_json, entry.created_at, entry.updated_at),
-                )
-                self._db.commit()
+            self._persist_entry(entry)
                 
         _LOGGER.debug("Upserted vector: %s (type=%s)", entry_id, entry_type)
         return entry
@@ -222,14 +666,7 @@ class VectorStore:
                 ).fetchone()
                 
                 if row:
-                    entry = VectorEntry(
-                        id=row["id"],
-                        vector=json.loads(row["vector"]),
-                        entry_type=row["entry_type"],
-                        metadata=json.loads(row["metadata"]),
-                        created_at=row["created_at"],
-                        updated_at=row["updated_at"],
-                    )
+                    entry = self._row_to_entry(row)
                     self._cache[entry_id] = entry
                     return entry
                     
@@ -248,6 +685,7 @@ class VectorStore:
             # Remove from cache
             if entry_id in self._cache:
                 del self._cache[entry_id]
+            removed = self._unindex_entry(entry_id)
                 
             # Remove from DB
             if self.config.persist and self._db:
@@ -255,10 +693,17 @@ class VectorStore:
                     "DELETE FROM vectors WHERE id = ?",
                     (entry_id,),
                 )
+                if cursor.rowcount and (self._ann or self._ann_thread is not None):
+                    # Snapshots may still hold the row; remembered until rebuilt
+                    self._seq += 1
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO vector_deletions (id, seq) VALUES (?, ?)",
+                        (entry_id, self._seq),
+                    )
                 self._db.commit()
                 return cursor.rowcount > 0
                 
-        return False
+        return removed
         
     async def get_by_type(self, entry_type: str, limit: int = 100) -> list[VectorEntry]:
         """Get all entries of a specific type.
@@ -287,15 +732,7 @@ class VectorStore:
                 
                 for row in rows:
                     if row["id"] not in self._cache:
-                        entry = VectorEntry(
-                            id=row["id"],
-                            vector=json.loads(row["vector"]),
-                            entry_type=row["entry_type"],
-                            metadata=json.loads(row["metadata"]),
-                            created_at=row["created_at"],
-                            updated_at=row["updated_at"],
-                        )
-                        entries.append(entry)
+                        entries.append(self._row_to_entry(row))
                         
         return entries[:limit]
         
@@ -321,60 +758,7 @@ class VectorStore:
         Returns:
             List of SearchResult objects, sorted by similarity (descending)
         """
-        threshold = threshold if threshold is not None else self.config.similarity_threshold
-        exclude_ids = exclude_ids or []
-        
-        # Calculate similarities
-        results: list[SearchResult] = []
-        
-        with self._lock:
-            # Search in cache
-            entries_to_search = list(self._cache.values())
-            
-            # Load from DB if persist enabled
-            if self.config.persist and self._db:
-                if entry_type:
-                    rows = self._db.execute(
-                        "SELECT * FROM vectors WHERE entry_type = ?",
-                        (entry_type,),
-                    ).fetchall()
-                else:
-                    rows = self._db.execute("SELECT * FROM vectors").fetchall()
-                    
-                for row in rows:
-                    if row["id"] not in self._cache:
-                        entry = VectorEntry(
-                            id=row["id"],
-                            vector=json.loads(row["vector"]),
-                            entry_type=row["entry_type"],
-                            metadata=json.loads(row["metadata"]),
-                            created_at=row["created_at"],
-                            updated_at=row["updated_at"],
-                        )
-                        entries_to_search.append(entry)
-                        
-            # Calculate similarities
-            for entry in entries_to_search:
-                # Apply filters
-                if entry.id in exclude_ids:
-                    continue
-                if entry_type and entry.entry_type != entry_type:
-                    continue
-                    
-                # Calculate similarity
-                similarity = _cosine_similarity(query_vector, entry.vector)
-                
-                if similarity >= threshold:
-                    results.append(SearchResult(
-                        id=entry.id,
-                        similarity=similarity,
-                        entry_type=entry.entry_type,
-                        metadata=entry.metadata,
-                    ))
-                    
-        # Sort by similarity (descending) and limit
-        results.sort(key=lambda r: r.similarity, reverse=True)
-        return results[:limit]
+        return self._search_index(query_vector, entry_type, limit, threshold, exclude_ids)
         
     async def find_similar_entities(
         self,
@@ -478,6 +862,7 @@ class VectorStore:
             "capabilities": capabilities or [],
             "tags": tags or [],
             **(metadata or {}),
+            "embedding_model": result.model,
         }
         
         return await self.upsert(
@@ -487,6 +872,51 @@ class VectorStore:
             metadata=meta,
         )
         
+    async def store_entity_embeddings_batch(
+        self, entities: list[dict[str, Any]]
+    ) -> list[VectorEntry]:
+        """Embed and store many entities with one engine call and one commit.
+
+        Each dict takes the arguments of :meth:`store_entity_embedding`.
+        """
+        if not entities:
+            return []
+        if not self._embedding_engine:
+            self._embedding_engine = get_embedding_engine()
+
+        matrix, models = await self._embedding_engine.embed_entities_batch(
+            entities, with_models=True
+        )
+        now = datetime.now(timezone.utc).isoformat()
+        entries = []
+        for entity, vector, model in zip(entities, matrix.tolist(), models):
+            entity_id = entity["entity_id"]
+            entries.append(VectorEntry(
+                id=f"entity:{entity_id}",
+                vector=vector,
+                entry_type="entity",
+                metadata={
+                    "entity_id": entity_id,
+                    "domain": entity.get("domain"),
+                    "area": entity.get("area"),
+                    "capabilities": entity.get("capabilities") or [],
+                    "tags": entity.get("tags") or [],
+                    **(entity.get("metadata") or {}),
+                    "embedding_model": model,
+                },
+                created_at=now,
+                updated_at=now,
+            ))
+
+        with self._lock:
+            for entry in entries:
+                if entry.id in self._cache:
+                    entry.created_at = self._cache[entry.id].created_at
+                self._cache[entry.id] = entry
+            self._prune_cache()
+            self._persist_entries(entries)
+        return entries
+
     # ==================== User Preference Embeddings ====================
     
     async def store_user_preference_embedding(
@@ -516,6 +946,7 @@ class VectorStore:
         meta = {
             "user_id": user_id,
             **(metadata or {}),
+            "embedding_model": result.model,
         }
         
         return await self.upsert(
@@ -567,6 +998,7 @@ class VectorStore:
             "conditions": conditions or {},
             "confidence": confidence,
             **(metadata or {}),
+            "embedding_model": result.model,
         }
         
         return await self.upsert(
@@ -601,18 +1033,7 @@ class VectorStore:
                 entry.created_at = self._cache[entry_id].created_at
             self._cache[entry_id] = entry
             self._prune_cache()
-
-            if self.config.persist and self._db:
-                vector_blob = json.dumps(vector).encode("utf-8")
-                metadata_json = json.dumps(entry.metadata)
-                self._db.execute(
-                    """INSERT OR REPLACE INTO vectors
-                    (id, entry_type, vector, metadata, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)""",
-                    (entry_id, entry_type, vector_blob, metadata_json,
-                     entry.created_at, entry.updated_at),
-                )
-                self._db.commit()
+            self._persist_entry(entry)
 
         return entry
 
@@ -625,50 +1046,7 @@ class VectorStore:
         exclude_ids: list[str] | None = None,
     ) -> list[SearchResult]:
         """Synchronous variant of :meth:`search_similar` for Flask code."""
-        threshold = threshold if threshold is not None else self.config.similarity_threshold
-        exclude_ids = exclude_ids or []
-        results: list[SearchResult] = []
-
-        with self._lock:
-            entries_to_search = list(self._cache.values())
-
-            if self.config.persist and self._db:
-                if entry_type:
-                    rows = self._db.execute(
-                        "SELECT * FROM vectors WHERE entry_type = ?",
-                        (entry_type,),
-                    ).fetchall()
-                else:
-                    rows = self._db.execute("SELECT * FROM vectors").fetchall()
-
-                for row in rows:
-                    if row["id"] not in self._cache:
-                        entry = VectorEntry(
-                            id=row["id"],
-                            vector=json.loads(row["vector"]),
-                            entry_type=row["entry_type"],
-                            metadata=json.loads(row["metadata"]),
-                            created_at=row["created_at"],
-                            updated_at=row["updated_at"],
-                        )
-                        entries_to_search.append(entry)
-
-            for entry in entries_to_search:
-                if entry.id in exclude_ids:
-                    continue
-                if entry_type and entry.entry_type != entry_type:
-                    continue
-                similarity = _cosine_similarity(query_vector, entry.vector)
-                if similarity >= threshold:
-                    results.append(SearchResult(
-                        id=entry.id,
-                        similarity=similarity,
-                        entry_type=entry.entry_type,
-                        metadata=entry.metadata,
-                    ))
-
-        results.sort(key=lambda r: r.similarity, reverse=True)
-        return results[:limit]
+        return self._search_index(query_vector, entry_type, limit, threshold, exclude_ids)
 
     # ==================== Stats & Maintenance ====================
     
@@ -686,6 +1064,8 @@ class VectorStore:
         }
         
         with self._lock:
+            stats["index"] = self._index.stats()
+            stats["ann"] = {etype: ann.stats() for etype, ann in self._ann.items()}
             # Count by type in cache
             for entry in self._cache.values():
                 stats["by_type"][entry.entry_type] = stats["by_type"].get(entry.entry_type, 0) + 1
@@ -728,6 +1108,12 @@ class VectorStore:
                 for entry_id in ids_to_remove:
                     del self._cache[entry_id]
                     count += 1
+                self._index.clear(entry_type)
+                self._index_metadata = {
+                    k: v for k, v in self._index_metadata.items() if k in self._index
+                }
+                self._index_seq = {k: v for k, v in self._index_seq.items() if k in self._index}
+                self._drop_ann(entry_type)
                     
                 if self.config.persist and self._db:
                     cursor = self._db.execute(
@@ -740,8 +1126,13 @@ class VectorStore:
                 # Clear all
                 count = len(self._cache)
                 self._cache.clear()
+                self._index.clear()
+                self._index_metadata.clear()
+                self._index_seq.clear()
+                self._drop_ann()
                 
                 if self.config.persist and self._db:
+                    self._db.execute("DELETE FROM vector_deletions")
                     cursor = self._db.execute("DELETE FROM vectors")
                     self._db.commit()
                     count = max(count, cursor.rowcount)
@@ -764,6 +1155,7 @@ class VectorStore:
     def close(self) -> None:
         """Close the database connection."""
         with self._lock:
+            self._ann_epoch += 1
             if self._db:
                 self._db.close()
                 self._db = None
@@ -783,6 +1175,10 @@ def get_vector_store(config: VectorStoreConfig | None = None) -> VectorStore:
             config = VectorStoreConfig(
                 db_path=os.environ.get("COPILOT_VECTOR_DB_PATH", DEFAULT_DB_PATH),
                 persist=os.environ.get("COPILOT_VECTOR_PERSIST", "true").lower() == "true",
+                ann_min_entries=int(os.environ.get(
+                    "COPILOT_VECTOR_ANN_MIN_ENTRIES", _DEFAULT_ANN_MIN_ENTRIES
+                )),
+                ann_nprobe=int(os.environ.get("COPILOT_VECTOR_ANN_NPROBE", _DEFAULT_ANN_NPROBE)),
             )
         _VECTOR_STORE = VectorStore(config)
     return _VECTOR_STORE
@@ -5,9 +5,12 @@ Main Application Entry Point.
 Delegates service initialization and blueprint registration to core_setup.py.
 """
 
+import atexit
 import json
 import logging as _logging
 import os
+import signal
+import sys
 import time
 import threading as _threading
 import uuid
@@ -18,7 +21,7 @@ from waitress import serve
 
 from copilot_core.api.security import require_token, validate_token
 from copilot_core.api.api_version import API_VERSION, parse_accept_version, get_deprecation_info
-from copilot_core.core_setup import init_services, register_blueprints
+from copilot_core.core_setup import init_services, register_blueprints, shutdown_services
 
 APP_VERSION = os.environ.get("COPILOT_VERSION") or os.environ.get("BUILD_VERSION") or "0.0.0"
 
@@ -160,35 +163,59 @@ def _after_request(response):
     return response
 
 
+# In-memory ring buffer of recent dev logs (thread-safe).
+_DEV_LOG_CACHE: list[dict] = []
+_DEV_LOG_LOCK = _threading.Lock()
+
+_STARTUP_TIME = time.time()
+_STARTUP_LOCK = _threading.Lock()
+_started = False
+
+
 # ---------------------------------------------------------------------------
 # Service initialization
 # ---------------------------------------------------------------------------
 
-_options = _load_options_json()
+def create_app() -> Flask:
+    """Initialize services and blueprints once and return the app.
 
-# Run pre-flight checks
-_preflight_results = _preflight_check()
-_main_logger.info("Pre-flight check results: %s", json.dumps(_preflight_results))
+    Startup must not run at import time: process pools use the ``spawn``
+    start method, whose workers re-import this script as ``__mp_main__``
+    and would each boot the whole service.
+    """
+    global _STARTUP_TIME, _started
+    with _STARTUP_LOCK:
+        if _started:
+            return app
+        _started = True
 
-try:
-    _services = init_services(config=_options)
-except Exception:
-    _main_logger.exception("CRITICAL: init_services failed — starting with empty services")
-    _services = {}
+        options = _load_options_json()
 
-try:
-    register_blueprints(app, _services)
-except Exception:
-    _main_logger.exception("CRITICAL: register_blueprints failed")
+        # Run pre-flight checks
+        preflight_results = _preflight_check()
+        _main_logger.info("Pre-flight check results: %s", json.dumps(preflight_results))
 
-# Store startup info
-_STARTUP_TIME = time.time()
-app.config["STARTUP_TIME"] = _STARTUP_TIME
-app.config["PREFLIGHT"] = _preflight_results
+        try:
+            services = init_services(config=options)
+        except Exception:
+            _main_logger.exception("CRITICAL: init_services failed — starting with empty services")
+            services = {}
 
-# In-memory ring buffer of recent dev logs (thread-safe).
-_DEV_LOG_CACHE: list[dict] = []
-_DEV_LOG_LOCK = _threading.Lock()
+        try:
+            register_blueprints(app, services)
+        except Exception:
+            _main_logger.exception("CRITICAL: register_blueprints failed")
+
+        # Finish accepted background work on interpreter exit
+        atexit.register(shutdown_services, services)
+
+        # Store startup info
+        _STARTUP_TIME = time.time()
+        app.config["STARTUP_TIME"] = _STARTUP_TIME
+        app.config["PREFLIGHT"] = preflight_results
+
+        _load_dev_log_cache()
+        return app
 
 
 def _now_iso():
@@ -224,9 +251,6 @@ def _load_dev_log_cache() -> None:
         return
 
 
-_load_dev_log_cache()
-
-
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
 
@@ -447,10 +471,13 @@ def get_dev_logs():
 
 
 if __name__ == "__main__":
+    create_app()
+    # SIGTERM (add-on stop) exits normally so the atexit shutdown hook runs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     host = "0.0.0.0"
     port = int(os.environ.get("PORT", "8909"))
     _main_logger.info(
         "Starting PilotSuite v%s on %s:%d (pre-flight: %s)",
-        APP_VERSION, host, port, json.dumps(_preflight_results),
+        APP_VERSION, host, port, json.dumps(app.config["PREFLIGHT"]),
     )
     serve(app, host=host, port=port)
@@ -22,3 +22,25 @@ def reset_auth_token_cache():
         sec._token_cache = ("", 0.0)
     except ImportError:
         pass
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: wall-clock assertions are opt-in (COPILOT_RUN_BENCHMARKS=1)
+# ---------------------------------------------------------------------------
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "benchmark: wall-clock timing test, skipped unless COPILOT_RUN_BENCHMARKS=1",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    import os
+
+    if os.environ.get("COPILOT_RUN_BENCHMARKS", "").lower() in ("1", "true", "yes", "on"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; set COPILOT_RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if item.get_closest_marker("benchmark") is not None:
+            item.add_marker(skip)
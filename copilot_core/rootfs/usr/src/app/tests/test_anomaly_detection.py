@@ -137,6 +137,159 @@ class TestPatternLearning:
         assert corrs[0]["correlation"] < 0
 
 
+class TestCorrelationMatrix:
+    def test_incremental_matches_full_matrix(self, engine):
+        import numpy as np
+        rng = np.random.default_rng(3)
+        base = rng.normal(size=80).cumsum()
+        start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        for k in range(6):
+            noise = rng.normal(size=80) * (k + 1)
+            for i in range(80):
+                engine.ingest(f"sensor.s{k}", float(base[i] * (-1) ** k + noise[i]),
+                              start + timedelta(hours=i))
+        engine.learn_correlations()
+        grid = engine._grid
+        versions = list(grid.versions)
+        # Extra reading inside the latest grid slot: only that row changes
+        engine.ingest("sensor.s2", 99.0, start + timedelta(hours=79, minutes=30))
+        engine.learn_correlations()
+        assert [a != b for a, b in zip(grid.versions, versions)] == [
+            False, False, True, False, False, False]
+        assert grid.slots == 80
+        full = np.nan_to_num(np.corrcoef(grid.rows))
+        assert np.allclose(grid.corr, full)
+
+    def test_sparse_result_keeps_strong_pairs(self, engine):
+        import random
+        random.seed(7)
+        for i in range(100):
+            ts = _ts(100 - i)
+            engine.ingest("sensor.temp", 20.0 + i * 0.1, ts)
+            engine.ingest("sensor.heat", 5.0 + i * 0.2, ts)
+            engine.ingest("sensor.noise", random.random(), ts)
+        engine.learn_correlations()
+        pairs = {(c["entity_a"], c["entity_b"]) for c in engine.get_correlations()}
+        assert pairs == {("sensor.temp", "sensor.heat")}
+        assert engine.get_correlations()[0]["sample_count"] == 100
+
+    def test_detects_reversed_recent_correlation(self, engine):
+        for i in range(100):
+            ts = _ts(130 - i)
+            engine.ingest("sensor.temp", 20.0 + i * 0.1, ts)
+            engine.ingest("sensor.humidity", 60.0 + i * 0.1, ts)
+        engine.learn_correlations()
+        for i in range(30):
+            ts = _ts(30 - i)
+            engine.ingest("sensor.temp", 30.0 + i * 0.1, ts)
+            engine.ingest("sensor.humidity", 70.0 - i * 0.5, ts)
+        anomalies = engine.detect()
+        assert any(a.anomaly_type == "correlation" for a in anomalies)
+
+
+class TestStreamingStatistics:
+    def test_profile_current_without_learning(self, engine):
+        _populate_normal(engine, count=50)
+        profile = engine.get_profile("sensor.temp")
+        assert profile is not None
+        assert profile.total_points == 50
+        engine.ingest("sensor.temp", 80.0, _ts(0))
+        assert engine.get_profile("sensor.temp").max_value == 80.0
+
+    def test_windowed_moments_match_statistics(self):
+        engine = AnomalyDetectionEngine(max_history=60)
+        _populate_normal(engine, count=157)
+        series = engine._history["sensor.temp"]
+        assert len(series) == 60
+        values = [series[i].value for i in range(len(series))]
+        profile = engine.get_profile("sensor.temp")
+        assert profile.global_mean == pytest.approx(statistics.mean(values))
+        assert profile.global_std == pytest.approx(statistics.stdev(values))
+        hours = series.ordered(series.hours).tolist()
+        for hour, mean in profile.hourly_means.items():
+            bucket = [v for v, h in zip(values, hours) if h == hour]
+            assert mean == pytest.approx(statistics.mean(bucket))
+            expected_std = statistics.stdev(bucket) if len(bucket) > 1 else 0.0
+            assert profile.hourly_stds[hour] == pytest.approx(expected_std, abs=1e-9)
+
+    def test_ring_buffer_keeps_order(self):
+        engine = AnomalyDetectionEngine(max_history=5)
+        for i in range(12):
+            engine.ingest("sensor.temp", float(i), _ts(12 - i))
+        series = engine._history["sensor.temp"]
+        assert [series[i].value for i in range(5)] == [7.0, 8.0, 9.0, 10.0, 11.0]
+        assert series[0].timestamp < series[-1].timestamp
+        with pytest.raises(IndexError):
+            series[5]
+
+
+class TestPersistence:
+    def test_restart_restores_history_and_snapshot(self, tmp_path):
+        engine = AnomalyDetectionEngine(max_history=100)
+        engine.attach_store(str(tmp_path), snapshot_interval=0)
+        for i in range(120):
+            ts = _ts(120 - i)
+            engine.ingest("sensor.temp", 20.0 + i * 0.1, ts)
+            engine.ingest("sensor.humidity", 60.0 - i * 0.05, ts)
+        engine.learn_patterns()
+        engine.learn_correlations()
+        engine.close()
+
+        restored = AnomalyDetectionEngine(max_history=100)
+        assert restored.attach_store(str(tmp_path), snapshot_interval=0) == 2
+        series = restored._history["sensor.temp"]
+        assert len(series) == 100
+        assert series[-1].value == pytest.approx(20.0 + 119 * 0.1)
+        assert series[0].timestamp == engine._history["sensor.temp"][0].timestamp
+        before = engine.get_profile("sensor.temp")
+        after = restored.get_profile("sensor.temp")
+        assert after.global_mean == pytest.approx(before.global_mean)
+        assert after.hourly_means == pytest.approx(before.hourly_means)
+        assert restored.get_correlations() == engine.get_correlations()
+
+    def test_shutdown_hook_checkpoints_buffered_readings(self, tmp_path):
+        from copilot_core.core_setup import shutdown_services
+
+        engine = AnomalyDetectionEngine(max_history=100)
+        engine.attach_store(str(tmp_path), snapshot_interval=3600)
+        for i in range(10):
+            engine.ingest("sensor.temp", 20.0 + i, _ts(10 - i))
+        shutdown_services({"hub_anomaly": engine})
+
+        restored = AnomalyDetectionEngine(max_history=100)
+        assert restored.attach_store(str(tmp_path), snapshot_interval=0) == 1
+        assert len(restored._history["sensor.temp"]) == 10
+        restored.close()
+
+    def test_segments_are_compacted(self, tmp_path):
+        from copilot_core.hub.anomaly_store import RECORD, AnomalyHistoryStore
+
+        store = AnomalyHistoryStore(tmp_path, capacity=10)
+        for i in range(35):
+            store.append("sensor.temp", float(i), float(i), 0, 0)
+            store.flush()
+        segment = next(tmp_path.glob("*.seg"))
+        assert segment.stat().st_size <= 20 * RECORD.itemsize
+        records = AnomalyHistoryStore(tmp_path, capacity=10).load()["sensor.temp"]
+        assert records["value"].tolist() == [float(i) for i in range(25, 35)]
+
+    def test_torn_record_is_dropped(self, tmp_path):
+        from copilot_core.hub.anomaly_store import AnomalyHistoryStore
+
+        store = AnomalyHistoryStore(tmp_path, capacity=10)
+        store.append("sensor.temp", 1.0, 1.0, 0, 0)
+        store.flush()
+        segment = next(tmp_path.glob("*.seg"))
+        with open(segment, "ab") as fh:
+            fh.write(b"\x00" * 5)
+        store = AnomalyHistoryStore(tmp_path, capacity=10)
+        assert store.load()["sensor.temp"]["value"].tolist() == [1.0]
+        store.append("sensor.temp", 2.0, 2.0, 0, 0)
+        store.flush()
+        values = AnomalyHistoryStore(tmp_path, capacity=10).load()["sensor.temp"]["value"]
+        assert values.tolist() == [1.0, 2.0]
+
+
 class TestSpikeDetection:
     def test_detect_spike(self, engine):
         _populate_normal(engine, count=100, base=21.0, std=0.5)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for brain graph SVG rendering, render cache and force layout.
+"""
+
+import math
+import time
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+from copilot_core.brain_graph.layout import force_layout
+from copilot_core.brain_graph.render import GraphRenderer
+
+
+def _state(n, kinds=("entity", "zone", "concept", "module")):
+    nodes = [
+        {"id": f"light.n{i}", "kind": kinds[i % len(kinds)], "label": f"Node {i}", "score": float(n - i)}
+        for i in range(n)
+    ]
+    edges = [
+        {"id": f"e{i}", "from": f"light.n{i}", "to": f"light.n{(i * 3 + 1) % n}", "type": "controls", "weight": 1.0}
+        for i in range(n)
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+def _fake_graphviz(args, input, **kwargs):
+    """Stand-in for the Graphviz binary: a grid layout in Graphviz's SVG shape."""
+    ids = [line.split()[0] for line in input.decode().splitlines() if "[label=" in line and "->" not in line]
+    groups = "".join(
+        f'<g id="node{i}" class="node">\n<title>{dot_id}</title>\n'
+        f'<ellipse cx="{i % 5 * 100}" cy="{-(i // 5) * 80}" rx="27" ry="18"/>\n'
+        f'<text text-anchor="middle" x="{i % 5 * 100}" y="{-(i // 5) * 80 + 4}">x</text>\n</g>\n'
+        for i, dot_id in enumerate(ids)
+    )
+
+    class Result:
+        returncode = 0
+        stdout = f'<svg xmlns="http://www.w3.org/2000/svg">{groups}</svg>'.encode()
+        stderr = b""
+
+    return Result()
+
+
+def test_force_layout_warm_start_keeps_positions():
+    """Adding a node barely moves the nodes that were already placed."""
+    state = _state(20)
+    ids = [n["id"] for n in state["nodes"]]
+    edges = [(e["from"], e["to"], e["weight"]) for e in state["edges"]]
+    cold = force_layout(ids, edges)
+    assert cold == force_layout(ids, edges)  # deterministic per node set
+
+    warm = force_layout(ids + ["light.new"], edges + [("light.new", "light.n0", 1.0)], initial=cold)
+    xs = [p[0] for p in cold.values()]
+    span = max(xs) - min(xs)
+    drift = max(math.dist(cold[i], warm[i]) for i in ids)
+    assert drift < 0.25 * span
+    assert math.dist(warm["light.new"], warm["light.n0"]) < 0.5 * span
+
+
+def test_render_cache_and_incremental_relayout():
+    """Graphviz runs once per view; small changes relayout in-process."""
+    renderer = GraphRenderer()
+    view = ((), (), None, 1, 120, 300)
+    with patch("copilot_core.brain_graph.render.subprocess.run", side_effect=_fake_graphviz) as run:
+        first = renderer.render_svg(_state(20), layout="neato", view=view)
+        assert run.call_count == 1
+        assert renderer.render_svg(_state(20), layout="neato", view=view) == first
+
+        svg = renderer.render_svg(_state(21), layout="neato", view=view)
+        assert run.call_count == 1  # warm-started, no subprocess
+        root = ET.fromstring(svg)
+        titles = [el.text for el in root.iter("{http://www.w3.org/2000/svg}title")]
+        assert len(titles) == 21
+
+        renderer.render_svg(_state(60), layout="neato", view=view)
+        assert run.call_count == 2  # too many new nodes: full re-render
+
+        renderer.render_svg(_state(10), layout="force", view=view)
+        assert run.call_count == 2
+
+    stats = renderer.get_stats()
+    assert stats["incremental"] == 1 and stats["graphviz"] == 2 and stats["hits"] == 1
+
+
+def test_render_without_graphviz():
+    """Force layouts render in-process; dot reports an error and is not cached."""
+    renderer = GraphRenderer()
+    with patch("copilot_core.brain_graph.render.subprocess.run", side_effect=FileNotFoundError("dot")):
+        svg = renderer.render_svg(_state(8), layout="fdp", view="all")
+        assert b"<ellipse" in svg
+        error = renderer.render_svg(_state(8), layout="dot", view="all")
+        assert b"Graph rendering unavailable" in error
+        assert renderer.render_svg(_state(8), layout="fdp", view="all") == svg
+        assert renderer.render_svg(_state(8), layout="dot", view="all") == error
+    assert renderer.get_stats()["hits"] == 1  # errors are not cached
+
+
+def test_render_cache_keys_on_drawn_content():
+    """Unrelated changes and invisible decay hit the cache; stale entries expire."""
+    renderer = GraphRenderer(cache_ttl=60.0)
+    state = _state(8)
+    with patch("copilot_core.brain_graph.render.subprocess.run", side_effect=_fake_graphviz) as run:
+        first = renderer.render_svg(state, layout="dot", view="all")
+        decayed = {
+            "nodes": [{**n, "score": n["score"] * 0.99} for n in state["nodes"]],
+            "edges": state["edges"],
+        }
+        assert renderer.render_svg(decayed, layout="dot", view="all") == first
+        assert run.call_count == 1
+
+        # Scores are drawn with label=full, so visible decay re-renders there
+        renderer.render_svg(state, layout="dot", label_style="full", view="all")
+        renderer.render_svg(decayed, layout="dot", label_style="full", view="all")
+        assert run.call_count == 3
+
+        relabeled = {"nodes": [{**state["nodes"][0], "label": "Renamed"}] + state["nodes"][1:],
+                     "edges": state["edges"]}
+        renderer.render_svg(relabeled, layout="dot", view="all")
+        assert run.call_count == 4
+
+        with patch("copilot_core.brain_graph.render.time.monotonic", return_value=time.monotonic() + 61):
+            renderer.render_svg(state, layout="dot", view="all")
+        assert run.call_count == 5
@@ -289,3 +289,623 @@ def test_ha_service_call_processing():
         # Check that affects edges were created
         edges = store.get_edges(from_node="ha.service:light.turn_on")
         assert len(edges) >= 2
+
+
+def _counting_store(tmp_dir):
+    """Store that records how many write transactions it sees."""
+    store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+    calls = {"upsert_many": 0, "upsert_node": 0, "upsert_edge": 0}
+    for name in calls:
+        original = getattr(store, name)
+
+        def counted(*args, _name=name, _original=original, **kwargs):
+            calls[_name] += 1
+            return _original(*args, **kwargs)
+
+        setattr(store, name, counted)
+    return store, calls
+
+
+def test_batch_buffers_writes_until_commit():
+    """Touches inside a batch accumulate in memory and flush in one transaction."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store, calls = _counting_store(tmp_dir)
+        service = BrainGraphService(store=store)
+
+        service.begin_batch(size=1000)
+        for i in range(1000):
+            service.touch_node(f"ha.entity:light.l{i % 50}", label="L", kind="entity", delta=1.0)
+            service.link(f"ha.entity:light.l{i % 50}", "in_zone", "zone:kitchen")
+
+        assert store.get_node("ha.entity:light.l0") is None
+        assert calls["upsert_many"] == 0
+
+        service.commit_batch()
+
+        assert calls == {"upsert_many": 1, "upsert_node": 0, "upsert_edge": 0}
+        node = store.get_node("ha.entity:light.l0")
+        assert node.score == pytest.approx(20.0, rel=1e-3)  # 20 accumulated touches
+        edges = store.get_edges(to_node="zone:kitchen")
+        assert len(edges) == 50
+        assert service.get_stats()["write_behind"]["flushed_nodes"] == 50
+
+
+def test_rollback_discards_buffered_writes():
+    """Rolling back a batch drops its buffered writes."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+        service.touch_node("keep", label="Keep", kind="entity")
+
+        service.begin_batch()
+        service.touch_node("keep", delta=5.0)
+        service.touch_node("drop", label="Drop", kind="entity")
+        service.rollback_batch()
+        service.flush()
+
+        assert store.get_node("drop") is None
+        assert store.get_node("keep").score == pytest.approx(1.0, rel=1e-3)
+
+
+def test_batch_reads_see_buffered_edges():
+    """Service-call processing inside a batch sees zone edges buffered earlier."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+
+        service.begin_batch()
+        service.process_ha_event({
+            "event_type": "state_changed",
+            "data": {"entity_id": "light.kitchen_main", "new_state": {"state": "on"}},
+        })
+        service.process_ha_event({
+            "event_type": "call_service",
+            "data": {"domain": "light", "service": "turn_on",
+                     "service_data": {"entity_id": "light.kitchen_main"}},
+        })
+        service.commit_batch()
+
+        targets = {e.to_node for e in store.get_edges(from_node="ha.service:light.turn_on")}
+        assert targets == {"ha.entity:light.kitchen_main", "zone:kitchen"}
+
+
+def test_timed_write_behind_flushes_in_background():
+    """With flush_interval_seconds set, non-batch touches are flushed by a timer."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store, calls = _counting_store(tmp_dir)
+        service = BrainGraphService(store=store, flush_interval_seconds=0.05)
+        try:
+            for i in range(20):
+                service.touch_node(f"n{i}", label="N", kind="entity")
+            deadline = time.time() + 2
+            while store.get_node("n19") is None and time.time() < deadline:
+                time.sleep(0.01)
+            assert store.get_node("n19") is not None
+            assert calls["upsert_many"] <= 2
+        finally:
+            service.close()
+
+
+def test_max_pending_writes_forces_flush():
+    """The buffer is bounded: reaching max_pending_writes flushes mid-batch."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store, calls = _counting_store(tmp_dir)
+        service = BrainGraphService(store=store, max_pending_writes=10)
+
+        service.begin_batch()
+        for i in range(25):
+            service.touch_node(f"n{i}", label="N", kind="entity")
+        assert calls["upsert_many"] == 2
+        service.commit_batch()
+        assert store.get_stats()["nodes"] == 25
+
+
+def test_rollback_keeps_concurrent_writes_and_reports_forced_flush():
+    """Rollback drops only the batch thread's writes; flushed ones stay."""
+    import threading
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+
+        service.begin_batch()
+        service.touch_node("batch", label="Batch", kind="entity")
+        other = threading.Thread(
+            target=service.touch_node, args=("other",), kwargs={"label": "Other", "kind": "entity"}
+        )
+        other.start()
+        other.join()
+        result = service.rollback_batch()
+
+        assert result == {"discarded": 1, "partially_persisted": False}
+        assert store.get_node("batch") is None
+        assert store.get_node("other") is not None
+
+        small = BrainGraphService(store=store, max_pending_writes=3)
+        small.begin_batch()
+        for i in range(4):
+            small.touch_node(f"n{i}", label="N", kind="entity")
+        result = small.rollback_batch()
+        assert result == {"discarded": 1, "partially_persisted": True}
+        assert [store.get_node(f"n{i}") is not None for i in range(4)] == [True] * 3 + [False]
+
+
+def _legacy_graph_edges(store, nodes):
+    """Pre-batching edge gathering: one get_edges per node + list membership."""
+    node_ids = {node.id for node in nodes}
+    all_edges = []
+    for node in nodes:
+        for edge in store.get_edges(from_node=node.id):
+            if edge.to_node in node_ids and edge not in all_edges:
+                all_edges.append(edge)
+    return all_edges
+
+
+def _large_graph_service(tmp_dir):
+    """Service over a 10,000-node, ~30,000-edge random graph."""
+    import random
+    from copilot_core.brain_graph.model import GraphNode, GraphEdge
+
+    store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"), max_nodes=10_000, max_edges=30_000)
+    service = BrainGraphService(store=store)
+    rnd = random.Random(7)
+    now_ms = int(time.time() * 1000)
+    nodes = [GraphNode(id=f"n{i}", kind="entity", label=f"N{i}", updated_at_ms=now_ms,
+                       score=rnd.random() * 10) for i in range(10_000)]
+    edges = {}
+    for i in range(10_000):
+        for _ in range(3):
+            j = rnd.randrange(10_000)
+            edge_id = GraphEdge.create_id(f"n{i}", "controls", f"n{j}")
+            edges[edge_id] = GraphEdge(id=edge_id, from_node=f"n{i}", to_node=f"n{j}",
+                                       edge_type="controls", updated_at_ms=now_ms, weight=1.0)
+    store.upsert_many(nodes, edges.values())
+    return store, service
+
+
+def test_graph_state_matches_legacy_edges():
+    """get_graph_state selects the same edges as the legacy per-node path.
+
+    The HTTP endpoints cap limitNodes at 500; 2,000 and 10,000 exercise the
+    service directly. The legacy path is compared up to 2,000 nodes (at
+    10,000 its quadratic dedup takes minutes).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store, service = _large_graph_service(tmp_dir)
+        for limit in (500, 2_000):
+            state = service.get_graph_state(limit_nodes=limit)
+            legacy = _legacy_graph_edges(store, store.get_nodes(limit=limit))
+            assert {e["id"] for e in state["edges"]} == {e.id for e in legacy}
+        assert len(service.get_graph_state(limit_nodes=10_000)["nodes"]) == 10_000
+
+
+@pytest.mark.benchmark
+def test_graph_state_benchmark():
+    """get_graph_state at 2,000 nodes beats the legacy edge gathering alone."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store, service = _large_graph_service(tmp_dir)
+        service.get_graph_state(limit_nodes=500)  # warm-up: loads the snapshot
+        start = time.perf_counter()
+        service.get_graph_state(limit_nodes=2_000)
+        new_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        _legacy_graph_edges(store, store.get_nodes(limit=2_000))
+        legacy_ms = (time.perf_counter() - start) * 1000
+        assert new_ms < legacy_ms
+
+
+def test_query_cache_tags_and_generation():
+    """Tag invalidation is selective; a generation bump retires everything."""
+    from copilot_core.performance import QueryCache
+
+    cache = QueryCache(max_size=10)
+    cache.set("a", 1, tags=["view:entity|light"])
+    cache.set("b", 2, tags=["view:entity|sensor"])
+    assert cache.get("a") == 1
+
+    assert cache.invalidate_tags(["view:entity|light"]) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    tag_stats = cache.get_tag_stats()
+    assert tag_stats["view:entity|light"]["invalidations"] == 1
+    assert tag_stats["view:entity|sensor"]["hits"] == 1
+
+    cache.bump_generation()
+    assert cache.get("b") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_bounded_cache_memory_budget():
+    """Caches sharing a budget evict the globally least recently used entry."""
+    from copilot_core.performance import BoundedQueryCache, MemoryBudget, estimate_size
+
+    budget = MemoryBudget(max_bytes=3 * estimate_size("x" * 1000) + 100)
+    first = BoundedQueryCache(budget=budget, name="first")
+    second = BoundedQueryCache(budget=budget, name="second")
+    first.set("a", "a" * 1000)
+    time.sleep(0.01)
+    second.set("b", "b" * 1000)
+    time.sleep(0.01)
+    first.set("c", "c" * 1000)
+    time.sleep(0.01)
+    first.get("a")  # now "b" is the oldest access
+    second.set("d", "d" * 1000)
+
+    assert second.get("b") is None
+    assert first.get("a") is not None and first.get("c") is not None
+    assert budget.used_bytes <= budget.max_bytes
+    assert budget.get_stats()["caches"] == {"first": first.bytes, "second": second.bytes}
+
+    local = BoundedQueryCache(max_bytes=estimate_size("x" * 1000) + 10)
+    local.set("a", "a" * 1000)
+    local.set("b", "b" * 1000)
+    assert local.get("a") is None and local.get_stats()["byte_evictions"] == 1
+
+
+def test_memory_budget_reads_bytes_under_cache_lock():
+    """The budget waits for a cache mid-update instead of reading a torn counter."""
+    import threading
+    from copilot_core.performance import BoundedQueryCache, MemoryBudget
+
+    budget = MemoryBudget(max_bytes=10_000)
+    cache = BoundedQueryCache(budget=budget, name="only")
+    cache.set("a", "a" * 100)
+    before = cache.bytes
+
+    results = []
+    with cache._lock:
+        reader = threading.Thread(target=lambda: results.append(budget.used_bytes))
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive() and results == []
+        cache._bytes += 1000  # a put in progress
+    reader.join(5)
+    assert results == [before + 1000]
+
+
+def test_bounded_cache_coalescing_and_stale_refresh():
+    """Concurrent misses load once; expired values are served while refreshing."""
+    import threading
+    from copilot_core.performance import BoundedQueryCache
+
+    cache = BoundedQueryCache(default_ttl=0.3, stale_ttl=10.0)
+    calls = []
+    release = threading.Event()
+
+    def slow_load():
+        calls.append(1)
+        release.wait(2)
+        return len(calls)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow_load)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [1] * 5 and len(calls) == 1
+    assert cache.get_stats()["coalesced"] == 4
+
+    time.sleep(0.4)  # expired, still within the stale window
+    assert cache.get_or_compute("k", slow_load) == 1
+    deadline = time.time() + 2
+    while cache.get_stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_compute("k", slow_load) == 2
+
+    # Invalidated entries are never served stale
+    cache.set("t", "old", tags=["node:x"])
+    cache.invalidate_tags(["node:x"])
+    assert cache.get_or_compute("t", lambda: "new") == "new"
+
+
+def test_bounded_cache_drops_loads_invalidated_in_flight():
+    """A load that snapshots its input before an invalidation is not cached."""
+    import threading
+
+    from copilot_core.performance import BoundedQueryCache
+
+    cache = BoundedQueryCache(default_ttl=0.2, stale_ttl=10.0)
+    data = {"value": "old"}
+    started, release = threading.Event(), threading.Event()
+
+    def snapshot_load():
+        seen = data["value"]
+        started.set()
+        release.wait(5)
+        return f"snap-of-{seen}"
+
+    def load_in_background():
+        thread = threading.Thread(target=lambda: cache.get_or_compute("k", snapshot_load, tags=["node:x"]))
+        thread.start()
+        assert started.wait(5)
+        return thread
+
+    # Tag invalidation while the leader's loader runs
+    thread = load_in_background()
+    data["value"] = "new"
+    cache.invalidate_tags(["node:x"])
+    release.set()
+    thread.join()
+    assert cache.get_or_compute("k", snapshot_load, tags=["node:x"]) == "snap-of-new"
+    assert cache.get_stats()["discarded_loads"] == 1
+
+    # Generation bump while a stale-while-revalidate refresh runs
+    started.clear(), release.clear()
+    time.sleep(0.3)
+    data["value"] = "newer"
+    assert cache.get_or_compute("k", snapshot_load, tags=["node:x"]) == "snap-of-new"  # stale
+    assert started.wait(5)
+    data["value"] = "newest"
+    cache.bump_generation()
+    release.set()
+    deadline = time.time() + 2
+    while cache.get_stats()["discarded_loads"] < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get_stats()["refreshes"] == 0
+    assert cache.get_or_compute("k", lambda: "fresh") == "fresh"
+
+
+def test_touch_invalidates_only_dependent_views():
+    """A light node touch leaves cached sensor views alone."""
+    from copilot_core.performance import brain_graph_cache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+        service.touch_node("light.kitchen", label="Kitchen", kind="entity", domain="light")
+        service.touch_node("sensor.temp", label="Temp", kind="entity", domain="sensor")
+        service.touch_node("zone:kitchen", label="Kitchen", kind="zone")
+
+        brain_graph_cache.clear()
+        views = {
+            "light": (["entity"], ["light"], None),
+            "sensor": (["entity"], ["sensor"], None),
+            "zone": (["zone"], None, None),
+            "around_zone": (None, None, "zone:kitchen"),
+        }
+        for name, (kinds, domains, center) in views.items():
+            body, tags = service.get_graph_state_json(kinds=kinds, domains=domains, center_node=center)
+            brain_graph_cache.set(name, body, tags=tags)
+
+        service.touch_node("light.kitchen", delta=1.0)
+        assert brain_graph_cache.get("light") is None
+        assert brain_graph_cache.get("sensor") is not None
+        assert brain_graph_cache.get("zone") is not None
+        assert brain_graph_cache.get("around_zone") is not None
+
+        # An edge invalidates views containing either endpoint
+        service.touch_edge("sensor.temp", "in_zone", "zone:kitchen")
+        assert brain_graph_cache.get("sensor") is None
+        assert brain_graph_cache.get("zone") is None
+        assert brain_graph_cache.get("around_zone") is None
+        brain_graph_cache.clear()
+
+
+def _without_scores(state):
+    """Graph state minus the time-dependent parts."""
+    return (
+        sorted((n["id"], n["kind"], n["domain"], n["label"]) for n in state["nodes"]),
+        sorted((e["id"], e["from"], e["to"], e["type"]) for e in state["edges"]),
+    )
+
+
+def test_snapshot_matches_store_state():
+    """The in-memory snapshot serves the same views as the store path."""
+    import json
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+        for i in range(30):
+            domain = "light" if i % 2 else "sensor"
+            service.touch_node(f"{domain}.e{i}", delta=1.0 + i, label=f"E{i}", kind="entity", domain=domain)
+        service.touch_node("zone:kitchen", label="Kitchen", kind="zone")
+        for i in range(0, 30, 3):
+            domain = "light" if i % 2 else "sensor"
+            service.touch_edge(f"{domain}.e{i}", "in_zone", "zone:kitchen", delta=0.5 + i)
+
+        views = [
+            {},
+            {"kinds": ["entity"], "domains": ["light"], "limit_nodes": 5},
+            {"center_node": "zone:kitchen", "hops": 1},
+            {"center_node": "zone:kitchen", "limit_nodes": 4, "limit_edges": 2},
+        ]
+        for view in views:
+            memory = service.get_graph_state(**view)
+            from_store = service._store_graph_state(
+                view.get("kinds"), view.get("domains"), view.get("center_node"),
+                view.get("hops", 1), view.get("limit_nodes"), view.get("limit_edges"),
+            )
+            assert _without_scores(memory) == _without_scores(from_store)
+            body, tags = service.get_graph_state_json(**view)
+            assert _without_scores(json.loads(body)) == _without_scores(memory)
+            assert {f"node:{n['id']}" for n in memory["nodes"]} <= set(tags)
+
+        # Filtered views are ordered by decayed salience
+        scores = [n["score"] for n in service.get_graph_state(kinds=["entity"])["nodes"]]
+        assert scores == sorted(scores, reverse=True)
+        assert service.get_stats()["snapshot"]["loaded"]
+
+
+def test_snapshot_and_store_pick_same_top_nodes():
+    """limit_nodes selects by decayed score on both paths, not raw score."""
+    from copilot_core.brain_graph.model import GraphNode
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+        now_ms = int(time.time() * 1000)
+        day_ms = 24 * 3600 * 1000
+        # Stale nodes with high raw scores, fresh ones with low raw scores
+        nodes = [
+            GraphNode(id=f"stale{i}", kind="entity", label=f"S{i}", domain="light",
+                      updated_at_ms=now_ms - 4 * day_ms, score=8.0 + i)
+            for i in range(6)
+        ] + [
+            GraphNode(id=f"fresh{i}", kind="entity", label=f"F{i}", domain="light",
+                      updated_at_ms=now_ms, score=1.0 + i * 0.1)
+            for i in range(6)
+        ] + [
+            GraphNode(id=f"tie{i}", kind="entity", label=f"T{i}", domain="sensor",
+                      updated_at_ms=now_ms, score=1.0)
+            for i in range(4)
+        ]
+        store.upsert_many(nodes, [])
+
+        for view in ({"limit_nodes": 5}, {"limit_nodes": 8}, {"domains": ["sensor"], "limit_nodes": 2}):
+            memory = service.get_graph_state(**view)
+            from_store = service._store_graph_state(None, view.get("domains"), None, 1, view["limit_nodes"], None)
+            assert [n["id"] for n in memory["nodes"]] == [n["id"] for n in from_store["nodes"]]
+        assert service.get_stats()["snapshot"]["loaded"]
+        top = [n["id"] for n in service.get_graph_state(limit_nodes=5)["nodes"]]
+        assert top == [f"fresh{i}" for i in range(5, 0, -1)]
+
+
+def test_snapshot_touch_is_served_without_database():
+    """Touches patch the loaded snapshot; polling does not read the store."""
+    from unittest.mock import patch
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store, flush_interval_seconds=3600)
+        service.touch_node("light.a", label="A", kind="entity", domain="light")
+        service.get_graph_state()  # loads the snapshot
+
+        service.touch_node("light.b", delta=5.0, label="B", kind="entity", domain="light")
+        service.touch_edge("light.a", "controls", "light.b")
+        with patch.object(store, "_reader", side_effect=AssertionError("store read")), \
+                patch.object(service, "flush", side_effect=AssertionError("flush")):
+            state = service.get_graph_state(limit_nodes=1)
+            assert [n["id"] for n in state["nodes"]] == ["light.b"]
+            state = service.get_graph_state()
+            assert len(state["edges"]) == 1
+        service.close()
+
+        # A rollback discards the batch from the snapshot as well
+        service.begin_batch()
+        service.touch_node("light.c", label="C", kind="entity", domain="light")
+        service.rollback_batch()
+        assert "light.c" not in {n["id"] for n in service.get_graph_state()["nodes"]}
+
+
+def test_snapshot_falls_back_to_store_when_oversized():
+    """Graphs beyond the snapshot capacity are read from the store."""
+    from copilot_core.brain_graph.model import GraphNode
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"), max_nodes=5)
+        service = BrainGraphService(store=store)
+        now_ms = int(time.time() * 1000)
+        store.upsert_many(
+            [GraphNode(id=f"n{i}", kind="entity", label=f"N{i}", updated_at_ms=now_ms, score=1.0)
+             for i in range(30)],
+            [],
+        )
+        state = service.get_graph_state()
+        assert len(state["nodes"]) == 30
+        stats = service.get_stats()["snapshot"]
+        assert not stats["loaded"] and stats["fallbacks"] == 1
+
+        service.prune_now()
+        assert len(service.get_graph_state()["nodes"]) == 5
+        assert service.get_stats()["snapshot"]["loaded"]
+
+
+def test_sse_stream_coalesces_bursts_into_batches():
+    """A burst of touches becomes one frame with the latest state per node."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = GraphStore(db_path=os.path.join(tmp_dir, "test.db"))
+        service = BrainGraphService(store=store)
+        service._sse.flush_interval = 0.0
+        subscriber = service.subscribe_sse()
+        for _ in range(50):
+            service.touch_node("light.a", label="A", kind="entity", domain="light")
+            service.touch_node("light.b", label="B", kind="entity", domain="light")
+        service.touch_edge("light.a", "controls", "light.b")
+
+        frame = subscriber.next_frame(timeout=1.0)
+        assert frame["seq"] == 101
+        assert [e["event"] for e in frame["events"]] == ["node_updated", "node_updated", "edge_updated"]
+        assert frame["events"][0]["data"]["score"] == pytest.approx(50.0, rel=1e-3)
+        assert subscriber.next_frame(timeout=0.01) is None
+        service.unsubscribe_sse(subscriber)
+
+
+def test_sse_endpoint_per_event_and_batched_frames():
+    """/stream sends one message per event by default, one per batch with ?batch=1."""
+    import json
+    from flask import Flask
+    from copilot_core.brain_graph import api as graph_api
+
+    def read_messages(response, count):
+        messages, buffer = [], ""
+        for chunk in response.response:
+            buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+            while "\n\n" in buffer and len(messages) < count:
+                message, buffer = buffer.split("\n\n", 1)
+                fields = dict(line.split(": ", 1) for line in message.splitlines())
+                messages.append((fields.get("id"), json.loads(fields["data"])))
+            if len(messages) >= count:
+                return messages
+        return messages
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        service = BrainGraphService(store=GraphStore(db_path=os.path.join(tmp_dir, "test.db")))
+        service._sse.flush_interval = 0.0
+        app = Flask(__name__)
+        app.register_blueprint(graph_api.brain_graph_bp)
+        previous = graph_api._brain_graph_service
+        graph_api.init_brain_graph_api(service)
+        client = app.test_client()
+
+        try:
+            for query, expected in (("", 3), ("?batch=1", 2)):
+                response = client.get(f"/api/v1/graph/stream{query}", buffered=False)
+                service.touch_node("light.a", label="A", kind="entity", domain="light")
+                service.touch_node("light.b", label="B", kind="entity", domain="light")
+                messages = read_messages(response, expected)
+                response.close()
+
+                assert messages[0][1]["event"] == "connected"
+                last_id = str(service._sse.seq)
+                if query:
+                    event_id, batch = messages[1]
+                    assert batch["event"] == "batch" and event_id == last_id
+                    assert [e["data"]["id"] for e in batch["events"]] == ["light.a", "light.b"]
+                else:
+                    (first_id, first), (second_id, second) = messages[1:]
+                    assert (first["event"], first["data"]["id"]) == ("node_updated", "light.a")
+                    assert {"data", "timestamp_ms", "seq"} <= set(first)
+                    assert first_id is None and second_id == last_id
+        finally:
+            graph_api._brain_graph_service = previous
+
+
+def test_sse_stream_resume_and_resync():
+    """Last-Event-ID replays missed events; overflow and stale ids resync."""
+    from copilot_core.brain_graph.stream import GraphEventStream
+
+    stream = GraphEventStream(flush_interval_ms=0, replay_size=10, max_pending=3)
+    for i in range(5):
+        stream.publish("node_updated", {"id": f"n{i}"})
+
+    resumed = stream.subscribe(last_event_id=3)
+    frame = resumed.next_frame(timeout=1.0)
+    assert [e["data"]["id"] for e in frame["events"]] == ["n3", "n4"]
+    assert frame["seq"] == 5
+
+    for i in range(20):
+        stream.publish("node_updated", {"id": f"n{i}"})
+    assert resumed.next_frame(timeout=1.0) == {"seq": 25, "resync": True}
+
+    stale = stream.subscribe(last_event_id=2)  # no longer in the replay log
+    assert stale.next_frame(timeout=1.0)["resync"]
+    assert stream.subscribe(last_event_id=99).resync  # from before a restart
+    assert stream.get_stats()["resyncs"] == 3
@@ -114,6 +114,31 @@ class TestBrainGraphStore(unittest.TestCase):
         self.assertEqual(len(stored), 1)
         self.assertEqual(stored[0].edge_type, "controls")
 
+    def test_store_upsert_many(self):
+        """Test upsert_many writes nodes and edges in one call."""
+        if BrainGraphStore is None:
+            self.skipTest("BrainGraphStore not available")
+        store = BrainGraphStore(db_path=self.tmpdb)
+
+        nodes = [
+            GraphNode(id=f"test:n{i}", kind="entity", label=f"N{i}",
+                      updated_at_ms=1234567890, score=1.0, meta={"i": i})
+            for i in range(3)
+        ]
+        edges = [
+            GraphEdge(
+                id=GraphEdge.create_id("test:n0", "controls", f"test:n{i}"),
+                from_node="test:n0", to_node=f"test:n{i}", edge_type="controls",
+                updated_at_ms=1234567890, weight=0.5,
+            )
+            for i in (1, 2)
+        ]
+
+        self.assertEqual(store.upsert_many(nodes, edges), (3, 2))
+        self.assertEqual(store.upsert_many(), (0, 0))
+        self.assertEqual(store.get_node("test:n2").meta, {"i": 2})
+        self.assertEqual(len(store.get_edges(from_node="test:n0")), 2)
+
     def test_store_get_node(self):
         """Test get_node method."""
         if BrainGraphStore is None:
@@ -225,6 +250,232 @@ class TestBrainGraphStore(unittest.TestCase):
             fallback_tmp.cleanup()
 
 
+class TestBrainGraphStoreConnections(unittest.TestCase):
+    """Test long-lived writer/reader connections."""
+
+    def setUp(self):
+        if BrainGraphStore is None:
+            self.skipTest("BrainGraphStore not available")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = BrainGraphStore(db_path=os.path.join(self.tmpdir.name, "graph.db"), max_readers=2)
+        self.addCleanup(self.store.close)
+
+    def test_connections_are_reused(self):
+        """Many operations share one writer and at most max_readers readers."""
+        for i in range(50):
+            self.store.upsert_node(GraphNode(
+                id=f"n{i}", kind="entity", label="N", updated_at_ms=1, score=1.0,
+            ))
+            self.store.get_node(f"n{i}")
+        self.store.get_neighborhood("n0", hops=2)
+
+        stats = self.store.pool_stats()
+        self.assertEqual(stats["writer"]["created"], 1)
+        self.assertEqual(stats["readers"]["created"], 1)
+        self.assertGreaterEqual(stats["readers"]["acquired"], 50)
+        self.assertEqual(stats["readers"]["active_count"], 0)
+
+    def test_concurrent_readers_and_writer(self):
+        """Readers on other threads see committed writes under WAL."""
+        import threading
+
+        errors = []
+
+        def read_loop():
+            try:
+                for _ in range(100):
+                    self.store.get_nodes(limit=10)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=read_loop) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for i in range(100):
+            self.store.upsert_node(GraphNode(
+                id=f"c{i}", kind="entity", label="C", updated_at_ms=1, score=1.0,
+            ))
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.store.get_stats()["nodes"], 100)
+        self.assertLessEqual(self.store.pool_stats()["readers"]["created"], 2)
+
+    def test_pools_are_registered_for_performance_api(self):
+        """Graph pools appear in the performance pool stats."""
+        from copilot_core.performance import get_connection_pool_stats
+
+        pools = get_connection_pool_stats()
+        self.assertIn("brain_graph_writer", pools)
+        self.assertEqual(pools["brain_graph_readers"]["max_connections"], 2)
+
+
+class TestBrainGraphStorePruning(unittest.TestCase):
+    """Test index-driven, sliced pruning."""
+
+    HOUR_MS = 3600 * 1000
+
+    def setUp(self):
+        if BrainGraphStore is None:
+            self.skipTest("BrainGraphStore not available")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.tmpdb = os.path.join(self.tmpdir.name, "graph.db")
+        self.now = int(time.time() * 1000)
+
+    def _node(self, node_id, score=1.0, age_hours=0.0):
+        return GraphNode(id=node_id, kind="entity", label=node_id,
+                         updated_at_ms=self.now - int(age_hours * self.HOUR_MS), score=score)
+
+    def _edge(self, src, dst, weight=1.0, age_hours=0.0):
+        return GraphEdge(id=GraphEdge.create_id(src, "controls", dst), from_node=src, to_node=dst,
+                         edge_type="controls", updated_at_ms=self.now - int(age_hours * self.HOUR_MS),
+                         weight=weight)
+
+    def _degrees(self, store):
+        with store._reader() as conn:
+            return {row[0]: row[1] for row in conn.execute("SELECT id, degree FROM nodes")}
+
+    def test_degree_column_tracks_edges(self):
+        store = BrainGraphStore(db_path=self.tmpdb)
+        store.upsert_many([self._node("a"), self._node("b")], [self._edge("a", "b"), self._edge("a", "c")])
+        store.upsert_node(self._node("c"))  # endpoint created after its edge
+        store.upsert_node(self._node("a", score=3.0))  # update keeps degree
+        store.upsert_edge(self._edge("a", "b", weight=2.0))  # update, not a new edge
+        self.assertEqual(self._degrees(store), {"a": 2, "b": 1, "c": 1})
+
+        with store._writer() as conn:
+            conn.execute("DELETE FROM edges WHERE to_node = 'c'")
+        self.assertEqual(self._degrees(store), {"a": 1, "b": 1, "c": 0})
+
+    def test_prune_uses_decayed_scores(self):
+        store = BrainGraphStore(db_path=self.tmpdb, node_min_score=0.5, edge_min_weight=0.5)
+        store.upsert_many(
+            [
+                self._node("fresh", score=1.0),
+                self._node("stale", score=1.0, age_hours=48),   # 0.25 after two half-lives
+                self._node("linked", score=1.0, age_hours=48),  # kept: still has an edge
+                self._node("peer", score=1.0),
+            ],
+            [
+                self._edge("linked", "peer", weight=1.0),
+                self._edge("fresh", "peer", weight=1.0, age_hours=24),  # 0.25 → removed
+            ],
+        )
+
+        stats = store.prune_graph(self.now)
+
+        self.assertEqual((stats["nodes_removed"], stats["edges_removed"]), (1, 1))
+        self.assertIsNone(store.get_node("stale"))
+        self.assertIsNotNone(store.get_node("linked"))
+        self.assertEqual(len(store.get_edges()), 1)
+
+    def test_prune_enforces_capacity_by_decayed_score(self):
+        store = BrainGraphStore(db_path=self.tmpdb, max_nodes=5, max_edges=3, node_min_score=0.0)
+        store.upsert_many(
+            [self._node(f"n{i}", score=1.0 + i) for i in range(10)],
+            [self._edge("n9", f"n{i}", weight=1.0 + i) for i in range(5, 9)],
+        )
+
+        stats = store.prune_graph(self.now)
+
+        kept = {n.id for n in store.get_nodes()}
+        self.assertEqual(kept, {"n5", "n6", "n7", "n8", "n9"})
+        self.assertEqual(stats["nodes_removed"], 5)
+        self.assertEqual({e.to_node for e in store.get_edges()}, {"n6", "n7", "n8"})
+
+    def test_prune_runs_in_bounded_slices(self):
+        store = BrainGraphStore(db_path=self.tmpdb, max_nodes=10, prune_batch=7, prune_budget_ms=1)
+        store.upsert_many([self._node(f"n{i}", score=1.0 + i) for i in range(100)])
+
+        with patch("copilot_core.brain_graph.store.time.monotonic", side_effect=range(10_000)):
+            stats = store.prune_graph(self.now)
+
+        self.assertEqual(stats["nodes_removed"], 90)
+        self.assertGreater(stats["slices"], 1)
+        self.assertEqual(store.get_stats()["nodes"], 10)
+
+    def test_migrates_databases_without_prune_columns(self):
+        import sqlite3
+
+        conn = sqlite3.connect(self.tmpdb)
+        conn.executescript("""
+            CREATE TABLE nodes (id TEXT PRIMARY KEY, kind TEXT NOT NULL, label TEXT NOT NULL,
+                updated_at_ms INTEGER NOT NULL, score REAL NOT NULL, domain TEXT,
+                source_json TEXT, tags_json TEXT, meta_json TEXT);
+            CREATE TABLE edges (id TEXT PRIMARY KEY, from_node TEXT NOT NULL, to_node TEXT NOT NULL,
+                edge_type TEXT NOT NULL, updated_at_ms INTEGER NOT NULL, weight REAL NOT NULL,
+                evidence_json TEXT, meta_json TEXT);
+        """)
+        old = self.now - 72 * self.HOUR_MS
+        conn.execute("INSERT INTO nodes VALUES ('old', 'entity', 'Old', ?, 1.0, NULL, NULL, NULL, NULL)", (old,))
+        conn.execute("INSERT INTO nodes VALUES ('hub', 'entity', 'Hub', ?, 1.0, NULL, NULL, NULL, NULL)", (self.now,))
+        conn.execute("INSERT INTO edges VALUES ('e1', 'hub', 'hub2', 'controls', ?, 1.0, NULL, NULL)", (self.now,))
+        conn.commit()
+        conn.close()
+
+        store = BrainGraphStore(db_path=self.tmpdb, node_min_score=0.5)
+        self.assertEqual(self._degrees(store), {"old": 0, "hub": 1})
+
+        store.prune_graph(self.now)
+        self.assertIsNone(store.get_node("old"))
+        self.assertIsNotNone(store.get_node("hub"))
+
+
+class TestBrainGraphStoreInducedEdges(unittest.TestCase):
+    """Test get_induced_edges for inline and temp-table node sets."""
+
+    def setUp(self):
+        if BrainGraphStore is None:
+            self.skipTest("BrainGraphStore not available")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = BrainGraphStore(db_path=os.path.join(self.tmpdir.name, "graph.db"),
+                                     max_readers=1)
+        nodes = [GraphNode(id=f"n{i}", kind="entity", label="N", updated_at_ms=1, score=1.0)
+                 for i in range(1000)]
+        edges = [
+            GraphEdge(id=GraphEdge.create_id(f"n{i}", etype, f"n{(i + 1) % 1000}"),
+                      from_node=f"n{i}", to_node=f"n{(i + 1) % 1000}", edge_type=etype,
+                      updated_at_ms=1, weight=float(i % 7))
+            for i in range(1000)
+            for etype in ("controls", "in_zone")
+        ]
+        self.store.upsert_many(nodes, edges)
+
+    def _expected(self, ids, edge_types=None):
+        return sorted(
+            e.id for e in self.store.get_edges()
+            if e.from_node in ids and e.to_node in ids
+            and (edge_types is None or e.edge_type in edge_types)
+        )
+
+    def test_small_set_inline(self):
+        ids = {"n1", "n2", "n3", "n500"}
+        edges = self.store.get_induced_edges(ids)
+        self.assertEqual(sorted(e.id for e in edges), self._expected(ids))
+        self.assertEqual(len(edges), 4)
+        weights = [e.weight for e in edges]
+        self.assertEqual(weights, sorted(weights, reverse=True))
+
+    def test_large_set_temp_table(self):
+        ids = {f"n{i}" for i in range(0, 1000, 2)} | {f"n{i}" for i in range(100, 300)}
+        edges = self.store.get_induced_edges(ids, edge_types=["in_zone"])
+        self.assertEqual(sorted(e.id for e in edges), self._expected(ids, ["in_zone"]))
+
+        # Temp table is emptied and the reader sees later commits
+        self.store.upsert_edge(GraphEdge(
+            id=GraphEdge.create_id("n0", "controls", "n2"), from_node="n0", to_node="n2",
+            edge_type="controls", updated_at_ms=1, weight=1.0,
+        ))
+        self.assertEqual(len(self.store.get_induced_edges(ids)), len(self._expected(ids)))
+
+    def test_empty_set(self):
+        self.assertEqual(self.store.get_induced_edges([]), [])
+
+
 class TestBrainGraphStoreIntegration(unittest.TestCase):
     """Integration tests for BrainGraphStore."""
 
@@ -404,7 +404,8 @@ def test_flask_api_smoke(result: PipelineResult):
     os.environ.setdefault("COPILOT_VERSION", "0.4.5-test")
 
     try:
-        from main import app
+        from main import create_app
+        app = create_app()
     except ModuleNotFoundError as e:
         logger.info(f"Test 5: Flask API Smoke — SKIPPED (missing dep: {e})")
         result.ok("flask API smoke skipped (missing optional dependencies)")
@@ -3,14 +3,19 @@ from __future__ import annotations
 
 import json
 import os
+import random
 import tempfile
+import time
 import unittest
 
+import pytest
+
 # Ensure copilot_core is importable
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from copilot_core.ingest.event_store import EventStore
+from copilot_core.ingest.dedup import DedupWheel
+from copilot_core.ingest.event_store import EventStore, _compute_dedup_key
 
 
 def _make_event(
@@ -179,6 +184,262 @@ class TestEventStoreQuery(unittest.TestCase):
         self.assertEqual(len(results), 2)
 
 
+class TestEventStoreIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp()
+        self.store = EventStore(
+            store_path=os.path.join(self._tmpdir, "events.jsonl"),
+            max_events=200,
+            dedup_ttl=0,
+            fsync="never",
+        )
+        self.addCleanup(self.store.close)
+
+    def _brute_force(self, events, domain=None, entity_id=None, kind=None,
+                     zone_id=None, since=None, limit=100):
+        out = []
+        for ev in reversed(events):
+            if domain and ev.get("domain") != domain:
+                continue
+            if entity_id and ev.get("entity_id") != entity_id:
+                continue
+            if kind and ev.get("kind") != kind:
+                continue
+            if zone_id and zone_id not in ev.get("zone_ids", []):
+                continue
+            if since and ev.get("ts", "") < since:
+                continue
+            out.append(ev)
+            if len(out) >= limit:
+                break
+        out.reverse()
+        return out
+
+    def test_indexed_query_matches_full_scan_after_eviction(self):
+        rng = random.Random(7)
+        domains = ["light", "sensor", "switch"]
+        zones = ["kitchen", "bedroom", "hall"]
+        events = []
+        for i in range(1000):
+            domain = rng.choice(domains)
+            ev = _make_event(
+                entity_id=f"{domain}.e{rng.randrange(20)}",
+                kind=rng.choice(["state_changed", "call_service"]),
+                ts=f"2026-02-10T03:{rng.randrange(60):02d}:{rng.randrange(60):02d}Z",
+                event_id=f"x:{i}",
+                zone_ids=rng.sample(zones, rng.randrange(1, 3)),
+            )
+            events.append(ev)
+        for start in range(0, len(events), 50):
+            self.store.ingest_batch(events[start:start + 50])
+
+        ring = self.store.query(limit=1000)
+        self.assertEqual(len(ring), 200)
+        self.assertEqual(ring[-1]["id"], "x:999")
+
+        cases = [
+            {"domain": "light"},
+            {"entity_id": "sensor.e3"},
+            {"zone_id": "hall", "kind": "call_service"},
+            {"since": "2026-02-10T03:30:00Z"},
+            {"domain": "switch", "zone_id": "kitchen", "since": "2026-02-10T03:10:00Z", "limit": 7},
+            {"entity_id": "light.unknown"},
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                expected = self._brute_force(ring, **case)
+                self.assertEqual(self.store.query(**case), expected)
+
+    def test_posting_lists_evicted_with_ring(self):
+        small = EventStore(
+            store_path=os.path.join(self._tmpdir, "small.jsonl"),
+            max_events=10,
+            dedup_ttl=0,
+            fsync="never",
+        )
+        self.addCleanup(small.close)
+        small.ingest_batch([
+            _make_event(entity_id=f"light.s_{i}", event_id=f"s:{i}", zone_ids=[f"z{i}"])
+            for i in range(100)
+        ])
+        keys = small.stats()["index_keys"]
+        self.assertEqual(keys["entity_id"], 10)
+        self.assertEqual(keys["zone"], 10)
+        self.assertEqual(small.query(entity_id="light.s_5"), [])
+        self.assertEqual(len(small.query(entity_id="light.s_95")), 1)
+
+    def test_since_with_out_of_order_timestamps(self):
+        self.store.ingest_batch([
+            _make_event(entity_id="light.a", event_id="o:1", ts="2026-02-10T05:00:00Z"),
+            _make_event(entity_id="light.b", event_id="o:2", ts="2026-02-10T01:00:00Z"),
+            _make_event(entity_id="light.c", event_id="o:3", ts="2026-02-10T04:00:00Z"),
+        ])
+        ids = [ev["id"] for ev in self.store.query(since="2026-02-10T03:00:00Z")]
+        self.assertEqual(ids, ["o:1", "o:3"])
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDedupWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self.wheel = DedupWheel(ttl=60, max_keys=1000, clock=self.clock)
+
+    def test_duplicate_within_ttl(self):
+        self.assertFalse(self.wheel.seen("a"))
+        self.clock.now += 59
+        self.assertTrue(self.wheel.seen("a"))
+
+    def test_key_expires_after_ttl(self):
+        self.wheel.seen("a")
+        self.clock.now += 61
+        self.assertFalse(self.wheel.seen("a"))
+        # Re-registered key is live again and survives draining of its old bucket
+        self.clock.now += 10
+        self.assertTrue(self.wheel.seen("a"))
+
+    def test_expired_buckets_are_drained(self):
+        for i in range(500):
+            self.wheel.seen(f"k{i}")
+        self.clock.now += 120
+        self.wheel.expire()
+        self.assertEqual(len(self.wheel), 0)
+        self.assertEqual(self.wheel.stats()["buckets"], 0)
+        self.assertEqual(self.wheel.expired_total, 500)
+
+    def test_ceiling_drops_oldest_keys_first(self):
+        for i in range(1500):
+            self.clock.now += 0.01
+            self.wheel.seen(f"k{i}")
+        stats = self.wheel.stats()
+        self.assertEqual(stats["keys"], 1000)
+        self.assertEqual(stats["evicted_early"], 500)
+        self.assertLessEqual(stats["approx_bytes"], stats["max_bytes"])
+        self.assertTrue(self.wheel.seen("k1499"))
+
+    def test_store_reports_dedup_ceiling(self):
+        store = EventStore(
+            store_path=os.path.join(tempfile.mkdtemp(), "events.jsonl"),
+            max_events=10,
+            dedup_ttl=60,
+            dedup_max_keys=25,
+            fsync="never",
+        )
+        self.addCleanup(store.close)
+        store.ingest_batch([_make_event(event_id=f"c:{i}") for i in range(100)])
+        stats = store.stats()
+        self.assertEqual(stats["dedup_keys_tracked"], 25)
+        self.assertEqual(stats["dedup"]["max_keys"], 25)
+
+
+class TestDedupBenchmark(unittest.TestCase):
+    """Per-event dedup cost must not grow with volume."""
+
+    TOTAL = 1_000_000
+    BLOCK = 100_000
+
+    def _replay(self, total: int, block: int) -> tuple[int, int, list[float]]:
+        """(duplicates, keys tracked, seconds per block) for *total* envelopes."""
+        clock = _FakeClock()
+        wheel = DedupWheel(ttl=120, max_keys=10_000, clock=clock)
+        envelope = {"entity_id": "light.bench", "type": "state_changed", "ts": ""}
+
+        durations = []
+        duplicates = 0
+        start = time.perf_counter()
+        for i in range(total):
+            clock.now += 0.01  # 100 events/s
+            # Every 5th envelope retransmits one sent three events earlier (20%)
+            envelope["id"] = f"ev:{i - 3 if i % 5 == 4 else i}"
+            if wheel.seen(_compute_dedup_key(envelope)):
+                duplicates += 1
+            if (i + 1) % block == 0:
+                now = time.perf_counter()
+                durations.append(now - start)
+                start = now
+        return duplicates, len(wheel), durations
+
+    def test_envelopes_stay_bounded(self):
+        duplicates, tracked, _ = self._replay(50_000, 10_000)
+        self.assertEqual(duplicates, 50_000 // 5)
+        self.assertLessEqual(tracked, 10_000)
+
+    @pytest.mark.benchmark
+    def test_million_envelopes_steady_cost(self):
+        duplicates, tracked, durations = self._replay(self.TOTAL, self.BLOCK)
+        self.assertEqual(duplicates, self.TOTAL // 5)
+        self.assertLessEqual(tracked, 10_000)
+        baseline = sorted(durations)[len(durations) // 2]
+        self.assertLess(max(durations[-3:]), baseline * 4, durations)
+
+
+class TestEventStoreJournal(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self._tmpdir, "events.jsonl")
+
+    def _store(self, **kwargs) -> EventStore:
+        store = EventStore(store_path=self.path, max_events=100, dedup_ttl=60, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_one_write_per_batch(self):
+        store = self._store(fsync="never")
+        events = [_make_event(entity_id=f"light.b_{i}", event_id=f"b:{i}") for i in range(20)]
+        store.ingest_batch(events)
+        journal = store.stats()["journal"]
+        self.assertEqual(journal["commits"], 1)
+        self.assertEqual(journal["records"], 20)
+        self.assertEqual(journal["queued"], 0)
+
+    def test_fsync_always_syncs_each_commit(self):
+        store = self._store(fsync="always")
+        store.ingest_batch([_make_event(event_id="f:1")])
+        store.ingest_batch([_make_event(event_id="f:2")])
+        self.assertEqual(store.stats()["journal"]["fsyncs"], 2)
+
+    def test_interval_flusher_fsyncs_in_background(self):
+        store = self._store(fsync="interval", flush_interval=0.05)
+        store.ingest_batch([_make_event(event_id="i:1")])
+        deadline = time.time() + 2.0
+        while store.stats()["journal"]["fsyncs"] == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertGreaterEqual(store.stats()["journal"]["fsyncs"], 1)
+
+    def test_size_rotation_and_reload(self):
+        store = self._store(fsync="never", rotate_bytes=2048, backups=2, compact_keep=0)
+        for i in range(30):
+            store.ingest_batch([_make_event(entity_id=f"light.r_{i}", event_id=f"r:{i}")])
+        store.close()
+
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        self.assertGreaterEqual(store.stats()["journal"]["rotations"], 1)
+
+        reloaded = self._store(fsync="never", rotate_bytes=2048, backups=2, compact_keep=0)
+        ids = [ev["id"] for ev in reloaded.query(limit=1000)]
+        self.assertEqual(ids[-1], "r:29")
+        # Newest-first ordering across generations is preserved on reload
+        self.assertEqual(ids, sorted(ids, key=lambda x: int(x.split(":")[1])))
+
+    def test_time_rotation(self):
+        store = self._store(fsync="never", flush_interval=0.05, rotate_seconds=0.1, compact_keep=0)
+        store.ingest_batch([_make_event(event_id="t:1")])
+        deadline = time.time() + 2.0
+        while not os.path.exists(self.path + ".1") and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertTrue(os.path.exists(self.path + ".1"))
+
+
 class TestEventStoreNormalization(unittest.TestCase):
 
     def setUp(self):
@@ -28,11 +28,13 @@ class TestGraphApi(unittest.TestCase):
             brain_graph_json_path=f"{self.tmpdir.name}/brain_graph.json",
         )
 
-        # Reset lazy singleton between tests
+        # Reset lazy singleton (and views cached from it) between tests
         from copilot_core.brain_graph import provider
+        from copilot_core.performance import brain_graph_cache
 
         provider._STORE = None
         provider._SVC = None
+        brain_graph_cache.clear()
 
         client = app.test_client()
         r = client.get("/api/v1/graph/state")
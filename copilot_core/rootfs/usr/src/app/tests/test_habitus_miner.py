@@ -210,5 +210,233 @@ def test_export_summary():
             assert "confidence" in summary["top_rules"][0]
 
 
+def _synthetic_stream(days: int, entities: int, planted: int, seed: int = 7):
+    """Random on/off traffic plus *planted* A→B habits (B 5–25 s after A, 85%)."""
+    import random
+
+    rng = random.Random(seed)
+    start = 1_700_000_000_000
+    span = days * 24 * 3600 * 1000
+    domains = ["light", "switch", "sensor", "media_player", "cover"]
+    events = []
+    for i in range(entities):
+        entity = f"{domains[i % len(domains)]}.e{i}"
+        state = "off"
+        for ts in sorted(rng.randrange(span) for _ in range(rng.randint(5 * days, 15 * days))):
+            state = "on" if state == "off" else "off"
+            events.append(NormEvent(ts=start + ts, key=f"{entity}:{state}", entity_id=entity,
+                                    domain=entity.split(".")[0], transition=state))
+    for p in range(planted):
+        a_key = f"light.e{p * len(domains)}:on"
+        entity = f"switch.habit{p}"
+        for ev in [e for e in events if e.key == a_key]:
+            if rng.random() < 0.85:
+                events.append(NormEvent(ts=ev.ts + rng.randint(5000, 25000), key=f"{entity}:on",
+                                        entity_id=entity, domain="switch", transition="on"))
+    rng.shuffle(events)
+    return events
+
+
+def _legacy_mine_ab_rules(events, config):
+    """Reference: the exhaustive A×B×window miner the sweep replaced."""
+    from copilot_core.habitus_miner import mining as m
+
+    events = m._deduplicate_events(m._filter_events(events, config), config)
+    a_candidates, b_candidates = m._get_frequent_events(events, config.min_support_A, config.min_support_B)
+    indices = m._create_event_indices(events)
+    rules = set()
+    for dt_sec in config.windows:
+        for a_key in a_candidates:
+            for b_key in b_candidates:
+                if config.exclude_self_rules and a_key == b_key:
+                    continue
+                n_ab, hits, _misses = m._count_ab_hits(a_key, b_key, dt_sec * 1000, indices)
+                if n_ab < config.min_hits:
+                    continue
+                baseline = m._calculate_baseline_pb(b_key, events, dt_sec)
+                q = m._calculate_rule_quality(len(indices[a_key]), n_ab, baseline)
+                if (q["confidence"] < config.min_confidence or q["confidence_lb"] < config.min_confidence_lb
+                        or q["lift"] < config.min_lift or q["leverage"] < config.min_leverage):
+                    continue
+                rules.add((a_key, b_key, dt_sec, n_ab, round(baseline, 9),
+                           tuple(hits[:config.max_evidence_examples])))
+    return rules
+
+
+def test_sweep_miner_matches_exhaustive_reference():
+    events = _synthetic_stream(days=7, entities=40, planted=3)
+    config = MiningConfig(min_support_A=10, min_support_B=10, min_hits=5,
+                          min_confidence=0.3, min_lift=1.1, max_rules=10_000)
+
+    expected = _legacy_mine_ab_rules(list(events), config)
+    rules = mine_ab_rules(list(events), config)
+
+    assert expected
+    assert {
+        (r.A, r.B, r.dt_sec, r.nAB, round(r.baseline_p_b, 9), tuple(r.evidence.hit_examples))
+        for r in rules
+    } == expected
+
+
+@pytest.mark.benchmark
+def test_mining_benchmark_30_days_500_entities():
+    """Synthetic 30-day, 500-entity stream (~150k events) mines in seconds."""
+    import time
+
+    events = _synthetic_stream(days=30, entities=500, planted=10)
+    config = MiningConfig()
+
+    started = time.perf_counter()
+    rules = mine_ab_rules(events, config)
+    elapsed = time.perf_counter() - started
+
+    planted = {(f"light.e{p * 5}:on", f"switch.habit{p}:on") for p in range(10)}
+    found = {(r.A, r.B) for r in rules if r.dt_sec == 30}
+    assert planted <= found
+    assert elapsed < 10.0
+
+
+def _time_chunks(events, parts):
+    events = sorted(events, key=lambda e: e.ts)
+    size = -(-len(events) // parts)
+    return [events[i:i + size] for i in range(0, len(events), size)]
+
+
+def test_incremental_batches_match_single_fold():
+    from copilot_core.habitus_miner.incremental import PairStatistics
+
+    config = MiningConfig(min_support_A=5, min_support_B=5, min_hits=3, decay_half_life_days=0)
+    events = _synthetic_stream(days=7, entities=40, planted=3)
+
+    whole = PairStatistics(config)
+    whole.update(events, config)
+    batched = PairStatistics(config)
+    for chunk in _time_chunks(events, 6):
+        batched.update(chunk, config)
+
+    assert batched.ref_ts == whole.ref_ts
+    assert batched.period_ms == whole.period_ms
+
+    def summary(rules):
+        return {(r.A, r.B, r.dt_sec, r.nA, r.nB, r.nAB) for r in rules}
+
+    rules = whole.rules(config)
+    assert summary(batched.rules(config)) == summary(rules)
+    assert {("light.e0:on", "switch.habit0:on"), ("light.e5:on", "switch.habit1:on")} <= {
+        (r.A, r.B) for r in rules
+    }
+    assert all(r.evidence.latency_quantiles for r in rules)
+
+
+def test_incremental_counts_match_direct_scan():
+    from copilot_core.habitus_miner import mining as m
+    from copilot_core.habitus_miner.incremental import PairStatistics
+
+    config = MiningConfig(decay_half_life_days=0)
+    events = _synthetic_stream(days=3, entities=20, planted=2)
+    stats = PairStatistics(config)
+    for chunk in _time_chunks(events, 4):
+        stats.update(chunk, config)
+
+    # Only A events a full window before the newest event are finalized
+    cleaned = m._deduplicate_events(m._filter_events(list(events), config), config)
+    indices = m._create_event_indices(cleaned)
+    finalized = {k: [t for t in ts if t <= stats.ref_ts] for k, ts in indices.items()}
+    for a_key, b_key in [("light.e0:on", "switch.habit0:on"), ("light.e5:on", "switch.habit1:on"),
+                         ("switch.e1:on", "sensor.e2:off")]:
+        for dt_sec in config.windows:
+            a_only = dict(indices, **{a_key: finalized[a_key]})
+            expected, _hits, _misses = m._count_ab_hits(a_key, b_key, dt_sec * 1000, a_only)
+            assert stats.n_ab(a_key, b_key, dt_sec) == expected
+
+
+def test_incremental_counts_decay_with_half_life():
+    from copilot_core.habitus_miner.incremental import PairStatistics
+
+    config = MiningConfig(windows=[60], decay_half_life_days=1)
+    day = 24 * 3600 * 1000
+    start = 1_700_000_000_000
+
+    def event(ts, key):
+        return NormEvent(ts=ts, key=key, entity_id=key.split(":")[0], domain="light", transition="on")
+
+    stats = PairStatistics(config)
+    stats.update([event(start, "light.a:on"), event(start + 10_000, "light.b:on"),
+                  event(start + 60_000, "light.c:on")], config)
+    assert stats.n_ab("light.a:on", "light.b:on", 60) == pytest.approx(1.0)
+
+    stats.update([event(start + 60_000 + day, "light.c:on")], config)
+    assert stats.n_ab("light.a:on", "light.b:on", 60) == pytest.approx(0.5)
+    assert stats.key_counts[stats.keys.index("light.a:on")] == pytest.approx(0.5)
+
+
+def test_service_incremental_mining_persists_statistics():
+    config = MiningConfig(min_support_A=5, min_support_B=5, min_hits=3)
+    chunks = _time_chunks(_synthetic_stream(days=5, entities=30, planted=2), 3)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        service = HabitusMinerService(Path(tmpdir), config)
+        service.mine_incremental(chunks[0])
+        service.mine_incremental(chunks[1])
+
+        restarted = HabitusMinerService(Path(tmpdir), config)
+        stats = restarted.get_pair_stats()
+        assert stats.watermark == chunks[1][-1].ts
+        assert stats.events_folded == len(chunks[0]) + len(chunks[1])
+
+        # Replayed events are ignored, only the new chunk is folded
+        rules = restarted.mine_incremental(chunks[1] + chunks[2])
+        assert stats.late_events == len(chunks[1])
+        assert ("light.e0:on", "switch.habit0:on") in {(r.A, r.B) for r in rules}
+        assert restarted.store.get_stats()["files_exist"]["pair_stats"]
+
+        # A config change the statistics depend on starts them over
+        restarted.update_config(windows=[30, 120])
+        assert restarted.get_pair_stats().events_folded == 0
+
+
+def test_event_table_preprocessing_matches_lists():
+    from copilot_core.habitus_miner import mining as m
+    from copilot_core.habitus_miner.table import EventTable
+
+    events = _synthetic_stream(days=2, entities=30, planted=1)
+    # Flapping duplicates inside the cooldown, and a per-entity cooldown
+    events += [NormEvent(ts=e.ts + 500, key=e.key, entity_id=e.entity_id, domain=e.domain,
+                         transition=e.transition) for e in events[:300]]
+    config = MiningConfig(exclude_domains=["cover"], entity_cooldown={"light.e0": 600})
+
+    expected = m._deduplicate_events(m._filter_events(list(events), config), config)
+    table = m._deduplicate_table(m._filter_table(EventTable.from_events(events), config), config)
+
+    def rows(evs):
+        return [(e.ts, e.key, e.entity_id, e.domain, e.transition) for e in evs]
+
+    assert rows(table.to_events()) == rows(expected)
+    assert m._get_frequent_events(table, 5, 5) == m._get_frequent_events(expected, 5, 5)
+
+    lists = m._create_event_indices(expected)
+    arrays = m._create_event_indices(table)
+    assert {k: list(v) for k, v in arrays.items()} == lists
+    for a_key, b_key in [("light.e0:on", "switch.habit0:on"), ("switch.e1:on", "sensor.e2:off")]:
+        assert m._count_ab_hits(a_key, b_key, 30_000, arrays) == m._count_ab_hits(
+            a_key, b_key, 30_000, lists
+        )
+
+
+def test_event_table_is_compact():
+    import sys
+    from copilot_core.habitus_miner.table import EventTable
+
+    events = _synthetic_stream(days=7, entities=100, planted=2)
+    table = EventTable.from_events(events)
+    # normalize_ha_event builds a fresh key string per event
+    object_bytes = sum(
+        sys.getsizeof(e) + sys.getsizeof(e.__dict__) + sys.getsizeof(e.key) for e in events
+    )
+
+    assert table.nbytes == 24 * len(events)
+    assert table.nbytes * 8 < object_bytes
+
+
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
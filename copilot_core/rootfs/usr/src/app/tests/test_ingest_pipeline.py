@@ -0,0 +1,200 @@
+"""Tests for copilot_core.ingest.pipeline – async post-ingest queue."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from copilot_core.ingest.pipeline import IngestPipeline
+
+try:
+    from flask import Flask
+except ModuleNotFoundError:  # pragma: no cover
+    Flask = None
+
+
+def _events(n: int, prefix: str = "e") -> list[dict]:
+    return [{"id": f"{prefix}:{i}"} for i in range(n)]
+
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def _pipeline(self, **kwargs) -> IngestPipeline:
+        pipeline = IngestPipeline(**kwargs)
+        self.addCleanup(pipeline.stop)
+        return pipeline
+
+    def test_stages_run_in_order_off_thread(self):
+        seen: list[tuple[str, str, str]] = []
+        caller = threading.current_thread().name
+
+        def stage(name):
+            return lambda events: seen.extend(
+                (name, ev["id"], threading.current_thread().name) for ev in events
+            )
+
+        pipeline = self._pipeline(max_queue=10, workers=1)
+        pipeline.add_stage("graph", stage("graph"))
+        pipeline.add_stage("mood", stage("mood"))
+        pipeline.start()
+
+        self.assertTrue(pipeline.submit(_events(2, "a")))
+        self.assertTrue(pipeline.submit(_events(1, "b")))
+        self.assertTrue(pipeline.drain(timeout=2))
+
+        self.assertEqual(
+            [(n, i) for n, i, _ in seen],
+            [("graph", "a:0"), ("graph", "a:1"), ("mood", "a:0"), ("mood", "a:1"),
+             ("graph", "b:0"), ("mood", "b:0")],
+        )
+        self.assertTrue(all(t != caller for _, _, t in seen))
+
+        stats = pipeline.stats()
+        self.assertEqual(stats["enqueued_batches"], 2)
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["stages"]["graph"]["events"], 3)
+        self.assertGreater(stats["stages"]["mood"]["lag_max_ms"], 0.0)
+
+    def test_stage_error_is_isolated(self):
+        calls: list[str] = []
+
+        def broken(events):
+            raise RuntimeError("boom")
+
+        pipeline = self._pipeline(max_queue=10)
+        pipeline.add_stage("broken", broken)
+        pipeline.add_stage("ok", lambda events: calls.append("ok"))
+        pipeline.start()
+        pipeline.submit(_events(1))
+        pipeline.drain(timeout=2)
+
+        self.assertEqual(calls, ["ok"])
+        self.assertEqual(pipeline.stats()["stages"]["broken"]["errors"], 1)
+
+    def test_drop_policy_when_full(self):
+        gate = threading.Event()
+        pipeline = self._pipeline(max_queue=2, overflow="drop")
+        pipeline.add_stage("slow", lambda events: gate.wait(2))
+        pipeline.start()
+
+        results = [pipeline.submit(_events(1, str(i))) for i in range(6)]
+        gate.set()
+        pipeline.drain(timeout=2)
+
+        stats = pipeline.stats()
+        self.assertIn(False, results)
+        self.assertEqual(stats["dropped_batches"], results.count(False))
+        self.assertEqual(stats["enqueued_batches"], results.count(True))
+        self.assertLessEqual(stats["high_watermark"], 2)
+
+    def test_block_policy_waits_for_room(self):
+        gate = threading.Event()
+        pipeline = self._pipeline(max_queue=1, overflow="block", block_timeout=2.0)
+        pipeline.add_stage("slow", lambda events: gate.wait(2))
+        pipeline.start()
+
+        pipeline.submit(_events(1, "first"))   # taken by the worker
+        pipeline.submit(_events(1, "second"))  # fills the queue
+        threading.Timer(0.1, gate.set).start()
+        self.assertTrue(pipeline.submit(_events(1, "third")))
+        pipeline.drain(timeout=2)
+
+        stats = pipeline.stats()
+        self.assertEqual(stats["dropped_batches"], 0)
+        self.assertGreaterEqual(stats["blocked_puts"], 1)
+        self.assertEqual(stats["stages"]["slow"]["batches"], 3)
+
+    def test_block_policy_times_out_and_drops(self):
+        gate = threading.Event()
+        pipeline = self._pipeline(max_queue=1, overflow="block", block_timeout=0.05)
+        self.addCleanup(gate.set)  # runs before pipeline.stop (LIFO)
+        pipeline.add_stage("stuck", lambda events: gate.wait(2))
+        pipeline.start()
+
+        pipeline.submit(_events(1, "a"))
+        pipeline.submit(_events(1, "b"))
+        self.assertFalse(pipeline.submit(_events(3, "c")))
+        self.assertEqual(pipeline.stats()["dropped_events"], 3)
+
+    def test_shutdown_hook_processes_acknowledged_batches(self):
+        from copilot_core.core_setup import shutdown_services
+
+        release = threading.Event()
+        seen: list[str] = []
+
+        def slow_stage(events):
+            release.wait(timeout=2)
+            seen.extend(ev["id"] for ev in events)
+
+        pipeline = self._pipeline(max_queue=10, workers=1)
+        pipeline.add_stage("graph", slow_stage)
+        pipeline.start()
+        for prefix in ("a", "b", "c"):
+            self.assertTrue(pipeline.submit(_events(1, prefix)))
+        threading.Timer(0.05, release.set).start()
+
+        shutdown_services({"ingest_pipeline": pipeline})
+        self.assertEqual(seen, ["a:0", "b:0", "c:0"])
+        self.assertFalse(pipeline.running)
+
+    def test_invalid_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            IngestPipeline(overflow="spill")
+
+
+@unittest.skipIf(Flask is None, "Flask not installed")
+class TestIngestPipelineEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        from copilot_core.api.v1 import events_ingest
+        from copilot_core.ingest.event_store import EventStore
+
+        self.events_ingest = events_ingest
+        self._tmpdir = tempfile.mkdtemp()
+        store = EventStore(
+            store_path=os.path.join(self._tmpdir, "events.jsonl"), dedup_ttl=0, fsync="never"
+        )
+        self.addCleanup(store.close)
+        events_ingest.set_store(store)
+
+        self.received: list[dict] = []
+        self.pipeline = IngestPipeline(max_queue=10)
+        self.pipeline.add_stage("collect", self.received.extend)
+        self.pipeline.start()
+        events_ingest.set_ingest_pipeline(self.pipeline)
+        self.addCleanup(self.pipeline.stop)
+        self.addCleanup(events_ingest.set_ingest_pipeline, None)
+        self.addCleanup(events_ingest.set_store, None)
+
+        app = Flask(__name__)
+        app.register_blueprint(events_ingest.bp)
+        self.client = app.test_client()
+
+    def test_post_acks_and_pipeline_endpoint_reports(self):
+        payload = {"items": [{
+            "id": "p:1",
+            "ts": "2026-02-10T03:00:00Z",
+            "type": "state_changed",
+            "source": "ha",
+            "entity_id": "light.kitchen",
+            "attributes": {"domain": "light", "new_state": "on"},
+        }]}
+        r = self.client.post("/api/v1/events", json=payload)
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.get_json()["queued"])
+
+        self.assertTrue(self.pipeline.drain(timeout=2))
+        self.assertEqual([ev["id"] for ev in self.received], ["p:1"])
+
+        stats = self.client.get("/api/v1/events/pipeline").get_json()
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["stages"]["collect"]["events"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,7 +15,9 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from main import app
+from main import create_app
+
+app = create_app()
 
 
 def test_list_tags_endpoint():
@@ -15,6 +15,8 @@ import tempfile
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -36,7 +38,10 @@ from copilot_core.vector_store.store import (
     get_vector_store,
     reset_vector_store,
     _cosine_similarity,
+    _pack_vector,
 )
+from copilot_core.vector_store.index import SimilarityIndex, VectorMatrix
+from copilot_core.vector_store.ollama import EmbeddingDiskCache, OllamaEmbedder
 
 
 class TestEmbeddingEngine(unittest.TestCase):
@@ -78,7 +83,7 @@ class TestEmbeddingEngine(unittest.TestCase):
             self.assertIsInstance(result, EmbeddingResult)
             self.assertEqual(len(result.vector), EMBEDDING_DIM)
             self.assertEqual(result.source, "local")
-            self.assertEqual(result.model, "entity_v1")
+            self.assertEqual(result.model, "entity_v2")
             
         asyncio.run(run_test())
         
@@ -115,7 +120,7 @@ class TestEmbeddingEngine(unittest.TestCase):
             self.assertIsInstance(result, EmbeddingResult)
             self.assertEqual(len(result.vector), EMBEDDING_DIM)
             self.assertEqual(result.source, "local")
-            self.assertEqual(result.model, "preference_v1")
+            self.assertEqual(result.model, "preference_v2")
             
         asyncio.run(run_test())
         
@@ -133,7 +138,7 @@ class TestEmbeddingEngine(unittest.TestCase):
             self.assertIsInstance(result, EmbeddingResult)
             self.assertEqual(len(result.vector), EMBEDDING_DIM)
             self.assertEqual(result.source, "local")
-            self.assertEqual(result.model, "pattern_v1")
+            self.assertEqual(result.model, "pattern_v2")
             
         asyncio.run(run_test())
         
@@ -158,6 +163,248 @@ class TestEmbeddingEngine(unittest.TestCase):
         asyncio.run(run_test())
 
 
+class TestEmbeddingBatch(unittest.TestCase):
+    """Batched, memoized local entity embeddings."""
+
+    @staticmethod
+    def _entities(n):
+        areas = ["kitchen", "living_room", "bedroom", "office", "garage"]
+        domains = ["light", "sensor", "switch", "climate", "cover", "media_player"]
+        return [
+            {
+                "entity_id": f"{domains[i % 6]}.device_{i}",
+                "area": areas[i % 5],
+                "capabilities": ["on_off", "brightness"] if i % 2 else ["on_off"],
+                "tags": ["indoor"] if i % 3 else None,
+                "state": {"state": i % 100, "attributes": {"brightness": 128}} if i % 4 == 0 else None,
+            }
+            for i in range(n)
+        ]
+
+    def test_batch_rows_match_single_embeddings(self):
+        import numpy as np
+
+        engine = EmbeddingEngine(EmbeddingConfig(cache_embeddings=False))
+        entities = self._entities(12)
+        matrix = asyncio.run(engine.embed_entities_batch(entities))
+        self.assertEqual(matrix.shape, (12, EMBEDDING_DIM))
+        for row, entity in zip(matrix, entities):
+            single = asyncio.run(engine.embed_entity(**entity))
+            self.assertTrue(np.allclose(row, single.vector))
+        self.assertTrue(np.allclose(np.linalg.norm(matrix, axis=1), 1.0))
+        self.assertEqual(len(_hash_to_vector("x", 7)), 7)
+
+    def test_component_cache_is_bounded_lru(self):
+        engine = EmbeddingEngine(EmbeddingConfig())
+        asyncio.run(engine.embed_entities_batch(self._entities(50)))
+        stats = engine.component_cache_stats()
+        self.assertEqual(stats["size"], 8)  # 5 areas, 2 capability sets, 1 tag set
+        self.assertEqual(stats["misses"], 8)
+
+        small = EmbeddingEngine(EmbeddingConfig(component_cache_size=3))
+        asyncio.run(small.embed_entities_batch(self._entities(50)))
+        self.assertEqual(small.component_cache_stats()["size"], 3)
+
+    @pytest.mark.benchmark
+    def test_full_reembed_is_fast(self):
+        import time
+
+        engine = EmbeddingEngine(EmbeddingConfig())
+        entities = self._entities(3000)
+        start = time.perf_counter()
+        matrix = asyncio.run(engine.embed_entities_batch(entities))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(matrix.shape, (3000, EMBEDDING_DIM))
+        self.assertLess(elapsed, 1.0)
+
+    def test_store_batch_persists_entities(self):
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(temp_fd)
+        self.addCleanup(os.remove, temp_path)
+        store = VectorStore(VectorStoreConfig(db_path=temp_path, persist=True))
+        self.addCleanup(store.close)
+        store.set_embedding_engine(EmbeddingEngine(EmbeddingConfig()))
+
+        entries = asyncio.run(store.store_entity_embeddings_batch(self._entities(20)))
+        self.assertEqual(len(entries), 20)
+        self.assertEqual(entries[1].metadata["area"], "living_room")
+        self.assertEqual((asyncio.run(store.stats()))["total_entries"], 20)
+        similar = asyncio.run(store.find_similar_entities("entity:light.device_0", threshold=0.0))
+        self.assertTrue(similar)
+
+
+class _StubOllama:
+    """Threaded HTTP stub of the Ollama embedding endpoints."""
+
+    def __init__(self, batch_endpoint=True):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import threading
+
+        self.digest = "sha256:v1"
+        self.batches: list[list[str]] = []
+        self.single_requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply(200, {"models": [{"name": "embed:latest", "digest": stub.digest}]})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path == "/api/embed" and batch_endpoint:
+                    stub.batches.append(body["input"])
+                    self._reply(200, {"embeddings": [stub.vector(t) for t in body["input"]]})
+                elif self.path == "/api/embeddings":
+                    stub.single_requests += 1
+                    self._reply(200, {"embedding": stub.vector(body["prompt"])})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def vector(self, text):
+        return [float(len(text)), 1.0, float(self.digest == "sha256:v2")]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestOllamaEmbedder(unittest.TestCase):
+    """Coalescing Ollama client and its persistent cache, against a stub server."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.cache_path = os.path.join(self._tmpdir.name, "embeddings.db")
+
+    def _stub(self, **kwargs):
+        stub = _StubOllama(**kwargs)
+        self.addCleanup(stub.close)
+        return stub
+
+    def _embedder(self, stub, cache=True, **kwargs):
+        embedder = OllamaEmbedder(
+            stub.url, "embed",
+            cache=EmbeddingDiskCache(self.cache_path) if cache else None,
+            batch_wait_ms=20, **kwargs,
+        )
+        self.addCleanup(embedder.close)
+        if embedder.cache is not None:
+            self.addCleanup(embedder.cache.close)
+        return embedder
+
+    def test_concurrent_calls_are_coalesced_into_batches(self):
+        stub = self._stub()
+        embedder = self._embedder(stub, cache=False, batch_size=8)
+        texts = [f"text-{'x' * i}" for i in range(20)]
+
+        async def run():
+            return await asyncio.gather(*(embedder.embed(t) for t in texts))
+
+        vectors = asyncio.run(run())
+        self.assertEqual(vectors, [stub.vector(t) for t in texts])
+        self.assertEqual(sorted(len(b) for b in stub.batches), [4, 8, 8])
+        self.assertEqual(embedder.stats()["requests"], 3)
+
+    def test_disk_cache_survives_restart_and_tracks_model_version(self):
+        stub = self._stub()
+        first = self._embedder(stub)
+        asyncio.run(first.embed_many(["a", "bb", "a"]))
+        self.assertEqual(stub.batches, [["a", "bb"]])
+        first.close()
+        first.cache.close()
+
+        second = self._embedder(stub)
+        self.assertEqual(asyncio.run(second.embed_many(["bb", "a"])), [[2.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
+        self.assertEqual(len(stub.batches), 1)
+        self.assertEqual(second.stats()["cache_hits"], 2)
+        second.close()
+        second.cache.close()
+
+        # A new model digest drops the old vectors on first use
+        stub.digest = "sha256:v2"
+        third = self._embedder(stub)
+        self.assertEqual(asyncio.run(third.embed("a")), [1.0, 1.0, 1.0])
+        self.assertEqual(len(stub.batches), 2)
+        self.assertEqual(len(third.cache), 1)
+
+    def test_falls_back_to_single_text_endpoint(self):
+        stub = self._stub(batch_endpoint=False)
+        embedder = self._embedder(stub, cache=False)
+        self.assertEqual(asyncio.run(embedder.embed_many(["a", "bb"])), [[1.0, 1.0, 0.0], [2.0, 1.0, 0.0]])
+        self.assertEqual(stub.single_requests, 2)
+        self.assertFalse(embedder.stats()["batch_endpoint"])
+
+    def test_engine_uses_batched_client_and_falls_back_locally(self):
+        stub = self._stub()
+        engine = EmbeddingEngine(EmbeddingConfig(
+            use_ollama=True, ollama_url=stub.url, ollama_model="embed",
+            disk_cache_path=self.cache_path, ollama_batch_wait_ms=20,
+        ))
+        self.addCleanup(engine.close)
+        matrix = asyncio.run(engine.embed_entities_batch(
+            [{"entity_id": "light.a"}, {"entity_id": "light.bb"}]
+        ))
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertEqual(len(stub.batches), 1)
+        self.assertEqual(engine.ollama_stats()["disk_cache"]["misses"], 2)
+
+        stub.close()
+        offline = EmbeddingEngine(EmbeddingConfig(
+            use_ollama=True, ollama_url=stub.url, ollama_model="embed",
+            disk_cache_path=None, ollama_batch_wait_ms=0,
+        ))
+        self.addCleanup(offline.close)
+        result = asyncio.run(offline.embed_entity("light.c"))
+        self.assertEqual(result.source, "local")
+
+    def test_store_batch_records_fallback_model(self):
+        """Rows embedded locally during an Ollama outage are labelled as such."""
+        stub = self._stub()
+        online = EmbeddingEngine(EmbeddingConfig(
+            use_ollama=True, ollama_url=stub.url, ollama_model="embed",
+            disk_cache_path=None, ollama_batch_wait_ms=0,
+        ))
+        self.addCleanup(online.close)
+        matrix, models = asyncio.run(online.embed_entities_batch(
+            [{"entity_id": "light.a"}], with_models=True
+        ))
+        self.assertEqual((matrix.shape[0], models), (1, ["embed"]))
+        stub.close()
+
+        offline = EmbeddingEngine(EmbeddingConfig(
+            use_ollama=True, ollama_url=stub.url, ollama_model="embed",
+            disk_cache_path=None, ollama_batch_wait_ms=0,
+        ))
+        self.addCleanup(offline.close)
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(temp_fd)
+        self.addCleanup(os.remove, temp_path)
+        store = VectorStore(VectorStoreConfig(db_path=temp_path, persist=True))
+        self.addCleanup(store.close)
+        store._embedding_engine = offline
+        entries = asyncio.run(store.store_entity_embeddings_batch(
+            [{"entity_id": "light.a"}, {"entity_id": "light.b"}]
+        ))
+        self.assertEqual(
+            [e.metadata["embedding_model"] for e in entries], ["text_hash_v2"] * 2
+        )
+
+
 class TestVectorStore(unittest.TestCase):
     """Test the VectorStore class."""
     
@@ -347,6 +594,282 @@ class TestVectorStore(unittest.TestCase):
         asyncio.run(run_test())
 
 
+class TestSimilarityIndex(unittest.TestCase):
+    """Test the in-memory float32 similarity index."""
+
+    def test_matches_pure_python_cosine(self):
+        import random
+
+        rnd = random.Random(3)
+        vectors = {f"e{i}": [rnd.uniform(-1, 1) for _ in range(16)] for i in range(200)}
+        index = SimilarityIndex()
+        for entry_id, vec in vectors.items():
+            index.upsert(entry_id, "entity", vec)
+        query = [rnd.uniform(-1, 1) for _ in range(16)]
+
+        hits = index.search(query, "entity", limit=5, threshold=-1.0, exclude_ids=["e0"])
+
+        expected = sorted(
+            ((eid, _cosine_similarity(query, vec)) for eid, vec in vectors.items() if eid != "e0"),
+            key=lambda h: h[1], reverse=True,
+        )[:5]
+        self.assertEqual([h[0] for h in hits], [e[0] for e in expected])
+        for (_, sim, _), (_, ref) in zip(hits, expected):
+            self.assertAlmostEqual(sim, ref, places=5)
+
+    def test_upsert_delete_keep_rows_in_sync(self):
+        matrix = VectorMatrix(dim=2, capacity=1)
+        index = SimilarityIndex()
+        for i in range(5):
+            index.upsert(f"e{i}", "entity", [1.0, float(i)])
+            matrix.upsert(f"e{i}", [1.0, 0.0])
+        self.assertEqual(len(matrix), 5)  # grew past the initial capacity
+
+        self.assertTrue(index.remove("e0"))
+        self.assertFalse(index.remove("e0"))
+        index.upsert("e4", "entity", [1.0, 0.0])  # update in place after swap-remove
+        hits = index.search([1.0, 0.0], "entity", limit=10, threshold=0.99)
+        self.assertEqual([h[0] for h in hits], ["e4"])
+
+        index.upsert("e1", "pattern", [0.0, 1.0])  # moves to another type
+        self.assertEqual(index.stats()["by_type"], {"entity": 3, "pattern": 1})
+        self.assertEqual(index.search([0.0, 1.0], limit=1, threshold=0.99)[0][:1], ("e1",))
+
+    def test_zero_vectors_and_dimension_mismatch(self):
+        index = SimilarityIndex()
+        index.upsert("zero", "entity", [0.0, 0.0, 0.0])
+        index.upsert("other_dim", "entity", [1.0, 0.0])
+        hits = index.search([1.0, 0.0, 0.0], "entity", limit=10, threshold=0.0)
+        self.assertEqual(hits, [("zero", 0.0, "entity")])
+
+    def test_bulk_upsert_repeated_id_keeps_last(self):
+        import numpy as np
+
+        index = SimilarityIndex()
+        index.bulk_upsert("entity", ["a", "a", "b"], np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.count("entity"), 2)
+        hits = index.search([0.0, 1.0], "entity", limit=10, threshold=-1.0)
+        self.assertEqual([h[0] for h in hits], ["a", "b"])
+        self.assertAlmostEqual(hits[0][1], 1.0, places=5)
+
+    def _reloaded_store(self, count: int):
+        """Persisted store with *count* random entity vectors, reopened."""
+        import random
+
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(temp_fd)
+        self.addCleanup(os.remove, temp_path)
+        rnd = random.Random(5)
+        vectors = {
+            f"entity:e{i}": [rnd.gauss(0, 1) for _ in range(EMBEDDING_DIM)] for i in range(count)
+        }
+        store = VectorStore(VectorStoreConfig(db_path=temp_path, persist=True, cache_size=100))
+        # Bulk-write the rows in one transaction; reopening loads them into the index
+        store._db.executemany(
+            "INSERT INTO vectors (id, entry_type, vector, metadata, created_at, updated_at) "
+            "VALUES (?, 'entity', ?, ?, '', '')",
+            [
+                (entry_id, _pack_vector(vec), json.dumps({"n": i}))
+                for i, (entry_id, vec) in enumerate(vectors.items())
+            ],
+        )
+        store._db.commit()
+        store.close()
+
+        store = VectorStore(VectorStoreConfig(db_path=temp_path, persist=True, cache_size=100))
+        self.addCleanup(store.close)
+        return store, vectors
+
+    def test_store_reloads_index_and_searches(self):
+        store, vectors = self._reloaded_store(5000)
+        index_stats = asyncio.run(store.stats())["index"]
+        self.assertEqual(index_stats["entries"], 5000)
+        self.assertEqual(index_stats["by_type"], {"entity": 5000})
+
+        results = asyncio.run(store.find_similar_entities("entity:e42", limit=10, threshold=-1.0))
+
+        query = vectors["entity:e42"]
+        expected = sorted(
+            (eid for eid in vectors if eid != "entity:e42"),
+            key=lambda eid: _cosine_similarity(query, vectors[eid]), reverse=True,
+        )[:10]
+        self.assertEqual([r.id for r in results], expected)
+        self.assertIn("n", results[0].metadata)
+
+    @pytest.mark.benchmark
+    def test_store_search_latency(self):
+        import time
+
+        store, _ = self._reloaded_store(5000)
+
+        async def find():
+            return await store.find_similar_entities("entity:e42", limit=10, threshold=-1.0)
+
+        asyncio.run(find())  # warm-up
+        start = time.perf_counter()
+        for _ in range(20):
+            asyncio.run(find())
+        per_query_ms = (time.perf_counter() - start) * 1000 / 20
+        self.assertLess(per_query_ms, 50)
+
+
+class TestVectorStorePersistence(unittest.TestCase):
+    """Binary vector storage and the on-disk IVF index."""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.db_path = os.path.join(self._tmpdir.name, "vectors.db")
+
+    def _store(self, **kwargs) -> VectorStore:
+        store = VectorStore(VectorStoreConfig(db_path=self.db_path, persist=True, **kwargs))
+        self.addCleanup(store.close)
+        return store
+
+    def test_legacy_json_rows_are_migrated_once(self):
+        import sqlite3
+
+        db = sqlite3.connect(self.db_path)
+        db.execute(
+            "CREATE TABLE vectors (id TEXT PRIMARY KEY, entry_type TEXT NOT NULL, "
+            "vector BLOB NOT NULL, metadata TEXT DEFAULT '{}', "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        db.executemany(
+            "INSERT INTO vectors VALUES (?, 'custom', ?, '{}', '', '')",
+            [("entity:a", json.dumps([1.0, 0.0, 0.5]).encode("utf-8")),
+             ("entity:b", json.dumps([0.0, 1.0, 0.0]).encode("utf-8"))],
+        )
+        db.commit()
+        db.close()
+
+        store = self._store()
+        blob, version = store._db.execute(
+            "SELECT vector, (SELECT user_version FROM pragma_user_version) "
+            "FROM vectors WHERE id = 'entity:a'"
+        ).fetchone()
+        self.assertEqual(len(blob), 3 * 4)
+        self.assertEqual(version, 2)
+        entry = asyncio.run(store.get("entity:a"))
+        self.assertEqual(entry.vector, [1.0, 0.0, 0.5])
+        hits = store.search_similar_sync([1.0, 0.0, 0.5], threshold=0.9)
+        self.assertEqual([h.id for h in hits], ["entity:a"])
+
+        store.upsert_sync("entity:c", [0.5, 0.5, 0.5], "entity")
+        store.close()
+        reopened = self._store()
+        self.assertEqual(asyncio.run(reopened.stats())["index"]["entries"], 3)
+
+    def test_vectors_of_outdated_embedding_models_are_dropped(self):
+        store = self._store()
+        store.set_embedding_engine(EmbeddingEngine(EmbeddingConfig()))
+        asyncio.run(store.store_entity_embedding("light.kitchen", domain="light"))
+        asyncio.run(store.store_pattern_embedding("p1", "temporal", ["light.kitchen"]))
+        store.upsert_sync("custom:1", [1.0, 0.0], "custom")
+        store.upsert_sync("entity:old_hash", [0.0, 1.0], "entity",
+                          metadata={"embedding_model": "entity_v1"})
+        self.assertEqual(
+            asyncio.run(store.get("pattern:p1")).metadata["embedding_model"], "pattern_v2"
+        )
+        store.close()
+
+        reopened = self._store()
+        self.assertIsNone(asyncio.run(reopened.get("entity:old_hash")))
+        self.assertIsNotNone(asyncio.run(reopened.get("entity:light.kitchen")))
+
+        # Databases from before models were recorded: unlabelled rows of
+        # embedded types are dropped once, other types are kept
+        reopened._db.execute("UPDATE vectors SET metadata = '{}'")
+        reopened._db.execute("PRAGMA user_version = 1")
+        reopened._db.commit()
+        reopened.close()
+        migrated = self._store()
+        ids = {row[0] for row in migrated._db.execute("SELECT id FROM vectors")}
+        self.assertEqual(ids, {"custom:1"})
+        self.assertEqual(asyncio.run(migrated.stats())["index"]["entries"], 1)
+
+    def _clustered_rows(self, n: int, dim: int = 32, clusters: int = 40):
+        import numpy as np
+
+        rng = np.random.default_rng(11)
+        centers = rng.normal(size=(clusters, dim))
+        vectors = centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.3, size=(n, dim))
+        return vectors.astype("float32")
+
+    def test_ivf_snapshot_is_mapped_and_layered_with_live_changes(self):
+        import numpy as np
+
+        vectors = self._clustered_rows(3000)
+        store = self._store(ann_min_entries=0)
+        store._db.executemany(
+            "INSERT INTO vectors (id, entry_type, vector, metadata, created_at, updated_at) "
+            "VALUES (?, 'pattern', ?, ?, '', '')",
+            [(f"pattern:p{i}", _pack_vector(v), json.dumps({"n": i})) for i, v in enumerate(vectors)],
+        )
+        store._db.commit()
+        store.close()
+        units = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        exact = [
+            [f"pattern:p{i}" for i in np.argsort(-(units @ units[q]))[:10]]
+            for q in range(0, 3000, 150)
+        ]
+
+        # First open with the index enabled builds the snapshot in the background
+        store = self._store(ann_min_entries=1000, ann_nprobe=8)
+        self.assertTrue(store.wait_for_ann(timeout=30))
+        stats = asyncio.run(store.stats())
+        self.assertEqual(stats["ann"]["pattern"]["entries"], 3000)
+        self.assertEqual(stats["index"]["entries"], 0)
+        store.close()
+
+        store = self._store(ann_min_entries=1000, ann_nprobe=8)
+        stats = asyncio.run(store.stats())
+        self.assertTrue(stats["ann"]["pattern"]["mmap"])
+        self.assertEqual(stats["index"]["entries"], 0)
+        approx = [
+            store.search_similar_sync(list(vectors[q]), limit=10, threshold=-1.0)
+            for q in range(0, 3000, 150)
+        ]
+        recall = sum(
+            len(set(e) & {h.id for h in a}) for e, a in zip(exact, approx)
+        ) / sum(len(e) for e in exact)
+        self.assertGreaterEqual(recall, 0.9)
+        self.assertEqual(approx[0][0].metadata, {"n": 0})
+
+        # Live changes shadow the snapshot and survive a restart
+        store.upsert_sync("pattern:p0", [-x for x in vectors[0].tolist()], "pattern", {"n": "new"})
+        asyncio.run(store.delete("pattern:p150"))
+        store.close()
+
+        store = self._store(ann_min_entries=1000, ann_nprobe=8)
+        stats = asyncio.run(store.stats())
+        self.assertEqual(stats["ann"]["pattern"]["tombstones"], 2)
+        self.assertEqual(stats["index"]["entries"], 1)
+        ids = [h.id for h in store.search_similar_sync(list(vectors[150]), limit=5, threshold=-1.0)]
+        self.assertNotIn("pattern:p150", ids)
+        hits = store.search_similar_sync([-x for x in vectors[0].tolist()], limit=1, threshold=0.99)
+        self.assertEqual([(h.id, h.metadata) for h in hits], [("pattern:p0", {"n": "new"})])
+        self.assertNotIn(
+            "pattern:p0",
+            [h.id for h in store.search_similar_sync(list(vectors[0]), limit=5, threshold=0.5)],
+        )
+
+        # A rebuild folds the changes back into a fresh snapshot
+        store.build_ann_index()
+        stats = asyncio.run(store.stats())
+        self.assertEqual(stats["ann"]["pattern"]["entries"], 2999)
+        self.assertEqual(stats["ann"]["pattern"]["tombstones"], 0)
+        self.assertEqual(stats["index"]["entries"], 0)
+        self.assertEqual(
+            len([f for f in os.listdir(self.db_path + ".ann") if f.endswith(".ids.json")]), 1
+        )
+
+        asyncio.run(store.clear("pattern"))
+        self.assertEqual(asyncio.run(store.stats())["ann"], {})
+        self.assertEqual(store.search_similar_sync(list(vectors[1]), threshold=-1.0), [])
+
+
 class TestVectorAPI(unittest.TestCase):
     """Test the Vector Store API endpoints."""
     